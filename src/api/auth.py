@@ -0,0 +1,166 @@
+"""
+API key authentication middleware
+Hash-indexed key lookup, short-TTL validated-key cache and per-key rate limits
+"""
+from typing import Iterable, Optional, Tuple
+from collections import OrderedDict
+from datetime import datetime
+import math
+import time
+
+from starlette.responses import JSONResponse
+
+from src.engines.enterprise_platform import APIKey, EnterprisePlatform, hash_api_key
+from src.api.rate_limit import LocalRateLimiter, RateLimitResult
+
+# Paths that never require a key (the path itself or anything below it)
+DEFAULT_PUBLIC_PATHS: Tuple[str, ...] = (
+    "/api/v1/health",
+    "/api/v1/about",
+    "/api/v1/metrics",
+    "/api/docs",
+    "/api/redoc",
+    "/openapi.json",
+    "/static",
+)
+
+
+class APIKeyCache:
+    """Bounded LRU of validated keys (key_hash -> APIKey) with a short TTL"""
+
+    def __init__(self, ttl: float = 30.0, max_size: int = 10000, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.clock = clock
+        self.entries: "OrderedDict[str, Tuple[APIKey, float]]" = OrderedDict()
+
+    def get(self, key_hash: str) -> Optional[APIKey]:
+        entry = self.entries.get(key_hash)
+        if entry is None:
+            return None
+        if entry[1] < self.clock():
+            del self.entries[key_hash]
+            return None
+        self.entries.move_to_end(key_hash)
+        return entry[0]
+
+    def put(self, key_hash: str, api_key: APIKey) -> None:
+        self.entries[key_hash] = (api_key, self.clock() + self.ttl)
+        self.entries.move_to_end(key_hash)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, key_hash: Optional[str] = None) -> None:
+        """Drop one key (e.g. after revocation) or the whole cache"""
+        if key_hash is None:
+            self.entries.clear()
+        else:
+            self.entries.pop(key_hash, None)
+
+
+class APIKeyAuthMiddleware:
+    """
+    Pure ASGI middleware authenticating requests by API key
+
+    The key is read from the X-API-Key header (or "Authorization: Bearer").
+    It is hashed with SHA-256 and resolved through the platform's hash index,
+    with validated keys cached for `cache_ttl` seconds. Each key is limited to
+    APIKey.rate_limit requests per hour by a token bucket; exhausted keys get
+    429 with Retry-After and X-RateLimit-* headers.
+
+    Requests without a key pass through unless `require_key` is set, in which
+    case only `public_paths` are reachable anonymously. The resolved key is
+    exposed to handlers as request.state.api_key.
+    """
+
+    def __init__(
+        self,
+        app,
+        platform: EnterprisePlatform,
+        limiter=None,
+        require_key: bool = False,
+        public_paths: Iterable[str] = DEFAULT_PUBLIC_PATHS,
+        cache_ttl: float = 30.0,
+        cache_size: int = 10000
+    ):
+        self.app = app
+        self.platform = platform
+        self.limiter = limiter or LocalRateLimiter()
+        self.require_key = require_key
+        self.public_paths = tuple(public_paths)
+        self.cache = APIKeyCache(ttl=cache_ttl, max_size=cache_size)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        presented = self._extract_key(scope)
+        if presented is None:
+            if self.require_key and not self._is_public(scope["path"]):
+                await self._reject(scope, receive, send, 401, "API key required")
+                return
+            await self.app(scope, receive, send)
+            return
+
+        api_key = self._resolve(hash_api_key(presented))
+        if api_key is None:
+            await self._reject(scope, receive, send, 401, "Invalid or expired API key")
+            return
+
+        result = await self.limiter.acquire(
+            api_key.key_id, api_key.rate_limit, api_key.rate_limit / 3600.0
+        )
+        headers = self._rate_limit_headers(result)
+        if not result.allowed:
+            headers.append((b"retry-after", str(math.ceil(result.retry_after)).encode()))
+            await self._reject(scope, receive, send, 429, "Rate limit exceeded", headers)
+            return
+
+        scope.setdefault("state", {})["api_key"] = api_key
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + headers
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _resolve(self, key_hash: str) -> Optional[APIKey]:
+        """Resolve a key hash to a valid APIKey via the cache, then the index"""
+        api_key = self.cache.get(key_hash)
+        if api_key is None:
+            api_key = self.platform.lookup_api_key(key_hash)
+            if api_key is None:
+                return None
+            self.cache.put(key_hash, api_key)
+
+        return api_key if api_key.is_valid(datetime.utcnow()) else None
+
+    def _is_public(self, path: str) -> bool:
+        """Match whole path segments so /api/v1/health-internal stays protected"""
+        return any(path == p or path.startswith(p + "/") for p in self.public_paths)
+
+    @staticmethod
+    def _extract_key(scope) -> Optional[str]:
+        for name, value in scope.get("headers", ()):
+            if name == b"x-api-key":
+                return value.decode("latin-1")
+            if name == b"authorization" and value[:7].lower() == b"bearer ":
+                return value[7:].decode("latin-1").strip()
+        return None
+
+    @staticmethod
+    def _rate_limit_headers(result: RateLimitResult) -> list:
+        return [
+            (b"x-ratelimit-limit", str(result.limit).encode()),
+            (b"x-ratelimit-remaining", str(result.remaining).encode()),
+        ]
+
+    @staticmethod
+    async def _reject(scope, receive, send, status: int, detail: str, headers: Optional[list] = None):
+        response = JSONResponse({"detail": detail}, status_code=status)
+        if headers:
+            response.raw_headers.extend(headers)
+        await response(scope, receive, send)
+
@@ -0,0 +1,130 @@
+"""
+Request coalescing (single-flight)
+Identical concurrent requests share one execution of the underlying work
+"""
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import hashlib
+import json
+
+from src.utils.metrics import REGISTRY, MetricsRegistry
+
+# Coalescing scopes
+SCOPE_OFF = "off"  # Never coalesce
+SCOPE_TENANT = "tenant"  # Coalesce identical requests from the same organization
+SCOPE_GLOBAL = "global"  # Coalesce identical requests across all callers
+
+ANONYMOUS_TENANT = "anonymous"
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls by key
+
+    The first caller for a key (the leader) starts the work as a task; callers
+    arriving while it is in flight await the same task. The key is released
+    as soon as the work finishes, so results are never cached beyond the
+    lifetime of the call. Work runs shielded: a cancelled caller does not
+    cancel the shared execution for everyone else.
+    """
+
+    def __init__(self):
+        self.in_flight: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, work: Callable[[], Awaitable[Any]]) -> tuple:
+        """
+        Run `work` once per key among concurrent callers
+
+        Returns:
+            (result, shared) where shared is True if another caller led
+        """
+        task = self.in_flight.get(key)
+        if task is not None:
+            return await asyncio.shield(task), True
+
+        task = asyncio.ensure_future(work())
+        self.in_flight[key] = task
+        task.add_done_callback(lambda _: self._release(key, task))
+        return await asyncio.shield(task), False
+
+    def _release(self, key: str, task: asyncio.Future) -> None:
+        if self.in_flight.get(key) is task:
+            del self.in_flight[key]
+        if not task.cancelled():
+            task.exception()  # Mark retrieved so abandoned failures are not logged
+
+
+def request_key(route: str, body: Any, tenant: Optional[str]) -> str:
+    """Canonical hash of (route, body, tenant); key order in the body is irrelevant"""
+    canonical = json.dumps(body, sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.sha256()
+    digest.update(route.encode())
+    digest.update(b"\0")
+    digest.update((tenant or "").encode())
+    digest.update(b"\0")
+    digest.update(canonical.encode())
+    return digest.hexdigest()
+
+
+class RequestCoalescer:
+    """
+    Coalesces identical in-flight API requests per route
+
+    Args:
+        scopes: Route path -> scope (off, tenant, global)
+        default_scope: Scope for routes not listed in `scopes`
+        registry: Metrics registry for coalescing counters
+    """
+
+    def __init__(
+        self,
+        scopes: Optional[Dict[str, str]] = None,
+        default_scope: str = SCOPE_TENANT,
+        registry: MetricsRegistry = REGISTRY
+    ):
+        self.scopes = dict(scopes or {})
+        self.default_scope = default_scope
+        self.flights = SingleFlight()
+        self.executed = registry.counter(
+            "coalescing_executions_total",
+            "Requests that executed generation work (single-flight leaders)",
+            ("route",),
+        )
+        self.collapsed = registry.counter(
+            "coalescing_collapsed_total",
+            "Requests served from another in-flight request's result",
+            ("route",),
+        )
+
+    def set_scope(self, route: str, scope: str) -> None:
+        if scope not in (SCOPE_OFF, SCOPE_TENANT, SCOPE_GLOBAL):
+            raise ValueError(f"Unknown coalescing scope: {scope}")
+        self.scopes[route] = scope
+
+    async def run(
+        self,
+        route: str,
+        body: Any,
+        work: Callable[[], Awaitable[Any]],
+        tenant: Optional[str] = None
+    ) -> Any:
+        """
+        Execute `work` for a request, sharing the result with identical
+        concurrent requests according to the route's scope
+        """
+        scope = self.scopes.get(route, self.default_scope)
+        if scope == SCOPE_OFF:
+            self.executed.labels(route).inc()
+            return await work()
+
+        tenant_key = (tenant or ANONYMOUS_TENANT) if scope == SCOPE_TENANT else None
+        key = request_key(route, body, tenant_key)
+        result, shared = await self.flights.do(key, work)
+        (self.collapsed if shared else self.executed).labels(route).inc()
+        return result
+
+
+def tenant_of(request) -> str:
+    """Organization of the authenticated API key, if any"""
+    api_key = getattr(request.state, "api_key", None)
+    return api_key.organization_id if api_key else ANONYMOUS_TENANT
@@ -2,12 +2,30 @@
 AI Film Studio API - Enterprise Studio Operating System
 Main API entry point with all engine integrations
 """
-from fastapi import FastAPI, Depends, HTTPException, Header
+from fastapi import FastAPI, Depends, HTTPException, Header, Query, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse, PlainTextResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from src.utils.logger import setup_logger
-from src.config.settings import API_HOST, API_PORT
+from src.utils.metrics import REGISTRY
+from src.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from src.utils.serialization import JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE
+from src.api.metrics import MetricsMiddleware
+from src.api.auth import APIKeyAuthMiddleware
+from src.api.rate_limit import LocalRateLimiter, RedisRateLimiter
+from src.api.coalescing import RequestCoalescer, SCOPE_TENANT, tenant_of
+from src.config.settings import (
+    API_HOST,
+    API_PORT,
+    CHARACTER_SNAPSHOT_PATH,
+    SCRIPT_STREAM_THRESHOLD,
+    API_AUTH_REQUIRED,
+    API_KEY_CACHE_TTL,
+    RATE_LIMIT_BACKEND,
+    REDIS_URL
+)
+from typing import Optional
+from contextlib import asynccontextmanager
 from src.engines import (
     CharacterEngine,
     WritingEngine,
@@ -25,12 +43,43 @@ logger = setup_logger(__name__)
 # Version constant
 VERSION = "0.1.0"
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm-start characters from a snapshot; write back cached character edits on shutdown"""
+    if CHARACTER_SNAPSHOT_PATH and os.path.exists(CHARACTER_SNAPSHOT_PATH) and not len(character_engine.characters):
+        with open(CHARACTER_SNAPSHOT_PATH, "rb") as snapshot:
+            character_engine.restore_snapshot(snapshot)
+    yield
+    character_engine.characters.close()
+
+
 app = FastAPI(
     title="AI Film Studio API",
     description="Enterprise AI-native studio operating system for film, TV, and brand content",
     version=VERSION,
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    lifespan=lifespan
+)
+
+# Initialize engines
+character_engine = CharacterEngine()
+writing_engine = WritingEngine()
+preproduction_engine = PreProductionEngine(character_engine=character_engine)
+production_manager = ProductionManager()
+production_layer = ProductionLayer(character_engine=character_engine)
+postproduction_engine = PostProductionEngine()
+marketing_engine = MarketingEngine()
+enterprise_platform = EnterprisePlatform()
+
+# API key authentication with per-key token-bucket rate limiting
+app.add_middleware(
+    APIKeyAuthMiddleware,
+    platform=enterprise_platform,
+    limiter=RedisRateLimiter.from_url(REDIS_URL) if RATE_LIMIT_BACKEND == "redis" else LocalRateLimiter(),
+    require_key=API_AUTH_REQUIRED,
+    cache_ttl=API_KEY_CACHE_TTL,
 )
 
 # CORS middleware
@@ -42,15 +91,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize engines
-character_engine = CharacterEngine()
-writing_engine = WritingEngine()
-preproduction_engine = PreProductionEngine()
-production_manager = ProductionManager()
-production_layer = ProductionLayer()
-postproduction_engine = PostProductionEngine()
-marketing_engine = MarketingEngine()
-enterprise_platform = EnterprisePlatform()
+# Per-route latency, size and status metrics (exposed at /api/v1/metrics)
+app.add_middleware(MetricsMiddleware)
+
+# Single-flight coalescing of identical concurrent generation requests.
+# Results carry per-organization job IDs and outputs, so requests are only
+# coalesced within one organization.
+coalescer = RequestCoalescer(scopes={
+    "/api/v1/marketing/poster": SCOPE_TENANT,
+    "/api/v1/post-production/voice": SCOPE_TENANT,
+})
+
 
 # Mount static files
 static_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "static")
@@ -83,6 +134,11 @@ async def health_check():
         }
     }
 
+@app.get("/api/v1/metrics")
+async def metrics():
+    """Prometheus-compatible metrics in text exposition format"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/api/v1/about")
 async def about():
     """About endpoint with application information"""
@@ -111,16 +167,46 @@ async def about():
         ]
     }
 
+async def _paginate(page):
+    """Await an engine page query, reporting bad cursors as 400"""
+    try:
+        return await page
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 # Character Engine endpoints
+@app.get("/api/v1/characters")
+async def list_characters(
+    project_id: Optional[str] = None,
+    mode: Optional[str] = None,
+    brand_id: Optional[str] = None,
+    character_type: Optional[str] = None,
+    order_by: str = "created_at",
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    versions: bool = True
+):
+    """
+    List characters (cursor-paginated; order_by=-updated_at for most recently edited first)
+
+    versions=false leaves out each character's version history.
+    """
+    page = await _paginate(character_engine.list_characters_page(
+        project_id=project_id, mode=mode, brand_id=brand_id, character_type=character_type,
+        order_by=order_by, cursor=cursor, limit=limit
+    ))
+    return Response(character_engine.page_to_json(page, include_versions=versions), media_type=JSON_MEDIA_TYPE)
+
 @app.post("/api/v1/characters")
 async def create_character(character_data: dict):
     """Create a new character"""
     return await character_engine.create_character(**character_data)
 
 @app.get("/api/v1/characters/{character_id}")
-async def get_character(character_id: str):
-    """Get character by ID"""
-    return await character_engine.get_character(character_id)
+async def get_character(character_id: str, versions: bool = True):
+    """Get character by ID (versions=false leaves out the version history)"""
+    character = await character_engine.get_character(character_id)
+    return Response(character_engine.to_json(character, include_versions=versions), media_type=JSON_MEDIA_TYPE)
 
 # Writing Engine endpoints
 @app.post("/api/v1/scripts")
@@ -129,9 +215,148 @@ async def create_script(script_data: dict):
     return await writing_engine.generate_script(**script_data)
 
 @app.get("/api/v1/scripts/{script_id}")
-async def get_script(script_id: str):
-    """Get script by ID"""
-    return await writing_engine.get_script(script_id)
+async def get_script(
+    script_id: str,
+    fields: Optional[str] = None,
+    exclude: Optional[str] = None,
+    scene_offset: int = Query(0, ge=0),
+    scene_limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    dialogue_offset: int = Query(0, ge=0),
+    dialogue_limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    stream: Optional[bool] = None
+):
+    """
+    Get script by ID
+
+    Supports sparse fieldsets (fields/exclude as comma-separated dotted paths)
+    and scene/dialogue pagination. Large scripts are streamed as incrementally
+    encoded JSON unless stream=false.
+    """
+    script = await writing_engine.get_script(script_id)
+    view = dict(
+        fields=fields,
+        exclude=exclude,
+        scene_offset=scene_offset,
+        scene_limit=scene_limit,
+        dialogue_offset=dialogue_offset,
+        dialogue_limit=dialogue_limit
+    )
+
+    if stream is None:
+        stream = len(script.scenes) > SCRIPT_STREAM_THRESHOLD
+
+    if stream:
+        return StreamingResponse(
+            writing_engine.iter_script_json(script_id, **view),
+            media_type="application/json"
+        )
+
+    if any(v for v in view.values()):
+        return await writing_engine.get_script_view(script_id, **view)
+
+    return script
+
+@app.get("/api/v1/scripts/{script_id}/scenes")
+async def list_script_scenes(
+    script_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    location: Optional[str] = None
+):
+    """List scenes of a script (paginated), optionally at one location"""
+    return await writing_engine.list_scenes(
+        script_id, offset=offset, limit=limit, fields=fields, location=location
+    )
+
+@app.get("/api/v1/scripts/{script_id}/dialogues")
+async def list_script_dialogues(
+    script_id: str,
+    scene_id: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    character_id: Optional[str] = None
+):
+    """List dialogue lines of a script (paginated), optionally for one scene or character"""
+    return await writing_engine.list_dialogues(
+        script_id, scene_id=scene_id, offset=offset, limit=limit, fields=fields,
+        character_id=character_id
+    )
+
+@app.get("/api/v1/scripts/{script_id}/fountain")
+async def export_script_fountain(script_id: str):
+    """Export a script as Fountain, streamed scene by scene"""
+    script = await writing_engine.get_script(script_id)
+    return StreamingResponse(
+        writing_engine.iter_fountain_export(script),
+        media_type="text/plain; charset=utf-8"
+    )
+
+@app.get("/api/v1/scripts/{script_id}/export")
+async def export_script(script_id: str, format: str = Query("json", pattern="^(json|msgpack)$")):
+    """Export a complete script as compact JSON or MessagePack"""
+    script = await writing_engine.get_script(script_id)
+    if format == "msgpack":
+        return Response(writing_engine.export_to_msgpack(script), media_type=MSGPACK_MEDIA_TYPE)
+    return Response(writing_engine.export_to_json(script, indent=None), media_type=JSON_MEDIA_TYPE)
+
+@app.post("/api/v1/scripts/import")
+async def import_script(request: Request):
+    """Import a script exported by /export (JSON or application/msgpack body)"""
+    body = await request.body()
+    try:
+        if request.headers.get("content-type", "").startswith(MSGPACK_MEDIA_TYPE):
+            script = writing_engine.import_from_msgpack(body)
+        else:
+            script = writing_engine.import_from_json(body)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"script_id": script.script_id, "scene_count": len(script.scenes)}
+
+@app.get("/api/v1/scripts/{script_id}/storyboard")
+async def stream_storyboard(
+    script_id: str,
+    style: Optional[str] = None,
+    concurrency: Optional[int] = Query(None, ge=1, le=64)
+):
+    """Storyboard frames as newline-delimited JSON, streamed as each scene finishes"""
+    await writing_engine.get_script(script_id)
+
+    async def frames():
+        async for frame in writing_engine.iter_storyboard(script_id, style=style, concurrency=concurrency):
+            yield frame.model_dump_json().encode() + b"\n"
+
+    return StreamingResponse(frames(), media_type="application/x-ndjson")
+
+@app.get("/api/v1/scripts/{script_id}/analytics")
+async def get_script_analytics(script_id: str):
+    """Script totals, re-analyzing only scenes edited since the last request"""
+    return writing_engine.get_script_analytics(script_id)
+
+@app.get("/api/v1/search")
+async def search_scripts(
+    q: str = "",
+    kind: Optional[str] = None,
+    script_id: Optional[str] = None,
+    script_type: Optional[str] = None,
+    genre: Optional[str] = None,
+    character_id: Optional[str] = None,
+    project_id: Optional[str] = None,
+    location: Optional[str] = None,
+    facets: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE)
+):
+    """Full-text search over scripts, scenes and dialogue lines with facet filters"""
+    try:
+        return writing_engine.search_scripts(
+            q, kind=kind, script_id=script_id, script_type=script_type, genre=genre,
+            character_id=character_id, project_id=project_id, location=location,
+            limit=limit, offset=offset, facets=facets.split(",") if facets else None
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 # Production Management endpoints
 @app.post("/api/v1/projects")
@@ -144,6 +369,31 @@ async def get_project(project_id: str):
     """Get project by ID"""
     return await production_manager.get_project(project_id)
 
+@app.get("/api/v1/projects/{project_id}/assets")
+async def list_project_assets(
+    project_id: str,
+    asset_type: Optional[str] = None,
+    status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+):
+    """List a project's production assets (cursor-paginated)"""
+    return await _paginate(production_manager.get_project_assets_page(
+        project_id, asset_type=asset_type, status=status, cursor=cursor, limit=limit
+    ))
+
+@app.get("/api/v1/projects/{project_id}/marketing-assets")
+async def list_marketing_assets(
+    project_id: str,
+    asset_type: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+):
+    """List a project's marketing assets (cursor-paginated)"""
+    return await _paginate(marketing_engine.get_marketing_assets_page(
+        project_id, asset_type=asset_type, cursor=cursor, limit=limit
+    ))
+
 # Production Layer endpoints
 @app.post("/api/v1/production/upload-footage")
 async def upload_footage(footage_data: dict):
@@ -155,13 +405,30 @@ async def generate_shot(shot_data: dict):
     """Generate AI shot"""
     return await production_layer.generate_ai_shot(**shot_data)
 
+@app.get("/api/v1/production/scenes/{scene_id}/shots")
+async def list_scene_shots(
+    scene_id: str,
+    shot_type: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+):
+    """List a scene's shots (cursor-paginated)"""
+    return await _paginate(production_layer.get_scene_shots_page(
+        scene_id, shot_type=shot_type, cursor=cursor, limit=limit
+    ))
+
 # Post-Production endpoints
 @app.post("/api/v1/post-production/voice")
-async def generate_voice(voice_data: dict):
-    """Generate character-aware voice"""
-    return await postproduction_engine.generate_character_voice(
-        postproduction_engine.SceneAwareVoiceRequest(**voice_data),
-        voice_data.get("job_id", "default")
+async def generate_voice(voice_data: dict, request: Request):
+    """Generate character-aware voice (identical concurrent requests are coalesced)"""
+    return await coalescer.run(
+        "/api/v1/post-production/voice",
+        voice_data,
+        lambda: postproduction_engine.generate_character_voice(
+            postproduction_engine.SceneAwareVoiceRequest(**voice_data),
+            voice_data.get("job_id", "default")
+        ),
+        tenant=tenant_of(request)
     )
 
 @app.post("/api/v1/post-production/music")
@@ -179,9 +446,14 @@ async def generate_trailer(trailer_data: dict):
     return await marketing_engine.generate_trailer(**trailer_data)
 
 @app.post("/api/v1/marketing/poster")
-async def generate_poster(poster_data: dict):
-    """Generate poster"""
-    return await marketing_engine.generate_poster(**poster_data)
+async def generate_poster(poster_data: dict, request: Request):
+    """Generate poster (identical concurrent requests are coalesced)"""
+    return await coalescer.run(
+        "/api/v1/marketing/poster",
+        poster_data,
+        lambda: marketing_engine.generate_poster(**poster_data),
+        tenant=tenant_of(request)
+    )
 
 # Enterprise Platform endpoints
 @app.post("/api/v1/organizations")
@@ -0,0 +1,84 @@
+"""
+Request metrics middleware
+Per-route latency/size histograms, status counters and in-flight gauge
+"""
+import time
+
+from src.utils.metrics import REGISTRY, MetricsRegistry, SIZE_BUCKETS
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording per-route request metrics
+
+    Routes are labelled by their template (e.g. /api/v1/scripts/{script_id}),
+    never by the raw path, so series cardinality is bounded by the route
+    table. Requests that match no route share a single label.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry = REGISTRY):
+        self.app = app
+        self.duration = registry.histogram(
+            "http_request_duration_seconds",
+            "HTTP request latency by route",
+            ("method", "route"),
+        )
+        self.response_size = registry.histogram(
+            "http_response_size_bytes",
+            "HTTP response body size by route",
+            ("method", "route"),
+            buckets=SIZE_BUCKETS,
+        )
+        self.request_size = registry.histogram(
+            "http_request_size_bytes",
+            "HTTP request body size (Content-Length) by route",
+            ("method", "route"),
+            buckets=SIZE_BUCKETS,
+        )
+        self.requests = registry.counter(
+            "http_requests_total",
+            "HTTP requests by route and status code",
+            ("method", "route", "status"),
+        )
+        self.in_flight = registry.gauge(
+            "http_requests_in_flight",
+            "HTTP requests currently being served",
+        ).labels()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        state = [500, 0]  # status, response bytes
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state[0] = message["status"]
+            elif message["type"] == "http.response.body":
+                state[1] += len(message.get("body", b""))
+            await send(message)
+
+        self.in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.in_flight.dec()
+            self._record(scope, state[0], state[1], time.perf_counter() - start)
+
+    def _record(self, scope, status: int, response_bytes: int, elapsed: float) -> None:
+        route = scope.get("route")
+        template = getattr(route, "path", None) or UNMATCHED_ROUTE
+        method = scope["method"]
+
+        self.duration.labels(method, template).observe(elapsed)
+        self.response_size.labels(method, template).observe(response_bytes)
+        self.requests.labels(method, template, str(status)).inc()
+
+        for name, value in scope.get("headers", ()):
+            if name == b"content-length":
+                self.request_size.labels(method, template).observe(int(value))
+                break
@@ -0,0 +1,147 @@
+"""
+Token-bucket rate limiting
+In-memory limiter for single-process deployments and a Redis-backed limiter
+shared across API pods
+"""
+from typing import Dict, List, NamedTuple, Tuple
+import math
+import time
+
+
+class RateLimitResult(NamedTuple):
+    """Outcome of a rate limit check"""
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float  # Seconds until one token is available (0 if allowed)
+
+
+def refill(
+    tokens: float,
+    last: float,
+    now: float,
+    capacity: int,
+    rate: float,
+    cost: int = 1
+) -> Tuple[bool, float]:
+    """
+    Apply one token-bucket step
+
+    Args:
+        tokens: Tokens left after the previous step
+        last: Timestamp of the previous step
+        now: Current timestamp
+        capacity: Bucket size (burst)
+        rate: Refill rate in tokens per second
+        cost: Tokens consumed by this request
+
+    Returns:
+        (allowed, tokens_after)
+    """
+    if rate <= 0:
+        # A bucket that never refills is a blocked key, not a one-off burst
+        return False, 0.0
+    tokens = min(capacity, tokens + max(0.0, now - last) * rate)
+    if tokens >= cost:
+        return True, tokens - cost
+    return False, tokens
+
+
+def _result(allowed: bool, tokens: float, capacity: int, rate: float, cost: int) -> RateLimitResult:
+    retry_after = 0.0 if allowed else (cost - tokens) / rate if rate > 0 else math.inf
+    return RateLimitResult(allowed, capacity, int(tokens), retry_after)
+
+
+class LocalRateLimiter:
+    """
+    In-process token buckets keyed by an arbitrary string (e.g. API key ID)
+
+    State is two floats per key, so checks are a dict lookup and some
+    arithmetic. Only suitable when a single process serves all traffic.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.buckets: Dict[str, List[float]] = {}  # key -> [tokens, last]
+
+    async def acquire(self, key: str, capacity: int, rate: float, cost: int = 1) -> RateLimitResult:
+        """Consume `cost` tokens from the bucket for `key` if available"""
+        now = self.clock()
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = [float(capacity), now]
+
+        allowed, tokens = refill(bucket[0], bucket[1], now, capacity, rate, cost)
+        bucket[0] = tokens
+        bucket[1] = now
+        return _result(allowed, tokens, capacity, rate, cost)
+
+    def reset(self, key: str) -> None:
+        self.buckets.pop(key, None)
+
+
+# Atomic token-bucket step. KEYS[1] = bucket key;
+# ARGV = capacity, rate (tokens/s), now (s), cost
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+if rate <= 0 then
+    return {0, '0'}
+end
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisRateLimiter:
+    """
+    Token buckets shared across processes via Redis
+
+    Each check is a single EVALSHA round trip running TOKEN_BUCKET_SCRIPT,
+    so concurrent pods cannot over-spend a bucket. Works with any async
+    client exposing redis-py's script_load/evalsha (e.g. redis.asyncio).
+    """
+
+    def __init__(self, client, prefix: str = "ratelimit:", clock=time.time):
+        self.client = client
+        self.prefix = prefix
+        self.clock = clock
+        self._sha = None
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisRateLimiter":
+        """Create a limiter from a redis:// URL (requires the redis package)"""
+        import redis.asyncio as redis_asyncio
+        return cls(redis_asyncio.from_url(url), **kwargs)
+
+    async def acquire(self, key: str, capacity: int, rate: float, cost: int = 1) -> RateLimitResult:
+        """Consume `cost` tokens from the shared bucket for `key` if available"""
+        args = (1, self.prefix + key, capacity, rate, self.clock(), cost)
+        if self._sha is None:
+            self._sha = await self.client.script_load(TOKEN_BUCKET_SCRIPT)
+
+        try:
+            allowed, tokens = await self.client.evalsha(self._sha, *args)
+        except Exception as e:
+            # Script cache is flushed when Redis restarts; reload once
+            if "NOSCRIPT" not in str(e):
+                raise
+            self._sha = await self.client.script_load(TOKEN_BUCKET_SCRIPT)
+            allowed, tokens = await self.client.evalsha(self._sha, *args)
+
+        return _result(bool(int(allowed)), float(tokens), capacity, rate, cost)
+
+    async def reset(self, key: str) -> None:
+        await self.client.delete(self.prefix + key)
@@ -21,3 +21,56 @@ PROCESSED_DATA_DIR = DATA_DIR / "processed"
 # Logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOG_DIR = BASE_DIR / "logs"
+
+# API Serialization
+# Scripts with more scenes than this are streamed as incrementally encoded JSON
+SCRIPT_STREAM_THRESHOLD = int(os.getenv("SCRIPT_STREAM_THRESHOLD", 200))
+
+# API Authentication
+# When true, every non-public route requires an X-API-Key header
+API_AUTH_REQUIRED = os.getenv("API_AUTH_REQUIRED", "false").lower() == "true"
+API_KEY_CACHE_TTL = float(os.getenv("API_KEY_CACHE_TTL", 30))
+# "local" (in-process token buckets) or "redis" (shared across pods)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "local")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# LLM Gateway
+# OpenAI-compatible endpoint; when unset the engines' built-in client is used
+LLM_BASE_URL = os.getenv("LLM_BASE_URL")
+LLM_API_KEY = os.getenv("LLM_API_KEY")
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+# Prompts per provider call; >1 batches through /v1/completions
+LLM_MAX_BATCH_SIZE = int(os.getenv("LLM_MAX_BATCH_SIZE", 1))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 3))
+# SQLite file for the response cache (":memory:" keeps it per process)
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ":memory:")
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+# Prompt token budget for script context (estimated locally, completion tokens excluded)
+LLM_CONTEXT_TOKENS = int(os.getenv("LLM_CONTEXT_TOKENS", 8000))
+
+# Script Search
+# Saved search index segment, memory-mapped by WritingEngine at startup
+SEARCH_INDEX_PATH = os.getenv("SEARCH_INDEX_PATH")
+
+# Storyboards
+# Scenes rendered concurrently per storyboard run, and cached scene renders
+STORYBOARD_CONCURRENCY = int(os.getenv("STORYBOARD_CONCURRENCY", 8))
+STORYBOARD_CACHE_SCENES = int(os.getenv("STORYBOARD_CACHE_SCENES", 2048))
+
+# Character Repository
+# SQLite file for characters (unset keeps them in memory); hot characters cached in memory
+CHARACTER_DB_PATH = os.getenv("CHARACTER_DB_PATH")
+CHARACTER_CACHE_SIZE = int(os.getenv("CHARACTER_CACHE_SIZE", 1024))
+# Binary character snapshot loaded at API startup when the repository is empty (warm start)
+CHARACTER_SNAPSHOT_PATH = os.getenv("CHARACTER_SNAPSHOT_PATH")
+
+# Character Image Generation
+# Images per image-backend request, and backend requests in flight per engine
+IMAGE_BATCH_SIZE = int(os.getenv("IMAGE_BATCH_SIZE", 16))
+IMAGE_CONCURRENCY = int(os.getenv("IMAGE_CONCURRENCY", 4))
+
+# Character Identity Embeddings
+# .npy file memory-mapped for version embeddings (unset keeps them in memory)
+IDENTITY_INDEX_PATH = os.getenv("IDENTITY_INDEX_PATH")
+IDENTITY_EMBEDDING_DIM = int(os.getenv("IDENTITY_EMBEDDING_DIM", 256))
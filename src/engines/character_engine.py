@@ -2,13 +2,25 @@
 Character Engine - Core Module
 Characters are first-class assets with identity locking, versions, and consistency
 """
-from typing import Optional, Dict, List, Any, Literal
-from pydantic import BaseModel, Field
+from typing import Optional, Dict, List, Set, Any, Literal, Iterable, Tuple, Union, Callable, TextIO, BinaryIO, AsyncIterator
+from pydantic import BaseModel, Field, PrivateAttr
 from enum import Enum
+from collections import OrderedDict
 from datetime import datetime
+from urllib.parse import urlparse
+import gc
 import uuid
 import logging
 
+from ..utils.metrics import timed
+from ..utils.pagination import CursorIndex, Page, DEFAULT_PAGE_SIZE
+from .character_graph import CharacterGraph
+from .character_scenes import SceneAssignmentIndex
+from .character_store import CharacterRepository, MemoryCharacterRepository, index_attrs
+from .character_renders import ImageBatch, BatchRenderer, PlaceholderImageGenerator, frame_records
+from .character_versions import VersionIndex, compact_versions, expand_versions
+from .character_snapshot import write_snapshot, read_snapshot
+
 logger = logging.getLogger(__name__)
 
 
@@ -44,6 +56,7 @@ class CharacterIdentity(BaseModel):
     personality_traits: List[str] = Field(default_factory=list)
     cultural_context: Optional[str] = None
     voice_id: Optional[str] = None  # Links to voice synthesis
+    revision: int = 0  # Bumped on every identity edit; keys the compiled identity prompt
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -59,6 +72,7 @@ class CharacterVisual(BaseModel):
     wardrobe: Optional[str] = None
     makeup: Optional[str] = None
     aging: Optional[str] = None  # young, adult, elderly
+    consistency_score: Optional[float] = None  # Cosine similarity to the character's identity
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
 
@@ -89,15 +103,93 @@ class Character(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     metadata: Dict[str, Any] = Field(default_factory=dict)
+    lineage: List[str] = Field(default_factory=list)  # Characters this was cloned from, original source first
+
+    # Version positions by ID and type; versions are append-only, add them with add_version()
+    _version_index: Optional[VersionIndex] = PrivateAttr(default=None)  # Built on first lookup
+    # Copy-on-write after cloning: the versions before _shared_upto share their visuals and scene
+    # assignments with clones (or with this clone's source) until this character modifies them
+    _shared_upto: int = PrivateAttr(default=0)
+    _copied: Optional[Set[int]] = PrivateAttr(default=None)  # Shared positions already copied
+
+    def __eq__(self, other: Any) -> bool:
+        # Fields only: the private attributes hold derived lookup and copy-on-write state
+        if isinstance(other, Character):
+            return self.__dict__ == other.__dict__
+        return NotImplemented
+
+    def _versions_by(self) -> VersionIndex:
+        # Direct read: pydantic's __getattr__ fallback for private attributes dominates a lookup
+        private = self.__pydantic_private__
+        index = private["_version_index"]
+        if index is None:
+            index = private["_version_index"] = VersionIndex()
+        return index
+
+    def share_versions(self) -> None:
+        """Freeze the current versions' contents so a clone can share them"""
+        private = self.__pydantic_private__
+        private["_shared_upto"] = len(self.versions)
+        private["_copied"] = set()
+
+    def fork(self, character_id: str, **update: Any) -> "Character":
+        """
+        Copy of this character under a new ID, sharing its version contents
+
+        Each version of the copy is a shallow copy with a new version ID and
+        the new owner; visuals and scene assignments stay shared with this
+        character until either side modifies the version (edit_version()).
+
+        Args:
+            character_id: ID of the copy
+            **update: Other fields to set on the copy
+
+        Returns:
+            The copy, versions in the same order as this character's
+        """
+        self.share_versions()
+        version_ids: Dict[str, str] = {}
+        versions = []
+        for version in self.versions:
+            version_ids[version.version_id] = new_version_id = str(uuid.uuid4())
+            versions.append(version.model_copy(update={"version_id": new_version_id, "character_id": character_id}))
+        forked = self.model_copy(update={
+            **update,
+            "character_id": character_id,
+            "versions": versions,
+            "active_version_id": version_ids.get(self.active_version_id)
+        })
+        forked.__pydantic_private__["_version_index"] = None  # model_copy shares this character's
+        forked.share_versions()
+        return forked
 
     def get_active_version(self) -> Optional[CharacterVersion]:
         """Get the currently active character version"""
         if not self.active_version_id:
             return None
-        for version in self.versions:
-            if version.version_id == self.active_version_id:
-                return version
-        return None
+        return self._versions_by().get(self.versions, self.active_version_id)
+
+    def get_version(self, version_id: str) -> Optional[CharacterVersion]:
+        """Get a version by ID"""
+        return self._versions_by().get(self.versions, version_id)
+
+    def edit_version(self, version_id: Optional[str]) -> Optional[CharacterVersion]:
+        """
+        Get a version to modify in place
+
+        A version shared with a clone (or with this clone's source) is first
+        replaced by a private copy, so the change stays with this character.
+        """
+        version = self.get_version(version_id)
+        if version is None:
+            return None
+        private = self.__pydantic_private__
+        position = private["_version_index"].by_id[version_id]
+        if position < private["_shared_upto"] and position not in private["_copied"]:
+            version = version.model_copy(deep=True)
+            self.versions[position] = version
+            private["_copied"].add(position)
+        return version
 
     def add_version(self, version: CharacterVersion) -> None:
         """Add a new character version"""
@@ -108,10 +200,16 @@ class Character(BaseModel):
 
     def get_version_by_type(self, version_type: CharacterVersionType) -> Optional[CharacterVersion]:
         """Get version by type"""
-        for version in self.versions:
-            if version.version_type == version_type:
-                return version
-        return None
+        return self._versions_by().first_of_type(self.versions, version_type)
+
+    def compact_history(self) -> List[List[Any]]:
+        """Versions as compact history: the first whole, later ones as deltas against their predecessor"""
+        return compact_versions(self.versions)
+
+    def restore_history(self, records: Iterable[List[Any]]) -> None:
+        """Replace the versions with those rebuilt from compact_history() records"""
+        self.versions = expand_versions(records, CharacterVersion)
+        self.__pydantic_private__["_shared_upto"] = 0
 
 
 class CharacterConsistencyConfig(BaseModel):
@@ -122,6 +220,21 @@ class CharacterConsistencyConfig(BaseModel):
     emotion_control: bool = True
     wardrobe_consistency: bool = True
     scene_continuity: bool = True
+    identity_threshold: float = 0.8  # Generations scoring below this are flagged as drifting
+
+
+# Character attributes list_characters can filter on (any combination)
+CHARACTER_INDEX_FIELDS = ("project_id", "mode", "brand_id", "character_type")
+
+# list_characters orderings; a leading "-" means newest first
+CharacterOrder = Literal["created_at", "-created_at", "updated_at", "-updated_at"]
+
+# Compiled identity prompt blocks and reference embeddings kept per engine
+IDENTITY_CACHE_SIZE = 4096
+
+# Serializer exclusions leaving out version history (of a character, or of every item of a page)
+WITHOUT_VERSIONS = {"versions"}
+PAGE_WITHOUT_VERSIONS = {"items": {"__all__": WITHOUT_VERSIONS}}
 
 
 class CharacterEngine:
@@ -136,12 +249,100 @@ class CharacterEngine:
     - Scene-to-scene continuity
     """
     
-    def __init__(self, s3_bucket: str = "ai-film-studio-characters"):
+    def __init__(
+        self,
+        s3_bucket: str = "ai-film-studio-characters",
+        embedder: Optional[Callable] = None,
+        repository: Optional[CharacterRepository] = None,
+        image_generator: Optional[Any] = None
+    ):
+        from ..config.settings import IMAGE_BATCH_SIZE, IMAGE_CONCURRENCY
+        
         self.s3_bucket = s3_bucket
-        self.characters: Dict[str, Character] = {}
+        # Image backend: async generate(ImageBatch) -> one URL per image
+        self.image_generator = image_generator or PlaceholderImageGenerator(s3_bucket)
+        self.renderer = BatchRenderer(self._generate_images, IMAGE_BATCH_SIZE, IMAGE_CONCURRENCY)
+        self.embedder = embedder  # visuals -> embedding matrix (default: HashingEmbedder)
+        self._identity_index = None
+        self.characters: CharacterRepository = repository if repository is not None else self._default_repository()
+        # Secondary indexes over the list filters: creation order and recency
+        self.character_index = CursorIndex(CHARACTER_INDEX_FIELDS, sort_field="created_at")
+        self.recent_index = CursorIndex(CHARACTER_INDEX_FIELDS, sort_field="updated_at")
+        entries = list(self.characters.index_entries())
+        self.character_index.add_many(entries)
+        self.recent_index.add_many(entries)
+        self.relationships = CharacterGraph()
+        # Version scene assignments, by scene and by character
+        self.scene_index = SceneAssignmentIndex()
+        self.scene_index.add_many(self.characters.scene_assignments())
+        # (character_id, identity revision) -> identity prompt block
+        self.identity_blocks: "OrderedDict[Tuple[str, int], str]" = OrderedDict()
+        # (character_id, embedding revision) -> reference embedding (None without versions)
+        self.identity_references: "OrderedDict[Tuple[str, int], Any]" = OrderedDict()
         self.consistency_config = CharacterConsistencyConfig()
         self.voice_parameters: Dict[str, Dict[str, Any]] = {}
     
+    @staticmethod
+    def _default_repository() -> CharacterRepository:
+        from ..config.settings import CHARACTER_DB_PATH, CHARACTER_CACHE_SIZE
+        
+        if not CHARACTER_DB_PATH:
+            return MemoryCharacterRepository()
+        from .character_store import SQLiteCharacterRepository
+        return SQLiteCharacterRepository(CHARACTER_DB_PATH, CHARACTER_CACHE_SIZE)
+    
+    @property
+    def identity_index(self):
+        """Embedding store for version visuals (NumPy is loaded on first use)"""
+        if self._identity_index is None:
+            from .identity_embeddings import IdentityEmbeddingStore, HashingEmbedder
+            from ..config.settings import IDENTITY_INDEX_PATH, IDENTITY_EMBEDDING_DIM
+            
+            self._identity_index = IdentityEmbeddingStore(IDENTITY_EMBEDDING_DIM, IDENTITY_INDEX_PATH)
+            if self.embedder is None:
+                self.embedder = HashingEmbedder(IDENTITY_EMBEDDING_DIM)
+        return self._identity_index
+    
+    def _stored_identity_index(self):
+        """The identity store if loaded or persisted on disk (None when there is nothing to update)"""
+        from ..config.settings import IDENTITY_INDEX_PATH
+        
+        if self._identity_index is None and not IDENTITY_INDEX_PATH:
+            return None
+        return self.identity_index
+    
+    def _identity_reference(self, character_id: str):
+        """A character's reference embedding, cached until its embeddings change"""
+        index = self.identity_index
+        key = (character_id, index.revision(character_id))
+        if key in self.identity_references:
+            self.identity_references.move_to_end(key)
+            return self.identity_references[key]
+        return self._remember(self.identity_references, key, index.reference(character_id))
+    
+    @staticmethod
+    def _remember(cache: OrderedDict, key: Any, value: Any) -> Any:
+        cache[key] = value
+        if len(cache) > IDENTITY_CACHE_SIZE:
+            cache.popitem(last=False)
+        return value
+    
+    def _score_visuals(self, character_id: str, visuals: List[CharacterVisual]):
+        """Embed visuals in one call and set their consistency scores; returns the embeddings"""
+        reference = self._identity_reference(character_id)
+        vectors = self.embedder(visuals)
+        scores = None if reference is None else self.identity_index.consistency(character_id, vectors, reference)
+        for i, visual in enumerate(visuals):
+            visual.consistency_score = None if scores is None else float(scores[i])
+        return vectors
+    
+    def _score_visual(self, character_id: str, visual: CharacterVisual):
+        """Embed a visual and set its consistency score; returns the embedding"""
+        return self._score_visuals(character_id, [visual])[0]
+    
+    async def _generate_images(self, batch: ImageBatch) -> List[str]:
+        return await self.image_generator.generate(batch)
+    
     def create_character(
         self,
         name: str,
@@ -211,6 +412,7 @@ class CharacterEngine:
         )
         
         self.characters[character_id] = character
+        self._index_character(character)
         logger.info(f"Created character {character_id}: {name} ({character.mode.value} mode)")
         
         return character
@@ -305,11 +507,15 @@ class CharacterEngine:
             is_active=is_active
         )
         
+        vector = self._score_visual(character_id, visual)
+        self.identity_index.add(character_id, version_id, vector)
         character.add_version(version)
+        self._touch(character)
         logger.info(f"Added version {version_id} ({version_type.value}) to character {character_id}")
         
         return version
     
+    @timed()
     async def generate_character_image(
         self,
         character_id: str,
@@ -325,35 +531,75 @@ class CharacterEngine:
         
         Maintains character identity across different scenes and contexts
         """
+        shot = {"pose": pose, "lighting": lighting, "emotion": emotion, "wardrobe": wardrobe}
+        visuals = await self.generate_character_images(character_id, prompt, [shot], scene_context)
+        return visuals[0]
+    
+    async def generate_character_images(
+        self,
+        character_id: str,
+        prompt: str,
+        shots: List[Dict[str, Optional[str]]],
+        scene_context: Optional[str] = None
+    ) -> List[CharacterVisual]:
+        """
+        Generate several images of a character as one batched job
+        
+        Every shot shares the character's compiled identity block; the shots
+        go to the image backend in batches (see BatchRenderer) and the
+        results are embedded and consistency-scored in a single pass.
+        
+        Args:
+            character_id: Character ID
+            prompt: Action shared by every shot
+            shots: Per-image fields: pose, lighting, emotion, wardrobe and
+                   optionally scene_context (overriding the shared one)
+            scene_context: Scene description shared by every shot
+            
+        Returns:
+            One CharacterVisual per shot, in order
+        """
         if character_id not in self.characters:
             raise ValueError(f"Character {character_id} not found")
         
         character = self.characters[character_id]
+        prompts = [
+            self._build_consistency_prompt(
+                character, prompt, shot.get("scene_context", scene_context),
+                shot.get("pose"), shot.get("lighting"), shot.get("emotion"), shot.get("wardrobe")
+            )
+            for shot in shots
+        ]
+        logger.info(f"Generating {len(shots)} images for character {character_id} with consistency lock")
+        urls = await self.renderer.render(self.renderer.split(character_id, "image", len(shots), prompts))
+        
+        revision = character.identity.revision
+        visuals = [
+            CharacterVisual(
+                image_url=url,
+                s3_key=urlparse(url).path.lstrip("/"),
+                version=str(uuid.uuid4()),
+                pose=shot.get("pose"),
+                lighting=shot.get("lighting"),
+                emotion=shot.get("emotion"),
+                wardrobe=shot.get("wardrobe"),
+                metadata={"prompt": shot_prompt, "identity_revision": revision}
+            )
+            for shot, shot_prompt, url in zip(shots, prompts, urls)
+        ]
         
-        # Build consistency-aware prompt
-        consistency_prompt = self._build_consistency_prompt(
-            character, prompt, scene_context, pose, lighting, emotion, wardrobe
-        )
-        
-        # TODO: Integrate with image generation service
-        # This would call Stable Diffusion, Midjourney, or DALL-E with character identity locked
-        logger.info(f"Generating image for character {character_id} with consistency lock")
-        
-        # Placeholder - would generate actual image
-        image_url = f"s3://{self.s3_bucket}/characters/{character_id}/generated_{uuid.uuid4()}.jpg"
-        s3_key = f"characters/{character_id}/generated_{uuid.uuid4()}.jpg"
-        
-        visual = CharacterVisual(
-            image_url=image_url,
-            s3_key=s3_key,
-            version=str(uuid.uuid4()),
-            pose=pose,
-            lighting=lighting,
-            emotion=emotion,
-            wardrobe=wardrobe
-        )
+        self._score_visuals(character_id, visuals)
+        threshold = self.consistency_config.identity_threshold
+        drifting = [v for v in visuals if v.consistency_score is not None and v.consistency_score < threshold]
+        for visual in drifting:
+            visual.metadata["identity_drift"] = True
+        if drifting:
+            logger.warning(
+                f"{len(drifting)} of {len(visuals)} generated images for character {character_id} drift "
+                f"from its identity (consistency < {threshold})"
+            )
         
-        return visual
+        return visuals
     
     def _build_consistency_prompt(
         self,
@@ -365,20 +611,8 @@ class CharacterEngine:
         emotion: Optional[str],
         wardrobe: Optional[str]
     ) -> str:
-        """Build prompt with character identity locked in"""
-        identity = character.identity
-        
-        consistency_parts = [
-            f"Character: {identity.name}",
-            f"Description: {identity.description}",
-        ]
-        
-        if identity.physical_attributes:
-            attrs = ", ".join([f"{k}: {v}" for k, v in identity.physical_attributes.items()])
-            consistency_parts.append(f"Physical: {attrs}")
-        
-        if identity.cultural_context:
-            consistency_parts.append(f"Cultural context: {identity.cultural_context}")
+        """Build prompt with character identity locked in (identity block + per-shot fields)"""
+        consistency_parts = [self._identity_block(character)]
         
         if scene_context:
             consistency_parts.append(f"Scene: {scene_context}")
@@ -399,31 +633,204 @@ class CharacterEngine:
         
         return ", ".join(consistency_parts)
     
+    def _identity_block(self, character: Character) -> str:
+        """The identity section of consistency prompts, compiled once per identity revision"""
+        identity = character.identity
+        key = (character.character_id, identity.revision)
+        block = self.identity_blocks.get(key)
+        if block is not None:
+            self.identity_blocks.move_to_end(key)
+            return block
+        
+        parts = [
+            f"Character: {identity.name}",
+            f"Description: {identity.description}",
+        ]
+        
+        if identity.physical_attributes:
+            attrs = ", ".join([f"{k}: {v}" for k, v in identity.physical_attributes.items()])
+            parts.append(f"Physical: {attrs}")
+        
+        if identity.cultural_context:
+            parts.append(f"Cultural context: {identity.cultural_context}")
+        
+        return self._remember(self.identity_blocks, key, ", ".join(parts))
+    
+    def get_identity_conditioning(self, character_id: str) -> Dict[str, Any]:
+        """
+        Precomputed identity conditioning for image providers
+        
+        Both parts are cached: the prompt block until the identity is edited,
+        the reference embedding (normalized mean of the character's version
+        embeddings, usable as IP-adapter style image conditioning) until a
+        version is added or removed.
+        
+        Args:
+            character_id: Character ID
+            
+        Returns:
+            {"identity_prompt", "identity_revision", "reference_embedding"}
+        """
+        if character_id not in self.characters:
+            raise ValueError(f"Character {character_id} not found")
+        character = self.characters[character_id]
+        return {
+            "identity_prompt": self._identity_block(character),
+            "identity_revision": character.identity.revision,
+            "reference_embedding": self._identity_reference(character_id)
+        }
+    
+    def _identity_changed(self, character: Character) -> None:
+        """Bump the identity revision (invalidating compiled prompts) and touch the character"""
+        character.identity.revision += 1
+        character.identity.updated_at = datetime.utcnow()
+        self._touch(character)
+    
     async def get_character(self, character_id: str) -> Character:
         """Get character by ID"""
         if character_id not in self.characters:
             raise ValueError(f"Character {character_id} not found")
         return self.characters[character_id]
     
+    def _index_character(self, character: Character) -> None:
+        """Add or re-bucket a character in the list indexes"""
+        attrs = index_attrs(character)
+        self.character_index.update(character.character_id, attrs)
+        self.recent_index.update(character.character_id, attrs)
+    
+    def _touch(self, character: Character) -> None:
+        """Stamp a character as modified, keeping the recency index and repository current"""
+        character.updated_at = datetime.utcnow()
+        if self.characters.touch(character):
+            self._index_character(character)
+    
+    def _order_index(self, order_by: str) -> CursorIndex:
+        if order_by.lstrip("-") == "created_at":
+            return self.character_index
+        if order_by.lstrip("-") == "updated_at":
+            return self.recent_index
+        raise ValueError(f"Cannot order characters by {order_by}")
+    
     async def list_characters(
         self,
         project_id: Optional[str] = None,
         mode: Optional[CharacterMode] = None,
-        brand_id: Optional[str] = None
+        brand_id: Optional[str] = None,
+        character_type: Optional[CharacterType] = None,
+        order_by: CharacterOrder = "created_at"
     ) -> List[Character]:
-        """List characters with filters"""
-        characters = list(self.characters.values())
+        """List characters matching all given filters (in creation order by default)"""
+        ids = self._order_index(order_by).iter_ids(
+            descending=order_by.startswith("-"),
+            project_id=project_id or None,
+            mode=mode or None,
+            brand_id=brand_id or None,
+            character_type=character_type or None
+        )
+        return [self.characters[i] for i in ids]
+    
+    async def list_characters_page(
+        self,
+        project_id: Optional[str] = None,
+        mode: Optional[CharacterMode] = None,
+        brand_id: Optional[str] = None,
+        character_type: Optional[CharacterType] = None,
+        order_by: CharacterOrder = "created_at",
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """
+        List characters with filters, one page at a time
+        
+        Filters combine (AND); each combination is a single index lookup.
         
-        if project_id:
-            characters = [c for c in characters if c.project_id == project_id]
+        Args:
+            project_id: Filter by project
+            mode: Filter by character mode
+            brand_id: Filter by brand
+            character_type: Filter by character type
+            order_by: created_at or updated_at, "-" prefix for newest first
+            cursor: Opaque cursor from the previous page (None for the first page)
+            limit: Page size
+            
+        Returns:
+            Page of Character objects
+        """
+        return self._order_index(order_by).page_items(
+            self.characters,
+            {"project_id": project_id, "mode": mode, "brand_id": brand_id, "character_type": character_type},
+            cursor,
+            limit,
+            descending=order_by.startswith("-")
+        )
+    
+    def score_character_versions(self, character_id: Optional[str] = None) -> Dict[str, float]:
+        """
+        Re-score version visuals against their character's other versions
         
-        if mode:
-            characters = [c for c in characters if c.mode == mode]
+        All scores come from one vectorized pass over the embedding matrix
+        and are written to each version's visual.consistency_score.
         
-        if brand_id:
-            characters = [c for c in characters if c.brand_id == brand_id]
+        Args:
+            character_id: Character to re-score (default: every character)
+            
+        Returns:
+            version_id -> consistency score
+        """
+        if character_id is not None and character_id not in self.characters:
+            raise ValueError(f"Character {character_id} not found")
+        index = self.identity_index
+        scores = index.rescore(character_id)
+        characters = [self.characters[character_id]] if character_id else self.characters.values()
+        for character in characters:
+            changed = False
+            for row in index.by_character.get(character.character_id, []):
+                version_id = index.keys[row][1]
+                version = character.get_version(version_id)
+                if version is not None and version.visual.consistency_score != scores[version_id]:
+                    character.edit_version(version_id).visual.consistency_score = scores[version_id]
+                    changed = True
+            if changed:
+                self.characters.touch(character)
+        return scores
+    
+    def find_similar_visuals(
+        self,
+        character_id: str,
+        version_id: str,
+        k: int = 5,
+        across_characters: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Versions whose visuals look most like a given version
         
-        return characters
+        Args:
+            character_id: Character ID
+            version_id: Version to compare against
+            k: Number of results
+            across_characters: Search every character, not just this one
+            
+        Returns:
+            [{"character_id", "version_id", "similarity"}], most similar first
+        """
+        vector = self.identity_index.vector(version_id)
+        if vector is None:
+            raise ValueError(f"Version {version_id} not found for character {character_id}")
+        matches = self.identity_index.query(
+            vector, k, character_id=None if across_characters else character_id, exclude=version_id
+        )
+        return [
+            {"character_id": c, "version_id": v, "similarity": score}
+            for c, v, score in matches
+        ]
+    
+    def find_duplicate_visuals(
+        self,
+        character_id: Optional[str] = None,
+        threshold: float = 0.97
+    ) -> List[Tuple[str, str, float]]:
+        """Near-duplicate version visuals as (version_id, version_id, similarity) pairs"""
+        return self.identity_index.near_duplicates(threshold, character_id)
     
     async def link_character_to_voice(
         self,
@@ -435,7 +842,7 @@ class CharacterEngine:
             raise ValueError(f"Character {character_id} not found")
         
         self.characters[character_id].identity.voice_id = voice_id
-        self.characters[character_id].updated_at = datetime.utcnow()
+        self._identity_changed(self.characters[character_id])
         logger.info(f"Linked character {character_id} to voice {voice_id}")
     
     async def assign_character_to_scene(
@@ -449,19 +856,14 @@ class CharacterEngine:
             raise ValueError(f"Character {character_id} not found")
         
         character = self.characters[character_id]
-        version = None
-        
-        for v in character.versions:
-            if v.version_id == version_id:
-                version = v
-                break
-        
+        version = character.get_version(version_id)
         if not version:
             raise ValueError(f"Version {version_id} not found for character {character_id}")
         
         if scene_id not in version.scene_assignments:
-            version.scene_assignments.append(scene_id)
-            character.updated_at = datetime.utcnow()
+            character.edit_version(version_id).scene_assignments.append(scene_id)
+            self.scene_index.add(character_id, version_id, scene_id)
+            self._touch(character)
             logger.info(f"Assigned character {character_id} version {version_id} to scene {scene_id}")
     
     async def delete_character(self, character_id: str) -> bool:
@@ -479,6 +881,13 @@ class CharacterEngine:
             return False
         
         del self.characters[character_id]
+        self.character_index.remove(character_id)
+        self.recent_index.remove(character_id)
+        self.relationships.remove_character(character_id)
+        self.scene_index.remove_character(character_id)
+        identity_index = self._stored_identity_index()
+        if identity_index is not None:
+            identity_index.remove_character(character_id)
         logger.info(f"Deleted character {character_id}")
         return True
     
@@ -534,43 +943,29 @@ class CharacterEngine:
             voice_id=original.identity.voice_id
         )
         
-        # Create cloned character
-        cloned_character = Character(
-            character_id=new_character_id,
+        # Share version contents instead of copying them; whichever character
+        # modifies a shared version first gets its own copy (Character.edit_version)
+        now = datetime.utcnow()
+        cloned_character = original.fork(
+            new_character_id,
             identity=new_identity,
-            mode=original.mode,
-            character_type=original.character_type,
-            brand_id=original.brand_id,
-            project_id=original.project_id,
-            consistency_lock=original.consistency_lock
+            lineage=[*original.lineage, character_id],
+            metadata={},
+            created_at=now,
+            updated_at=now
         )
-        
-        # Clone versions
-        for version in original.versions:
-            cloned_version = CharacterVersion(
-                version_id=str(uuid.uuid4()),
-                character_id=new_character_id,
-                version_type=version.version_type,
-                visual=CharacterVisual(
-                    image_url=version.visual.image_url,
-                    s3_key=version.visual.s3_key,
-                    version=version.visual.version,
-                    pose=version.visual.pose,
-                    lighting=version.visual.lighting,
-                    emotion=version.visual.emotion,
-                    wardrobe=version.visual.wardrobe,
-                    makeup=version.visual.makeup,
-                    aging=version.visual.aging,
-                    metadata=version.visual.metadata.copy()
-                ),
-                scene_assignments=version.scene_assignments.copy(),
-                created_by=version.created_by,
-                notes=f"Cloned from {character_id}",
-                is_active=version.is_active
-            )
-            cloned_character.add_version(cloned_version)
+        identity_index = self._stored_identity_index()
+        if identity_index is not None:
+            # The clone's versions have their own IDs, so they get their own embeddings
+            for version, cloned_version in zip(original.versions, cloned_character.versions):
+                if version.version_id in identity_index:
+                    identity_index.add(
+                        new_character_id, cloned_version.version_id, identity_index.vector(version.version_id)
+                    )
         
         self.characters[new_character_id] = cloned_character
+        self._index_character(cloned_character)
+        self.scene_index.add_character(cloned_character)
         logger.info(f"Cloned character {character_id} to {new_character_id}")
         
         return cloned_character
@@ -616,11 +1011,10 @@ class CharacterEngine:
         
         logger.info(f"Generating portrait for character: {name}")
         
-        # TODO: Integrate with image generation service
-        image_url = f"https://{self.s3_bucket}.s3.amazonaws.com/portraits/{character_id}.png"
+        urls = await self.renderer.render(self.renderer.split(character_id, "portrait", 1))
         
         return {
-            "url": image_url,
+            "url": urls[0],
             "character_id": character_id,
             "width": 1024,
             "height": 1024,
@@ -642,16 +1036,13 @@ class CharacterEngine:
         Returns:
             List of image dictionaries
         """
-        variations = []
         character_id = character.get('id') or character.get('character_id', str(uuid.uuid4()))
         
-        for i in range(num_variations):
-            variations.append({
-                "url": f"https://{self.s3_bucket}.s3.amazonaws.com/portraits/{character_id}_v{i+1}.png",
-                "variation_number": i + 1,
-                "width": 1024,
-                "height": 1024
-            })
+        urls = await self.renderer.render(self.renderer.split(character_id, "variation", num_variations))
+        variations = [
+            {"url": url, "variation_number": i + 1, "width": 1024, "height": 1024}
+            for i, url in enumerate(urls)
+        ]
         
         logger.info(f"Generated {num_variations} variations for character {character_id}")
         return variations
@@ -672,7 +1063,7 @@ class CharacterEngine:
             Updated Character object
         """
         character.identity.physical_attributes.update(appearance)
-        character.updated_at = datetime.utcnow()
+        self._identity_changed(character)
         logger.info(f"Updated appearance for character {character.character_id}")
         return character
     
@@ -693,7 +1084,7 @@ class CharacterEngine:
         """
         if 'traits' in personality:
             character.identity.personality_traits = personality['traits']
-        character.updated_at = datetime.utcnow()
+        self._identity_changed(character)
         logger.info(f"Set personality for character {character.character_id}")
         return character
     
@@ -762,7 +1153,7 @@ class CharacterEngine:
             Updated Character object
         """
         character.identity.voice_id = voice_id
-        character.updated_at = datetime.utcnow()
+        self._identity_changed(character)
         logger.info(f"Assigned voice {voice_id} to character {character.character_id}")
         return character
     
@@ -813,8 +1204,11 @@ class CharacterEngine:
         Returns:
             True if saved successfully
         """
-        self.characters[character.character_id] = character
+        character.identity.revision += 1  # The caller may have edited the identity directly
         character.updated_at = datetime.utcnow()
+        self.characters[character.character_id] = character
+        self._index_character(character)
+        self.scene_index.add_character(character)  # Assignments may have been edited directly
         logger.info(f"Saved character {character.character_id}")
         return True
     
@@ -840,10 +1234,111 @@ class CharacterEngine:
         Returns:
             Character object or None if not found
         """
-        if character_id in self.characters:
-            return self.characters[character_id]
-        logger.warning(f"Character {character_id} not found")
-        return None
+        character = self.characters.get(character_id)
+        if character is None:
+            logger.warning(f"Character {character_id} not found")
+        return character
+    
+    def export_characters(self, out: TextIO) -> int:
+        """
+        Stream every character to a file as JSON lines
+        
+        Args:
+            out: Text file (or any object with write())
+            
+        Returns:
+            Number of characters written
+        """
+        count = self.characters.export_jsonl(out)
+        logger.info(f"Exported {count} characters")
+        return count
+    
+    def import_characters(self, lines: Iterable[str]) -> int:
+        """
+        Load characters from JSON lines (as written by export_characters)
+        
+        Lines are parsed and stored in batches, so a large export never
+        has to fit in memory. Existing characters with the same ID are replaced.
+        
+        Args:
+            lines: JSON lines, e.g. an open file
+            
+        Returns:
+            Number of characters imported
+        """
+        count = self._store_characters(
+            Character.model_validate_json(line) for line in lines if line.strip()
+        )
+        logger.info(f"Imported {count} characters")
+        return count
+    
+    def _store_characters(self, characters: Iterable[Character]) -> int:
+        """Save many characters and bulk-index them"""
+        entries = []
+        
+        def indexed():
+            for character in characters:
+                entries.append((character.character_id, index_attrs(character)))
+                self.scene_index.add_character(character)
+                yield character
+        
+        # Every object a bulk load allocates survives, so cyclic GC passes over the
+        # growing heap find nothing; pause them until the load is done
+        was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            count = self.characters.save_many(indexed())
+            self.character_index.add_many(entries)
+            self.recent_index.add_many(entries)
+        finally:
+            if was_enabled:
+                gc.enable()
+        return count
+    
+    def dump_snapshot(self, out: BinaryIO) -> int:
+        """
+        Write every character to a binary snapshot (backups, warm starts)
+        
+        Characters are streamed from the repository and written as
+        compressed batches, each encoded in one compiled serializer call.
+        
+        Args:
+            out: Binary file object
+            
+        Returns:
+            Number of characters written
+        """
+        self.characters.flush()
+        count = write_snapshot(self.characters.values(), out)
+        logger.info(f"Wrote snapshot of {count} characters")
+        return count
+    
+    def restore_snapshot(self, source: BinaryIO) -> int:
+        """
+        Load characters from a dump_snapshot() file
+        
+        Existing characters with the same ID are replaced.
+        
+        Args:
+            source: Binary file object
+            
+        Returns:
+            Number of characters restored
+            
+        Raises:
+            ValueError: The file is not a snapshot or is truncated
+        """
+        count = self._store_characters(
+            character for batch in read_snapshot(source, Character) for character in batch
+        )
+        logger.info(f"Restored {count} characters from snapshot")
+        return count
+    
+    def flush(self) -> None:
+        """Write pending character changes to the repository and identity store"""
+        self.characters.flush()
+        if self._identity_index is not None:
+            self._identity_index.flush()
     
     def set_pose(
         self,
@@ -865,10 +1360,10 @@ class CharacterEngine:
             return None
         
         character = self.characters[character_id]
-        active_version = character.get_active_version()
+        active_version = character.edit_version(character.active_version_id)
         if active_version:
             active_version.visual.pose = pose
-        character.updated_at = datetime.utcnow()
+        self._touch(character)
         logger.info(f"Set pose '{pose}' for character {character_id}")
         return character
     
@@ -892,17 +1387,47 @@ class CharacterEngine:
             return None
         
         character = self.characters[character_id]
-        active_version = character.get_active_version()
+        active_version = character.edit_version(character.active_version_id)
         if active_version:
             active_version.visual.emotion = expression
-        character.updated_at = datetime.utcnow()
+        self._touch(character)
         logger.info(f"Set expression '{expression}' for character {character_id}")
         return character
     
+    async def stream_animation_frames(
+        self,
+        character: Character,
+        num_frames: int = 24,
+        animation_type: Optional[str] = None,
+        fps: float = 24.0
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Generate animation frames, yielding each backend batch as it finishes
+        
+        Batches complete in any order; every frame carries its frame_number.
+        
+        Args:
+            character: Character object
+            num_frames: Number of frames to generate
+            animation_type: Type of animation (walk, run, idle, etc.)
+            fps: Frame rate the timestamps are computed at
+            
+        Yields:
+            Lists of frame dictionaries
+        """
+        batches = self.renderer.split(
+            character.character_id, "frame", num_frames,
+            **({"animation_type": animation_type} if animation_type else {})
+        )
+        async for batch, urls in self.renderer.stream(batches):
+            yield frame_records(batch, urls, fps, animation_type)
+    
     async def generate_animation_frames(
         self,
         character: Character,
-        num_frames: int = 24
+        num_frames: int = 24,
+        animation_type: Optional[str] = None,
+        fps: float = 24.0
     ) -> List[Dict[str, Any]]:
         """
         Generate animation frames for a character
@@ -910,17 +1435,15 @@ class CharacterEngine:
         Args:
             character: Character object
             num_frames: Number of frames to generate
+            animation_type: Type of animation, added to each frame if given
+            fps: Frame rate the timestamps are computed at
             
         Returns:
             List of frame dictionaries
         """
-        frames = []
-        for i in range(num_frames):
-            frames.append({
-                "frame_number": i,
-                "url": f"https://{self.s3_bucket}.s3.amazonaws.com/animation/{character.character_id}/frame_{i:04d}.png",
-                "timestamp": i / 24.0
-            })
+        frames: List[Dict[str, Any]] = [None] * num_frames
+        async for batch in self.stream_animation_frames(character, num_frames, animation_type, fps):
+            frames[batch[0]["frame_number"]:batch[0]["frame_number"] + len(batch)] = batch
         
         logger.info(f"Generated {num_frames} animation frames for character {character.character_id}")
         return frames
@@ -947,58 +1470,47 @@ class CharacterEngine:
             return []
         
         character = self.characters[character_id]
-        frames = await self.generate_animation_frames(character, num_frames)
-        
-        # Add animation type metadata
-        for frame in frames:
-            frame["animation_type"] = animation_type
+        frames = await self.generate_animation_frames(character, num_frames, animation_type)
         
         logger.info(f"Generated {num_frames} {animation_type} animation frames for character {character_id}")
         return frames
     
     def create_relationship(
         self,
-        character1: Character,
-        character2: Character,
+        character1: Union[Character, str],
+        character2: Union[Character, str],
         relationship_type: str
     ) -> Dict[str, Any]:
         """
         Create a relationship between two characters
         
         Args:
-            character1: First character
-            character2: Second character
+            character1: First character (or its ID)
+            character2: Second character (or its ID)
             relationship_type: Type of relationship (friend, rival, family, etc.)
             
         Returns:
-            Relationship information
+            Relationship information (the existing one if the pair already
+            has a relationship of this type)
         """
-        relationship = {
-            "id": str(uuid.uuid4()),
-            "character1_id": character1.character_id,
-            "character2_id": character2.character_id,
-            "type": relationship_type,
-            "created_at": datetime.utcnow().isoformat()
-        }
+        character1_id = getattr(character1, "character_id", character1)
+        character2_id = getattr(character2, "character_id", character2)
+        relationship = self.relationships.add(character1_id, character2_id, relationship_type)
         
-        # Store in metadata
-        if "relationships" not in character1.metadata:
-            character1.metadata["relationships"] = []
-        character1.metadata["relationships"].append(relationship)
-        
-        if "relationships" not in character2.metadata:
-            character2.metadata["relationships"] = []
-        character2.metadata["relationships"].append(relationship)
-        
-        logger.info(f"Created {relationship_type} relationship between {character1.character_id} and {character2.character_id}")
-        return relationship
+        logger.info(f"Created {relationship_type} relationship between {character1_id} and {character2_id}")
+        return relationship.model_dump(mode="json", exclude={"metadata"})
     
-    def get_relationships(self, character_id: str) -> List[Dict[str, Any]]:
+    def get_relationships(
+        self,
+        character_id: str,
+        relationship_type: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
         """
         Get all relationships for a character
         
         Args:
             character_id: Character ID
+            relationship_type: Only relationships of this type
             
         Returns:
             List of relationships
@@ -1007,17 +1519,152 @@ class CharacterEngine:
             logger.warning(f"Character {character_id} not found")
             return []
         
-        character = self.characters[character_id]
-        return character.metadata.get("relationships", [])
+        types = [relationship_type] if relationship_type else None
+        return [
+            r.model_dump(mode="json", exclude={"metadata"})
+            for r in self.relationships.relationships_of(character_id, types)
+        ]
     
-    def to_dict(self, character: Character) -> Dict[str, Any]:
+    def load_relationships(self, relationships: Iterable[Union[Dict[str, Any], Tuple[str, str, str]]]) -> int:
+        """
+        Bulk load relationships (e.g. a large ensemble cast)
+        
+        Args:
+            relationships: (character1_id, character2_id, type) tuples or
+                           dicts as returned by get_relationships
+            
+        Returns:
+            Number of relationships added
+        """
+        return self.relationships.bulk_load(relationships)
+    
+    def get_related_characters(
+        self,
+        character_id: str,
+        hops: int = 1,
+        relationship_types: Optional[List[str]] = None
+    ) -> Dict[str, int]:
+        """
+        Characters within `hops` relationships of a character
+        
+        Args:
+            character_id: Character ID
+            hops: Maximum number of relationships to follow
+            relationship_types: Only follow these types
+            
+        Returns:
+            character_id -> distance, nearest first
+        """
+        if character_id not in self.characters:
+            raise ValueError(f"Character {character_id} not found")
+        return self.relationships.neighborhood(character_id, hops, relationship_types)
+    
+    def find_relationship_path(
+        self,
+        source_id: str,
+        target_id: str,
+        relationship_types: Optional[List[str]] = None
+    ) -> Optional[List[str]]:
+        """
+        Shortest chain of relationships between two characters
+        
+        Returns:
+            Character IDs from source to target, or None if unconnected
+        """
+        for character_id in (source_id, target_id):
+            if character_id not in self.characters:
+                raise ValueError(f"Character {character_id} not found")
+        return self.relationships.shortest_path(source_id, target_id, relationship_types)
+    
+    def get_scene_connections(
+        self,
+        scene_id: str,
+        character_id: str,
+        hops: Optional[int] = None,
+        relationship_types: Optional[List[str]] = None
+    ) -> Dict[str, int]:
+        """
+        Everyone assigned to a scene who is connected to a character
+        
+        Args:
+            scene_id: Scene ID (characters are in a scene through their
+                      versions' scene assignments)
+            character_id: Character to connect to
+            hops: Maximum relationship distance (default: any)
+            relationship_types: Only follow these types
+            
+        Returns:
+            character_id -> distance for connected characters in the scene
+        """
+        if character_id not in self.characters:
+            raise ValueError(f"Character {character_id} not found")
+        cast = list(self.scene_index.by_scene.get(scene_id, ()))
+        return self.relationships.connected(character_id, cast, hops, relationship_types)
+    
+    def get_scene_cast(self, scene_id: str) -> Dict[str, List[str]]:
+        """
+        Characters assigned to a scene
+        
+        Args:
+            scene_id: Scene ID
+            
+        Returns:
+            character_id -> IDs of the versions assigned to the scene
+        """
+        return self.scene_index.cast(scene_id)
+    
+    def get_scene_casts(self, scene_ids: Iterable[str]) -> Dict[str, Dict[str, List[str]]]:
+        """Casts of many scenes at once: scene_id -> character_id -> version IDs"""
+        return {scene_id: self.scene_index.cast(scene_id) for scene_id in scene_ids}
+    
+    def get_character_scenes(self, character_id: str) -> Dict[str, List[str]]:
+        """
+        Scenes a character is assigned to, across projects
+        
+        Args:
+            character_id: Character ID
+            
+        Returns:
+            scene_id -> IDs of the character's versions assigned to it
+        """
+        if character_id not in self.characters:
+            raise ValueError(f"Character {character_id} not found")
+        return self.scene_index.scenes(character_id)
+    
+    def get_scenes_for_characters(self, character_ids: Iterable[str]) -> Dict[str, Dict[str, List[str]]]:
+        """Scenes of many characters at once: character_id -> scene_id -> version IDs"""
+        return {character_id: self.scene_index.scenes(character_id) for character_id in character_ids}
+    
+    def to_dict(self, character: Character, include_versions: bool = True) -> Dict[str, Any]:
         """
         Convert character to dictionary (for serialization)
         
         Args:
             character: Character object
+            include_versions: Include the version history
             
         Returns:
             Dictionary representation of character
         """
-        return character.model_dump()
\ No newline at end of file
+        return character.model_dump(exclude=None if include_versions else WITHOUT_VERSIONS)
+    
+    def to_json(self, character: Character, include_versions: bool = True) -> bytes:
+        """
+        Encode a character as JSON with its compiled pydantic-core serializer
+        
+        Args:
+            character: Character object
+            include_versions: Include the version history
+            
+        Returns:
+            UTF-8 JSON
+        """
+        return Character.__pydantic_serializer__.to_json(
+            character, exclude=None if include_versions else WITHOUT_VERSIONS
+        )
+    
+    def page_to_json(self, page: Page, include_versions: bool = True) -> bytes:
+        """Encode a page of characters as JSON in one serializer call"""
+        return Page.__pydantic_serializer__.to_json(
+            page, exclude=None if include_versions else PAGE_WITHOUT_VERSIONS
+        )
\ No newline at end of file
@@ -0,0 +1,332 @@
+"""
+Character Graph - Relationship store for CharacterEngine
+Adjacency by character and relationship type over compact integer node IDs
+"""
+from typing import Optional, Dict, List, Any, Tuple, Iterable, Set, Union
+from pydantic import BaseModel, Field
+from collections import deque
+from datetime import datetime
+import os
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CharacterRelationship(BaseModel):
+    """Undirected relationship between two characters"""
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    character1_id: str
+    character2_id: str
+    type: str  # friend, rival, family, ...
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+
+
+class CharacterGraph:
+    """
+    Relationship graph between characters
+
+    Character and relationship-type IDs are interned to small integers;
+    each node's adjacency maps type -> neighbor -> relationship ID, so
+    "X's rivals" is one dict lookup and traversals run over ints. At most one
+    relationship of a given type exists per pair; adding it again returns
+    the existing one.
+
+    Bulk-loaded relationships are kept as plain tuples and only become
+    CharacterRelationship models when first read.
+    """
+
+    def __init__(self):
+        self.nodes: Dict[str, int] = {}  # character_id -> node
+        self.ids: List[Optional[str]] = []  # node -> character_id (None once removed)
+        self.types: Dict[str, int] = {}  # relationship type -> type id
+        self.type_names: List[str] = []
+        self.adjacency: List[Dict[int, Dict[int, str]]] = []  # node -> type -> neighbor -> relationship id
+        self.records: Dict[str, Union[CharacterRelationship, tuple]] = {}  # id -> model or raw fields
+        self.edges: Dict[str, Tuple[int, int, int]] = {}  # relationship id -> (node, node, type)
+        self.by_type: Dict[int, Set[str]] = {}  # type -> relationship ids
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def get(self, relationship_id: str) -> Optional[CharacterRelationship]:
+        """A relationship by ID"""
+        record = self.records.get(relationship_id)
+        if isinstance(record, tuple):
+            character1_id, character2_id, relationship_type, created_at = record
+            record = self.records[relationship_id] = CharacterRelationship.model_construct(
+                id=relationship_id, character1_id=character1_id, character2_id=character2_id,
+                type=relationship_type, created_at=created_at, metadata={}
+            )
+        return record
+
+    def _node(self, character_id: str) -> int:
+        node = self.nodes.get(character_id)
+        if node is None:
+            node = self.nodes[character_id] = len(self.ids)
+            self.ids.append(character_id)
+            self.adjacency.append({})
+        return node
+
+    def _type(self, relationship_type: str) -> int:
+        type_id = self.types.get(relationship_type)
+        if type_id is None:
+            type_id = self.types[relationship_type] = len(self.type_names)
+            self.type_names.append(relationship_type)
+        return type_id
+
+    def _type_filter(self, types: Optional[Iterable[str]]) -> Optional[Set[int]]:
+        if types is None:
+            return None
+        return {self.types[t] for t in types if t in self.types}
+
+    def _link(self, relationship: CharacterRelationship) -> CharacterRelationship:
+        a = self._node(relationship.character1_id)
+        b = self._node(relationship.character2_id)
+        type_id = self._type(relationship.type)
+        existing = self.adjacency[a].get(type_id, {}).get(b)
+        if existing is not None:
+            return self.get(existing)
+
+        self.adjacency[a].setdefault(type_id, {})[b] = relationship.id
+        self.adjacency[b].setdefault(type_id, {})[a] = relationship.id
+        self.records[relationship.id] = relationship
+        self.edges[relationship.id] = (a, b, type_id)
+        self.by_type.setdefault(type_id, set()).add(relationship.id)
+        return relationship
+
+    def add(
+        self,
+        character1_id: str,
+        character2_id: str,
+        relationship_type: str,
+        **metadata: Any
+    ) -> CharacterRelationship:
+        """Add a relationship (or return the existing one of that type)"""
+        if character1_id == character2_id:
+            raise ValueError("A character cannot have a relationship with itself")
+        return self._link(CharacterRelationship(
+            character1_id=character1_id,
+            character2_id=character2_id,
+            type=relationship_type,
+            metadata=metadata
+        ))
+
+    def bulk_load(self, records: Iterable[Union[Dict[str, Any], Tuple[str, str, str]]]) -> int:
+        """
+        Load many relationships at once (no per-edge validation or logging)
+
+        Args:
+            records: (character1_id, character2_id, type) tuples or dicts in
+                     the form returned by CharacterEngine.get_relationships
+
+        Returns:
+            Number of relationships added (duplicates and self-links are skipped)
+        """
+        records = list(records)
+        before = len(self.records)
+        now = datetime.utcnow()
+        # One random draw for every new ID instead of a uuid4() call per edge
+        entropy = os.urandom(16 * len(records)).hex()
+        node, type_of, adjacency, stored, edges = self._node, self._type, self.adjacency, self.records, self.edges
+        by_type = self.by_type
+
+        for i, record in enumerate(records):
+            if isinstance(record, dict):
+                if record.get("character1_id") != record.get("character2_id"):
+                    self._link(CharacterRelationship.model_validate(record))
+                continue
+            character1_id, character2_id, relationship_type = record
+            if character1_id == character2_id:
+                continue
+            a, b, type_id = node(character1_id), node(character2_id), type_of(relationship_type)
+            neighbors = adjacency[a].get(type_id)
+            if neighbors is None:
+                neighbors = adjacency[a][type_id] = {}
+            elif b in neighbors:
+                continue
+            h = entropy[32 * i:32 * i + 32]
+            relationship_id = f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{h[16:20]}-{h[20:]}"
+            neighbors[b] = relationship_id
+            adjacency[b].setdefault(type_id, {})[a] = relationship_id
+            stored[relationship_id] = (character1_id, character2_id, relationship_type, now)
+            edges[relationship_id] = (a, b, type_id)
+            type_ids = by_type.get(type_id)
+            if type_ids is None:
+                type_ids = by_type[type_id] = set()
+            type_ids.add(relationship_id)
+
+        added = len(self.records) - before
+        logger.info(f"Bulk loaded {added} relationships")
+        return added
+
+    def remove(self, relationship_id: str) -> bool:
+        """Remove one relationship"""
+        edge = self.edges.pop(relationship_id, None)
+        if edge is None:
+            return False
+        a, b, type_id = edge
+        for node, other in ((a, b), (b, a)):
+            neighbors = self.adjacency[node][type_id]
+            del neighbors[other]
+            if not neighbors:
+                del self.adjacency[node][type_id]
+        self.by_type[type_id].discard(relationship_id)
+        del self.records[relationship_id]
+        return True
+
+    def remove_character(self, character_id: str) -> int:
+        """Remove a character and all of its relationships"""
+        node = self.nodes.pop(character_id, None)
+        if node is None:
+            return 0
+        ids = [rid for neighbors in self.adjacency[node].values() for rid in neighbors.values()]
+        for relationship_id in ids:
+            self.remove(relationship_id)
+        self.ids[node] = None
+        return len(ids)
+
+    def relationships_of(
+        self,
+        character_id: str,
+        types: Optional[Iterable[str]] = None
+    ) -> List[CharacterRelationship]:
+        """A character's relationships, optionally of the given types"""
+        node = self.nodes.get(character_id)
+        if node is None:
+            return []
+        wanted = self._type_filter(types)
+        return [
+            self.get(rid)
+            for type_id, neighbors in self.adjacency[node].items()
+            if wanted is None or type_id in wanted
+            for rid in neighbors.values()
+        ]
+
+    def of_type(self, relationship_type: str) -> List[CharacterRelationship]:
+        """Every relationship of one type"""
+        type_id = self.types.get(relationship_type)
+        return [self.get(rid) for rid in self.by_type.get(type_id, ())]
+
+    def _neighbors(self, node: int, wanted: Optional[Set[int]]) -> Iterable[int]:
+        for type_id, neighbors in self.adjacency[node].items():
+            if wanted is None or type_id in wanted:
+                yield from neighbors
+
+    def neighborhood(
+        self,
+        character_id: str,
+        hops: int = 1,
+        types: Optional[Iterable[str]] = None
+    ) -> Dict[str, int]:
+        """
+        Characters within `hops` relationships (breadth-first)
+
+        Returns:
+            character_id -> distance, nearest first (the character itself excluded)
+        """
+        start = self.nodes.get(character_id)
+        if start is None:
+            return {}
+        wanted = self._type_filter(types)
+        distance = {start: 0}
+        frontier = [start]
+        for depth in range(1, hops + 1):
+            next_frontier = []
+            for node in frontier:
+                for neighbor in self._neighbors(node, wanted):
+                    if neighbor not in distance:
+                        distance[neighbor] = depth
+                        next_frontier.append(neighbor)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+        del distance[start]
+        return {self.ids[node]: d for node, d in distance.items()}
+
+    def shortest_path(
+        self,
+        source_id: str,
+        target_id: str,
+        types: Optional[Iterable[str]] = None
+    ) -> Optional[List[str]]:
+        """
+        Fewest-relationship path between two characters (bidirectional BFS)
+
+        Returns:
+            Character IDs from source to target, or None if unconnected
+        """
+        source, target = self.nodes.get(source_id), self.nodes.get(target_id)
+        if source is None or target is None:
+            return None
+        if source == target:
+            return [source_id]
+
+        wanted = self._type_filter(types)
+        parents = ({source: -1}, {target: -1})
+        frontiers = (deque([source]), deque([target]))
+        while frontiers[0] and frontiers[1]:
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1  # Expand the smaller side
+            seen, other = parents[side], parents[1 - side]
+            for _ in range(len(frontiers[side])):
+                node = frontiers[side].popleft()
+                for neighbor in self._neighbors(node, wanted):
+                    if neighbor in seen:
+                        continue
+                    seen[neighbor] = node
+                    if neighbor in other:
+                        return self._join(parents, neighbor)
+                    frontiers[side].append(neighbor)
+        return None
+
+    def _join(self, parents: Tuple[Dict[int, int], Dict[int, int]], meeting: int) -> List[str]:
+        forward, node = [], meeting
+        while node != -1:
+            forward.append(node)
+            node = parents[0][node]
+        backward, node = [], parents[1][meeting]
+        while node != -1:
+            backward.append(node)
+            node = parents[1][node]
+        return [self.ids[node] for node in forward[::-1] + backward]
+
+    def connected(
+        self,
+        character_id: str,
+        candidates: Iterable[str],
+        hops: Optional[int] = None,
+        types: Optional[Iterable[str]] = None
+    ) -> Dict[str, int]:
+        """
+        Which candidates are connected to a character, and how closely
+
+        The search stops as soon as every candidate is found (or `hops` is
+        reached), so asking about one scene's cast never walks the whole graph.
+
+        Returns:
+            candidate character_id -> distance, for connected candidates only
+        """
+        start = self.nodes.get(character_id)
+        targets = {self.nodes[c] for c in candidates if c in self.nodes and c != character_id}
+        if start is None or not targets:
+            return {}
+        wanted = self._type_filter(types)
+        found: Dict[str, int] = {}
+        seen = {start}
+        frontier = [start]
+        depth = 0
+        while frontier and targets and (hops is None or depth < hops):
+            depth += 1
+            next_frontier = []
+            for node in frontier:
+                for neighbor in self._neighbors(node, wanted):
+                    if neighbor in seen:
+                        continue
+                    seen.add(neighbor)
+                    next_frontier.append(neighbor)
+                    if neighbor in targets:
+                        targets.discard(neighbor)
+                        found[self.ids[neighbor]] = depth
+            frontier = next_frontier
+        return found
@@ -0,0 +1,154 @@
+"""
+Character Renders - Batched image generation for CharacterEngine
+Splits portrait, variation, shot and animation-frame jobs into backend batches
+run under a shared concurrency limit, yielding results as batches finish
+"""
+from typing import Optional, Dict, List, Any, Tuple, AsyncIterator, Awaitable, Callable, Sequence
+from pydantic import BaseModel, Field
+import asyncio
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ImageBatch(BaseModel):
+    """One request to the image backend: `count` images of one character"""
+    character_id: str
+    kind: str  # portrait, variation, frame, image
+    start: int = 0  # Index of the first item within the whole job
+    count: int
+    prompts: List[str] = Field(default_factory=list)  # One per item, or empty for uniform items
+    params: Dict[str, Any] = Field(default_factory=dict)  # Shared by every item (animation type, ...)
+    width: int = 1024
+    height: int = 1024
+
+    @property
+    def indexes(self) -> range:
+        return range(self.start, self.start + self.count)
+
+
+# Backend call: one batch in, one image URL per item out (in item order)
+GenerateImages = Callable[[ImageBatch], Awaitable[List[str]]]
+
+
+class PlaceholderImageGenerator:
+    """
+    Image backend stand-in: returns the URLs a real backend would write to
+
+    Args:
+        s3_bucket: Bucket the URLs point into
+    """
+
+    def __init__(self, s3_bucket: str):
+        self.s3_bucket = s3_bucket
+
+    async def generate(self, batch: ImageBatch) -> List[str]:
+        base = f"https://{self.s3_bucket}.s3.amazonaws.com"
+        character_id = batch.character_id
+        if batch.kind == "portrait":
+            return [f"{base}/portraits/{character_id}.png"] * batch.count
+        if batch.kind == "variation":
+            return [f"{base}/portraits/{character_id}_v{i + 1}.png" for i in batch.indexes]
+        if batch.kind == "frame":
+            prefix = f"{base}/animation/{character_id}/frame_"
+            return [f"{prefix}{i:04d}.png" for i in batch.indexes]
+        prefix = f"s3://{self.s3_bucket}/characters/{character_id}/generated_"
+        return [f"{prefix}{uuid.uuid4()}.jpg" for _ in batch.indexes]
+
+
+class BatchRenderer:
+    """
+    Runs image jobs as backend batches
+
+    A job of N items becomes ceil(N / batch_size) backend requests. At most
+    `concurrency` requests are in flight per renderer, across all jobs, so
+    many concurrent jobs queue rather than flood the backend. Closing a
+    stream early cancels its batches still running.
+
+    Args:
+        generate: Backend call for one batch
+        batch_size: Items per backend request
+        concurrency: Maximum backend requests in flight
+    """
+
+    def __init__(self, generate: GenerateImages, batch_size: int = 16, concurrency: int = 4):
+        self.generate = generate
+        self.batch_size = max(1, batch_size)
+        self.concurrency = concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.requests = 0  # Backend requests made
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    def split(
+        self,
+        character_id: str,
+        kind: str,
+        count: int,
+        prompts: Optional[Sequence[str]] = None,
+        batch_size: Optional[int] = None,
+        **params: Any
+    ) -> List[ImageBatch]:
+        """Batches covering items 0..count-1 of one job"""
+        size = max(1, batch_size or self.batch_size)
+        return [
+            ImageBatch(
+                character_id=character_id,
+                kind=kind,
+                start=start,
+                count=min(size, count - start),
+                prompts=list(prompts[start:start + size]) if prompts else [],
+                params=params
+            )
+            for start in range(0, count, size)
+        ]
+
+    async def _run(self, batch: ImageBatch) -> Tuple[ImageBatch, List[str]]:
+        async with self.semaphore:
+            self.requests += 1
+            urls = await self.generate(batch)
+        if len(urls) != batch.count:
+            raise ValueError(f"Image backend returned {len(urls)} images for a batch of {batch.count}")
+        return batch, urls
+
+    async def stream(self, batches: Sequence[ImageBatch]) -> AsyncIterator[Tuple[ImageBatch, List[str]]]:
+        """Yield (batch, urls) in completion order"""
+        tasks = [asyncio.ensure_future(self._run(batch)) for batch in batches]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def render(self, batches: Sequence[ImageBatch]) -> List[str]:
+        """Every item's URL, in item order"""
+        urls: List[Optional[str]] = [None] * sum(batch.count for batch in batches)
+        async for batch, batch_urls in self.stream(batches):
+            urls[batch.start:batch.start + batch.count] = batch_urls
+        return urls
+
+
+def frame_records(
+    batch: ImageBatch,
+    urls: List[str],
+    fps: float = 24.0,
+    animation_type: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Animation frame dicts for one batch, built in a single pass over its columns"""
+    numbers = batch.indexes
+    timestamps = [n / fps for n in numbers]
+    if animation_type is None:
+        return [
+            {"frame_number": n, "url": url, "timestamp": t}
+            for n, url, t in zip(numbers, urls, timestamps)
+        ]
+    return [
+        {"frame_number": n, "url": url, "timestamp": t, "animation_type": animation_type}
+        for n, url, t in zip(numbers, urls, timestamps)
+    ]
@@ -0,0 +1,72 @@
+"""
+Character Scenes - Scene assignment index for CharacterEngine
+Which character versions appear in a scene, and which scenes a character appears in
+"""
+from typing import Dict, List, Iterable, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# (character_id, version_id, scene_id)
+Assignment = Tuple[str, str, str]
+
+
+class SceneAssignmentIndex:
+    """
+    Bidirectional index of version-to-scene assignments
+
+    Both directions map to nested dicts used as insertion-ordered sets:
+    scene -> character -> versions and character -> scene -> versions, so
+    a scene's cast and a character's scenes are each one lookup rather
+    than a scan over every character's versions.
+    """
+
+    def __init__(self):
+        self.by_scene: Dict[str, Dict[str, Dict[str, None]]] = {}
+        self.by_character: Dict[str, Dict[str, Dict[str, None]]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(versions) for scenes in self.by_character.values() for versions in scenes.values())
+
+    def add(self, character_id: str, version_id: str, scene_id: str) -> None:
+        self.by_scene.setdefault(scene_id, {}).setdefault(character_id, {})[version_id] = None
+        self.by_character.setdefault(character_id, {}).setdefault(scene_id, {})[version_id] = None
+
+    def add_many(self, assignments: Iterable[Assignment]) -> int:
+        count = 0
+        for character_id, version_id, scene_id in assignments:
+            self.add(character_id, version_id, scene_id)
+            count += 1
+        return count
+
+    def add_character(self, character) -> int:
+        """Index every scene assignment on a character's versions (replacing what was indexed)"""
+        self.remove_character(character.character_id)
+        return self.add_many(
+            (character.character_id, version.version_id, scene_id)
+            for version in character.versions
+            for scene_id in version.scene_assignments
+        )
+
+    def remove_character(self, character_id: str) -> int:
+        scenes = self.by_character.pop(character_id, {})
+        for scene_id in scenes:
+            cast = self.by_scene[scene_id]
+            del cast[character_id]
+            if not cast:
+                del self.by_scene[scene_id]
+        return len(scenes)
+
+    def cast(self, scene_id: str) -> Dict[str, List[str]]:
+        """character_id -> assigned version IDs for one scene"""
+        return {
+            character_id: list(versions)
+            for character_id, versions in self.by_scene.get(scene_id, {}).items()
+        }
+
+    def scenes(self, character_id: str) -> Dict[str, List[str]]:
+        """scene_id -> assigned version IDs for one character"""
+        return {
+            scene_id: list(versions)
+            for scene_id, versions in self.by_character.get(character_id, {}).items()
+        }
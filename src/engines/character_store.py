@@ -0,0 +1,360 @@
+"""
+Character Store - Persistent storage for CharacterEngine
+In-memory and SQLite character repositories with a bounded LRU of hot characters
+"""
+from typing import Dict, List, Any, Iterable, Iterator, Tuple, TextIO, TYPE_CHECKING
+from collections import OrderedDict
+from collections.abc import MutableMapping
+import sqlite3
+import sys
+import threading
+import logging
+
+if TYPE_CHECKING:  # character_engine imports this module
+    from .character_engine import Character
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per round trip when streaming the whole store
+STREAM_BATCH = 500
+
+
+def index_attrs(character: "Character") -> Dict[str, Any]:
+    """The attributes CharacterEngine indexes characters by"""
+    return {
+        "project_id": character.project_id,
+        "mode": character.mode,
+        "brand_id": character.brand_id,
+        "character_type": character.character_type,
+        "created_at": character.created_at,
+        "updated_at": character.updated_at
+    }
+
+
+class CharacterRepository(MutableMapping):
+    """
+    Characters keyed by ID
+
+    A mapping, so engines read and write it like a dict. Characters are
+    mutated in place; call touch() after a change so stores that keep
+    characters outside memory know to write it back.
+    """
+
+    def touch(self, character: "Character") -> bool:
+        """Record a change to a stored character (False if it isn't stored)"""
+        return self.get(character.character_id) is character
+
+    def save_many(self, characters: Iterable["Character"]) -> int:
+        """Store many characters at once"""
+        count = 0
+        for character in characters:
+            self[character.character_id] = character
+            count += 1
+        return count
+
+    def index_entries(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """(character_id, index attributes) for every stored character"""
+        for character in self.values():
+            yield character.character_id, index_attrs(character)
+
+    def scene_assignments(self) -> Iterator[Tuple[str, str, str]]:
+        """(character_id, version_id, scene_id) for every scene assignment of every stored version"""
+        for character in self.values():
+            for version in character.versions:
+                for scene_id in version.scene_assignments:
+                    yield character.character_id, version.version_id, scene_id
+
+    def export_jsonl(self, out: TextIO) -> int:
+        """Write every character as one JSON line; returns the count"""
+        count = 0
+        for character in self.values():
+            out.write(character.model_dump_json())
+            out.write("\n")
+            count += 1
+        return count
+
+    def flush(self) -> None:
+        """Write pending changes (no-op for in-memory stores)"""
+
+    def close(self) -> None:
+        self.flush()
+
+
+class MemoryCharacterRepository(CharacterRepository):
+    """Every character held in a dict (the default; nothing survives a restart)"""
+
+    def __init__(self):
+        self.data: Dict[str, "Character"] = {}
+
+    def __getitem__(self, character_id: str) -> "Character":
+        return self.data[character_id]
+
+    def __setitem__(self, character_id: str, character: "Character") -> None:
+        self.data[character_id] = character
+
+    def __delitem__(self, character_id: str) -> None:
+        del self.data[character_id]
+
+    def __contains__(self, character_id: object) -> bool:
+        return character_id in self.data
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def values(self):
+        return self.data.values()
+
+
+class SQLiteCharacterRepository(CharacterRepository):
+    """
+    Characters in a SQLite file, loaded on access
+
+    Identities and character fields live in one row per character (the
+    indexed attributes in their own columns); versions and their visuals in
+    one row each. At most `cache_size` characters are held in memory, least
+    recently used evicted first. Changes recorded with touch() are written
+    back on eviction or flush(); new and replaced characters are written
+    immediately.
+
+    Args:
+        path: Database file (":memory:" for a throwaway store)
+        cache_size: Characters kept in memory
+    """
+
+    def __init__(self, path: str = ":memory:", cache_size: int = 1024):
+        self.path = path
+        self.cache_size = max(1, cache_size)
+        self.cache: "OrderedDict[str, Character]" = OrderedDict()
+        self.dirty: set = set()
+        self.loads = 0  # Characters read from the database
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS characters ("
+            " character_id TEXT PRIMARY KEY, project_id TEXT, mode TEXT, brand_id TEXT,"
+            " character_type TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL,"
+            " data TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS character_versions ("
+            " version_id TEXT PRIMARY KEY, character_id TEXT NOT NULL,"
+            " position INTEGER NOT NULL, data TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS character_versions_owner"
+            " ON character_versions (character_id, position);"
+        )
+
+    # Rows <-> models
+
+    @staticmethod
+    def _character_row(character: "Character") -> tuple:
+        return (
+            character.character_id, character.project_id, character.mode.value, character.brand_id,
+            character.character_type.value, character.created_at.timestamp(),
+            character.updated_at.timestamp(), character.model_dump_json(exclude={"versions"})
+        )
+
+    @staticmethod
+    def _version_rows(character: "Character") -> List[tuple]:
+        return [
+            (version.version_id, character.character_id, position, version.model_dump_json())
+            for position, version in enumerate(character.versions)
+        ]
+
+    def _write(self, characters: Iterable["Character"]) -> None:
+        characters = list(characters)
+        if not characters:
+            return
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO characters VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [self._character_row(c) for c in characters]
+            )
+            self._db.executemany(
+                "DELETE FROM character_versions WHERE character_id = ?",
+                [(c.character_id,) for c in characters]
+            )
+            self._db.executemany(
+                "INSERT INTO character_versions VALUES (?, ?, ?, ?)",
+                [row for c in characters for row in self._version_rows(c)]
+            )
+
+    def _decode(self, rows: List[Tuple[str, str]]) -> Dict[str, "Character"]:
+        """Characters from (character_id, data) rows, with their versions in one query"""
+        from .character_engine import Character, CharacterVersion
+
+        characters = {character_id: Character.model_validate_json(data) for character_id, data in rows}
+        if characters:
+            versions = self._db.execute(
+                "SELECT character_id, data FROM character_versions"
+                f" WHERE character_id IN ({','.join('?' * len(characters))}) ORDER BY character_id, position",
+                list(characters)
+            ).fetchall()
+            for character_id, data in versions:
+                characters[character_id].versions.append(CharacterVersion.model_validate_json(data))
+        self.loads += len(characters)
+        return characters
+
+    # LRU
+
+    def _cache(self, character: "Character") -> None:
+        self.cache[character.character_id] = character
+        self.cache.move_to_end(character.character_id)
+        while len(self.cache) > self.cache_size:
+            character_id, evicted = self.cache.popitem(last=False)
+            if character_id in self.dirty:
+                self.dirty.discard(character_id)
+                self._write([evicted])
+
+    # Mapping
+
+    def __getitem__(self, character_id: str) -> "Character":
+        with self._lock:
+            character = self.cache.get(character_id)
+            if character is not None:
+                self.cache.move_to_end(character_id)
+                return character
+            row = self._db.execute(
+                "SELECT character_id, data FROM characters WHERE character_id = ?", (character_id,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(character_id)
+            character = self._decode([row])[character_id]
+            self._cache(character)
+            return character
+
+    def __setitem__(self, character_id: str, character: "Character") -> None:
+        with self._lock:
+            self._write([character])
+            self.dirty.discard(character_id)
+            self._cache(character)
+
+    def __delitem__(self, character_id: str) -> None:
+        with self._lock:
+            with self._db:
+                deleted = self._db.execute(
+                    "DELETE FROM characters WHERE character_id = ?", (character_id,)
+                ).rowcount
+                self._db.execute("DELETE FROM character_versions WHERE character_id = ?", (character_id,))
+            self.cache.pop(character_id, None)
+            self.dirty.discard(character_id)
+            if not deleted:
+                raise KeyError(character_id)
+
+    def __contains__(self, character_id: object) -> bool:
+        with self._lock:
+            if character_id in self.cache:
+                return True
+            return self._db.execute(
+                "SELECT 1 FROM characters WHERE character_id = ?", (character_id,)
+            ).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM characters").fetchone()[0]
+
+    def _batches(self, columns: str) -> Iterator[List[tuple]]:
+        """Stream rows in rowid order, one batch per query (rowid first)"""
+        last = 0
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    f"SELECT rowid, {columns} FROM characters WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (last, STREAM_BATCH)
+                ).fetchall()
+            if not rows:
+                return
+            last = rows[-1][0]
+            yield rows
+
+    def __iter__(self) -> Iterator[str]:
+        for rows in self._batches("character_id"):
+            for _, character_id in rows:
+                yield character_id
+
+    def values(self) -> Iterator["Character"]:
+        """
+        Stream every character
+
+        Cached characters are returned as-is; the rest are decoded without
+        entering the cache, so a full scan doesn't evict the hot set. Call
+        touch() on any you change.
+        """
+        for rows in self._batches("character_id, data"):
+            with self._lock:
+                cached = {row[1]: self.cache[row[1]] for row in rows if row[1] in self.cache}
+                decoded = self._decode([row[1:] for row in rows if row[1] not in cached])
+            for _, character_id, _ in rows:
+                yield cached.get(character_id) or decoded[character_id]
+
+    def touch(self, character: "Character") -> bool:
+        with self._lock:
+            character_id = character.character_id
+            if self.cache.get(character_id) is character:
+                self.dirty.add(character_id)
+                return True
+            if character_id not in self:
+                return False
+            # A copy loaded before it was evicted: it is now the latest state
+            self[character_id] = character
+            return True
+
+    def save_many(self, characters: Iterable["Character"], batch: int = 1000) -> int:
+        """Write characters in batched transactions, bypassing the cache"""
+        count = 0
+        pending: List["Character"] = []
+        for character in characters:
+            pending.append(character)
+            if len(pending) >= batch:
+                count += self._save_batch(pending)
+                pending = []
+        return count + self._save_batch(pending)
+
+    def _save_batch(self, characters: List["Character"]) -> int:
+        with self._lock:
+            self._write(characters)
+            for character in characters:
+                if character.character_id in self.cache:
+                    self.cache[character.character_id] = character
+                    self.dirty.discard(character.character_id)
+        return len(characters)
+
+    def index_entries(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Index attributes straight from their columns (no character is decoded)
+
+        The filter values repeat across many characters, so they are interned
+        rather than kept as one string per row.
+        """
+        columns = "character_id, project_id, mode, brand_id, character_type, created_at, updated_at"
+        for rows in self._batches(columns):
+            for _, character_id, project_id, mode, brand_id, character_type, created, updated in rows:
+                yield character_id, {
+                    "project_id": project_id and sys.intern(project_id),
+                    "mode": sys.intern(mode),
+                    "brand_id": brand_id and sys.intern(brand_id),
+                    "character_type": sys.intern(character_type),
+                    "created_at": created,
+                    "updated_at": updated
+                }
+
+    def scene_assignments(self) -> Iterator[Tuple[str, str, str]]:
+        """Scene assignments straight from the version rows (no character is decoded)"""
+        self.flush()
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT v.character_id, json_extract(v.data, '$.version_id'), s.value"
+                " FROM character_versions v, json_each(v.data, '$.scene_assignments') s"
+                " ORDER BY v.character_id, v.position"
+            ).fetchall()
+        return iter(rows)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._write(self.cache[i] for i in self.dirty if i in self.cache)
+            self.dirty.clear()
+
+    def close(self) -> None:
+        self.flush()
+        self._db.close()
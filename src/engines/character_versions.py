@@ -0,0 +1,131 @@
+"""
+Character Versions - Version lookup index and compact version history
+Positions of a character's versions by ID and type, and a delta encoding
+in which each version stores only what changed since the one before it
+"""
+from typing import Optional, Dict, List, Any, Iterable, Sequence, Tuple, Type
+from pydantic import BaseModel
+import copy
+import logging
+
+logger = logging.getLogger(__name__)
+
+HISTORY_FORMAT_VERSION = 1
+
+# One change: (path of keys into the version's JSON form, new value); an empty path replaces the whole version
+Change = Tuple[List[str], Any]
+
+
+class VersionIndex:
+    """
+    Positions of a character's versions by version ID and by type
+
+    Derived from the versions list and extended lazily over versions
+    appended since the last lookup, so adding a version and looking one up
+    are both O(1). Replacing or shrinking the list triggers a rebuild, and a
+    lookup that lands on a different version (the list was edited in place)
+    rebuilds once and retries.
+    """
+    __slots__ = ("source", "indexed", "by_id", "by_type")
+
+    def __init__(self):
+        self.source: Optional[list] = None  # The indexed versions list
+        self.indexed = 0  # Leading versions covered by the maps
+        self.by_id: Dict[str, int] = {}
+        self.by_type: Dict[Any, int] = {}  # Version type -> first version of that type
+
+    def sync(self, versions: list, rebuild: bool = False) -> None:
+        """Bring the index up to date with `versions`"""
+        if rebuild or self.source is not versions or self.indexed > len(versions):
+            self.source = versions
+            self.indexed = 0
+            self.by_id = {}
+            self.by_type = {}
+        by_id, by_type = self.by_id, self.by_type
+        for position in range(self.indexed, len(versions)):
+            version = versions[position]
+            by_id[version.version_id] = position
+            by_type.setdefault(version.version_type, position)
+        self.indexed = len(versions)
+
+    def _find(self, versions: list, table: str, key: Any, attribute: str) -> Optional[Any]:
+        for rebuild in (False, True):
+            self.sync(versions, rebuild)
+            position = getattr(self, table).get(key)
+            if position is None:
+                return None
+            version = versions[position]
+            if getattr(version, attribute) == key:
+                return version
+        return None
+
+    def get(self, versions: list, version_id: str) -> Optional[Any]:
+        return self._find(versions, "by_id", version_id, "version_id")
+
+    def first_of_type(self, versions: list, version_type: Any) -> Optional[Any]:
+        return self._find(versions, "by_type", version_type, "version_type")
+
+
+def _diff(before: Any, after: Any, path: Tuple[str, ...] = ()) -> List[Change]:
+    # Objects with the same keys (sub-models) are diffed field by field; anything else is replaced
+    if isinstance(before, dict) and isinstance(after, dict) and before.keys() == after.keys():
+        changes: List[Change] = []
+        for key, value in after.items():
+            if before[key] != value:
+                changes.extend(_diff(before[key], value, path + (key,)))
+        return changes
+    return [(list(path), after)]
+
+
+def _apply(state: Any, path: Sequence[str], value: Any) -> Any:
+    # Copies the containers along the path so earlier versions' data is never mutated
+    if not path:
+        return copy.deepcopy(value)
+    updated = dict(state)
+    updated[path[0]] = _apply(state[path[0]], path[1:], value)
+    return updated
+
+
+def compact_versions(versions: Iterable[BaseModel]) -> List[List[Change]]:
+    """
+    Compact history of a version list
+
+    The first version is stored whole; every later version stores only the
+    fields (and nested fields) that differ from the version before it.
+    Records are JSON-serializable.
+
+    Args:
+        versions: Versions, oldest first
+
+    Returns:
+        One list of changes per version
+    """
+    records: List[List[Change]] = []
+    previous: Optional[Dict[str, Any]] = None
+    for version in versions:
+        current = version.model_dump(mode="json")
+        records.append([([], current)] if previous is None else _diff(previous, current))
+        previous = current
+    return records
+
+
+def expand_versions(records: Iterable[Sequence[Change]], model: Type[BaseModel]) -> List[BaseModel]:
+    """
+    Rebuild full versions from compact_versions() records
+
+    Args:
+        records: Change lists, oldest version first
+        model: Version model to validate each version into
+
+    Returns:
+        Versions, oldest first
+    """
+    versions: List[BaseModel] = []
+    state: Any = None
+    for changes in records:
+        for path, value in changes:
+            if state is None and path:
+                raise ValueError("Compact history must start with a whole version")
+            state = _apply(state, path, value)
+        versions.append(model.model_validate(state))
+    return versions
@@ -6,11 +6,20 @@ from typing import Optional, Dict, List, Any
 from pydantic import BaseModel, Field
 from enum import Enum
 from datetime import datetime
+import hashlib
+import secrets
 import uuid
 import logging
 
 logger = logging.getLogger(__name__)
 
+API_KEY_PREFIX = "afs_"
+
+
+def hash_api_key(api_key: str) -> str:
+    """Hash a plaintext API key for storage and lookup (SHA-256 hex)"""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
 
 class SubscriptionTier(str, Enum):
     """Subscription tiers"""
@@ -72,6 +81,13 @@ class APIKey(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     expires_at: Optional[datetime] = None
     is_active: bool = True
+    key: Optional[str] = Field(default=None, exclude=True)  # Plaintext, only on the copy returned at creation
+
+    def is_valid(self, now: Optional[datetime] = None) -> bool:
+        """Check the key is active and not expired"""
+        if not self.is_active:
+            return False
+        return not self.expires_at or self.expires_at >= (now or datetime.utcnow())
 
 
 class SLA(BaseModel):
@@ -101,6 +117,7 @@ class EnterprisePlatform:
         self.usage_records: List[UsageRecord] = []
         self.billing_periods: Dict[str, BillingPeriod] = {}
         self.api_keys: Dict[str, APIKey] = {}
+        self.api_key_index: Dict[str, str] = {}  # key_hash -> key_id
         self.slas: Dict[str, SLA] = {}
     
     async def create_organization(
@@ -316,26 +333,7 @@ class EnterprisePlatform:
         rate_limit: int = 1000
     ) -> APIKey:
         """Create API key for programmatic access"""
-        if organization_id not in self.organizations:
-            raise ValueError(f"Organization {organization_id} not found")
-        
-        key_id = str(uuid.uuid4())
-        # In production, would hash the actual key
-        key_hash = f"hash_{key_id}"
-        
-        api_key = APIKey(
-            organization_id=organization_id,
-            key_hash=key_hash,
-            name=name,
-            permissions=permissions or ["read", "write"],
-            rate_limit=rate_limit
-        )
-        
-        self.api_keys[api_key.key_id] = api_key
-        
-        logger.info(f"Created API key {api_key.key_id} for organization {organization_id}")
-        
-        return api_key
+        return self.create_api_key_sync(organization_id, name, permissions, rate_limit)
 
     def create_api_key_sync(
         self,
@@ -344,36 +342,42 @@ class EnterprisePlatform:
         permissions: Optional[List[str]] = None,
         rate_limit: int = 1000
     ) -> APIKey:
-        """Create API key (synchronous - tests expect sync)"""
+        """
+        Create API key (synchronous - tests expect sync)
+
+        Only the SHA-256 hash of the key is stored. The plaintext key is set
+        on the returned copy (APIKey.key) and cannot be recovered later.
+        """
         if organization_id not in self.organizations:
             raise ValueError(f"Organization {organization_id} not found")
         
-        key_id = str(uuid.uuid4())
-        key_hash = f"hash_{key_id}"
+        plaintext = f"{API_KEY_PREFIX}{secrets.token_urlsafe(32)}"
         
         api_key = APIKey(
             organization_id=organization_id,
-            key_hash=key_hash,
+            key_hash=hash_api_key(plaintext),
             name=name,
             permissions=permissions or ["read", "write"],
             rate_limit=rate_limit
         )
         
         self.api_keys[api_key.key_id] = api_key
+        self.api_key_index[api_key.key_hash] = api_key.key_id
         logger.info(f"Created API key {api_key.key_id} for organization {organization_id}")
-        return api_key
+        return api_key.model_copy(update={"key": plaintext})
     
     # Make sync version the default
     create_api_key = create_api_key_sync
     
+    def lookup_api_key(self, key_hash: str) -> Optional[APIKey]:
+        """Look up an API key by hash (O(1)), regardless of validity"""
+        key_id = self.api_key_index.get(key_hash)
+        return self.api_keys.get(key_id) if key_id else None
+    
     async def validate_api_key_async(self, key_hash: str) -> Optional[APIKey]:
         """Validate API key (async)"""
-        for key in self.api_keys.values():
-            if key.key_hash == key_hash and key.is_active:
-                if key.expires_at and key.expires_at < datetime.utcnow():
-                    return None
-                return key
-        return None
+        key = self.lookup_api_key(key_hash)
+        return key if key and key.is_valid() else None
     
     def validate_api_key(self, api_key: str) -> bool:
         """
@@ -385,11 +389,19 @@ class EnterprisePlatform:
         Returns:
             True if valid, False otherwise
         """
-        import asyncio
-        # In production, would hash the api_key and compare
-        # For tests, check if any key matches
-        result = asyncio.run(self.validate_api_key_async(f"hash_{api_key}"))
-        return result is not None
+        key = self.lookup_api_key(hash_api_key(api_key))
+        return key is not None and key.is_valid()
+    
+    def revoke_api_key(self, key_id: str) -> bool:
+        """Revoke an API key; returns False if it does not exist"""
+        if key_id not in self.api_keys:
+            return False
+        
+        key = self.api_keys[key_id]
+        key.is_active = False
+        self.api_key_index.pop(key.key_hash, None)
+        logger.info(f"Revoked API key {key_id}")
+        return True
     
     async def get_organization(self, organization_id: str) -> Organization:
         """Get organization by ID"""
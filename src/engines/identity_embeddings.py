@@ -0,0 +1,307 @@
+"""
+Identity Embeddings - Visual identity consistency for characters
+Embedding matrix per character version, cosine queries and batch re-scoring
+"""
+from typing import Optional, Dict, List, Any, Tuple, Callable, Sequence
+import hashlib
+import json
+import os
+import re
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Maps visuals to an (n, dim) array; swap in an image model in production
+Embedder = Callable[[Sequence[Any]], np.ndarray]
+
+
+class HashingEmbedder:
+    """
+    Deterministic CPU embedder (feature hashing over a visual's descriptors)
+
+    Embeds the generation prompt stored in `visual.metadata["prompt"]`, or
+    the visual's URL and attributes, so visuals described alike land close
+    together. A stand-in for an image-embedding model in tests and
+    development; it never looks at pixels.
+
+    Args:
+        dim: Embedding dimension
+    """
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    @staticmethod
+    def describe(visual: Any) -> str:
+        prompt = visual.metadata.get("prompt")
+        if prompt:
+            return prompt
+        fields = (visual.image_url, visual.pose, visual.lighting, visual.emotion,
+                  visual.wardrobe, visual.makeup, visual.aging)
+        return " ".join(f for f in fields if f)
+
+    def __call__(self, visuals: Sequence[Any]) -> np.ndarray:
+        matrix = np.zeros((len(visuals), self.dim), dtype=np.float32)
+        for row, visual in enumerate(visuals):
+            for token in _TOKEN_RE.findall(self.describe(visual).lower()):
+                digest = hashlib.blake2b(token.encode(), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self.dim
+                matrix[row, bucket] += 1.0 if digest[4] & 1 else -1.0
+        return matrix
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+class IdentityEmbeddingStore:
+    """
+    Embeddings of character version visuals in one float32 matrix
+
+    Rows are L2-normalized, so cosine similarity is a dot product and a
+    query against every stored visual is one matrix-vector multiply. With
+    `path` the matrix is a memory-mapped .npy file (keys in a JSON sidecar
+    written by flush()), so large stores open without loading into memory.
+    Freed rows are reused.
+
+    Args:
+        dim: Embedding dimension
+        path: .npy file to memory-map (None keeps the matrix in memory)
+        capacity: Initial number of rows
+    """
+
+    def __init__(self, dim: int = 256, path: Optional[str] = None, capacity: int = 1024):
+        self.dim = dim
+        self.path = path
+        self.keys: List[Optional[Tuple[str, str]]] = []  # row -> (character_id, version_id)
+        self.rows: Dict[str, int] = {}  # version_id -> row
+        self.by_character: Dict[str, List[int]] = {}
+        self.free: List[int] = []
+        self.revisions: Dict[str, int] = {}  # character_id -> count of embedding changes
+
+        if path and os.path.exists(path) and os.path.exists(self._keys_path):
+            self.matrix = np.load(path, mmap_mode="r+")
+            if self.matrix.shape[1] != dim:
+                raise ValueError(f"{path} holds {self.matrix.shape[1]}-d embeddings, expected {dim}")
+            with open(self._keys_path) as f:
+                self.keys = [tuple(k) if k else None for k in json.load(f)]
+            for row, key in enumerate(self.keys):
+                if key is None:
+                    self.free.append(row)
+                else:
+                    self.rows[key[1]] = row
+                    self.by_character.setdefault(key[0], []).append(row)
+        else:
+            self.matrix = self._allocate(capacity)
+
+    @property
+    def _keys_path(self) -> str:
+        return f"{self.path}.keys.json"
+
+    def _allocate(self, capacity: int) -> np.ndarray:
+        if not self.path:
+            return np.zeros((capacity, self.dim), dtype=np.float32)
+        return np.lib.format.open_memmap(self.path, mode="w+", dtype=np.float32, shape=(capacity, self.dim))
+
+    def _grow(self) -> None:
+        used = len(self.keys)
+        if not self.path:
+            grown = np.zeros((max(1024, used * 2), self.dim), dtype=np.float32)
+            grown[:used] = self.matrix[:used]
+            self.matrix = grown
+            return
+        tmp = f"{self.path}.tmp"
+        grown = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float32, shape=(max(1024, used * 2), self.dim))
+        grown[:used] = self.matrix[:used]
+        grown.flush()
+        del grown
+        self.matrix = None
+        os.replace(tmp, self.path)
+        self.matrix = np.load(self.path, mmap_mode="r+")
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, version_id: str) -> bool:
+        return version_id in self.rows
+
+    def revision(self, character_id: str) -> int:
+        """Changes to a character's embeddings so far (keys caches of its reference)"""
+        return self.revisions.get(character_id, 0)
+
+    def add(self, character_id: str, version_id: str, vector: np.ndarray) -> None:
+        """Store (or replace) the embedding of one character version"""
+        row = self.rows.get(version_id)
+        if row is None:
+            if self.free:
+                row = self.free.pop()
+                self.keys[row] = (character_id, version_id)
+            else:
+                if len(self.keys) == len(self.matrix):
+                    self._grow()
+                row = len(self.keys)
+                self.keys.append((character_id, version_id))
+            self.rows[version_id] = row
+            self.by_character.setdefault(character_id, []).append(row)
+        self.matrix[row] = _normalize(vector)
+        owner = self.keys[row][0]
+        self.revisions[owner] = self.revision(owner) + 1
+
+    def remove(self, version_id: str) -> bool:
+        row = self.rows.pop(version_id, None)
+        if row is None:
+            return False
+        character_id = self.keys[row][0]
+        rows = self.by_character[character_id]
+        rows.remove(row)
+        if not rows:
+            del self.by_character[character_id]
+        self.keys[row] = None
+        self.matrix[row] = 0.0
+        self.free.append(row)
+        self.revisions[character_id] = self.revision(character_id) + 1
+        return True
+
+    def remove_character(self, character_id: str) -> int:
+        versions = [self.keys[row][1] for row in self.by_character.get(character_id, [])]
+        for version_id in versions:
+            self.remove(version_id)
+        return len(versions)
+
+    def vector(self, version_id: str) -> Optional[np.ndarray]:
+        row = self.rows.get(version_id)
+        return None if row is None else np.array(self.matrix[row])
+
+    def reference(self, character_id: str, exclude: Optional[str] = None) -> Optional[np.ndarray]:
+        """Identity reference: normalized mean of the character's stored embeddings"""
+        excluded = self.rows.get(exclude) if exclude else None
+        rows = [row for row in self.by_character.get(character_id, []) if row != excluded]
+        if not rows:
+            return None
+        return _normalize(self.matrix[rows].sum(axis=0))
+
+    def consistency(
+        self,
+        character_id: str,
+        vectors: np.ndarray,
+        reference: Optional[np.ndarray] = None
+    ) -> Optional[np.ndarray]:
+        """Cosine similarity of each vector to the character's reference (None without one)"""
+        if reference is None:
+            reference = self.reference(character_id)
+        if reference is None:
+            return None
+        return _normalize(np.atleast_2d(vectors)) @ reference
+
+    def query(
+        self,
+        vector: np.ndarray,
+        k: int = 10,
+        character_id: Optional[str] = None,
+        exclude: Optional[str] = None
+    ) -> List[Tuple[str, str, float]]:
+        """
+        Most similar stored visuals to a vector
+
+        Args:
+            vector: Query embedding
+            k: Number of results
+            character_id: Only search this character's versions
+            exclude: Version ID to leave out (e.g. the query's own)
+
+        Returns:
+            (character_id, version_id, cosine similarity), best first
+        """
+        if character_id is not None:
+            rows = np.array(self.by_character.get(character_id, []), dtype=np.intp)
+            scores = self.matrix[rows] @ _normalize(vector)
+        else:
+            # Score every used row (freed rows are zero) rather than gathering live ones
+            rows = np.arange(len(self.keys), dtype=np.intp)
+            scores = self.matrix[:len(self.keys)] @ _normalize(vector)
+            if self.free:
+                scores[self.free] = -np.inf
+        if exclude in self.rows:
+            scores[rows == self.rows[exclude]] = -np.inf
+        k = min(k, int(np.isfinite(scores).sum()))
+        if k <= 0:
+            return []
+
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(*self.keys[rows[i]], float(scores[i])) for i in top]
+
+    def rescore(self, character_id: Optional[str] = None) -> Dict[str, float]:
+        """
+        Consistency of every stored version against its character's other versions
+
+        Each version is compared with the normalized sum of its character's
+        other embeddings (leave-one-out), computed for all versions at once.
+        Versions with no siblings score 1.0.
+
+        Returns:
+            version_id -> cosine similarity
+        """
+        characters = [character_id] if character_id is not None else list(self.by_character)
+        rows = np.array([row for c in characters for row in self.by_character.get(c, [])], dtype=np.intp)
+        if not len(rows):
+            return {}
+        counts = np.array([len(self.by_character.get(c, [])) for c in characters])
+        present = counts > 0
+        owners = np.repeat(np.arange(int(present.sum())), counts[present])
+        vectors = self.matrix[rows]
+        # Rows are grouped by character, so per-character sums are one segmented reduction
+        starts = np.concatenate(([0], np.cumsum(counts[present])[:-1]))
+        sums = np.add.reduceat(vectors, starts, axis=0)
+
+        others = sums[owners] - vectors
+        norms = np.linalg.norm(others, axis=1)
+        dots = np.einsum("ij,ij->i", vectors, others)
+        scores = np.where(norms > 1e-6, dots / np.maximum(norms, 1e-12), 1.0)
+        return {self.keys[row][1]: float(score) for row, score in zip(rows, scores)}
+
+    def near_duplicates(
+        self,
+        threshold: float = 0.97,
+        character_id: Optional[str] = None,
+        block: int = 2048
+    ) -> List[Tuple[str, str, float]]:
+        """
+        Pairs of stored visuals at least `threshold` similar
+
+        Compares blocks of rows against all rows so memory stays at
+        block x n similarities.
+
+        Returns:
+            (version_id, version_id, cosine similarity), most similar first
+        """
+        if character_id is not None:
+            rows = np.array(sorted(self.by_character.get(character_id, [])), dtype=np.intp)
+        else:
+            rows = np.array(sorted(self.rows.values()), dtype=np.intp)
+        vectors = self.matrix[rows]
+        pairs = []
+        for start in range(0, len(rows), block):
+            scores = vectors[start:start + block] @ vectors.T
+            i, j = np.nonzero(scores >= threshold)
+            upper = j > i + start
+            for a, b in zip(i[upper], j[upper]):
+                pairs.append((self.keys[rows[a + start]][1], self.keys[rows[b]][1], float(scores[a, b])))
+        pairs.sort(key=lambda pair: -pair[2])
+        return pairs
+
+    def flush(self) -> None:
+        """Persist the matrix and keys (no-op for in-memory stores)"""
+        if not self.path:
+            return
+        self.matrix.flush()
+        tmp = f"{self._keys_path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.keys, f)
+        os.replace(tmp, self._keys_path)
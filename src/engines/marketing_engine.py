@@ -8,6 +8,9 @@ from datetime import datetime
 import uuid
 import logging
 
+from ..utils.metrics import timed
+from ..utils.pagination import CursorIndex, Page, DEFAULT_PAGE_SIZE
+
 logger = logging.getLogger(__name__)
 
 
@@ -64,6 +67,7 @@ class MarketingEngine:
     def __init__(self, s3_bucket: str = "ai-film-studio-marketing"):
         self.s3_bucket = s3_bucket
         self.assets: Dict[str, MarketingAsset] = {}
+        self.asset_index = CursorIndex(("project_id", "asset_type"))
 
     def create_trailer(
         self,
@@ -107,6 +111,7 @@ class MarketingEngine:
         import asyncio
         return asyncio.run(self.generate_poster(project_id, style, dimensions))
     
+    @timed()
     async def generate_trailer(
         self,
         project_id: str,
@@ -139,7 +144,7 @@ class MarketingEngine:
             url=f"s3://{self.s3_bucket}/trailers/{project_id}/trailer.mp4"
         )
         
-        self.assets[asset.asset_id] = asset
+        self._store_asset(asset)
         
         logger.info(f"Generated trailer for project {project_id}")
         
@@ -160,12 +165,13 @@ class MarketingEngine:
             url=f"s3://{self.s3_bucket}/teasers/{project_id}/teaser.mp4"
         )
         
-        self.assets[asset.asset_id] = asset
+        self._store_asset(asset)
         
         logger.info(f"Generated teaser for project {project_id}")
         
         return asset
     
+    @timed()
     async def generate_poster(
         self,
         project_id: str,
@@ -193,7 +199,7 @@ class MarketingEngine:
             url=f"s3://{self.s3_bucket}/posters/{project_id}/poster.jpg"
         )
         
-        self.assets[asset.asset_id] = asset
+        self._store_asset(asset)
         
         logger.info(f"Generated poster for project {project_id}")
         
@@ -240,7 +246,7 @@ class MarketingEngine:
             url=f"s3://{self.s3_bucket}/social/{project_id}/{platform}.mp4"
         )
         
-        self.assets[asset.asset_id] = asset
+        self._store_asset(asset)
         
         logger.info(f"Generated {platform} clip for project {project_id}")
         
@@ -272,7 +278,7 @@ class MarketingEngine:
             url=f"s3://{self.s3_bucket}/cutdowns/{project_id}/cutdown.mp4"
         )
         
-        self.assets[asset.asset_id] = asset
+        self._store_asset(asset)
         
         logger.info(f"Generated {target_duration}s cut-down for project {project_id}")
         
@@ -317,9 +323,24 @@ class MarketingEngine:
         asset_type: Optional[str] = None
     ) -> List[MarketingAsset]:
         """Get all marketing assets for a project"""
-        assets = [a for a in self.assets.values() if a.project_id == project_id]
-        
-        if asset_type:
-            assets = [a for a in assets if a.asset_type == asset_type]
-        
-        return assets
+        ids = self.asset_index.iter_ids(project_id=project_id, asset_type=asset_type or None)
+        return [self.assets[i] for i in ids]
+    
+    async def get_marketing_assets_page(
+        self,
+        project_id: str,
+        asset_type: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get one page of a project's marketing assets (in creation order)"""
+        return self.asset_index.page_items(
+            self.assets, {"project_id": project_id, "asset_type": asset_type}, cursor, limit
+        )
+    
+    def _store_asset(self, asset: MarketingAsset) -> None:
+        self.assets[asset.asset_id] = asset
+        self.asset_index.add(asset.asset_id, {
+            "project_id": asset.project_id,
+            "asset_type": asset.asset_type
+        })
@@ -12,6 +12,7 @@ from ..services.music_audio import MusicAudioService
 from ..services.video_generation import VideoGenerationService
 from ..services.lipsync_animation import LipsyncAnimationService
 from ..services.subtitle_multilang import SubtitleMultilangService
+from ..utils.metrics import timed
 
 logger = logging.getLogger(__name__)
 
@@ -69,6 +70,7 @@ class PostProductionEngine:
         self.lipsync_service = LipsyncAnimationService(s3_bucket)
         self.subtitle_service = SubtitleMultilangService(s3_bucket)
     
+    @timed()
     async def generate_character_voice(
         self,
         request: SceneAwareVoiceRequest,
@@ -107,6 +109,7 @@ class PostProductionEngine:
             "scene_id": request.scene_id
         }
     
+    @timed()
     async def generate_scene_music(
         self,
         request: SceneAwareMusicRequest,
@@ -2,12 +2,15 @@
 AI Pre-Production Engine
 Converts scripts into executable production plans
 """
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, TYPE_CHECKING
 from pydantic import BaseModel, Field
 from datetime import datetime, date, time
 import uuid
 import logging
 
+if TYPE_CHECKING:
+    from .character_engine import CharacterEngine
+
 logger = logging.getLogger(__name__)
 
 
@@ -116,10 +119,15 @@ class PreProductionEngine:
     - Budget estimation
     - Call sheets
     - Production calendars
+    
+    Args:
+        character_engine: Source of the characters assigned to each scene
+            (breakdowns otherwise use only the script's character lists)
     """
     
-    def __init__(self):
+    def __init__(self, character_engine: Optional["CharacterEngine"] = None):
         self.plans: Dict[str, ProductionPlan] = {}
+        self.character_engine = character_engine
     
     async def create_production_plan(
         self,
@@ -189,9 +197,16 @@ class PreProductionEngine:
         # If script_data provided, extract basic information
         if script_data:
             scenes = script_data.get("scenes", [])
+            # Characters assigned to these scenes in the character engine, in one lookup
+            assigned = (
+                self.character_engine.get_scene_casts(scene.get("scene_id", "") for scene in scenes)
+                if self.character_engine is not None else {}
+            )
             for scene in scenes:
                 # Extract characters
-                characters = scene.get("characters", [])
+                characters = dict.fromkeys([
+                    *scene.get("characters", []), *assigned.get(scene.get("scene_id", ""), {})
+                ])
                 for char_id in characters:
                     breakdown.cast.append(BreakdownItem(
                         item_type="cast",
@@ -2,13 +2,19 @@
 AI / Real Shoot Production Layer
 Hybrid production execution supporting real footage + AI
 """
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, TYPE_CHECKING
 from pydantic import BaseModel, Field
 from enum import Enum
 from datetime import datetime
 import uuid
 import logging
 
+from ..utils.metrics import timed
+from ..utils.pagination import CursorIndex, Page, DEFAULT_PAGE_SIZE
+
+if TYPE_CHECKING:
+    from .character_engine import CharacterEngine
+
 logger = logging.getLogger(__name__)
 
 
@@ -70,11 +76,21 @@ class ProductionLayer:
     - Traditional filmmaking
     - Hybrid AI + real films
     - Fully AI productions
+    
+    Args:
+        s3_bucket: Bucket for uploaded and generated shots
+        character_engine: Source of the characters assigned to each scene
     """
     
-    def __init__(self, s3_bucket: str = "ai-film-studio-production"):
+    def __init__(
+        self,
+        s3_bucket: str = "ai-film-studio-production",
+        character_engine: Optional["CharacterEngine"] = None
+    ):
         self.s3_bucket = s3_bucket
+        self.character_engine = character_engine
         self.shots: Dict[str, Shot] = {}
+        self.shot_index = CursorIndex(("scene_id", "shot_type"))
         self.continuity_matches: Dict[str, ContinuityMatch] = {}
 
     def create_shot(
@@ -104,7 +120,7 @@ class ProductionLayer:
             metadata={"description": description, "style": style}
         )
         
-        self.shots[shot.shot_id] = shot
+        self._store_shot(shot)
         logger.info(f"Created shot {shot.shot_id} for scene {scene_id}")
         return shot
     
@@ -131,7 +147,7 @@ class ProductionLayer:
             metadata=metadata or {}
         )
         
-        self.shots[shot.shot_id] = shot
+        self._store_shot(shot)
         
         logger.info(f"Uploaded real footage shot {shot.shot_id} for scene {scene_id}")
         
@@ -154,6 +170,7 @@ class ProductionLayer:
             metadata=metadata
         )
     
+    @timed()
     async def generate_ai_shot(
         self,
         scene_id: str,
@@ -170,7 +187,11 @@ class ProductionLayer:
         - Fully AI productions
         - Inserts and gap-filling
         - Pre-visualization
+        
+        Without character_ids, the characters assigned to the scene are used.
         """
+        if character_ids is None and self.character_engine is not None:
+            character_ids = list(self.character_engine.get_scene_cast(scene_id))
         # TODO: Integrate with video generation service
         # Would generate shot matching scene requirements
         shot_id = str(uuid.uuid4())
@@ -191,7 +212,7 @@ class ProductionLayer:
             }
         )
         
-        self.shots[shot.shot_id] = shot
+        self._store_shot(shot)
         
         logger.info(f"Generated AI shot {shot.shot_id} for scene {scene_id}")
         
@@ -216,7 +237,7 @@ class ProductionLayer:
             metadata={"description": description, "is_placeholder": True}
         )
         
-        self.shots[shot.shot_id] = shot
+        self._store_shot(shot)
         
         logger.info(f"Created pre-vis {shot.shot_id} for scene {scene_id}")
         
@@ -390,4 +411,20 @@ class ProductionLayer:
     
     async def get_scene_shots(self, scene_id: str) -> List[Shot]:
         """Get all shots for a scene"""
-        return [s for s in self.shots.values() if s.scene_id == scene_id]
+        return [self.shots[i] for i in self.shot_index.iter_ids(scene_id=scene_id)]
+    
+    async def get_scene_shots_page(
+        self,
+        scene_id: str,
+        shot_type: Optional[ShotType] = None,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get one page of a scene's shots (in creation order)"""
+        return self.shot_index.page_items(
+            self.shots, {"scene_id": scene_id, "shot_type": shot_type}, cursor, limit
+        )
+    
+    def _store_shot(self, shot: Shot) -> None:
+        self.shots[shot.shot_id] = shot
+        self.shot_index.add(shot.shot_id, {"scene_id": shot.scene_id, "shot_type": shot.shot_type})
@@ -9,6 +9,8 @@ from datetime import datetime
 import uuid
 import logging
 
+from ..utils.pagination import CursorIndex, Page, DEFAULT_PAGE_SIZE
+
 logger = logging.getLogger(__name__)
 
 
@@ -154,6 +156,7 @@ class ProductionManager:
     def __init__(self):
         self.projects: Dict[str, Project] = {}
         self.assets: Dict[str, Asset] = {}
+        self.asset_index = CursorIndex(("project_id", "asset_type", "status"))
         self.users: Dict[str, User] = {}
         self.timelines: Dict[str, Timeline] = {}
         self.approvals: Dict[str, Approval] = {}
@@ -217,6 +220,7 @@ class ProductionManager:
         )
         
         self.assets[asset.asset_id] = asset
+        self._index_asset(asset)
         
         self._log_audit(
             project_id,
@@ -331,6 +335,7 @@ class ProductionManager:
         
         asset = self.assets[asset_id]
         asset.status = AssetStatus.IN_REVIEW
+        self._index_asset(asset)
         
         approval = Approval(
             asset_id=asset_id,
@@ -369,6 +374,7 @@ class ProductionManager:
             asset.status = AssetStatus.APPROVED
         else:
             asset.status = AssetStatus.DRAFT
+        self._index_asset(asset)
         
         self._log_audit(
             asset.project_id,
@@ -393,6 +399,7 @@ class ProductionManager:
         
         asset = self.assets[asset_id]
         asset.status = AssetStatus.LOCKED
+        self._index_asset(asset)
         
         self._log_audit(
             asset.project_id,
@@ -434,15 +441,34 @@ class ProductionManager:
         status: Optional[AssetStatus] = None
     ) -> List[Asset]:
         """Get all assets for a project with optional filters"""
-        assets = [a for a in self.assets.values() if a.project_id == project_id]
-        
-        if asset_type:
-            assets = [a for a in assets if a.asset_type == asset_type]
-        
-        if status:
-            assets = [a for a in assets if a.status == status]
-        
-        return assets
+        ids = self.asset_index.iter_ids(
+            project_id=project_id, asset_type=asset_type or None, status=status or None
+        )
+        return [self.assets[i] for i in ids]
+    
+    async def get_project_assets_page(
+        self,
+        project_id: str,
+        asset_type: Optional[AssetType] = None,
+        status: Optional[AssetStatus] = None,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Page:
+        """Get one page of a project's assets (in creation order)"""
+        return self.asset_index.page_items(
+            self.assets,
+            {"project_id": project_id, "asset_type": asset_type, "status": status},
+            cursor,
+            limit
+        )
+    
+    def _index_asset(self, asset: Asset) -> None:
+        """Add or re-bucket an asset in the list index (call after status changes)"""
+        self.asset_index.update(asset.asset_id, {
+            "project_id": asset.project_id,
+            "asset_type": asset.asset_type,
+            "status": asset.status
+        })
     
     async def get_project(self, project_id: str) -> Project:
         """Get project by ID"""
@@ -0,0 +1,159 @@
+"""
+Script Analytics - Incrementally maintained script metrics
+Per-scene metrics cached by scene revision, rolled up into script totals
+"""
+from typing import Optional, Dict, List, Any, Tuple, NamedTuple
+from collections import Counter
+
+# Rough speech rate used for duration estimates
+WORDS_PER_SECOND = 2.5
+MIN_SCENE_SECONDS = 5.0
+
+
+class SceneMetrics(NamedTuple):
+    """Analysis of one scene revision"""
+    scene_id: str
+    dialogue_count: int
+    dialogue_words: int
+    description_words: int
+    explicit_duration: float  # scene.duration_estimate or 0
+    duration: float  # Explicit estimate, else derived from dialogue words
+    lines_by_character: Dict[str, int]
+    warnings: Tuple[str, ...]  # Missing fields: "description", "location"
+
+
+def analyze_scene_metrics(scene: Any) -> SceneMetrics:
+    """Full analysis of one scene (splits all of its dialogue)"""
+    dialogue_words = sum(len(d.text.split()) for d in scene.dialogues)
+    return SceneMetrics(
+        scene_id=scene.scene_id,
+        dialogue_count=len(scene.dialogues),
+        dialogue_words=dialogue_words,
+        description_words=len(scene.description.split()),
+        explicit_duration=scene.duration_estimate or 0.0,
+        duration=scene.duration_estimate or max(MIN_SCENE_SECONDS, dialogue_words / WORDS_PER_SECOND),
+        lines_by_character=dict(Counter(d.character_id for d in scene.dialogues)),
+        warnings=tuple(
+            field for field in ("description", "location") if not getattr(scene, field)
+        ),
+    )
+
+
+class ScriptAnalytics:
+    """
+    Cached metrics for one script, kept current by WritingEngine
+
+    Each scene's metrics are stored with a stamp: the engine's revision
+    counter for the scene plus its top-level fields and dialogue count.
+    sync() compares stamps and re-analyzes only scenes whose stamp changed,
+    adjusting the script totals by the difference. Appending, removing and
+    reordering scenes or lines, and reassigning scene fields, are detected
+    automatically; editing a dialogue line in place needs touch() (done by
+    WritingEngine.update_dialogue).
+    """
+
+    def __init__(self, script: Any):
+        self.script = script
+        self.revisions: Dict[str, int] = {}
+        self.metrics: Dict[str, SceneMetrics] = {}
+        self.stamps: Dict[str, tuple] = {}
+        self.scenes: Dict[str, Any] = {}
+        self.order: List[str] = []
+        self.out_of_order = 0  # Adjacent scene pairs numbered in descending order
+        self.analyzed = 0  # Scenes re-analyzed by the last sync()
+
+        self.dialogue_count = 0
+        self.word_count = 0
+        self.duration = 0.0
+        self.explicit_duration = 0.0
+        self.scenes_without_dialogue = 0
+        self.lines_by_character: Counter = Counter()
+        self.sync()
+
+    def touch(self, scene_id: str) -> None:
+        """Mark a scene as edited so the next sync() re-analyzes it"""
+        self.revisions[scene_id] = self.revisions.get(scene_id, 0) + 1
+
+    def _stamp(self, scene: Any) -> tuple:
+        return (
+            self.revisions.get(scene.scene_id, 0), scene.description, scene.location,
+            scene.duration_estimate, len(scene.dialogues),
+            scene.dialogues[-1].dialogue_id if scene.dialogues else None,
+        )
+
+    def _apply(self, metrics: SceneMetrics, sign: int) -> None:
+        self.dialogue_count += sign * metrics.dialogue_count
+        self.word_count += sign * (metrics.dialogue_words + metrics.description_words)
+        self.duration += sign * metrics.duration
+        self.explicit_duration += sign * metrics.explicit_duration
+        self.scenes_without_dialogue += sign * (metrics.dialogue_count == 0)
+        for character_id, count in metrics.lines_by_character.items():
+            self.lines_by_character[character_id] += sign * count
+            if not self.lines_by_character[character_id]:
+                del self.lines_by_character[character_id]
+
+    def sync(self) -> int:
+        """
+        Bring metrics up to date with the script
+
+        Returns:
+            Number of scenes re-analyzed
+        """
+        analyzed = 0
+        seen = set()
+        order = []
+        previous_number = None
+        out_of_order = 0
+
+        for scene in self.script.scenes:
+            scene_id = scene.scene_id
+            seen.add(scene_id)
+            order.append(scene_id)
+            if previous_number is not None and scene.scene_number < previous_number:
+                out_of_order += 1
+            previous_number = scene.scene_number
+
+            stamp = self._stamp(scene)
+            if self.stamps.get(scene_id) == stamp and self.scenes.get(scene_id) is scene:
+                continue
+            old = self.metrics.get(scene_id)
+            if old is not None:
+                self._apply(old, -1)
+            metrics = self.metrics[scene_id] = analyze_scene_metrics(scene)
+            self._apply(metrics, 1)
+            self.stamps[scene_id] = stamp
+            self.scenes[scene_id] = scene
+            analyzed += 1
+
+        if len(seen) != len(self.metrics):
+            for scene_id in [s for s in self.metrics if s not in seen]:
+                self._apply(self.metrics.pop(scene_id), -1)
+                del self.stamps[scene_id], self.scenes[scene_id]
+
+        self.order = order
+        self.out_of_order = out_of_order
+        self.analyzed = analyzed
+        return analyzed
+
+    def scene_metrics(self, scene_id: str) -> Optional[SceneMetrics]:
+        return self.metrics.get(scene_id)
+
+    def warnings(self) -> List[str]:
+        """Missing-field warnings in script order ("Scene 3 has no location")"""
+        return [
+            f"Scene {position} has no {field}"
+            for position, scene_id in enumerate(self.order, start=1)
+            for field in self.metrics[scene_id].warnings
+        ]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "scene_count": len(self.order),
+            "dialogue_count": self.dialogue_count,
+            "word_count": self.word_count,
+            "estimated_duration": round(self.duration, 2),
+            "scenes_without_dialogue": self.scenes_without_dialogue,
+            "lines_by_character": dict(self.lines_by_character),
+            "scenes_out_of_order": self.out_of_order,
+            "warning_count": sum(len(m.warnings) for m in self.metrics.values()),
+        }
@@ -0,0 +1,291 @@
+"""
+Script Context - Token-budgeted LLM context for long scripts
+Scene windows, cached per-sequence summaries and cache-friendly prompt prefixes
+"""
+from typing import Optional, Dict, List, Any, Tuple, Callable, Awaitable, Union
+from pydantic import BaseModel, Field
+from collections import OrderedDict
+import hashlib
+import re
+import logging
+
+from .storyboard_pipeline import scene_revision
+
+logger = logging.getLogger(__name__)
+
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+Summarizer = Callable[[str], Awaitable[str]]
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Local BPE-style token estimate (no tokenizer download or network call)
+
+    Counts one token per punctuation mark and one per word plus one for
+    every further 6 characters. This slightly over-counts English compared
+    with cl100k-style tokenizers, which is the safe side for budget checks.
+    """
+    return sum(
+        1 + (len(piece) - 1) // 6 if piece[0].isalnum() or piece[0] == "_" else 1
+        for piece in _PIECE_RE.findall(text)
+    )
+
+
+def _hash(text: str) -> str:
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+class PromptContext(BaseModel):
+    """An assembled prompt and what went into it"""
+    system: str  # Stable shared prefix (character bible, style guide)
+    prompt: str  # Story so far, recent scenes and the task
+    prefix_key: str  # Hash of the shared prefix (identical prefixes hit provider prompt caches)
+    prefix_tokens: int
+    total_tokens: int
+    budget: int
+    scene_ids: List[str] = Field(default_factory=list)  # Scenes included in full
+    summarized_sequences: int = 0
+
+    def messages(self) -> List[Dict[str, str]]:
+        return [{"role": "system", "content": self.system}, {"role": "user", "content": self.prompt}]
+
+
+class ScriptContextBuilder:
+    """
+    Builds prompts about one scene of a long script within a token budget
+
+    Prompt layout, most stable first so that consecutive requests share the
+    longest possible prefix (provider-side prompt caching matches on it):
+
+        system: shared prefix - style guide, then character bible (sorted)
+        prompt: "STORY SO FAR" - one summary per earlier sequence, oldest first
+                "RECENT SCENES" - full text of the scenes before the focus scene
+                "CURRENT SCENE" - the focus scene
+                the task
+
+    Budgeting: the prefix, focus scene and task are required; recent scenes
+    are added nearest first up to `window_share` of what remains, then
+    summaries of the sequences before them, nearest first, with the rest.
+
+    Sequences follow the script's beats when it has any, otherwise fixed
+    runs of `sequence_size` scenes. Summaries are cached by the revisions of
+    their scenes, so an edit re-summarizes only the sequence containing it.
+
+    Args:
+        summarize: Coroutine turning sequence text into a summary
+                   (default: local extractive summary)
+        sequence_size: Scenes per sequence when the script has no beats
+        window_share: Share of the free budget reserved for recent scenes
+        max_cached: Maximum cached scene texts and sequence summaries
+    """
+
+    def __init__(
+        self,
+        summarize: Optional[Summarizer] = None,
+        sequence_size: int = 8,
+        window_share: float = 0.6,
+        max_cached: int = 4096
+    ):
+        self.summarize = summarize
+        self.sequence_size = sequence_size
+        self.window_share = window_share
+        self.max_cached = max_cached
+        self.scene_texts: "OrderedDict[Tuple[str, str], Tuple[str, int]]" = OrderedDict()
+        self.summaries: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self.prefixes: Dict[str, Tuple[str, int]] = {}
+        self.summaries_built = 0  # Sequence summaries produced (cache misses)
+
+    def _remember(self, cache: OrderedDict, key: Any, value: Any) -> Any:
+        cache[key] = value
+        if len(cache) > self.max_cached:
+            cache.popitem(last=False)
+        return value
+
+    def scene_text(
+        self, scene: Any, names: Optional[Dict[str, str]] = None, names_key: str = ""
+    ) -> Tuple[str, int]:
+        """
+        Compact screenplay text of a scene and its token estimate
+
+        Cached per scene revision; `names_key` identifies the `names` mapping.
+        """
+        key = (scene.scene_id, scene_revision(scene), names_key)
+        cached = self.scene_texts.get(key)
+        if cached is not None:
+            self.scene_texts.move_to_end(key)
+            return cached
+
+        names = names or {}
+        heading = f"{scene.scene_type.value}. {scene.location}"
+        if scene.time_of_day:
+            heading += f" - {scene.time_of_day}"
+        lines = [f"{scene.scene_number}. {heading.upper()}", scene.description]
+        for d in scene.dialogues:
+            name = names.get(d.character_id, d.character_id)
+            lines.append(f"{name}: {f'({d.parenthetical}) ' if d.parenthetical else ''}{d.text}")
+        text = "\n".join(line for line in lines if line)
+        return self._remember(self.scene_texts, key, (text, estimate_tokens(text)))
+
+    def sequences(self, script: Any) -> List[List[Any]]:
+        """Scenes grouped into sequences (by beat, else fixed-size runs)"""
+        if script.beats:
+            beat_of = {}
+            for beat in sorted(script.beats, key=lambda b: b.order):
+                for scene_id in beat.scene_ids:
+                    beat_of.setdefault(scene_id, beat.beat_id)
+            groups: List[List[Any]] = []
+            current: Optional[str] = None
+            for scene in script.scenes:
+                beat = beat_of.get(scene.scene_id)  # Runs of scenes outside any beat group together
+                if not groups or beat != current:
+                    groups.append([])
+                    current = beat
+                groups[-1].append(scene)
+            return groups
+        return [
+            script.scenes[i:i + self.sequence_size]
+            for i in range(0, len(script.scenes), self.sequence_size)
+        ]
+
+    async def sequence_summary(
+        self, scenes: List[Any], names: Optional[Dict[str, str]] = None, names_key: str = ""
+    ) -> Tuple[str, int]:
+        """Summary of a sequence and its token estimate (cached by scene revisions)"""
+        key = _hash(names_key + "|" + "|".join(f"{s.scene_id}:{scene_revision(s)}" for s in scenes))
+        cached = self.summaries.get(key)
+        if cached is not None:
+            self.summaries.move_to_end(key)
+            return cached
+
+        if self.summarize is not None:
+            text = "\n\n".join(self.scene_text(s, names, names_key)[0] for s in scenes)
+            summary = (await self.summarize(text)).strip()
+        else:
+            summary = " ".join(self._extract(scene, names or {}) for scene in scenes)
+        self.summaries_built += 1
+        return self._remember(self.summaries, key, (summary, estimate_tokens(summary)))
+
+    @staticmethod
+    def _extract(scene: Any, names: Dict[str, str]) -> str:
+        """One-line extractive summary: location, first sentence, speakers"""
+        first = _SENTENCE_RE.split(scene.description.strip(), maxsplit=1)[0] if scene.description else ""
+        words = first.split()
+        if len(words) > 25:
+            first = " ".join(words[:25]) + "..."
+        speakers = list(dict.fromkeys(names.get(d.character_id, d.character_id) for d in scene.dialogues))
+        talk = f" ({', '.join(speakers)} speak)" if speakers else ""
+        return f"[{scene.scene_number}. {scene.location}] {first}{talk}".strip()
+
+    def prefix(
+        self,
+        character_bible: Optional[Union[str, Dict[str, str]]] = None,
+        style_guide: Optional[str] = None
+    ) -> Tuple[str, int]:
+        """Shared system prefix; byte-identical for identical inputs"""
+        if isinstance(character_bible, dict):
+            character_bible = "\n".join(f"- {name}: {character_bible[name]}" for name in sorted(character_bible))
+        parts = ["You are a screenwriting assistant working on a feature script."]
+        if style_guide:
+            parts.append(f"STYLE GUIDE\n{style_guide.strip()}")
+        if character_bible:
+            parts.append(f"CHARACTERS\n{character_bible.strip()}")
+        text = "\n\n".join(parts)
+        key = _hash(text)
+        if key not in self.prefixes:
+            self.prefixes[key] = (text, estimate_tokens(text))
+        return self.prefixes[key]
+
+    async def build(
+        self,
+        script: Any,
+        scene_id: str,
+        task: str,
+        budget: int,
+        character_bible: Optional[Union[str, Dict[str, str]]] = None,
+        style_guide: Optional[str] = None,
+        names: Optional[Dict[str, str]] = None
+    ) -> PromptContext:
+        """
+        Assemble the prompt for a task about one scene
+
+        Args:
+            script: Script
+            scene_id: Focus scene
+            task: Instruction placed last
+            budget: Maximum prompt tokens (estimated)
+            character_bible: Text or {name: description}
+            style_guide: House style text
+            names: character_id -> display name for dialogue
+
+        Returns:
+            PromptContext within the budget
+
+        Raises:
+            ValueError: If the scene is not in the script or the required
+                parts alone exceed the budget
+        """
+        position = next((i for i, s in enumerate(script.scenes) if s.scene_id == scene_id), None)
+        if position is None:
+            raise ValueError(f"Scene {scene_id} not found in script {script.script_id}")
+
+        names_key = _hash(repr(sorted(names.items()))) if names else ""
+        system, prefix_tokens = self.prefix(character_bible, style_guide)
+        focus_text, focus_tokens = self.scene_text(script.scenes[position], names, names_key)
+        required = prefix_tokens + focus_tokens + estimate_tokens(task) + 8  # Section labels
+        if required > budget:
+            raise ValueError(f"Budget of {budget} tokens is below the {required} required")
+
+        free = budget - required
+        window: List[Tuple[Any, str]] = []
+        window_budget = int(free * self.window_share)
+        earliest = position
+        for scene in reversed(script.scenes[:position]):
+            text, tokens = self.scene_text(scene, names, names_key)
+            if tokens > window_budget:
+                break
+            window_budget -= tokens
+            free -= tokens
+            window.append((scene, text))
+            earliest -= 1
+
+        # Summaries cover everything before the window, nearest sequence first;
+        # stop at the first that does not fit so the story stays contiguous
+        summaries: List[str] = []
+        for sequence in reversed(self._sequences_before(script, earliest)):
+            summary, tokens = await self.sequence_summary(sequence, names, names_key)
+            if tokens > free:
+                break
+            free -= tokens
+            summaries.append(summary)
+
+        sections = []
+        if summaries:
+            sections.append("STORY SO FAR\n" + "\n".join(reversed(summaries)))
+        if window:
+            sections.append("RECENT SCENES\n" + "\n\n".join(text for _, text in reversed(window)))
+        sections.append(f"CURRENT SCENE\n{focus_text}")
+        sections.append(task.strip())
+        prompt = "\n\n".join(sections)
+
+        return PromptContext(
+            system=system,
+            prompt=prompt,
+            prefix_key=_hash(system),
+            prefix_tokens=prefix_tokens,
+            total_tokens=prefix_tokens + estimate_tokens(prompt),
+            budget=budget,
+            scene_ids=[scene.scene_id for scene, _ in reversed(window)] + [scene_id],
+            summarized_sequences=len(summaries),
+        )
+
+    def _sequences_before(self, script: Any, position: int) -> List[List[Any]]:
+        """Sequences starting before a scene position"""
+        result, seen = [], 0
+        for sequence in self.sequences(script):
+            if seen >= position:
+                break
+            result.append(sequence)
+            seen += len(sequence)
+        return result
@@ -0,0 +1,80 @@
+"""
+Script Index - Per-script lookup tables
+scene_id -> scene, character_id -> dialogue lines and location -> scenes
+"""
+from typing import Optional, Dict, List, Any
+from bisect import bisect_right
+
+
+def normalize_location(location: str) -> str:
+    """Locations match case- and whitespace-insensitively ("Office" == " OFFICE ")"""
+    return " ".join(location.split()).upper()
+
+
+class ScriptIndex:
+    """
+    Lookup tables for one script, kept in sync by WritingEngine
+
+    Built in one pass over the script and then maintained incrementally as
+    scenes and dialogue lines are added. Character lines are kept in script
+    order (scene position, then line number).
+
+    Scripts edited directly rather than through the engine are detected when
+    their scene count changes; other out-of-band edits need
+    WritingEngine.reindex_script().
+    """
+
+    def __init__(self, script: Any):
+        self.script = script
+        self.scenes: Dict[str, Any] = {}  # scene_id -> Scene
+        self.positions: Dict[str, int] = {}  # scene_id -> index in script.scenes
+        self.next_line: Dict[str, int] = {}  # scene_id -> next dialogue line number
+        self.lines_by_character: Dict[str, List[Any]] = {}
+        self.line_orders: Dict[str, List[tuple]] = {}  # Parallel to lines_by_character: _order() of each line
+        self.scenes_by_location: Dict[str, List[Any]] = {}
+
+        for scene in script.scenes:
+            self.add_scene(scene)
+            for dialogue in scene.dialogues:
+                self.add_dialogue(dialogue)
+
+    def is_current(self, script: Any) -> bool:
+        return script is self.script and len(script.scenes) == len(self.positions)
+
+    def add_scene(self, scene: Any) -> None:
+        """Index a scene appended to the end of the script"""
+        self.scenes[scene.scene_id] = scene
+        self.positions[scene.scene_id] = len(self.positions)
+        self.next_line[scene.scene_id] = max(
+            (d.line_number for d in scene.dialogues), default=0
+        ) + 1
+        self.scenes_by_location.setdefault(normalize_location(scene.location), []).append(scene)
+
+    def add_dialogue(self, dialogue: Any) -> None:
+        """Index a dialogue line already appended to its scene"""
+        lines = self.lines_by_character.setdefault(dialogue.character_id, [])
+        orders = self.line_orders.setdefault(dialogue.character_id, [])
+        order = self._order(dialogue)
+        if not orders or orders[-1] <= order:
+            lines.append(dialogue)
+            orders.append(order)
+        else:
+            # Bisect the parallel key list (bisect's key= needs Python 3.10)
+            at = bisect_right(orders, order)
+            lines.insert(at, dialogue)
+            orders.insert(at, order)
+        self.next_line[dialogue.scene_id] = max(
+            self.next_line.get(dialogue.scene_id, 1), dialogue.line_number + 1
+        )
+
+    def _order(self, dialogue: Any) -> tuple:
+        return self.positions.get(dialogue.scene_id, len(self.positions)), dialogue.line_number
+
+    def get_scene(self, scene_id: str) -> Optional[Any]:
+        return self.scenes.get(scene_id)
+
+    def character_lines(self, character_id: str) -> List[Any]:
+        return list(self.lines_by_character.get(character_id, ()))
+
+    def scenes_at(self, location: str) -> List[Any]:
+        return list(self.scenes_by_location.get(normalize_location(location), ()))
@@ -0,0 +1,200 @@
+"""
+Script Search - Full-text and faceted search across scripts
+Maps scripts, scenes and dialogue lines onto a SearchIndex and keeps it current
+"""
+from typing import Optional, Dict, List, Any, Iterable, Tuple
+import logging
+
+from ..utils.search_index import SearchIndex
+from .script_index import normalize_location
+
+logger = logging.getLogger(__name__)
+
+# Facets every document carries (also stored, so they can be counted)
+FACETS = ("kind", "script_id", "script_type", "genre", "project_id", "character_id", "location")
+
+
+class ScriptSearch:
+    """
+    Search documents for every script held by a WritingEngine
+
+    Each script contributes one "script" document (title, logline), one
+    "scene" document per scene (location, time of day, description) and one
+    "line" document per dialogue line. sync() re-indexes only scripts whose
+    object or updated_at changed since the last sync, and within them only
+    scenes whose stamp changed; script-level facet changes (type, genre,
+    project) re-index the whole script.
+
+    Args:
+        path: Optional segment file to load (memory-mapped) at startup
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.index = SearchIndex(path)
+        self.versions: Dict[str, Tuple[int, Any]] = {}  # script_id -> (id(script), updated_at)
+        self.headers: Dict[str, tuple] = {}  # script_id -> script-level stamp
+        self.scenes: Dict[str, Dict[str, Tuple[tuple, List[str]]]] = {}  # script_id -> scene_id -> (stamp, line IDs)
+        self.dirty: set = set()
+        self.indexed = 0  # Scenes (re)indexed by the last sync()
+
+    def touch(self, script_id: str, scene_id: Optional[str] = None) -> None:
+        """Force a scene (or the whole script) to be re-indexed on the next sync()"""
+        self.dirty.add(script_id)
+        if scene_id is None:
+            self.headers.pop(script_id, None)
+        elif scene_id in self.scenes.get(script_id, {}):
+            _, lines = self.scenes[script_id][scene_id]
+            self.scenes[script_id][scene_id] = (None, lines)
+
+    @staticmethod
+    def _header(script: Any) -> tuple:
+        return (
+            script.title, script.logline, script.script_type, script.genre,
+            script.project_id, tuple(script.characters),
+        )
+
+    @staticmethod
+    def _scene_stamp(scene: Any) -> tuple:
+        return (
+            id(scene), scene.location, scene.time_of_day, scene.description, tuple(scene.characters),
+            len(scene.dialogues), scene.dialogues[-1].dialogue_id if scene.dialogues else None,
+        )
+
+    def sync(self, scripts: Dict[str, Any]) -> int:
+        """
+        Bring the index up to date with the engine's scripts
+
+        Returns:
+            Number of scenes (re)indexed
+        """
+        indexed = 0
+        for script_id in [s for s in self.versions if s not in scripts]:
+            self._remove_script(script_id)
+
+        for script_id, script in scripts.items():
+            version = (id(script), script.updated_at)
+            if self.versions.get(script_id) == version and script_id not in self.dirty:
+                continue
+            if script_id not in self.versions and self._adopt(script):
+                continue
+            indexed += self._index_script(script)
+            self.versions[script_id] = version
+
+        self.dirty.clear()
+        self.indexed = indexed
+        return indexed
+
+    def _adopt(self, script: Any) -> bool:
+        """Reuse documents loaded from a saved segment if the script is unchanged since"""
+        stored = self.index.stored(f"script:{script.script_id}")
+        if stored is None or stored.get("updated_at") != script.updated_at.isoformat():
+            return False
+
+        self.headers[script.script_id] = self._header(script)
+        self.scenes[script.script_id] = {
+            scene.scene_id: (self._scene_stamp(scene), [d.dialogue_id for d in scene.dialogues])
+            for scene in script.scenes
+        }
+        self.versions[script.script_id] = (id(script), script.updated_at)
+        return True
+
+    def _index_script(self, script: Any) -> int:
+        script_id = script.script_id
+        header = self._header(script)
+        full = self.headers.get(script_id) != header
+        facets = {
+            "script_id": script_id,
+            "script_type": getattr(script.script_type, "value", script.script_type),
+            "genre": script.genre,
+            "project_id": script.project_id,
+        }
+        self._add("script", f"script:{script_id}", f"{script.title} {script.logline or ''}", {
+            **facets, "character_id": list(script.characters),
+        }, {"title": script.title, "updated_at": script.updated_at.isoformat()})
+
+        known = self.scenes.setdefault(script_id, {})
+        seen = set()
+        indexed = 0
+        for scene in script.scenes:
+            seen.add(scene.scene_id)
+            stamp = self._scene_stamp(scene)
+            previous = known.get(scene.scene_id)
+            if not full and previous is not None and previous[0] == stamp:
+                continue
+            if previous is not None:
+                self._remove_lines(previous[1], keep=scene.dialogues)
+            known[scene.scene_id] = (stamp, self._index_scene(scene, facets))
+            indexed += 1
+
+        for scene_id in [s for s in known if s not in seen]:
+            self.index.remove(f"scene:{scene_id}")
+            self._remove_lines(known.pop(scene_id)[1])
+
+        self.headers[script_id] = header
+        return indexed
+
+    def _index_scene(self, scene: Any, facets: Dict[str, Any]) -> List[str]:
+        location = normalize_location(scene.location)
+        speakers = list(dict.fromkeys([*scene.characters, *(d.character_id for d in scene.dialogues)]))
+        self._add(
+            "scene", f"scene:{scene.scene_id}",
+            f"{scene.location} {scene.time_of_day or ''} {scene.description}",
+            {**facets, "character_id": speakers, "location": location},
+            {"scene_id": scene.scene_id, "scene_number": scene.scene_number, "text": scene.description[:200]},
+        )
+        for dialogue in scene.dialogues:
+            self._add(
+                "line", f"line:{dialogue.dialogue_id}",
+                f"{dialogue.parenthetical or ''} {dialogue.text}",
+                {**facets, "character_id": dialogue.character_id, "location": location},
+                {
+                    "scene_id": scene.scene_id, "dialogue_id": dialogue.dialogue_id,
+                    "line_number": dialogue.line_number, "text": dialogue.text[:200],
+                },
+            )
+        return [d.dialogue_id for d in scene.dialogues]
+
+    def _add(self, kind: str, doc_id: str, text: str, facets: Dict[str, Any], stored: Dict[str, Any]) -> None:
+        facets = {"kind": kind, **facets}
+        self.index.add(doc_id, text, facets, {**facets, **stored})
+
+    def _remove_lines(self, dialogue_ids: Iterable[str], keep: Iterable[Any] = ()) -> None:
+        kept = {d.dialogue_id for d in keep}
+        for dialogue_id in dialogue_ids:
+            if dialogue_id not in kept:
+                self.index.remove(f"line:{dialogue_id}")
+
+    def _remove_script(self, script_id: str) -> None:
+        self.index.remove(f"script:{script_id}")
+        for scene_id, (_, lines) in self.scenes.pop(script_id, {}).items():
+            self.index.remove(f"scene:{scene_id}")
+            self._remove_lines(lines)
+        self.versions.pop(script_id, None)
+        self.headers.pop(script_id, None)
+
+    def search(
+        self,
+        query: str = "",
+        filters: Optional[Dict[str, Any]] = None,
+        limit: int = 20,
+        offset: int = 0,
+        facets: Iterable[str] = ()
+    ) -> Dict[str, Any]:
+        if filters and "location" in filters and filters["location"] is not None:
+            filters = {**filters, "location": normalize_location(filters["location"])}
+        facets = tuple(facets)
+        unknown = (set(filters or ()) | set(facets)) - set(FACETS)
+        if unknown:
+            raise ValueError(f"Unknown search facet: {', '.join(sorted(unknown))}")
+        return self.index.search(query, filters=filters, limit=limit, offset=offset, facets=facets)
+
+    def save(self, path: str) -> int:
+        return self.index.save(path)
+
+    def load(self, path: str) -> None:
+        """Memory-map a saved segment; unchanged scripts adopt its documents on sync()"""
+        self.index.open(path)
+        self.versions.clear()
+        self.headers.clear()
+        self.scenes.clear()
+        self.dirty.clear()
@@ -0,0 +1,120 @@
+"""
+Script Variants - Best-of-N draft generation
+Concurrent drafts, cheap local scoring and early termination
+"""
+from typing import Optional, Dict, List, Any, Tuple, Callable, Awaitable, TypeVar
+import asyncio
+import math
+import logging
+
+from .script_analytics import ScriptAnalytics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Weights of the score components (each in [0, 1])
+DEFAULT_WEIGHTS = {"pacing": 0.4, "structure": 0.3, "dialogue_balance": 0.3}
+
+
+def pacing_score(duration: float, target: Optional[float]) -> float:
+    """1.0 on target, falling linearly to 0 at 100% off (any duration > 0 without a target)"""
+    if not target:
+        return 1.0 if duration > 0 else 0.0
+    return max(0.0, 1.0 - abs(duration - target) / target)
+
+
+def structure_score(structure: Dict[str, Any], out_of_order: int = 0) -> float:
+    """1.0 for a valid structure, less 0.1 per warning or out-of-order scene"""
+    if not structure.get("valid"):
+        return 0.0
+    return max(0.0, 1.0 - 0.1 * (len(structure.get("warnings", [])) + out_of_order))
+
+
+def dialogue_balance(lines_by_character: Dict[str, int]) -> float:
+    """Normalized entropy of lines per character: 1.0 evenly shared, 0.0 monologue or none"""
+    counts = [c for c in lines_by_character.values() if c]
+    if len(counts) < 2:
+        return 0.0
+    total = sum(counts)
+    entropy = -sum(c / total * math.log(c / total) for c in counts)
+    return entropy / math.log(len(counts))
+
+
+def score_draft(
+    analytics: ScriptAnalytics,
+    structure: Dict[str, Any],
+    target_duration: Optional[float] = None,
+    weights: Optional[Dict[str, float]] = None
+) -> Tuple[float, Dict[str, float]]:
+    """
+    Score a draft from its analytics and structure check
+
+    Args:
+        analytics: ScriptAnalytics of the draft
+        structure: Result of WritingEngine.validate_structure
+        target_duration: Target duration in seconds
+        weights: Component weights (default: DEFAULT_WEIGHTS)
+
+    Returns:
+        (weighted score in [0, 1], component scores)
+    """
+    weights = weights or DEFAULT_WEIGHTS
+    scores = {
+        "pacing": pacing_score(analytics.duration, target_duration),
+        "structure": structure_score(structure, analytics.out_of_order),
+        "dialogue_balance": dialogue_balance(analytics.lines_by_character),
+    }
+    total = sum(weights.values())
+    return sum(scores[name] * weight for name, weight in weights.items()) / total, scores
+
+
+async def best_of_n(
+    generate: Callable[[int], Awaitable[T]],
+    score: Callable[[T], float],
+    n: int,
+    enough: Optional[int] = None,
+    min_score: float = 1.0
+) -> List[Tuple[float, int, T]]:
+    """
+    Run `generate(0..n-1)` concurrently and rank the results by score
+
+    Once `enough` results scoring at least `min_score` have arrived, the
+    remaining generations are cancelled. Failed generations are logged and
+    left out; if every one fails, the last error is raised.
+
+    Returns:
+        (score, sample index, result), best first
+    """
+    if n < 1:
+        raise ValueError("n must be at least 1")
+
+    async def run(index: int) -> Tuple[int, T]:
+        return index, await generate(index)
+
+    tasks = [asyncio.ensure_future(run(i)) for i in range(n)]
+    ranked: List[Tuple[float, int, T]] = []
+    good = 0
+    error: Optional[BaseException] = None
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                index, result = await next_done
+            except Exception as e:
+                logger.warning(f"Draft generation failed: {e}")
+                error = e
+                continue
+            value = score(result)
+            ranked.append((value, index, result))
+            good += value >= min_score
+            if enough and good >= enough:
+                break
+    finally:
+        cancelled = sum(task.cancel() for task in tasks)
+        if cancelled:
+            logger.info(f"Stopped early with {len(ranked)} of {n} drafts; cancelled {cancelled}")
+
+    if not ranked and error is not None:
+        raise error
+    ranked.sort(key=lambda item: (-item[0], item[1]))
+    return ranked
@@ -0,0 +1,334 @@
+"""
+Script Versioning - Structurally Shared Revisions
+Immutable script snapshots that share unchanged scenes and dialogue lines,
+scene-level diffs and a compact delta format for storing revision history
+"""
+from typing import Optional, Dict, List, Any, NamedTuple, Tuple, TextIO, Type
+from pydantic import BaseModel, Field
+from datetime import datetime
+import copy
+import hashlib
+import json
+import uuid
+import logging
+
+from pydantic_core import to_json
+
+logger = logging.getLogger(__name__)
+
+DELTA_FORMAT_VERSION = 1
+
+
+class ScriptVersion(BaseModel):
+    """Metadata for one committed script revision"""
+    version_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    script_id: str
+    parent_version_id: Optional[str] = None
+    label: str  # Script.version at commit time
+    notes: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    changed_scenes: int = 0  # Scenes not shared with the parent revision
+
+
+class SceneChange(BaseModel):
+    """How one scene differs between two revisions"""
+    scene_id: str
+    fields: List[str] = Field(default_factory=list)  # Changed scene fields (excluding dialogues)
+    dialogues_added: List[str] = Field(default_factory=list)
+    dialogues_removed: List[str] = Field(default_factory=list)
+    dialogues_modified: List[str] = Field(default_factory=list)
+
+
+class ScriptDiff(BaseModel):
+    """Scene-level difference between two revisions"""
+    from_version_id: str
+    to_version_id: str
+    header_fields: List[str] = Field(default_factory=list)  # Changed script-level fields
+    scenes_added: List[str] = Field(default_factory=list)
+    scenes_removed: List[str] = Field(default_factory=list)
+    scenes_modified: List[SceneChange] = Field(default_factory=list)
+    reordered: bool = False
+
+    @property
+    def is_empty(self) -> bool:
+        return not (
+            self.header_fields or self.scenes_added or self.scenes_removed
+            or self.scenes_modified or self.reordered
+        )
+
+
+class SceneSnapshot(NamedTuple):
+    """Frozen scene plus fingerprints; shared between revisions when unchanged"""
+    fingerprint: str
+    scene: Any  # Scene, never mutated after the snapshot is taken
+    dialogues: Dict[str, Tuple[str, Any]]  # dialogue_id -> (fingerprint, frozen Dialogue)
+
+
+class ScriptSnapshot(NamedTuple):
+    """One immutable revision: header fields and the ordered scene snapshots"""
+    info: ScriptVersion
+    header: Dict[str, Any]
+    scenes: Tuple[SceneSnapshot, ...]
+
+
+def _digest(*parts: bytes) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class ScriptVersionStore:
+    """
+    Persistent (structurally shared) script revisions
+
+    Committing a script fingerprints every scene and dialogue line and only
+    copies the ones that differ from the parent revision; unchanged scenes and
+    lines are the very same frozen objects in both revisions. A revision of a
+    200-scene script with one edited scene therefore costs one scene copy plus
+    a tuple of 200 references.
+
+    Snapshot objects are never handed out: materialize() returns fresh copies.
+
+    Args:
+        script_model: Script model class used to materialize revisions
+        scene_model: Scene model class used to load deltas
+    """
+
+    def __init__(self, script_model: Type[BaseModel], scene_model: Type[BaseModel]):
+        self.script_model = script_model
+        self.scene_model = scene_model
+        self.snapshots: Dict[str, ScriptSnapshot] = {}
+        self.history: Dict[str, List[str]] = {}  # script_id -> version IDs, oldest first
+        self.heads: Dict[str, str] = {}  # script_id -> latest version ID
+
+    # ==================== Commit / materialize ====================
+
+    def commit(
+        self,
+        script: BaseModel,
+        notes: Optional[str] = None,
+        parent_version_id: Optional[str] = None
+    ) -> ScriptVersion:
+        """
+        Snapshot the current state of a script
+
+        Args:
+            script: Working script to snapshot
+            notes: Revision notes
+            parent_version_id: Parent revision (defaults to the script's head)
+
+        Returns:
+            Metadata of the new revision
+        """
+        parent_id = parent_version_id or self.heads.get(script.script_id)
+        parent = self.snapshots.get(parent_id) if parent_id else None
+        previous = {s.scene.scene_id: s for s in parent.scenes} if parent else {}
+
+        scenes, changed = [], 0
+        for scene in script.scenes:
+            snapshot = self._snapshot_scene(scene, previous.get(scene.scene_id))
+            changed += snapshot is not previous.get(scene.scene_id)
+            scenes.append(snapshot)
+
+        info = ScriptVersion(
+            script_id=script.script_id,
+            parent_version_id=parent_id,
+            label=script.version,
+            notes=notes,
+            changed_scenes=changed
+        )
+        header = copy.deepcopy(script.__dict__)
+        del header["scenes"], header["script_id"]
+        self._add(ScriptSnapshot(info, header, tuple(scenes)))
+
+        logger.info(
+            f"Committed version {info.version_id} of script {script.script_id} "
+            f"({changed}/{len(scenes)} scenes changed)"
+        )
+        return info
+
+    def _snapshot_scene(self, scene: BaseModel, previous: Optional[SceneSnapshot]) -> SceneSnapshot:
+        """Reuse the previous scene snapshot if unchanged, else freeze a copy sharing unchanged lines"""
+        old_lines = previous.dialogues if previous else {}
+        lines: Dict[str, Tuple[str, Any]] = {}
+        for dialogue in scene.dialogues:
+            fingerprint = _digest(dialogue.model_dump_json().encode())
+            old = old_lines.get(dialogue.dialogue_id)
+            lines[dialogue.dialogue_id] = (
+                old if old is not None and old[0] == fingerprint
+                else (fingerprint, dialogue.model_copy(deep=True))
+            )
+
+        body = scene.model_dump_json(exclude={"dialogues"}).encode()
+        fingerprint = _digest(body, *(fp.encode() for fp, _ in lines.values()))
+        if previous is not None and previous.fingerprint == fingerprint:
+            return previous
+
+        fields = {
+            name: copy.deepcopy(value)
+            for name, value in scene.__dict__.items() if name != "dialogues"
+        }
+        frozen = type(scene).model_construct(
+            **fields, dialogues=[line for _, line in lines.values()]
+        )
+        return SceneSnapshot(fingerprint, frozen, lines)
+
+    def _add(self, snapshot: ScriptSnapshot) -> None:
+        info = snapshot.info
+        self.snapshots[info.version_id] = snapshot
+        self.history.setdefault(info.script_id, []).append(info.version_id)
+        self.heads[info.script_id] = info.version_id
+
+    def get(self, version_id: str) -> ScriptSnapshot:
+        if version_id not in self.snapshots:
+            raise ValueError(f"Script version {version_id} not found")
+        return self.snapshots[version_id]
+
+    def versions(self, script_id: str) -> List[ScriptVersion]:
+        """Revisions of a script, oldest first"""
+        return [self.snapshots[v].info for v in self.history.get(script_id, [])]
+
+    def materialize(self, version_id: str, script_id: Optional[str] = None) -> BaseModel:
+        """Build an independent, editable Script from a revision"""
+        snapshot = self.get(version_id)
+        return self.script_model(
+            script_id=script_id or snapshot.info.script_id,
+            scenes=[s.scene.model_copy(deep=True) for s in snapshot.scenes],
+            **copy.deepcopy(snapshot.header)
+        )
+
+    # ==================== Diff ====================
+
+    def diff(self, from_version_id: str, to_version_id: str) -> ScriptDiff:
+        """Scene-level diff between two revisions (shared scenes are skipped in O(1))"""
+        old, new = self.get(from_version_id), self.get(to_version_id)
+        old_scenes = {s.scene.scene_id: s for s in old.scenes}
+        new_scenes = {s.scene.scene_id: s for s in new.scenes}
+
+        result = ScriptDiff(
+            from_version_id=from_version_id,
+            to_version_id=to_version_id,
+            header_fields=[
+                k for k in new.header.keys() | old.header.keys()
+                if old.header.get(k) != new.header.get(k)
+            ],
+            scenes_added=[i for i in new_scenes if i not in old_scenes],
+            scenes_removed=[i for i in old_scenes if i not in new_scenes],
+        )
+        result.header_fields.sort()
+
+        for scene_id, after in new_scenes.items():
+            before = old_scenes.get(scene_id)
+            if before is None or before is after or before.fingerprint == after.fingerprint:
+                continue
+            result.scenes_modified.append(self._scene_change(before, after))
+
+        common_old = [i for i in old_scenes if i in new_scenes]
+        common_new = [i for i in new_scenes if i in old_scenes]
+        result.reordered = common_old != common_new
+        return result
+
+    @staticmethod
+    def _scene_change(before: SceneSnapshot, after: SceneSnapshot) -> SceneChange:
+        old_fields = before.scene.__dict__
+        new_fields = after.scene.__dict__
+        return SceneChange(
+            scene_id=after.scene.scene_id,
+            fields=[
+                name for name in new_fields
+                if name != "dialogues" and old_fields.get(name) != new_fields[name]
+            ],
+            dialogues_added=[i for i in after.dialogues if i not in before.dialogues],
+            dialogues_removed=[i for i in before.dialogues if i not in after.dialogues],
+            dialogues_modified=[
+                i for i, (fp, _) in after.dialogues.items()
+                if i in before.dialogues and before.dialogues[i][0] != fp
+            ],
+        )
+
+    # ==================== Delta format ====================
+
+    def dump(self, script_id: str, out: TextIO) -> int:
+        """
+        Write a script's revision history as newline-delimited JSON deltas
+
+        Each line holds one revision: its metadata, the header fields that
+        changed, the scene order only if it changed and the full JSON of
+        added or modified scenes. Unchanged scenes are not written at all.
+        The first revision (or one whose parent is not in the file) is full.
+
+        Returns:
+            Number of revisions written
+        """
+        out.write(json.dumps({"format": "script-deltas", "version": DELTA_FORMAT_VERSION}) + "\n")
+        written: Dict[str, ScriptSnapshot] = {}
+        for version_id in self.history.get(script_id, []):
+            snapshot = self.snapshots[version_id]
+            parent = written.get(snapshot.info.parent_version_id)
+            out.write(self._delta(snapshot, parent).decode() + "\n")
+            written[version_id] = snapshot
+        return len(written)
+
+    @staticmethod
+    def _delta(snapshot: ScriptSnapshot, parent: Optional[ScriptSnapshot]) -> bytes:
+        record: Dict[str, Any] = {"info": snapshot.info, "full": parent is None}
+        if parent is None:
+            record["header"] = snapshot.header
+            record["order"] = [s.scene.scene_id for s in snapshot.scenes]
+            record["scenes"] = [s.scene for s in snapshot.scenes]
+            return to_json(record)
+
+        record["header"] = {
+            k: v for k, v in snapshot.header.items() if parent.header.get(k) != v
+        }
+        order = [s.scene.scene_id for s in snapshot.scenes]
+        if order != [s.scene.scene_id for s in parent.scenes]:
+            record["order"] = order
+        previous = {s.scene.scene_id: s.fingerprint for s in parent.scenes}
+        record["scenes"] = [
+            s.scene for s in snapshot.scenes
+            if previous.get(s.scene.scene_id) != s.fingerprint
+        ]
+        return to_json(record)
+
+    def load(self, source: TextIO) -> List[ScriptVersion]:
+        """
+        Load revisions written by dump(), rebuilding structural sharing
+
+        Returns:
+            Metadata of the loaded revisions, oldest first
+        """
+        header = json.loads(next(iter(source)))
+        if header.get("format") != "script-deltas" or header.get("version") != DELTA_FORMAT_VERSION:
+            raise ValueError("Unsupported script delta format")
+
+        loaded: List[ScriptVersion] = []
+        for line in source:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            info = ScriptVersion.model_validate(record["info"])
+            parent = None if record["full"] else self.get(info.parent_version_id)
+
+            script_header = dict(parent.header) if parent else {}
+            if record["header"]:
+                # Round-trip changed header fields through the model for proper types
+                script_header.update(
+                    self.script_model.model_validate(
+                        {"title": "", "script_type": "film", **script_header, **record["header"]}
+                    ).__dict__
+                )
+                script_header.pop("scenes", None)
+                script_header.pop("script_id", None)
+
+            by_id = {s.scene.scene_id: s for s in parent.scenes} if parent else {}
+            for data in record["scenes"]:
+                scene = self.scene_model.model_validate(data)
+                by_id[scene.scene_id] = self._snapshot_scene(scene, by_id.get(scene.scene_id))
+            # An empty order is meaningful (no scenes); only a missing one means "unchanged"
+            order = record["order"] if "order" in record else [s.scene.scene_id for s in parent.scenes]
+
+            self._add(ScriptSnapshot(info, script_header, tuple(by_id[i] for i in order)))
+            loaded.append(info)
+        return loaded
@@ -0,0 +1,132 @@
+"""
+Storyboard Pipeline - Concurrent, cached storyboard generation
+Fans out per scene under a concurrency limit and yields frames as scenes finish
+"""
+from typing import Optional, Dict, List, Any, Tuple, AsyncIterator, Awaitable, Callable, Iterable
+from collections import OrderedDict
+import asyncio
+import hashlib
+import logging
+
+from ..utils.metrics import REGISTRY, MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+# Scene fields a storyboard depends on; anything else (metadata, shot lists) is ignored
+FRAME_FIELDS = {
+    **dict.fromkeys(("scene_number", "scene_type", "location", "time_of_day", "description", "characters"), True),
+    "dialogues": {"__all__": {"character_id", "text", "emotion", "parenthetical"}},
+}
+
+SceneRenderer = Callable[[Any, Optional[str]], Awaitable[List[Any]]]
+
+
+def scene_revision(scene: Any) -> str:
+    """Fingerprint of the fields a storyboard is generated from"""
+    body = scene.model_dump_json(include=FRAME_FIELDS).encode()
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+class StoryboardCache:
+    """
+    LRU cache of generated frames keyed on (scene_id, scene revision, style)
+
+    Args:
+        max_scenes: Maximum cached scene renders
+    """
+
+    def __init__(self, max_scenes: int = 2048):
+        self.max_scenes = max_scenes
+        self.entries: "OrderedDict[Tuple[str, str, Optional[str]], List[Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: Tuple[str, str, Optional[str]]) -> Optional[List[Any]]:
+        frames = self.entries.get(key)
+        if frames is not None:
+            self.entries.move_to_end(key)
+        return frames
+
+    def put(self, key: Tuple[str, str, Optional[str]], frames: List[Any]) -> None:
+        self.entries[key] = frames
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_scenes:
+            self.entries.popitem(last=False)
+
+
+class StoryboardPipeline:
+    """
+    Renders storyboards for many scenes concurrently
+
+    Cached scenes are yielded first, without waiting; the rest are rendered
+    with at most `concurrency` renders in flight and yielded in completion
+    order. Closing the iterator early cancels renders still running.
+
+    Args:
+        render: Coroutine producing the frames for (scene, style)
+        cache: Frame cache (shared across runs)
+        concurrency: Maximum concurrent scene renders
+        registry: Metrics registry
+    """
+
+    def __init__(
+        self,
+        render: SceneRenderer,
+        cache: Optional[StoryboardCache] = None,
+        concurrency: int = 8,
+        registry: MetricsRegistry = REGISTRY
+    ):
+        self.render = render
+        self.cache = cache if cache is not None else StoryboardCache()
+        self.concurrency = concurrency
+        self.scenes_total = registry.counter(
+            "storyboard_scenes_total", "Storyboard scene renders by outcome", ("outcome",)
+        )
+
+    async def run(
+        self,
+        scenes: Iterable[Any],
+        style: Optional[str] = None,
+        concurrency: Optional[int] = None
+    ) -> AsyncIterator[Tuple[Any, List[Any]]]:
+        """
+        Yield (scene, frames) as each scene's frames become available
+
+        Args:
+            scenes: Scenes to storyboard
+            style: Visual style (part of the cache key)
+            concurrency: Override of the pipeline's concurrency limit
+        """
+        pending: List[Tuple[Any, Tuple[str, str, Optional[str]]]] = []
+        for scene in scenes:
+            key = (scene.scene_id, scene_revision(scene), style)
+            frames = self.cache.get(key)
+            if frames is not None:
+                self.scenes_total.labels("cache_hit").inc()
+                yield scene, frames
+            else:
+                pending.append((scene, key))
+        if not pending:
+            return
+
+        semaphore = asyncio.Semaphore(concurrency or self.concurrency)
+
+        async def render(scene: Any, key: Tuple[str, str, Optional[str]]) -> Tuple[Any, List[Any]]:
+            async with semaphore:
+                try:
+                    frames = await self.render(scene, style)
+                except Exception:
+                    self.scenes_total.labels("error").inc()
+                    raise
+            self.cache.put(key, frames)
+            self.scenes_total.labels("rendered").inc()
+            return scene, frames
+
+        tasks = [asyncio.ensure_future(render(scene, key)) for scene, key in pending]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -2,13 +2,29 @@
 AI Writing & Story Engine
 Narrative intelligence layer for script generation, dialogue, and story structure
 """
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Iterator, AsyncIterator, TextIO, Union
 from pydantic import BaseModel, Field
 from enum import Enum
 from datetime import datetime
+from itertools import islice
 import uuid
 import logging
 
+from ..utils.serialization import (
+    SliceSpec, parse_field_spec, project, iter_json_chunks, dumps_json,
+    dump_model_json, load_model_json, dump_model_msgpack, load_model_msgpack
+)
+from ..utils.metrics import timed
+from ..utils import fountain
+from .script_versions import ScriptVersionStore, ScriptVersion, ScriptDiff
+from .script_index import ScriptIndex
+from .script_analytics import ScriptAnalytics, SceneMetrics, analyze_scene_metrics
+from .script_search import ScriptSearch
+from .storyboard_pipeline import StoryboardPipeline, StoryboardCache
+from .script_context import ScriptContextBuilder, PromptContext
+from .script_variants import best_of_n, score_draft
+from ..services.llm_gateway import LLMGateway, LLMRequest, gateway_from_settings
+
 logger = logging.getLogger(__name__)
 
 
@@ -40,6 +56,8 @@ class Dialogue(BaseModel):
     timing: Optional[float] = None  # Duration in seconds
     scene_id: str
     line_number: int
+    parenthetical: Optional[str] = None  # e.g. "(whispering)"
+    extension: Optional[str] = None  # Character extension, e.g. "V.O."
 
 
 class Beat(BaseModel):
@@ -94,6 +112,15 @@ class StoryboardFrame(BaseModel):
     visual_style: Optional[str] = None
 
 
+class DraftVariant(BaseModel):
+    """One generated draft with its local quality score"""
+    sample: int  # Position in the batch of requested drafts
+    score: float
+    scores: Dict[str, float] = Field(default_factory=dict)  # pacing, structure, dialogue_balance
+    script: Script
+    text: str  # Raw Fountain draft
+
+
 class LLMClient:
     """Mock LLM client for script generation (mockable)"""
     
@@ -120,10 +147,30 @@ class WritingEngine:
     - Script versioning and approvals
     """
     
-    def __init__(self):
+    def __init__(self, llm_gateway: Optional[LLMGateway] = None):
         self.scripts: Dict[str, Script] = {}
         self.llm_client = LLMClient()  # Mockable LLM client
+        self._llm_gateway = llm_gateway
+        self.versions = ScriptVersionStore(Script, Scene)
+        self.indexes: Dict[str, ScriptIndex] = {}  # script_id -> lookup tables
+        self.analytics: Dict[str, ScriptAnalytics] = {}  # script_id -> cached metrics
+        self.scene_scripts: Dict[str, Dict[str, None]] = {}  # scene_id -> IDs of scripts holding it
+        self.context = ScriptContextBuilder()  # Token-budgeted prompts for long scripts
+        
+        from ..config.settings import SEARCH_INDEX_PATH, STORYBOARD_CONCURRENCY, STORYBOARD_CACHE_SCENES
+        self.search = ScriptSearch(SEARCH_INDEX_PATH)  # Full-text index over all scripts
+        self.storyboards = StoryboardPipeline(
+            self._render_storyboard_scene, StoryboardCache(STORYBOARD_CACHE_SCENES), STORYBOARD_CONCURRENCY
+        )
+    
+    @property
+    def llm_gateway(self) -> LLMGateway:
+        """Async LLM gateway (built from settings around llm_client on first use)"""
+        if self._llm_gateway is None:
+            self._llm_gateway = gateway_from_settings(self.llm_client)
+        return self._llm_gateway
     
+    @timed()
     def generate_script(
         self,
         prompt: str,
@@ -231,52 +278,429 @@ class WritingEngine:
         self.scripts[script_id] = script
         return script
     
-    async def generate_dialogue(
+    async def add_dialogue(
         self,
         script_id: str,
         scene_id: str,
         character_id: str,
-        context: str,
+        text: str,
         emotion: Optional[str] = None,
-        tone: Optional[str] = None
+        tone: Optional[str] = None,
+        parenthetical: Optional[str] = None
     ) -> Dialogue:
+        """Append a dialogue line to a scene"""
+        return self._append_dialogue(
+            script_id, scene_id, character_id, text,
+            emotion=emotion, tone=tone, parenthetical=parenthetical
+        )
+    
+    async def generate_scene_dialogues(
+        self,
+        script_id: str,
+        scene_ids: Optional[List[str]] = None,
+        character_ids: Optional[List[str]] = None,
+        context: Optional[str] = None,
+        model: Optional[str] = None,
+        **params: Any
+    ) -> List[Dialogue]:
         """
-        Generate dialogue for a character in a scene
+        Generate one line per character for many scenes through the LLM gateway
         
-        Dialogue is character-aware and scene-context-aware
+        All prompts are issued concurrently; the gateway bounds in-flight calls
+        per provider, retries transient failures, batches where the provider
+        supports it and serves repeated prompts from its cache. Lines are
+        appended in scene order once every completion has arrived.
+        
+        Args:
+            script_id: Script ID
+            scene_ids: Scenes to write (default: all scenes)
+            character_ids: Speakers (default: each scene's own characters)
+            context: Extra direction added to every prompt (story context comes
+                     from build_prompt_context)
+            model: Model name (default: LLM_MODEL setting)
+            **params: Provider parameters (temperature, max_tokens, ...)
+            
+        Returns:
+            Appended Dialogue lines
         """
-        if script_id not in self.scripts:
-            raise ValueError(f"Script {script_id} not found")
+        from ..config.settings import LLM_MODEL, LLM_CONTEXT_TOKENS
         
+        index = self._index(script_id)
         script = self.scripts[script_id]
-        scene = None
-        
-        for s in script.scenes:
-            if s.scene_id == scene_id:
-                scene = s
-                break
+        scenes = [index.get_scene(scene_id) for scene_id in scene_ids] if scene_ids else list(script.scenes)
+        if None in scenes:
+            raise ValueError(f"Scene not found in script {script_id}")
         
+        budget = LLM_CONTEXT_TOKENS - params.get("max_tokens", 0)
+        jobs = []
+        requests = []
+        for scene in scenes:
+            for character_id in character_ids or scene.characters:
+                jobs.append((scene.scene_id, character_id))
+                prompt_context = await self.build_prompt_context(
+                    script_id, scene.scene_id, f"{context or ''}\nWrite {character_id}'s next line.", budget
+                )
+                requests.append(LLMRequest(
+                    system=prompt_context.system,
+                    prompt=prompt_context.prompt,
+                    model=model or LLM_MODEL,
+                    params=params
+                ))
+        
+        responses = await self.llm_gateway.complete_many(requests)
+        dialogues = [
+            self._append_dialogue(script_id, scene_id, character_id, response.content.strip())
+            for (scene_id, character_id), response in zip(jobs, responses)
+        ]
+        
+        logger.info(f"Generated {len(dialogues)} dialogue lines across {len(scenes)} scenes")
+        return dialogues
+    
+    def _append_dialogue(
+        self,
+        script_id: str,
+        scene_id: str,
+        character_id: str,
+        text: str,
+        **fields: Any
+    ) -> Dialogue:
+        """Append a line to a scene, keeping the script index in sync"""
+        index = self._index(script_id)
+        scene = index.get_scene(scene_id)
         if not scene:
             raise ValueError(f"Scene {scene_id} not found in script {script_id}")
         
-        # TODO: Integrate with LLM for dialogue generation
-        # Would use character personality, scene context, emotion, tone
-        
         dialogue = Dialogue(
             character_id=character_id,
-            text="",  # Would be generated by LLM
-            emotion=emotion,
-            tone=tone,
+            text=text,
             scene_id=scene_id,
-            line_number=len(scene.dialogues) + 1
+            line_number=index.next_line[scene_id],
+            **fields
         )
         
         scene.dialogues.append(dialogue)
-        script.updated_at = datetime.utcnow()
+        index.add_dialogue(dialogue)
+        self.scripts[script_id].updated_at = datetime.utcnow()
+        return dialogue
+    
+    def _index(self, script_id: str) -> ScriptIndex:
+        """Lookup tables for a script, (re)built if missing or stale"""
+        if script_id not in self.scripts:
+            raise ValueError(f"Script {script_id} not found")
+        
+        script = self.scripts[script_id]
+        index = self.indexes.get(script_id)
+        if index is None or not index.is_current(script):
+            index = self.indexes[script_id] = ScriptIndex(script)
+            self._track_scenes(script_id, script.scenes)
+        return index
+    
+    def _track_scenes(self, script_id: str, scenes: List[Scene]) -> None:
+        """Record which script holds each scene (scene IDs are shared by script versions)"""
+        for scene in scenes:
+            self.scene_scripts.setdefault(scene.scene_id, {})[script_id] = None
+    
+    def reindex_script(self, script_id: str) -> None:
+        """Rebuild a script's lookup tables after editing it outside the engine"""
+        self.indexes.pop(script_id, None)
+        self._index(script_id)
+        self.search.touch(script_id)
+    
+    def _analytics(self, script: Script) -> ScriptAnalytics:
+        """Up-to-date metrics for a script (cached for scripts held by the engine)"""
+        if self.scripts.get(script.script_id) is not script:
+            return ScriptAnalytics(script)
+        
+        analytics = self.analytics.get(script.script_id)
+        if analytics is None or analytics.script is not script:
+            analytics = self.analytics[script.script_id] = ScriptAnalytics(script)
+        else:
+            analytics.sync()
+        return analytics
+    
+    def _scene_metrics(self, scene: Scene) -> SceneMetrics:
+        """Cached metrics for a scene of a known script, else a fresh analysis"""
+        if len(self.indexes) < len(self.scripts):
+            # Index (and so track the scenes of) scripts stored without going through the engine
+            for script_id in [s for s in self.scripts if s not in self.indexes]:
+                self._index(script_id)
+        for script_id in self.scene_scripts.get(scene.scene_id, ()):
+            if script_id in self.scripts and self._index(script_id).get_scene(scene.scene_id) is scene:
+                return self._analytics(self.scripts[script_id]).scene_metrics(scene.scene_id)
+        return analyze_scene_metrics(scene)
+    
+    async def generate_variants(
+        self,
+        prompt: Optional[str] = None,
+        n: int = 4,
+        script_id: Optional[str] = None,
+        scene_id: Optional[str] = None,
+        target_duration: Optional[float] = None,
+        enough: Optional[int] = None,
+        min_score: float = 0.8,
+        model: Optional[str] = None,
+        **params: Any
+    ) -> List[DraftVariant]:
+        """
+        Generate N alternative drafts concurrently and rank them
+        
+        Without scene_id each draft is a whole script written from the prompt;
+        with script_id and scene_id each is an alternative take of that scene,
+        prompted with the script's story context. Drafts are requested in
+        Fountain, parsed and scored locally on pacing, structure and dialogue
+        balance, so ranking costs no further LLM calls. Drafts are not added
+        to the engine.
+        
+        Args:
+            prompt: Story prompt, or extra direction for a scene take
+            n: Number of drafts
+            script_id: Script of the scene to rewrite
+            scene_id: Scene to rewrite
+            target_duration: Target duration in minutes (scene takes default
+                             to the current scene's duration)
+            enough: Stop generating once this many drafts score >= min_score
+            min_score: Score a draft needs to count towards `enough`
+            model: Model name (default: LLM_MODEL setting)
+            **params: Provider parameters (temperature defaults to 0.9)
+            
+        Returns:
+            DraftVariants, best first
         
-        logger.info(f"Generated dialogue for character {character_id} in scene {scene_id}")
+        Raises:
+            ValueError: If neither a prompt nor a scene is given
+        """
+        from ..config.settings import LLM_MODEL
+        
+        target = target_duration * 60 if target_duration else None
+        if scene_id:
+            if script_id not in self.scripts:
+                raise ValueError(f"Script {script_id} not found")
+            scene = self._index(script_id).get_scene(scene_id)
+            if scene is None:
+                raise ValueError(f"Scene {scene_id} not found in script {script_id}")
+            prompt_context = await self.build_prompt_context(
+                script_id, scene_id,
+                f"Write an alternative take of the current scene in Fountain format. {prompt or ''}"
+            )
+            system, user_prompt = prompt_context.system, prompt_context.prompt
+            target = target or self.calculate_duration(scene)
+        elif prompt:
+            system = "You are a screenwriter. Write a complete screenplay in Fountain format."
+            user_prompt = prompt
+        else:
+            raise ValueError("Prompt cannot be empty")
+        
+        async def generate(sample: int) -> DraftVariant:
+            # A distinct seed per draft keeps the gateway from serving one cached answer N times
+            response = await self.llm_gateway.submit(LLMRequest(
+                system=system,
+                prompt=user_prompt,
+                model=model or LLM_MODEL,
+                params={"temperature": 0.9, **params, "seed": sample}
+            ))
+            draft = self._script_from_fountain(response.content)
+            score, scores = score_draft(ScriptAnalytics(draft), self._validate_structure_script(draft), target)
+            return DraftVariant(sample=sample, score=score, scores=scores, script=draft, text=response.content)
+        
+        ranked = await best_of_n(generate, lambda variant: variant.score, n, enough, min_score)
+        logger.info(f"Generated {len(ranked)} of {n} drafts; best score {ranked[0][0]:.2f}")
+        return [variant for _, _, variant in ranked]
+    
+    async def build_prompt_context(
+        self,
+        script_id: str,
+        scene_id: str,
+        task: str,
+        budget: Optional[int] = None,
+        character_bible: Optional[Union[str, Dict[str, str]]] = None,
+        style_guide: Optional[str] = None
+    ) -> PromptContext:
+        """
+        Build an LLM prompt about a scene with story context under a token budget
+        
+        The shared prefix (style guide, character bible) goes in the system
+        message and is byte-identical across calls, so provider-side prompt
+        caching applies; earlier sequences are summarized and the scenes just
+        before the focus scene are included in full.
+        
+        Args:
+            script_id: Script ID
+            scene_id: Focus scene
+            task: Instruction placed at the end of the prompt
+            budget: Prompt token budget (default: LLM_CONTEXT_TOKENS setting)
+            character_bible: Text or {name: description}
+                             (default: the script's "character_bible" metadata)
+            style_guide: House style (default: the script's "style_guide" metadata)
+            
+        Returns:
+            PromptContext with the system and user prompt
+        """
+        from ..config.settings import LLM_CONTEXT_TOKENS
+        
+        if script_id not in self.scripts:
+            raise ValueError(f"Script {script_id} not found")
+        script = self.scripts[script_id]
+        return await self.context.build(
+            script,
+            scene_id,
+            task,
+            budget or LLM_CONTEXT_TOKENS,
+            character_bible=character_bible or script.metadata.get("character_bible"),
+            style_guide=style_guide or script.metadata.get("style_guide")
+        )
+    
+    def get_script_analytics(self, script_id: str) -> Dict[str, Any]:
+        """
+        Script-level aggregates, re-analyzing only scenes edited since last call
+        
+        Args:
+            script_id: Script ID
+            
+        Returns:
+            Totals (scenes, dialogue, words, duration, lines per character, warnings)
+        
+        Raises:
+            ValueError: If the script does not exist
+        """
+        if script_id not in self.scripts:
+            raise ValueError(f"Script {script_id} not found")
+        
+        analytics = self._analytics(self.scripts[script_id])
+        return {"script_id": script_id, **analytics.summary(), "scenes_analyzed": analytics.analyzed}
+    
+    def touch_scene(self, script_id: str, scene_id: str) -> None:
+        """Mark a scene edited outside the engine (e.g. a dialogue line changed in place)"""
+        self._index(script_id)
+        analytics = self.analytics.get(script_id)
+        if analytics is not None:
+            analytics.touch(scene_id)
+        self.search.touch(script_id, scene_id)
+    
+    def search_scripts(
+        self,
+        query: str = "",
+        kind: Optional[str] = None,
+        script_id: Optional[str] = None,
+        script_type: Optional[ScriptType] = None,
+        genre: Optional[str] = None,
+        character_id: Optional[str] = None,
+        project_id: Optional[str] = None,
+        location: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0,
+        facets: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Full-text search over scripts, scenes and dialogue lines (BM25 ranked)
+        
+        Scripts edited since the last search are re-indexed first, scene by scene.
+        
+        Args:
+            query: Free text (empty lists everything matching the filters)
+            kind: "script", "scene" or "line"
+            script_id, script_type, genre, character_id, project_id, location: Facet filters
+            limit: Maximum hits
+            offset: Hits to skip
+            facets: Facet names to count across all matches
+            
+        Returns:
+            {"total": int, "hits": [{"doc_id", "score", ...stored fields}], "facets": {...}}
+        
+        Raises:
+            ValueError: If an unknown facet is requested
+        """
+        self.search.sync(self.scripts)
+        filters = dict(
+            kind=kind, script_id=script_id, script_type=script_type, genre=genre,
+            character_id=character_id, project_id=project_id, location=location
+        )
+        results = self.search.search(
+            query, filters={k: v for k, v in filters.items() if v is not None},
+            limit=limit, offset=offset, facets=facets or ()
+        )
+        results["hits"] = [
+            {"doc_id": hit.doc_id, "score": hit.score, **hit.stored} for hit in results["hits"]
+        ]
+        return results
+    
+    def save_search_index(self, path: str) -> int:
+        """Write the search index as a memory-mappable segment; returns document count"""
+        self.search.sync(self.scripts)
+        return self.search.save(path)
+    
+    def load_search_index(self, path: str) -> None:
+        """Memory-map a saved search index (unchanged scripts are not re-indexed)"""
+        self.search.load(path)
+    
+    async def update_scene(self, script_id: str, scene_id: str, **changes: Any) -> Scene:
+        """
+        Update fields of a scene
+        
+        Args:
+            script_id: Script ID
+            scene_id: Scene ID
+            **changes: Scene fields to set (description, location, time_of_day, ...)
+            
+        Returns:
+            Updated Scene
+        """
+        scene = await self.get_scene(script_id, scene_id)
+        unknown = set(changes) - (set(Scene.model_fields) - {"scene_id", "dialogues"})
+        if unknown:
+            raise ValueError(f"Cannot update scene fields: {', '.join(sorted(unknown))}")
+        
+        for field, value in changes.items():
+            setattr(scene, field, value)
+        if "location" in changes:
+            self.reindex_script(script_id)
+        self.touch_scene(script_id, scene_id)
+        self.scripts[script_id].updated_at = datetime.utcnow()
+        return scene
+    
+    async def update_dialogue(
+        self,
+        script_id: str,
+        scene_id: str,
+        dialogue_id: str,
+        **changes: Any
+    ) -> Dialogue:
+        """
+        Update fields of a dialogue line (text, emotion, tone, parenthetical, ...)
+        
+        Returns:
+            Updated Dialogue
+        """
+        scene = await self.get_scene(script_id, scene_id)
+        dialogue = next((d for d in scene.dialogues if d.dialogue_id == dialogue_id), None)
+        if not dialogue:
+            raise ValueError(f"Dialogue {dialogue_id} not found in scene {scene_id}")
+        unknown = set(changes) - (
+            set(Dialogue.model_fields) - {"dialogue_id", "scene_id", "line_number", "character_id"}
+        )
+        if unknown:
+            raise ValueError(f"Cannot update dialogue fields: {', '.join(sorted(unknown))}")
+        
+        for field, value in changes.items():
+            setattr(dialogue, field, value)
+        self.touch_scene(script_id, scene_id)
+        self.scripts[script_id].updated_at = datetime.utcnow()
         return dialogue
     
+    async def get_scene(self, script_id: str, scene_id: str) -> Scene:
+        """Get a scene of a script by ID"""
+        scene = self._index(script_id).get_scene(scene_id)
+        if not scene:
+            raise ValueError(f"Scene {scene_id} not found in script {script_id}")
+        return scene
+    
+    async def get_character_lines(self, script_id: str, character_id: str) -> List[Dialogue]:
+        """All dialogue lines of a character, in script order"""
+        return self._index(script_id).character_lines(character_id)
+    
+    async def get_scenes_at_location(self, script_id: str, location: str) -> List[Scene]:
+        """All scenes at a location (case-insensitive), in script order"""
+        return self._index(script_id).scenes_at(location)
+    
     async def add_scene(
         self,
         script_id: str,
@@ -288,9 +712,7 @@ class WritingEngine:
         time_of_day: Optional[str] = None
     ) -> Scene:
         """Add a scene to a script"""
-        if script_id not in self.scripts:
-            raise ValueError(f"Script {script_id} not found")
-        
+        index = self._index(script_id)
         script = self.scripts[script_id]
         
         scene = Scene(
@@ -303,208 +725,291 @@ class WritingEngine:
         )
         
         script.scenes.append(scene)
+        index.add_scene(scene)
+        self._track_scenes(script_id, [scene])
         script.updated_at = datetime.utcnow()
         
         logger.info(f"Added scene {scene_number} to script {script_id}")
         return scene
     
+    @timed()
     async def generate_storyboard(
         self,
         script_id: str,
-        scene_id: Optional[str] = None
+        scene_id: Optional[str] = None,
+        style: Optional[str] = None
     ) -> List[StoryboardFrame]:
         """
         Generate storyboard frames for script or specific scene
         
-        Produces shot descriptions with camera angles and character positions
+        Produces shot descriptions with camera angles and character positions.
+        Scenes are rendered concurrently (see iter_storyboard); frames are
+        returned in script order.
         """
-        if script_id not in self.scripts:
-            raise ValueError(f"Script {script_id} not found")
+        frames = [frame async for frame in self.iter_storyboard(
+            script_id, [scene_id] if scene_id else None, style=style
+        )]
+        positions = self._index(script_id).positions
+        frames.sort(key=lambda f: (positions[f.scene_id], f.shot_number))
         
-        script = self.scripts[script_id]
-        scenes = [s for s in script.scenes if not scene_id or s.scene_id == scene_id]
+        logger.info(f"Generated {len(frames)} storyboard frames for script {script_id}")
+        return frames
+    
+    async def iter_storyboard(
+        self,
+        script_id: str,
+        scene_ids: Optional[List[str]] = None,
+        style: Optional[str] = None,
+        concurrency: Optional[int] = None
+    ) -> AsyncIterator[StoryboardFrame]:
+        """
+        Yield storyboard frames scene by scene as they are generated
         
-        frames = []
+        Scenes fan out with at most `concurrency` renders in flight. Frames are
+        cached per (scene revision, style), so after editing one scene only
+        that scene is regenerated; cached scenes are yielded immediately.
         
-        for scene in scenes:
-            # TODO: Generate storyboard frames using AI
-            # Would analyze scene description and generate shot breakdown
+        Args:
+            script_id: Script ID
+            scene_ids: Scenes to storyboard (default: all; unknown IDs are skipped)
+            style: Visual style
+            concurrency: Maximum concurrent scene renders (default: STORYBOARD_CONCURRENCY)
             
-            frame = StoryboardFrame(
-                scene_id=scene.scene_id,
-                shot_number=1,
-                description=scene.description,
-                camera_angle="medium shot"
-            )
-            frames.append(frame)
+        Yields:
+            StoryboardFrame objects, grouped by scene in completion order
+        """
+        index = self._index(script_id)
+        if scene_ids is None:
+            scenes = list(self.scripts[script_id].scenes)
+        else:
+            scenes = [s for s in (index.get_scene(scene_id) for scene_id in scene_ids) if s]
         
-        logger.info(f"Generated {len(frames)} storyboard frames for script {script_id}")
-        return frames
+        async for _, frames in self.storyboards.run(scenes, style=style, concurrency=concurrency):
+            for frame in frames:
+                yield frame
+    
+    async def _render_storyboard_scene(self, scene: Scene, style: Optional[str]) -> List[StoryboardFrame]:
+        """Frames for one scene (the AI frame generation hook)"""
+        # TODO: Generate storyboard frames using AI
+        # Would analyze scene description and generate shot breakdown
+        return [StoryboardFrame(
+            scene_id=scene.scene_id,
+            shot_number=1,
+            description=scene.description,
+            camera_angle="medium shot",
+            visual_style=style
+        )]
     
     async def get_script(self, script_id: str) -> Script:
         """Get script by ID"""
         if script_id not in self.scripts:
             raise ValueError(f"Script {script_id} not found")
         return self.scripts[script_id]
-    
+
+    @staticmethod
+    def _script_slices(
+        scene_offset: int = 0,
+        scene_limit: Optional[int] = None,
+        dialogue_offset: int = 0,
+        dialogue_limit: Optional[int] = None
+    ) -> SliceSpec:
+        """Build sub-collection slices for scene and dialogue pagination"""
+        slices: SliceSpec = {}
+        if scene_offset or scene_limit is not None:
+            stop = scene_offset + scene_limit if scene_limit is not None else None
+            slices["scenes"] = slice(scene_offset, stop)
+        if dialogue_offset or dialogue_limit is not None:
+            stop = dialogue_offset + dialogue_limit if dialogue_limit is not None else None
+            slices["scenes.dialogues"] = slice(dialogue_offset, stop)
+        return slices
+
+    async def get_script_view(
+        self,
+        script_id: str,
+        fields: Optional[str] = None,
+        exclude: Optional[str] = None,
+        scene_offset: int = 0,
+        scene_limit: Optional[int] = None,
+        dialogue_offset: int = 0,
+        dialogue_limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Get a projected view of a script (sparse fieldsets)
+
+        Args:
+            script_id: Script ID
+            fields: Comma-separated dotted paths to include (e.g. "title,scenes.location")
+            exclude: Comma-separated dotted paths to drop (e.g. "scenes.dialogues")
+            scene_offset: First scene to include
+            scene_limit: Maximum number of scenes to include
+            dialogue_offset: First dialogue line to include per scene
+            dialogue_limit: Maximum number of dialogue lines per scene
+
+        Returns:
+            JSON-compatible dictionary with only the requested fields
+        """
+        script = await self.get_script(script_id)
+        return project(
+            script,
+            include=parse_field_spec(fields),
+            exclude=parse_field_spec(exclude),
+            slices=self._script_slices(scene_offset, scene_limit, dialogue_offset, dialogue_limit)
+        )
+
+    def iter_script_json(
+        self,
+        script_id: str,
+        fields: Optional[str] = None,
+        exclude: Optional[str] = None,
+        scene_offset: int = 0,
+        scene_limit: Optional[int] = None,
+        dialogue_offset: int = 0,
+        dialogue_limit: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """
+        Incrementally encode a (projected) script as JSON
+
+        Same arguments as get_script_view. Scenes are encoded one at a time so
+        peak memory stays proportional to a single scene, not the whole script.
+
+        Raises:
+            ValueError: If script is not found
+        """
+        if script_id not in self.scripts:
+            raise ValueError(f"Script {script_id} not found")
+
+        return iter_json_chunks(
+            self.scripts[script_id],
+            include=parse_field_spec(fields),
+            exclude=parse_field_spec(exclude),
+            slices=self._script_slices(scene_offset, scene_limit, dialogue_offset, dialogue_limit)
+        )
+
+    async def list_scenes(
+        self,
+        script_id: str,
+        offset: int = 0,
+        limit: int = 50,
+        fields: Optional[str] = None,
+        location: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Get a page of scenes for a script, optionally only those at a location"""
+        script = await self.get_script(script_id)
+        scenes = self._index(script_id).scenes_at(location) if location else script.scenes
+        page = scenes[offset:offset + limit]
+
+        return {
+            "items": project(page, include=parse_field_spec(fields)),
+            "offset": offset,
+            "limit": limit,
+            "total": len(scenes)
+        }
+
+    async def list_dialogues(
+        self,
+        script_id: str,
+        scene_id: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 100,
+        fields: Optional[str] = None,
+        character_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Get a page of dialogue lines for a script, optionally for one scene and/or character"""
+        script = await self.get_script(script_id)
+        scenes = [await self.get_scene(script_id, scene_id)] if scene_id else script.scenes
+
+        if character_id:
+            lines = self._index(script_id).character_lines(character_id)
+            if scene_id:
+                lines = [d for d in lines if d.scene_id == scene_id]
+            total = len(lines)
+            page = lines[offset:offset + limit]
+        else:
+            total = sum(len(scene.dialogues) for scene in scenes)
+            lines = (d for scene in scenes for d in scene.dialogues)
+            page = list(islice(lines, offset, offset + limit))
+
+        return {
+            "items": project(page, include=parse_field_spec(fields)),
+            "offset": offset,
+            "limit": limit,
+            "total": total
+        }
+
     async def create_script_version(
         self,
         script_id: str,
         version_notes: Optional[str] = None
     ) -> Script:
-        """Create a new version of a script"""
+        """
+        Create a new version of a script as an independent working copy
+        
+        The current state of the original is committed first; the new script
+        is built from that revision and its history shares every scene with it.
+        """
         if script_id not in self.scripts:
             raise ValueError(f"Script {script_id} not found")
         
         original = self.scripts[script_id]
-        
-        # Create new version
-        new_script = Script(
-            script_id=str(uuid.uuid4()),
-            title=original.title,
-            script_type=original.script_type,
-            genre=original.genre,
-            logline=original.logline,
-            scenes=original.scenes.copy(),  # Deep copy in production
-            beats=original.beats.copy(),
-            characters=original.characters.copy(),
-            version=str(float(original.version) + 0.1),
-            project_id=original.project_id,
-            metadata={**original.metadata, "parent_version": original.script_id, "version_notes": version_notes}
-        )
+        revision = self.versions.commit(original, notes=version_notes)
+        
+        new_script = self.versions.materialize(revision.version_id, script_id=str(uuid.uuid4()))
+        new_script.version = str(round(float(original.version) + 0.1, 1))
+        new_script.metadata = {
+            **new_script.metadata,
+            "parent_version": original.script_id,
+            "parent_revision": revision.version_id,
+            "version_notes": version_notes
+        }
+        # Start the new script's history from the committed revision
+        self.versions.heads[new_script.script_id] = revision.version_id
         
         self.scripts[new_script.script_id] = new_script
+        self._track_scenes(new_script.script_id, new_script.scenes)
         logger.info(f"Created version {new_script.version} of script {script_id}")
         
         return new_script
     
-    def analyze_scene(self, scene: Scene) -> Dict[str, Any]:
+    def commit_script(self, script_id: str, notes: Optional[str] = None) -> ScriptVersion:
         """
-        Analyze scene content for sentiment, mood, and structure
+        Save a revision of a script
         
-        Args:
-            scene: Scene object to analyze
-            
-        Returns:
-            Dictionary with analysis results (sentiment, mood, etc.)
+        Unchanged scenes and dialogue lines are shared with the previous
+        revision, so frequent saves only cost what was edited.
         """
-        # TODO: Integrate with LLM for scene analysis
-        # Would analyze dialogue, action, and structure
-        
-        analysis = {
-            "scene_id": scene.scene_id,
-            "scene_number": scene.scene_number,
-            "sentiment": "neutral",  # Would be determined by LLM
-            "mood": scene.scene_type.value,
-            "character_count": len(scene.characters),
-            "dialogue_count": len(scene.dialogues),
-            "estimated_duration": scene.duration_estimate or 0.0,
-            "location": scene.location,
-            "time_of_day": scene.time_of_day
-        }
-        
-        logger.info(f"Analyzed scene {scene.scene_id}")
-        return analysis
+        if script_id not in self.scripts:
+            raise ValueError(f"Script {script_id} not found")
+        return self.versions.commit(self.scripts[script_id], notes=notes)
     
-    def export_to_fountain(self, script: Script) -> str:
-        """
-        Export script to Fountain screenplay format
-        
-        Args:
-            script: Script object to export
-            
-        Returns:
-            Fountain format string
-        """
-        fountain_lines = []
-        
-        # Title page
-        fountain_lines.append(f"Title: {script.title}")
-        if script.logline:
-            fountain_lines.append(f"Logline: {script.logline}")
-        fountain_lines.append("")
-        
-        # Scenes
-        for scene in script.scenes:
-            # Scene heading
-            scene_type = "INT" if scene.scene_type == SceneType.INT else "EXT"
-            fountain_lines.append(f"{scene_type}. {scene.location}")
-            if scene.time_of_day:
-                fountain_lines[-1] += f" - {scene.time_of_day}"
-            fountain_lines.append("")
-            
-            # Action/Description
-            fountain_lines.append(scene.description)
-            fountain_lines.append("")
-            
-            # Dialogue
-            for dialogue in scene.dialogues:
-                # Character name (would need to look up from character_id)
-                fountain_lines.append("CHARACTER NAME")
-                fountain_lines.append(dialogue.text)
-                fountain_lines.append("")
-        
-        return "\n".join(fountain_lines)
+    def list_script_versions(self, script_id: str) -> List[ScriptVersion]:
+        """Committed revisions of a script, oldest first"""
+        return self.versions.versions(script_id)
     
-    def export_to_json(self, script: Script) -> str:
-        """
-        Export script to JSON format
-        
-        Args:
-            script: Script object to export
-            
-        Returns:
-            JSON string representation
-        """
-        import json
-        
-        script_dict = {
-            "script_id": script.script_id,
-            "title": script.title,
-            "script_type": script.script_type.value,
-            "genre": script.genre,
-            "logline": script.logline,
-            "version": script.version,
-            "created_at": script.created_at.isoformat(),
-            "updated_at": script.updated_at.isoformat(),
-            "scenes": [
-                {
-                    "scene_id": scene.scene_id,
-                    "scene_number": scene.scene_number,
-                    "scene_type": scene.scene_type.value,
-                    "location": scene.location,
-                    "time_of_day": scene.time_of_day,
-                    "description": scene.description,
-                    "characters": scene.characters,
-                    "dialogues": [
-                        {
-                            "dialogue_id": d.dialogue_id,
-                            "character_id": d.character_id,
-                            "text": d.text,
-                            "emotion": d.emotion,
-                            "tone": d.tone,
-                            "line_number": d.line_number
-                        }
-                        for d in scene.dialogues
-                    ]
-                }
-                for scene in script.scenes
-            ],
-            "beats": [
-                {
-                    "beat_id": beat.beat_id,
-                    "title": beat.title,
-                    "description": beat.description,
-                    "scene_ids": beat.scene_ids,
-                    "order": beat.order
-                }
-                for beat in script.beats
-            ],
-            "characters": script.characters,
-            "metadata": script.metadata
-        }
-        
-        return json.dumps(script_dict, indent=2)
+    def get_script_version(self, version_id: str) -> Script:
+        """Get an editable copy of a committed revision"""
+        return self.versions.materialize(version_id)
+    
+    def restore_script_version(self, script_id: str, version_id: str) -> Script:
+        """Replace a working script with the content of one of its revisions"""
+        if script_id not in self.scripts:
+            raise ValueError(f"Script {script_id} not found")
+        script = self.versions.materialize(version_id, script_id=script_id)
+        self.scripts[script_id] = script
+        self._track_scenes(script_id, script.scenes)
+        logger.info(f"Restored script {script_id} to version {version_id}")
+        return script
+    
+    def diff_script_versions(self, from_version_id: str, to_version_id: str) -> ScriptDiff:
+        """Scene-level diff between two revisions"""
+        return self.versions.diff(from_version_id, to_version_id)
+    
+    def save_script_history(self, script_id: str, out: TextIO) -> int:
+        """Write a script's revision history in the compact delta format"""
+        return self.versions.dump(script_id, out)
+    
+    def load_script_history(self, source: TextIO) -> List[ScriptVersion]:
+        """Load revision history written by save_script_history"""
+        return self.versions.load(source)
     
     def extract_elements(self, scene: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -564,166 +1069,204 @@ class WritingEngine:
             # Rough estimate: 2.5 words per second for speech
             return max(5.0, word_count / 2.5)
         else:
-            if hasattr(scene, 'duration_estimate') and scene.duration_estimate:
-                return scene.duration_estimate
-            
-            # Calculate from dialogues
-            word_count = sum(len(d.text.split()) for d in scene.dialogues if hasattr(scene, 'dialogues'))
-            return max(5.0, word_count / 2.5)
+            # Cached per scene revision for scenes of scripts held by the engine
+            return self._scene_metrics(scene).duration
     
-    def import_from_fountain(self, fountain_text: str) -> Script:
+    def iter_fountain(
+        self,
+        source: fountain.Source,
+        title_page: Optional[Dict[str, str]] = None
+    ) -> Iterator[Union[Scene, Dialogue]]:
         """
-        Import script from Fountain format
+        Parse Fountain incrementally, yielding each Dialogue as soon as it is
+        complete and each Scene (with its dialogues) when the next heading or
+        end of input is reached
         
         Args:
-            fountain_text: Fountain format text
+            source: Fountain text, bytes, file object or iterable of chunks
+            title_page: Optional dict filled with title page entries
             
-        Returns:
-            Script object
-        """
-        import re
+        Yields:
+            Dialogue and Scene objects in script order
         
-        lines = fountain_text.strip().split('\n')
-        
-        title = "Untitled"
-        scenes = []
-        current_scene = None
-        
-        for line in lines:
-            line = line.strip()
+        Content before the first scene heading (e.g. FADE IN:) is skipped, as
+        are sections, synopses and page breaks. Centered text and lyrics are
+        kept as action.
+        """
+        scene: Optional[Scene] = None
+        action: List[str] = []
+        cue: Optional[fountain.Element] = None
+        parenthetical: Optional[str] = None
+        scene_count = 0
+        
+        def finish(scene: Scene) -> Scene:
+            scene.description = "\n\n".join(action)
+            action.clear()
+            return scene
+        
+        for element in fountain.tokenize(source):
+            kind = element.kind
+            
+            if kind == fountain.TITLE:
+                if title_page is not None:
+                    title_page[element.extra] = element.text
+            
+            elif kind == fountain.SCENE_HEADING:
+                if scene is not None:
+                    yield finish(scene)
+                scene_count += 1
+                scene = self._scene_from_heading(element, scene_count)
+                cue = None
+            
+            elif scene is None:
+                continue
             
-            # Title
-            if line.startswith("Title:"):
-                title = line.replace("Title:", "").strip()
+            elif kind in (fountain.ACTION, fountain.CENTERED, fountain.LYRIC):
+                action.append(element.text)
+                cue = None
             
-            # Scene heading (INT./EXT.)
-            elif line.startswith("INT.") or line.startswith("EXT."):
-                if current_scene:
-                    scenes.append(current_scene)
-                
-                scene_type = SceneType.INT if line.startswith("INT.") else SceneType.EXT
-                location = line.replace("INT.", "").replace("EXT.", "").strip()
-                
-                current_scene = Scene(
-                    scene_number=len(scenes) + 1,
-                    scene_type=scene_type,
-                    location=location,
-                    description=""
+            elif kind == fountain.CHARACTER:
+                cue, parenthetical = element, None
+                if element.text not in scene.characters:
+                    scene.characters.append(element.text)
+            
+            elif kind == fountain.PARENTHETICAL:
+                parenthetical = element.text
+            
+            elif kind == fountain.DIALOGUE and cue is not None:
+                dialogue = Dialogue(
+                    character_id=cue.text,
+                    text=element.text,
+                    scene_id=scene.scene_id,
+                    line_number=len(scene.dialogues) + 1,
+                    parenthetical=parenthetical,
+                    extension=cue.extra
                 )
+                parenthetical = None
+                scene.dialogues.append(dialogue)
+                yield dialogue
+            
+            elif kind == fountain.TRANSITION:
+                scene.metadata["transition"] = element.text
         
-        if current_scene:
-            scenes.append(current_scene)
-        
-        script = Script(
-            title=title,
-            script_type=ScriptType.FILM,
-            scenes=scenes
+        if scene is not None:
+            yield finish(scene)
+    
+    @staticmethod
+    def _scene_from_heading(heading: fountain.Element, scene_count: int) -> Scene:
+        """Build an empty Scene from a scene heading element"""
+        text = heading.text
+        match = fountain.SCENE_HEADING_RE.match(text)
+        prefix = match.group(1).upper() if match else ""
+        rest = text[match.end():].strip() if match else text
+        location, _, time_of_day = rest.rpartition(" - ")
+        if not location:
+            location, time_of_day = time_of_day, ""
+        
+        number = heading.extra
+        return Scene(
+            scene_number=int(number) if number and number.isdigit() else scene_count,
+            scene_type=SceneType.EXT if prefix in ("EXT", "EST") else SceneType.INT,
+            location=location.strip(),
+            time_of_day=time_of_day.strip() or None,
+            description="",
+            metadata={"heading": text, **({"scene_label": number} if number else {})}
         )
-        
-        self.scripts[script.script_id] = script
-        logger.info(f"Imported script from Fountain: {title}")
-        
-        return script
     
-    def validate_structure(self, script: Script) -> Dict[str, Any]:
+    def import_from_fountain(self, fountain_text: fountain.Source) -> Script:
         """
-        Validate script structure
+        Import script from Fountain format
         
         Args:
-            script: Script object to validate
+            fountain_text: Fountain text, bytes, file object or iterable of chunks
             
         Returns:
-            Validation results with any issues found
+            Script object
         """
-        issues = []
-        warnings = []
-        
-        # Check title
-        if not script.title:
-            issues.append("Script missing title")
+        script = self._script_from_fountain(fountain_text)
+        self.scripts[script.script_id] = script
+        self._track_scenes(script.script_id, script.scenes)
+        logger.info(f"Imported script from Fountain: {script.title} ({len(script.scenes)} scenes)")
         
-        # Check scenes
-        if not script.scenes:
-            issues.append("Script has no scenes")
-        else:
-            for i, scene in enumerate(script.scenes):
-                if not scene.description:
-                    warnings.append(f"Scene {i+1} has no description")
-                if not scene.location:
-                    warnings.append(f"Scene {i+1} has no location")
+        return script
+    
+    def _script_from_fountain(self, fountain_text: fountain.Source) -> Script:
+        """Parse Fountain into a Script without adding it to the engine"""
+        title_page: Dict[str, str] = {}
+        scenes = [
+            item for item in self.iter_fountain(fountain_text, title_page)
+            if isinstance(item, Scene)
+        ]
+        
+        characters = list(dict.fromkeys(c for scene in scenes for c in scene.characters))
+        return Script(
+            title=title_page.pop("Title", None) or "Untitled",
+            script_type=ScriptType.FILM,
+            logline=title_page.pop("Logline", None),
+            scenes=scenes,
+            characters=characters,
+            metadata={"title_page": title_page} if title_page else {}
+        )
+    
+    def iter_fountain_elements(
+        self,
+        script: Script,
+        character_names: Optional[Dict[str, str]] = None
+    ) -> Iterator[fountain.Element]:
+        """Fountain elements for a script, generated scene by scene"""
+        names = character_names or {}
         
-        # Check scene numbering
-        scene_numbers = [s.scene_number for s in script.scenes]
-        if scene_numbers != sorted(scene_numbers):
-            warnings.append("Scene numbers are not in order")
+        yield fountain.Element(fountain.TITLE, script.title, "Title")
+        if script.logline:
+            yield fountain.Element(fountain.TITLE, script.logline, "Logline")
+        for key, value in script.metadata.get("title_page", {}).items():
+            yield fountain.Element(fountain.TITLE, value, key)
         
-        return {
-            "valid": len(issues) == 0,
-            "issues": issues,
-            "warnings": warnings,
-            "scene_count": len(script.scenes),
-            "character_count": len(script.characters),
-            "beat_count": len(script.beats)
-        }
+        for scene in script.scenes:
+            heading = scene.metadata.get("heading")
+            if not heading:
+                prefix = "EXT." if scene.scene_type == SceneType.EXT else "INT."
+                heading = f"{prefix} {scene.location}"
+                if scene.time_of_day:
+                    heading += f" - {scene.time_of_day}"
+            yield fountain.Element(fountain.SCENE_HEADING, heading, scene.metadata.get("scene_label"))
+            
+            for paragraph in scene.description.split("\n\n"):
+                if paragraph.strip():
+                    yield fountain.Element(fountain.ACTION, paragraph)
+            
+            for dialogue in scene.dialogues:
+                name = names.get(dialogue.character_id, dialogue.character_id)
+                yield fountain.Element(fountain.CHARACTER, name.upper(), dialogue.extension)
+                if dialogue.parenthetical:
+                    yield fountain.Element(fountain.PARENTHETICAL, dialogue.parenthetical)
+                yield fountain.Element(fountain.DIALOGUE, dialogue.text)
+            
+            if scene.metadata.get("transition"):
+                yield fountain.Element(fountain.TRANSITION, scene.metadata["transition"])
     
-    async def suggest_improvements(
+    def iter_fountain_export(
         self,
         script: Script,
-        focus_areas: Optional[List[str]] = None
-    ) -> List[Dict[str, Any]]:
+        character_names: Optional[Dict[str, str]] = None
+    ) -> Iterator[str]:
+        """Stream a script as Fountain text, one chunk per element"""
+        return fountain.render(self.iter_fountain_elements(script, character_names))
+    
+    def write_fountain(
+        self,
+        script: Script,
+        out: TextIO,
+        character_names: Optional[Dict[str, str]] = None
+    ) -> int:
         """
-        Suggest improvements for a script
+        Write a script as Fountain to a text file object without building
+        the whole document in memory
         
-        Args:
-            script: Script object to analyze
-            focus_areas: Optional list of areas to focus on (pacing, dialogue, structure)
-            
         Returns:
-            List of improvement suggestions
+            Number of characters written
         """
-        suggestions = []
-        
-        # Analyze pacing
-        if not focus_areas or "pacing" in focus_areas:
-            total_duration = sum(
-                s.duration_estimate or 0 for s in script.scenes
-            )
-            
-            if total_duration < 30:
-                suggestions.append({
-                    "type": "pacing",
-                    "priority": "high",
-                    "message": "Script may be too short. Consider adding more scenes or extending existing ones."
-                })
-            elif total_duration > 180:
-                suggestions.append({
-                    "type": "pacing",
-                    "priority": "medium",
-                    "message": "Script may be too long. Consider trimming scenes for tighter pacing."
-                })
-        
-        # Analyze dialogue
-        if not focus_areas or "dialogue" in focus_areas:
-            for scene in script.scenes:
-                if not scene.dialogues:
-                    suggestions.append({
-                        "type": "dialogue",
-                        "priority": "low",
-                        "scene": scene.scene_number,
-                        "message": f"Scene {scene.scene_number} has no dialogue. Consider if this is intentional."
-                    })
-        
-        # Analyze structure
-        if not focus_areas or "structure" in focus_areas:
-            if len(script.scenes) < 3:
-                suggestions.append({
-                    "type": "structure",
-                    "priority": "medium",
-                    "message": "Script has fewer than 3 scenes. Consider a basic three-act structure."
-                })
-        
-        logger.info(f"Generated {len(suggestions)} improvement suggestions for script {script.script_id}")
-        return suggestions
+        return fountain.write(self.iter_fountain_elements(script, character_names), out)
     
     def generate_dialogue(
         self,
@@ -772,6 +1315,11 @@ class WritingEngine:
         else:
             dialogue = f"I understand what you mean."
         
+        if script_id and scene_id:
+            self._append_dialogue(
+                script_id, scene_id, character_id or char_name, dialogue, emotion=emotion, tone=tone
+            )
+        
         logger.info(f"Generated dialogue for {char_name}: {dialogue[:50]}...")
         return dialogue
     
@@ -927,8 +1475,7 @@ class WritingEngine:
         Returns:
             JSON string
         """
-        import json
-        return json.dumps(script_dict, indent=2, default=str)
+        return dumps_json(script_dict, indent=2).decode()
     
     # Override methods to handle both Script objects and dicts
     def analyze_scene(self, scene) -> Dict[str, Any]:
@@ -946,16 +1493,19 @@ class WritingEngine:
             }
         
         # Original Scene object handling
+        metrics = self._scene_metrics(scene)
         return {
             "scene_id": scene.scene_id,
             "scene_number": scene.scene_number,
             "sentiment": "neutral",
             "mood": scene.scene_type.value,
             "character_count": len(scene.characters),
-            "dialogue_count": len(scene.dialogues),
-            "estimated_duration": scene.duration_estimate or 0.0,
+            "dialogue_count": metrics.dialogue_count,
+            "word_count": metrics.dialogue_words + metrics.description_words,
+            "estimated_duration": metrics.explicit_duration,
             "location": scene.location,
-            "time_of_day": scene.time_of_day
+            "time_of_day": scene.time_of_day,
+            "warnings": [f"Scene has no {field}" for field in metrics.warnings]
         }
     
     def validate_structure(self, script_or_dict) -> Dict[str, Any]:
@@ -975,9 +1525,7 @@ class WritingEngine:
         if not script.scenes:
             issues.append("Script has no scenes")
         else:
-            for i, scene in enumerate(script.scenes):
-                if not scene.description:
-                    warnings.append(f"Scene {i+1} has no description")
+            warnings = [w for w in self._analytics(script).warnings() if w.endswith("description")]
         
         return {
             "valid": len(issues) == 0,
@@ -1002,7 +1550,7 @@ class WritingEngine:
         suggestions = []
         
         if not focus_areas or "pacing" in focus_areas:
-            total_duration = sum(s.duration_estimate or 0 for s in script.scenes)
+            total_duration = self._analytics(script).explicit_duration
             if total_duration < 30:
                 suggestions.append({
                     "type": "pacing",
@@ -1019,22 +1567,45 @@ class WritingEngine:
         return self._export_to_fountain_script(script_or_dict)
     
     def _export_to_fountain_script(self, script: Script) -> str:
-        """Original export_to_fountain for Script objects"""
-        lines = []
-        lines.append(f"Title: {script.title}")
-        lines.append("")
-        
-        for scene in script.scenes:
-            scene_type = "INT" if scene.scene_type == SceneType.INT else "EXT"
-            lines.append(f"{scene_type}. {scene.location}")
-            lines.append("")
-            lines.append(scene.description)
-            lines.append("")
-        
-        return "\n".join(lines)
+        """Export a Script object to Fountain"""
+        return "".join(self.iter_fountain_export(script))
     
-    def export_to_json(self, script_or_dict) -> str:
+    def export_to_json(self, script_or_dict, indent: Optional[int] = 2) -> str:
         """Export to JSON - handles both Script objects and dicts"""
         if isinstance(script_or_dict, dict):
             return self.export_to_json_dict(script_or_dict)
-        return self._export_to_json_script(script_or_dict)
\ No newline at end of file
+        return self._export_to_json_script(script_or_dict, indent=indent)
+    
+    def _export_to_json_script(self, script: Script, indent: Optional[int] = 2) -> str:
+        """Export a Script object to JSON (every field, compiled serializer)"""
+        return dump_model_json(script, indent=indent)
+    
+    def import_from_json(self, data: Union[str, bytes]) -> Script:
+        """
+        Import a script exported with export_to_json
+        
+        Args:
+            data: JSON text or bytes
+            
+        Returns:
+            The imported Script (replaces any script with the same ID)
+        
+        Raises:
+            ValueError: If the payload is not a valid script
+        """
+        return self._register_import(load_model_json(Script, data))
+    
+    def export_to_msgpack(self, script: Script) -> bytes:
+        """Export a script as compact MessagePack (requires the msgpack package)"""
+        return dump_model_msgpack(script)
+    
+    def import_from_msgpack(self, data: bytes) -> Script:
+        """Import a script exported with export_to_msgpack"""
+        return self._register_import(load_model_msgpack(Script, data))
+    
+    def _register_import(self, script: Script) -> Script:
+        self.scripts[script.script_id] = script
+        self.indexes.pop(script.script_id, None)
+        self._track_scenes(script.script_id, script.scenes)
+        logger.info(f"Imported script {script.script_id} with {len(script.scenes)} scenes")
+        return script
\ No newline at end of file
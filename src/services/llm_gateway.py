@@ -0,0 +1,467 @@
+"""
+LLM Gateway
+Async access to text-generation providers with bounded per-provider
+concurrency, jittered-backoff retries, a persistent response cache and
+request batching
+"""
+from typing import Optional, Dict, Any, List, Tuple, Callable, Awaitable
+from pydantic import BaseModel, Field
+from collections import OrderedDict
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import random
+import sqlite3
+import threading
+import time
+import logging
+
+from ..utils.metrics import REGISTRY, MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROVIDER = "default"
+
+
+class LLMRequest(BaseModel):
+    """One text-generation request"""
+    prompt: str
+    model: str = "gpt-4o-mini"
+    system: Optional[str] = None
+    provider: str = DEFAULT_PROVIDER
+    params: Dict[str, Any] = Field(default_factory=dict)  # temperature, max_tokens, ...
+
+    def messages(self) -> List[Dict[str, str]]:
+        messages = [{"role": "system", "content": self.system}] if self.system else []
+        return messages + [{"role": "user", "content": self.prompt}]
+
+
+class LLMResponse(BaseModel):
+    """Completion text plus where it came from"""
+    content: str
+    model: str
+    provider: str
+    cached: bool = False
+    attempts: int = 0  # Provider calls made (0 when served from cache)
+
+
+class LLMError(Exception):
+    """Non-retryable provider failure"""
+
+
+class LLMRetryableError(LLMError):
+    """Transient provider failure (rate limit, 5xx, timeout)"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def normalize_prompt(text: str) -> str:
+    """Collapse whitespace so formatting-only differences share a cache entry"""
+    return " ".join(text.split())
+
+
+def cache_key(request: LLMRequest) -> str:
+    """Stable key over provider, model, normalized prompt/system and sorted params"""
+    canonical = json.dumps(
+        {
+            "provider": request.provider,
+            "model": request.model,
+            "system": normalize_prompt(request.system or ""),
+            "prompt": normalize_prompt(request.prompt),
+            "params": request.params,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    LRU cache of completions persisted in SQLite, capped by total size
+
+    Entries survive restarts when `path` is a file. Recency is tracked with a
+    monotonically increasing counter; when the total stored size exceeds
+    `max_bytes`, least recently used entries are evicted.
+
+    Args:
+        path: SQLite database file (":memory:" for a process-local cache)
+        max_bytes: Cap on the total size of cached completions
+    """
+
+    def __init__(self, path: str = ":memory:", max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " size INTEGER NOT NULL, used INTEGER NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS llm_cache_used ON llm_cache (used)")
+        row = self._db.execute("SELECT COALESCE(SUM(size), 0), COALESCE(MAX(used), 0) FROM llm_cache").fetchone()
+        self.total_bytes, self._clock = row
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._clock += 1
+            self._db.execute("UPDATE llm_cache SET used = ? WHERE key = ?", (self._clock, key))
+            return row[0]
+
+    def put(self, key: str, value: str) -> None:
+        size = len(value.encode())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._db.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            self._clock += 1
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, used) VALUES (?, ?, ?, ?)",
+                (key, value, size, self._clock),
+            )
+            self.total_bytes += size - (old[0] if old else 0)
+            while self.total_bytes > self.max_bytes:
+                victim = self._db.execute(
+                    "SELECT key, size FROM llm_cache ORDER BY used LIMIT 1"
+                ).fetchone()
+                self._db.execute("DELETE FROM llm_cache WHERE key = ?", (victim[0],))
+                self.total_bytes -= victim[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM llm_cache")
+            self.total_bytes = 0
+
+    def close(self) -> None:
+        self._db.close()
+
+
+class OpenAICompatibleProvider:
+    """
+    Provider speaking the OpenAI HTTP API (also vLLM, LiteLLM, Ollama, ...)
+
+    Single requests use /v1/chat/completions. When `max_batch_size` > 1,
+    batches of requests sharing model and params are sent as one
+    /v1/completions call with a list of prompts.
+
+    Args:
+        base_url: Server root, e.g. "https://api.openai.com"
+        api_key: Bearer token
+        max_concurrency: Maximum in-flight calls to this provider
+        max_batch_size: Prompts per call (1 disables batching)
+        timeout: Per-call timeout in seconds
+        transport: Optional httpx transport (e.g. ASGITransport for a local fake server)
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: Optional[str] = None,
+        max_concurrency: int = 8,
+        max_batch_size: int = 1,
+        timeout: float = 60.0,
+        transport=None
+    ):
+        import httpx
+
+        self.max_concurrency = max_concurrency
+        self.max_batch_size = max_batch_size
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self.client = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"), headers=headers, timeout=timeout, transport=transport
+        )
+
+    async def complete(self, requests: List[LLMRequest]) -> List[str]:
+        if len(requests) == 1:
+            request = requests[0]
+            body = {"model": request.model, "messages": request.messages(), **request.params}
+            data = await self._post("/v1/chat/completions", body)
+            return [data["choices"][0]["message"]["content"]]
+
+        first = requests[0]
+        prompts = [
+            f"{r.system}\n\n{r.prompt}" if r.system else r.prompt for r in requests
+        ]
+        data = await self._post("/v1/completions", {"model": first.model, "prompt": prompts, **first.params})
+        texts = [""] * len(requests)
+        for choice in data["choices"]:
+            texts[choice["index"]] = choice["text"]
+        return texts
+
+    async def _post(self, path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        import httpx
+
+        try:
+            response = await self.client.post(path, json=body)
+        except (httpx.TimeoutException, httpx.TransportError) as e:
+            raise LLMRetryableError(f"{type(e).__name__}: {e}")
+
+        if response.status_code == 429 or response.status_code >= 500:
+            retry_after = response.headers.get("retry-after")
+            raise LLMRetryableError(
+                f"HTTP {response.status_code}",
+                retry_after=float(retry_after) if retry_after else None,
+            )
+        if response.status_code >= 400:
+            raise LLMError(f"HTTP {response.status_code}: {response.text[:200]}")
+        return response.json()
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+class ClientProvider:
+    """
+    Provider wrapping an OpenAI-SDK-style client object
+
+    Works with anything exposing chat.completions.create(model=..., messages=...),
+    sync (run in a worker thread) or async. No batching.
+    """
+
+    def __init__(self, client: Any, max_concurrency: int = 4):
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.max_batch_size = 1
+
+    async def complete(self, requests: List[LLMRequest]) -> List[str]:
+        request = requests[0]
+        create = self.client.chat.completions.create
+        kwargs = dict(model=request.model, messages=request.messages(), **request.params)
+        if inspect.iscoroutinefunction(create):
+            result = await create(**kwargs)
+        else:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(None, functools.partial(create, **kwargs))
+        return [str(result.choices[0].message.content)]
+
+
+class _Batcher:
+    """Collects compatible requests for up to `window` seconds or max_batch_size"""
+
+    def __init__(self, gateway: "LLMGateway", provider_name: str, window: float):
+        self.gateway = gateway
+        self.provider_name = provider_name
+        self.window = window
+        self.pending: "OrderedDict[str, List[Tuple[LLMRequest, asyncio.Future]]]" = OrderedDict()
+        self.running: set = set()  # Keeps flushed batches referenced until done
+
+    def submit(self, request: LLMRequest) -> "asyncio.Future":
+        group = json.dumps([request.model, request.params], sort_keys=True, default=str)
+        future = asyncio.get_running_loop().create_future()
+        queue = self.pending.setdefault(group, [])
+        queue.append((request, future))
+
+        limit = self.gateway.providers[self.provider_name].max_batch_size
+        if len(queue) >= limit:
+            self._flush(group)
+        elif len(queue) == 1:
+            asyncio.get_running_loop().call_later(self.window, self._flush, group)
+        return future
+
+    def _flush(self, group: str) -> None:
+        queue = self.pending.pop(group, None)
+        if queue:
+            task = asyncio.ensure_future(self._run(queue))
+            self.running.add(task)
+            task.add_done_callback(self.running.discard)
+
+    async def _run(self, queue: List[Tuple[LLMRequest, asyncio.Future]]) -> None:
+        try:
+            texts, attempts = await self.gateway._call_provider(
+                self.provider_name, [request for request, _ in queue]
+            )
+        except Exception as e:
+            for _, future in queue:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), text in zip(queue, texts):
+            if not future.done():
+                future.set_result((text, attempts))
+
+
+class LLMGateway:
+    """
+    Async LLM call layer shared by the engines
+
+    - Responses are cached by cache_key() (normalized prompt + model + params)
+    - Identical requests in flight at the same time share one provider call;
+      it is cancelled once every caller waiting on it has been cancelled
+    - Each provider has a semaphore of max_concurrency in-flight calls
+    - Transient failures are retried with full-jitter exponential backoff,
+      honouring Retry-After when the provider sends one
+    - Providers with max_batch_size > 1 get micro-batches collected over
+      `batch_window` seconds
+
+    Args:
+        providers: Provider name -> provider (see OpenAICompatibleProvider)
+        cache: Response cache (None disables caching)
+        max_retries: Retries after the first attempt
+        base_delay: Backoff base in seconds
+        max_delay: Backoff cap in seconds
+        batch_window: Seconds to wait for more requests to batch
+        sleep: Awaitable sleep (injectable for tests)
+        registry: Metrics registry
+    """
+
+    def __init__(
+        self,
+        providers: Dict[str, Any],
+        cache: Optional[ResponseCache] = None,
+        max_retries: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        batch_window: float = 0.01,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        registry: MetricsRegistry = REGISTRY
+    ):
+        if not providers:
+            raise ValueError("At least one LLM provider is required")
+        self.providers = dict(providers)
+        self.cache = cache
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.batch_window = batch_window
+        self.sleep = sleep
+        self.semaphores = {
+            name: asyncio.Semaphore(provider.max_concurrency)
+            for name, provider in self.providers.items()
+        }
+        self.batchers = {
+            name: _Batcher(self, name, batch_window)
+            for name, provider in self.providers.items() if provider.max_batch_size > 1
+        }
+        self.in_flight: Dict[str, asyncio.Future] = {}
+        self.waiters: Dict[str, int] = {}  # Callers awaiting each in-flight request
+        self.requests_total = registry.counter(
+            "llm_requests_total", "LLM requests by provider and outcome", ("provider", "outcome")
+        )
+        self.retries_total = registry.counter(
+            "llm_retries_total", "LLM provider calls retried after a transient failure", ("provider",)
+        )
+
+    async def complete(
+        self,
+        prompt: str,
+        model: str = "gpt-4o-mini",
+        system: Optional[str] = None,
+        provider: str = DEFAULT_PROVIDER,
+        **params: Any
+    ) -> LLMResponse:
+        """Complete one prompt"""
+        return await self.submit(
+            LLMRequest(prompt=prompt, model=model, system=system, provider=provider, params=params)
+        )
+
+    async def complete_many(self, requests: List[LLMRequest]) -> List[LLMResponse]:
+        """Complete many requests concurrently (bounded per provider), preserving order"""
+        return list(await asyncio.gather(*(self.submit(r) for r in requests)))
+
+    async def submit(self, request: LLMRequest) -> LLMResponse:
+        if request.provider not in self.providers:
+            raise ValueError(f"Unknown LLM provider: {request.provider}")
+
+        key = cache_key(request)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.requests_total.labels(request.provider, "cache_hit").inc()
+                return LLMResponse(content=cached, model=request.model, provider=request.provider, cached=True)
+
+        task = self.in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(request, key))
+            self.in_flight[key] = task
+            task.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        self.waiters[key] = self.waiters.get(key, 0) + 1
+        try:
+            text, attempts = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self.waiters[key] == 1:
+                task.cancel()  # Last caller gave up: free the provider slot
+            raise
+        finally:
+            self.waiters[key] -= 1
+            if not self.waiters[key]:
+                del self.waiters[key]
+        return LLMResponse(content=text, model=request.model, provider=request.provider, attempts=attempts)
+
+    async def _fetch(self, request: LLMRequest, key: str) -> Tuple[str, int]:
+        try:
+            batcher = self.batchers.get(request.provider)
+            if batcher is not None:
+                text, attempts = await batcher.submit(request)
+            else:
+                texts, attempts = await self._call_provider(request.provider, [request])
+                text = texts[0]
+        except Exception:
+            self.requests_total.labels(request.provider, "error").inc()
+            raise
+
+        self.requests_total.labels(request.provider, "success").inc()
+        if self.cache is not None:
+            self.cache.put(key, text)
+        return text, attempts
+
+    async def _call_provider(self, name: str, requests: List[LLMRequest]) -> Tuple[List[str], int]:
+        """One provider call (with retries) under the provider's concurrency limit"""
+        provider = self.providers[name]
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                async with self.semaphores[name]:
+                    return await provider.complete(requests), attempt
+            except LLMRetryableError as e:
+                if attempt > self.max_retries:
+                    raise
+                delay = self.backoff(attempt, e.retry_after)
+                self.retries_total.labels(name).inc()
+                logger.warning(f"LLM provider {name} failed ({e}); retry {attempt} in {delay:.2f}s")
+                await self.sleep(delay)
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential backoff, never shorter than Retry-After"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        return max(delay, retry_after or 0.0)
+
+
+def gateway_from_settings(fallback_client: Any = None) -> LLMGateway:
+    """
+    Build the default gateway from LLM_* settings
+
+    Uses an OpenAICompatibleProvider when LLM_BASE_URL is set, otherwise wraps
+    `fallback_client` (an OpenAI-SDK-style client) in a ClientProvider.
+    """
+    from ..config import settings
+
+    if settings.LLM_BASE_URL:
+        provider = OpenAICompatibleProvider(
+            settings.LLM_BASE_URL,
+            api_key=settings.LLM_API_KEY,
+            max_concurrency=settings.LLM_MAX_CONCURRENCY,
+            max_batch_size=settings.LLM_MAX_BATCH_SIZE,
+        )
+    elif fallback_client is not None:
+        provider = ClientProvider(fallback_client, max_concurrency=settings.LLM_MAX_CONCURRENCY)
+    else:
+        raise ValueError("LLM_BASE_URL is not set and no fallback client was given")
+
+    return LLMGateway(
+        {DEFAULT_PROVIDER: provider},
+        cache=ResponseCache(settings.LLM_CACHE_PATH, settings.LLM_CACHE_MAX_BYTES),
+        max_retries=settings.LLM_MAX_RETRIES,
+    )
@@ -14,6 +14,7 @@ from ..config.ai_models import (
     VideoModelConfig,
     ModelProvider
 )
+from ..utils.metrics import timed
 
 logger = logging.getLogger(__name__)
 
@@ -88,6 +89,7 @@ class VideoGenerationService:
         self.processor = VideoProcessor()  # Mockable processor
         self.sqs_client = None  # Will be set if SQS is configured
     
+    @timed()
     async def generate_video(
         self,
         request: VideoGenerationRequest,
@@ -15,6 +15,7 @@ from ..config.ai_models import (
     ModelProvider,
     VOICE_MODELS
 )
+from ..utils.metrics import timed
 
 logger = logging.getLogger(__name__)
 
@@ -79,6 +80,7 @@ class VoiceSynthesisService:
         self.client = self.engine  # Alias for test compatibility
         self.sqs_client = None  # Will be set if SQS is configured
     
+    @timed()
     async def synthesize_speech(
         self,
         request: VoiceSynthesisRequest,
@@ -0,0 +1,358 @@
+"""
+Streaming Fountain screenplay tokenizer and writer
+Single-pass, generator based: memory use is bounded by the longest paragraph,
+not the length of the script. See https://fountain.io/syntax
+"""
+from typing import Any, Iterable, Iterator, NamedTuple, Optional, TextIO, Union
+from itertools import chain
+import codecs
+import io
+import re
+
+# Element kinds
+TITLE = "title"  # text = value, extra = key
+SCENE_HEADING = "scene_heading"  # extra = scene number (e.g. "12A") or None
+ACTION = "action"
+CHARACTER = "character"  # text = name, extra = extension (e.g. "V.O.")
+PARENTHETICAL = "parenthetical"
+DIALOGUE = "dialogue"
+TRANSITION = "transition"
+CENTERED = "centered"
+LYRIC = "lyric"
+SECTION = "section"  # extra = depth
+SYNOPSIS = "synopsis"
+PAGE_BREAK = "page_break"
+
+Source = Union[str, bytes, TextIO, io.BufferedIOBase, Iterable[Union[str, bytes]]]
+
+SCENE_HEADING_RE = re.compile(r"^(INT\.?/EXT|INT/EXT|I/E|INT|EXT|EST)[.\s]", re.IGNORECASE)
+SCENE_NUMBER_RE = re.compile(r"\s*#([\w.\-]+)#\s*$")
+# Line prefixes recognised even mid-paragraph (no blank line needed before them)
+INLINE_MARKERS = ("!", "#", "=", "~", ">")
+CHARACTER_RE = re.compile(r"^(?P<name>[^(^]+?)\s*(?:\((?P<ext>[^)]*)\))?\s*(?P<dual>\^)?$")
+TITLE_KEY_RE = re.compile(r"^(?P<key>[A-Za-z][A-Za-z0-9 _-]*):\s*(?P<value>.*)$")
+HIDDEN_RE = re.compile(r"/\*|\*/|\[\[|\]\]")
+
+READ_SIZE = 64 * 1024
+
+
+class Element(NamedTuple):
+    """One Fountain element"""
+    kind: str
+    text: str
+    extra: Any = None
+    dual: bool = False  # Dual dialogue (character cue ends with ^)
+
+
+def iter_lines(source: Source, encoding: str = "utf-8") -> Iterator[str]:
+    """
+    Lines of a Fountain source without line terminators
+
+    Accepts a string, bytes, a text or binary file object, or any iterable of
+    str/bytes chunks (e.g. an HTTP body). Chunks may split lines and multi-byte
+    characters anywhere; \\r\\n and \\r line endings are normalized.
+    """
+    if isinstance(source, (str, bytes)):
+        source = [source]
+    elif hasattr(source, "read"):
+        reader = source
+        source = iter(lambda: reader.read(READ_SIZE), reader.read(0))
+
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    buffer = ""
+    for chunk in source:
+        buffer += decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        # A trailing \r may be the first half of \r\n
+        held = "\r" if buffer.endswith("\r") else ""
+        if held:
+            buffer = buffer[:-1]
+        lines = buffer.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+        buffer = lines.pop() + held
+        yield from lines
+
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield from buffer.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+
+
+def _visible_lines(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Strip boneyard (/* */) and notes ([[ ]]); when either spans lines, the
+    text before it and the text after it are joined into one line
+    """
+    closer = None
+    carry = ""  # Visible text preceding an unclosed boneyard/note
+    for line in lines:
+        if closer is None and "/*" not in line and "[[" not in line:
+            yield line
+            continue
+
+        out, pos = [carry], 0
+        for match in HIDDEN_RE.finditer(line):
+            token = match.group()
+            if closer is None and token in ("/*", "[["):
+                out.append(line[pos:match.start()])
+                closer = "*/" if token == "/*" else "]]"
+            elif token == closer:
+                closer = None
+                pos = match.end()
+
+        if closer is None:
+            out.append(line[pos:])
+            carry = ""
+            visible = "".join(out)
+            # Lines holding only hidden content vanish rather than becoming blank
+            if visible.strip():
+                yield visible
+        else:
+            carry = "".join(out)
+
+    if carry:
+        yield carry
+
+
+def _character_cue(text: str) -> Optional[Element]:
+    match = CHARACTER_RE.match(text)
+    if not match:
+        return None
+    name = match.group("name").strip()
+    return Element(CHARACTER, name, match.group("ext"), bool(match.group("dual")))
+
+
+def _is_character(text: str) -> bool:
+    cue = _character_cue(text)
+    return (
+        cue is not None
+        and cue.text == cue.text.upper()
+        and any(c.isalpha() for c in cue.text)
+    )
+
+
+def _scene_heading(text: str) -> Element:
+    match = SCENE_NUMBER_RE.search(text)
+    if match:
+        return Element(SCENE_HEADING, text[:match.start()].strip(), match.group(1))
+    return Element(SCENE_HEADING, text.strip())
+
+
+def _title_page(lines: Iterator[str]) -> Iterator[Union[Element, str]]:
+    """
+    Consume the title page (if any), yielding TITLE elements and then the
+    first line that is not part of it
+    """
+    for line in lines:
+        if line.strip():
+            break
+    else:
+        return
+
+    match = TITLE_KEY_RE.match(line)
+    # An all-caps key with no value is a transition (FADE IN:), not a title page
+    if not match or (match.group("key").isupper() and not match.group("value")):
+        yield line
+        return
+
+    key, values = match.group("key"), [match.group("value").strip()]
+    for line in lines:
+        if not line.strip():
+            break
+        match = TITLE_KEY_RE.match(line)
+        if match and not line[:1].isspace():
+            yield Element(TITLE, "\n".join(v for v in values if v), key)
+            key, values = match.group("key"), [match.group("value").strip()]
+        else:
+            values.append(line.strip())
+    yield Element(TITLE, "\n".join(v for v in values if v), key)
+    yield ""
+
+
+def tokenize(source: Source, encoding: str = "utf-8") -> Iterator[Element]:
+    """
+    Tokenize a Fountain screenplay into elements, one pass, lazily
+
+    Consecutive action lines are merged into one ACTION element per paragraph
+    and consecutive dialogue lines into one DIALOGUE element, so consumers see
+    the same structure a screenplay reader would.
+    """
+    lines = _visible_lines(iter_lines(source, encoding))
+    first_lines = []
+    for item in _title_page(lines):
+        if isinstance(item, Element):
+            yield item
+        else:
+            first_lines.append(item)
+
+    paragraph = []  # Pending ACTION or DIALOGUE lines
+    paragraph_kind = None
+    in_dialogue = False
+    prev_blank = True
+
+    def flush():
+        nonlocal paragraph, paragraph_kind
+        if paragraph:
+            element = Element(paragraph_kind, "\n".join(paragraph))
+            paragraph, paragraph_kind = [], None
+            return element
+        return None
+
+    stream = chain(first_lines, lines)
+    line = next(stream, None)
+    while line is not None:
+        following = next(stream, None)
+        stripped = line.strip()
+        element = None
+
+        if not stripped:
+            if in_dialogue and line == "  " and following is not None and following.strip():
+                paragraph.append("")  # Intentional blank line inside dialogue
+                line = following
+                continue
+            pending = flush()
+            if pending:
+                yield pending
+            in_dialogue = False
+            prev_blank = True
+            line = following
+            continue
+
+        if in_dialogue:
+            if stripped.startswith("(") and stripped.endswith(")"):
+                element = Element(PARENTHETICAL, stripped)
+            else:
+                paragraph_kind = DIALOGUE
+                paragraph.append(stripped)
+        elif set(stripped) == {"="} and len(stripped) >= 3:
+            element = Element(PAGE_BREAK, "")
+        elif stripped.startswith("#"):
+            depth = len(stripped) - len(stripped.lstrip("#"))
+            element = Element(SECTION, stripped[depth:].strip(), depth)
+        elif stripped.startswith("="):
+            element = Element(SYNOPSIS, stripped[1:].strip())
+        elif stripped.startswith("~"):
+            element = Element(LYRIC, stripped[1:].strip())
+        elif stripped.startswith("!"):
+            if paragraph_kind != ACTION and paragraph:
+                yield flush()
+            paragraph_kind = ACTION
+            paragraph.append(line.rstrip()[line.index("!") + 1:])
+        elif stripped.startswith(">") and stripped.endswith("<"):
+            element = Element(CENTERED, stripped[1:-1].strip())
+        elif stripped.startswith(">"):
+            element = Element(TRANSITION, stripped[1:].strip())
+        elif prev_blank and stripped.startswith(".") and not stripped.startswith(".."):
+            element = _scene_heading(stripped[1:])
+        elif prev_blank and stripped.startswith("@") and following and following.strip():
+            element = _character_cue(stripped[1:]) or Element(CHARACTER, stripped[1:])
+            in_dialogue = True
+        elif prev_blank and SCENE_HEADING_RE.match(stripped):
+            element = _scene_heading(stripped)
+        elif (
+            prev_blank and stripped.isupper() and stripped.endswith("TO:")
+            and (following is None or not following.strip())
+        ):
+            element = Element(TRANSITION, stripped)
+        elif prev_blank and following and following.strip() and _is_character(stripped):
+            element = _character_cue(stripped)
+            in_dialogue = True
+        else:
+            paragraph_kind = ACTION
+            paragraph.append(line.rstrip())
+
+        if element is not None:
+            pending = flush()
+            if pending:
+                yield pending
+            yield element
+
+        prev_blank = False
+        line = following
+
+    pending = flush()
+    if pending:
+        yield pending
+
+
+def _needs_forcing(kind: str, text: str) -> bool:
+    """Whether plain output of an element would be read back as another kind"""
+    first = text.split("\n", 1)[0].strip()
+    if kind == ACTION:
+        return bool(
+            SCENE_HEADING_RE.match(first) or _is_character(first)
+            or first[:1] in INLINE_MARKERS + ("@", ".")
+        )
+    if kind == SCENE_HEADING:
+        return not SCENE_HEADING_RE.match(first)
+    if kind == CHARACTER:
+        return not _is_character(first)
+    if kind == TRANSITION:
+        return not (first.isupper() and first.endswith("TO:"))
+    return False
+
+
+def render(elements: Iterable[Element]) -> Iterator[str]:
+    """Render elements back to Fountain text, one chunk per element"""
+    started = False
+    in_title_page = False
+
+    for element in elements:
+        kind, text = element.kind, element.text
+
+        if kind == TITLE:
+            in_title_page = True
+            if "\n" in text:
+                body = "".join(f"    {line}\n" for line in text.split("\n"))
+                yield f"{element.extra}:\n{body}"
+            else:
+                yield f"{element.extra}: {text}\n"
+            started = True
+            continue
+
+        if kind in (PARENTHETICAL, DIALOGUE):
+            if kind == DIALOGUE:
+                text = "\n".join(line or "  " for line in text.split("\n"))
+            yield text + "\n"
+            continue
+
+        separator = "\n" if started or in_title_page else ""
+        in_title_page = False
+        started = True
+
+        if kind == SCENE_HEADING:
+            heading = ("." if _needs_forcing(kind, text) else "") + text
+            if element.extra:
+                heading += f" #{element.extra}#"
+            yield f"{separator}{heading}\n"
+        elif kind == CHARACTER:
+            cue = ("@" if _needs_forcing(kind, text) else "") + text
+            if element.extra:
+                cue += f" ({element.extra})"
+            if element.dual:
+                cue += " ^"
+            yield f"{separator}{cue}\n"
+        elif kind == ACTION:
+            first, *rest = text.split("\n")
+            body = [("!" if _needs_forcing(kind, first) else "") + first]
+            body.extend(("!" if line.strip()[:1] in INLINE_MARKERS else "") + line for line in rest)
+            yield separator + "\n".join(body) + "\n"
+        elif kind == TRANSITION:
+            yield f"{separator}{'> ' if _needs_forcing(kind, text) else ''}{text}\n"
+        elif kind == CENTERED:
+            yield f"{separator}> {text} <\n"
+        elif kind == LYRIC:
+            yield separator + "".join(f"~{line}\n" for line in text.split("\n"))
+        elif kind == SECTION:
+            yield f"{separator}{'#' * (element.extra or 1)} {text}\n"
+        elif kind == SYNOPSIS:
+            yield f"{separator}= {text}\n"
+        elif kind == PAGE_BREAK:
+            yield f"{separator}===\n"
+        else:
+            raise ValueError(f"Unknown Fountain element kind: {kind}")
+
+
+def write(elements: Iterable[Element], out: TextIO) -> int:
+    """Stream rendered elements to a text file object; returns characters written"""
+    written = 0
+    for chunk in render(elements):
+        written += out.write(chunk)
+    return written
@@ -0,0 +1,266 @@
+"""
+In-process metrics for AI Film Studio
+Fixed-bucket histograms, counters and gauges with Prometheus text exposition
+"""
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from bisect import bisect_left
+import asyncio
+import functools
+import threading
+import time
+
+# Latency buckets in seconds (Prometheus client defaults, extended for AI jobs)
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0
+)
+
+# Payload size buckets in bytes
+SIZE_BUCKETS: Tuple[float, ...] = (
+    128, 512, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216
+)
+
+# Label value used once a metric family hits its series cap
+OVERFLOW_LABEL = "__overflow__"
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is a bisect and three increments"""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts: List[int] = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> Iterable[Tuple[str, int]]:
+        """Yield (le, cumulative_count) pairs including +Inf"""
+        total = 0
+        for bound, bucket in zip(self.bounds, self.counts):
+            total += bucket
+            yield _format_value(bound), total
+        yield "+Inf", total + self.counts[-1]
+
+
+class Counter:
+    """Monotonic counter"""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class Gauge:
+    """Gauge that can go up and down"""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class MetricFamily:
+    """
+    A named metric with a fixed label set
+
+    Series are created on first use and cached by label-value tuple. The
+    number of series is capped; beyond the cap all new label combinations
+    collapse into a single overflow series so memory stays bounded.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        metric_type: str,
+        label_names: Tuple[str, ...] = (),
+        buckets: Optional[Tuple[float, ...]] = None,
+        max_series: int = 1000
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.metric_type = metric_type
+        self.label_names = label_names
+        self.buckets = buckets
+        self.max_series = max_series
+        self.series: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        """Get (or create) the series for the given label values"""
+        series = self.series.get(values)
+        if series is not None:
+            return series
+
+        with self._lock:
+            series = self.series.get(values)
+            if series is None:
+                if len(self.series) >= self.max_series:
+                    values = (OVERFLOW_LABEL,) * len(self.label_names)
+                    series = self.series.get(values)
+                if series is None:
+                    series = self._new_series()
+                    self.series[values] = series
+        return series
+
+    def _new_series(self):
+        if self.metric_type == "histogram":
+            return Histogram(self.buckets or LATENCY_BUCKETS)
+        if self.metric_type == "counter":
+            return Counter()
+        return Gauge()
+
+    def render(self) -> List[str]:
+        """Render this family in Prometheus text exposition format"""
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        for values, series in list(self.series.items()):
+            labels = _format_labels(self.label_names, values)
+            if self.metric_type == "histogram":
+                for le, total in series.cumulative():
+                    bucket_labels = _format_labels(self.label_names + ("le",), values + (le,))
+                    lines.append(f"{self.name}_bucket{bucket_labels} {total}")
+                lines.append(f"{self.name}_sum{labels} {_format_value(series.sum)}")
+                lines.append(f"{self.name}_count{labels} {series.count}")
+            else:
+                lines.append(f"{self.name}{labels} {_format_value(series.value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Registry of metric families, rendered together at /api/v1/metrics"""
+
+    def __init__(self):
+        self.families: Dict[str, MetricFamily] = {}
+
+    def _register(self, name: str, help_text: str, metric_type: str,
+                  label_names: Tuple[str, ...], buckets: Optional[Tuple[float, ...]] = None,
+                  max_series: int = 1000) -> MetricFamily:
+        family = self.families.get(name)
+        if family is None:
+            family = MetricFamily(name, help_text, metric_type, label_names, buckets, max_series)
+            self.families[name] = family
+        elif family.metric_type != metric_type or family.label_names != label_names:
+            raise ValueError(f"Metric {name} already registered with a different type or labels")
+        return family
+
+    def histogram(self, name: str, help_text: str, label_names: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS, max_series: int = 1000) -> MetricFamily:
+        return self._register(name, help_text, "histogram", label_names, buckets, max_series)
+
+    def counter(self, name: str, help_text: str, label_names: Tuple[str, ...] = (),
+                max_series: int = 1000) -> MetricFamily:
+        return self._register(name, help_text, "counter", label_names, max_series=max_series)
+
+    def gauge(self, name: str, help_text: str, label_names: Tuple[str, ...] = (),
+              max_series: int = 1000) -> MetricFamily:
+        return self._register(name, help_text, "gauge", label_names, max_series=max_series)
+
+    def render(self) -> str:
+        """Render all families in Prometheus text exposition format"""
+        lines: List[str] = []
+        for family in list(self.families.values()):
+            lines.extend(family.render())
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        """Drop all recorded series (families stay registered)"""
+        for family in self.families.values():
+            family.series.clear()
+
+
+def _format_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value)) if abs(value) < 1e15 else repr(float(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+# Default process-wide registry
+REGISTRY = MetricsRegistry()
+
+FUNCTION_DURATION = REGISTRY.histogram(
+    "function_duration_seconds",
+    "Duration of instrumented engine and service calls",
+    ("function",),
+)
+FUNCTION_ERRORS = REGISTRY.counter(
+    "function_errors_total",
+    "Exceptions raised by instrumented engine and service calls",
+    ("function",),
+)
+
+
+def timed(name: Optional[str] = None) -> Callable:
+    """
+    Decorator that records call latency into function_duration_seconds
+
+    Works on both sync and async functions. The series is resolved once at
+    decoration time so the per-call cost is two clock reads and an observe().
+
+    Args:
+        name: Series label (defaults to the function's qualified name)
+    """
+    def decorator(func: Callable) -> Callable:
+        label = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+        histogram = FUNCTION_DURATION.labels(label)
+        errors = FUNCTION_ERRORS.labels(label)
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                except BaseException:
+                    errors.inc()
+                    raise
+                finally:
+                    histogram.observe(time.perf_counter() - start)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except BaseException:
+                errors.inc()
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - start)
+        return wrapper
+
+    return decorator
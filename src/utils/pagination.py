@@ -0,0 +1,283 @@
+"""
+Cursor pagination over engine-side secondary indexes
+"""
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple, Union
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from enum import Enum
+from itertools import combinations, count
+from operator import itemgetter
+from pydantic import BaseModel, Field
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Insertion counter, or (sort value, insertion counter) for sorted indexes
+Position = Union[int, Tuple[float, int]]
+
+
+class Page(BaseModel):
+    """One page of results with an opaque cursor for the next page"""
+    items: List[Any] = Field(default_factory=list)
+    next_cursor: Optional[str] = None
+    limit: int = DEFAULT_PAGE_SIZE
+
+
+def encode_cursor(position: Position) -> str:
+    """Encode an index position as an opaque, URL-safe cursor"""
+    raw = json.dumps({"p": position}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: Optional[str]) -> Position:
+    """Decode a cursor produced by encode_cursor (None starts from the beginning)"""
+    if not cursor:
+        return -1
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded))["p"]
+        if isinstance(position, list):
+            sort_value, seq = position
+            return (float(sort_value), int(seq))
+        return int(position)
+    except (ValueError, KeyError, TypeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+def _normalize(value: Any) -> Hashable:
+    return value.value if isinstance(value, Enum) else value
+
+
+def _sort_value(value: Any) -> float:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return float(value) if value is not None else 0.0
+
+
+class CursorIndex:
+    """
+    Secondary index supporting stable cursor pagination
+
+    Every entity gets a monotonically increasing position on insert, which
+    defines a stable order (insertion order). For each subset of the indexed
+    fields the index keeps a sorted list of positions per combination of
+    values, so a filtered page is a bisect plus `limit` reads regardless of
+    how many entities exist, and any combination of filters is a single
+    bucket lookup rather than an intersection. Entities keep their position
+    when updated.
+
+    With `sort_field` the order is by that attribute (a datetime or number)
+    instead, ties broken by insertion; an update that changes it moves the
+    entity within its buckets.
+
+    Args:
+        fields: Attribute names that can be filtered on (keep this small;
+            each entity is stored in 2**len(fields) buckets)
+        sort_field: Attribute defining the order (default: insertion order)
+    """
+
+    def __init__(self, fields: Iterable[str], sort_field: Optional[str] = None):
+        self.fields: Tuple[str, ...] = tuple(fields)
+        self.sort_field = sort_field
+        self._subsets = [
+            subset
+            for size in range(len(self.fields) + 1)
+            for subset in combinations(range(len(self.fields)), size)
+        ]
+        # One getter per subset, picking its (field, value) pairs out of all of them
+        self._getters = [
+            itemgetter(*subset) if len(subset) > 1
+            else (lambda pairs, i=subset[0]: (pairs[i],)) if subset
+            else (lambda pairs: ())
+            for subset in self._subsets
+        ]
+        self._counter = count()
+        self.buckets: Dict[tuple, List[Position]] = {}
+        self.positions: Dict[str, Position] = {}  # entity id -> position
+        self.ids: Dict[Position, str] = {}  # position -> entity id
+        self.values: Dict[str, Tuple[Hashable, ...]] = {}  # entity id -> field values
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __contains__(self, entity_id: str) -> bool:
+        return entity_id in self.positions
+
+    def _keys(self, values: Tuple[Hashable, ...]) -> List[tuple]:
+        pairs = tuple(zip(self.fields, values))
+        return [getter(pairs) for getter in self._getters]
+
+    def add(self, entity_id: str, attrs: Dict[str, Any]) -> None:
+        """Index a new entity (re-indexes it if already present)"""
+        if entity_id in self.positions:
+            self.update(entity_id, attrs)
+            return
+
+        position: Position = next(self._counter)
+        if self.sort_field:
+            position = (_sort_value(attrs.get(self.sort_field)), position)
+        values = tuple(_normalize(attrs.get(f)) for f in self.fields)
+        self.positions[entity_id] = position
+        self.ids[position] = entity_id
+        self.values[entity_id] = values
+        for key in self._keys(values):
+            bucket = self.buckets.setdefault(key, [])
+            # New positions are usually the largest, so append keeps order
+            if not bucket or bucket[-1] < position:
+                bucket.append(position)
+            else:
+                insort(bucket, position)
+
+    def add_many(self, entries: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """
+        Index many entities at once, e.g. when rebuilding from storage
+
+        New positions are appended unsorted and every touched bucket is
+        sorted once at the end, instead of an insort per entity and bucket.
+
+        Returns:
+            Number of entities indexed
+        """
+        touched = set()
+        added = 0
+        for entity_id, attrs in entries:
+            added += 1
+            if entity_id in self.positions:
+                self.update(entity_id, attrs)
+                continue
+            position: Position = next(self._counter)
+            if self.sort_field:
+                position = (_sort_value(attrs.get(self.sort_field)), position)
+            values = tuple(_normalize(attrs.get(f)) for f in self.fields)
+            self.positions[entity_id] = position
+            self.ids[position] = entity_id
+            self.values[entity_id] = values
+            for key in self._keys(values):
+                bucket = self.buckets.get(key)
+                if bucket is None:
+                    bucket = self.buckets[key] = []
+                if bucket and bucket[-1] > position:
+                    touched.add(key)
+                bucket.append(position)
+        for key in touched:
+            self.buckets[key].sort()
+        return added
+
+    def update(self, entity_id: str, attrs: Dict[str, Any]) -> None:
+        """Move an entity to new buckets if its indexed values changed"""
+        if entity_id not in self.positions:
+            self.add(entity_id, attrs)
+            return
+
+        values = tuple(_normalize(attrs.get(f)) for f in self.fields)
+        old_values = self.values[entity_id]
+        position = self.positions[entity_id]
+        if self.sort_field:
+            sort_value = _sort_value(attrs.get(self.sort_field))
+            if sort_value != position[0]:
+                self.remove(entity_id)
+                self.positions[entity_id] = (sort_value, position[1])
+                self.ids[self.positions[entity_id]] = entity_id
+                self.values[entity_id] = values
+                for key in self._keys(values):
+                    insort(self.buckets.setdefault(key, []), self.positions[entity_id])
+                return
+        if values == old_values:
+            return
+
+        old_keys = set(self._keys(old_values))
+        new_keys = set(self._keys(values))
+        for key in old_keys - new_keys:
+            self._discard(key, position)
+        for key in new_keys - old_keys:
+            insort(self.buckets.setdefault(key, []), position)
+        self.values[entity_id] = values
+
+    def remove(self, entity_id: str) -> None:
+        """Drop an entity from the index (no-op if absent)"""
+        position = self.positions.pop(entity_id, None)
+        if position is None:
+            return
+        del self.ids[position]
+        for key in self._keys(self.values.pop(entity_id)):
+            self._discard(key, position)
+
+    def _discard(self, key: tuple, position: Position) -> None:
+        bucket = self.buckets.get(key)
+        if not bucket:
+            return
+        i = bisect_left(bucket, position)
+        if i < len(bucket) and bucket[i] == position:
+            del bucket[i]
+        if not bucket:
+            del self.buckets[key]
+
+    def _bucket(self, filters: Dict[str, Any]) -> List[Position]:
+        unknown = set(filters) - set(self.fields)
+        if unknown:
+            raise ValueError(f"Cannot filter on unindexed fields: {sorted(unknown)}")
+        key = tuple(
+            (f, _normalize(filters[f])) for f in self.fields
+            if f in filters and filters[f] is not None
+        )
+        return self.buckets.get(key, [])
+
+    def count(self, **filters: Any) -> int:
+        """Number of entities matching the filters"""
+        return len(self._bucket(filters))
+
+    def page(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        descending: bool = False
+    ) -> Tuple[List[str], Optional[str]]:
+        """
+        Get one page of entity IDs matching `filters` (None values are ignored)
+
+        Returns:
+            (entity_ids, next_cursor) where next_cursor is None on the last page
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        bucket = self._bucket(filters or {})
+        after = decode_cursor(cursor)
+        try:
+            if descending:
+                end = bisect_left(bucket, after) if cursor else len(bucket)
+                start = max(0, end - limit)
+                window = bucket[start:end][::-1]
+                more = start > 0
+            else:
+                start = bisect_right(bucket, after) if cursor else 0
+                window = bucket[start:start + limit]
+                more = start + limit < len(bucket)
+        except TypeError:
+            raise ValueError(f"Invalid cursor: {cursor}")
+
+        next_cursor = encode_cursor(window[-1]) if window and more else None
+        return [self.ids[p] for p in window], next_cursor
+
+    def page_items(
+        self,
+        store: Dict[str, Any],
+        filters: Optional[Dict[str, Any]] = None,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        descending: bool = False
+    ) -> Page:
+        """Like page(), resolving IDs through `store` (entity id -> entity)"""
+        ids, next_cursor = self.page(filters, cursor, limit, descending)
+        return Page(
+            items=[store[i] for i in ids],
+            next_cursor=next_cursor,
+            limit=max(1, min(limit, MAX_PAGE_SIZE))
+        )
+
+    def iter_ids(self, descending: bool = False, **filters: Any) -> Iterable[str]:
+        """All matching entity IDs in index order"""
+        ids = self.ids
+        bucket = self._bucket(filters)
+        return [ids[p] for p in (reversed(bucket) if descending else bucket)]
@@ -0,0 +1,459 @@
+"""
+Search Index
+In-process inverted index with BM25 ranking, facet filters and a
+memory-mappable on-disk segment format
+"""
+from typing import Optional, Dict, List, Any, Iterable, Iterator, Tuple, NamedTuple, Union
+from collections import Counter
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import logging
+
+logger = logging.getLogger(__name__)
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have he her his i in is it its "
+    "me my of on or our she that the their them they this to was we were what "
+    "with you your".split()
+)
+
+# Facet values are indexed as terms that tokenize() can never produce
+_FACET_PREFIX = "\x1f"
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens without stopwords ("Don't" -> "dont")"""
+    return [
+        token for token in _TOKEN_RE.findall(text.lower().replace("'", "").replace("’", ""))
+        if token not in STOPWORDS
+    ]
+
+
+def facet_term(name: str, value: Any) -> str:
+    value = getattr(value, "value", value)
+    return f"{_FACET_PREFIX}{name}={value}"
+
+
+class SearchHit(NamedTuple):
+    doc_id: str
+    score: float
+    stored: Dict[str, Any]  # Stored fields given to SearchIndex.add()
+
+
+class MemorySegment:
+    """Mutable segment holding documents added since the last save"""
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[int, int]] = {}  # term -> doc number -> term frequency
+        self.docs: List[Optional[Tuple[str, int, Dict[str, Any], Tuple[str, ...]]]] = []
+        self.doc_numbers: Dict[str, int] = {}
+        self.num_docs = 0
+        self.total_length = 0
+
+    def add(self, doc_id: str, tokens: List[str], facets: List[str], stored: Dict[str, Any]) -> None:
+        number = len(self.docs)
+        counts = Counter(tokens)
+        for term, tf in counts.items():
+            self.postings.setdefault(term, {})[number] = tf
+        for term in facets:
+            self.postings.setdefault(term, {})[number] = 0
+        terms = tuple(counts) + tuple(facets)
+        self.docs.append((doc_id, len(tokens), stored, terms))
+        self.doc_numbers[doc_id] = number
+        self.num_docs += 1
+        self.total_length += len(tokens)
+
+    def remove(self, doc_id: str) -> bool:
+        number = self.doc_numbers.pop(doc_id, None)
+        if number is None:
+            return False
+        _, length, _, terms = self.docs[number]
+        for term in terms:
+            postings = self.postings[term]
+            del postings[number]
+            if not postings:
+                del self.postings[term]
+        self.docs[number] = None
+        self.num_docs -= 1
+        self.total_length -= length
+        return True
+
+    def doc_freq(self, term: str) -> int:
+        return len(self.postings.get(term, ()))
+
+    def iter_postings(self, term: str) -> Iterator[Tuple[int, int]]:
+        return iter(self.postings.get(term, {}).items())
+
+    def doc_id(self, number: int) -> str:
+        return self.docs[number][0]
+
+    def length(self, number: int) -> int:
+        return self.docs[number][1]
+
+    def stored(self, number: int) -> Dict[str, Any]:
+        return self.docs[number][2]
+
+    def iter_docs(self) -> Iterator[Tuple[str, Dict[str, Any], Dict[str, int]]]:
+        """(doc_id, stored, term -> frequency) for every live document"""
+        for number, doc in enumerate(self.docs):
+            if doc is not None:
+                yield doc[0], doc[2], {term: self.postings[term][number] for term in doc[3]}
+
+
+class DiskSegment:
+    """
+    Read-only segment backed by a memory-mapped file
+
+    Opening reads only the fixed-size header; term lookups binary-search the
+    term table in place and posting lists are read straight from the mapping.
+
+    File layout (native byte order, all offsets from the start of the file):
+
+        magic      8 bytes   b"AFSIDX01"
+        header     8 x u64   num_terms, num_docs, total_length, num_postings,
+                             terms_offset, postings_offset, docs_offset, strings_offset
+        terms      num_terms x 4 u64   (string offset, string length, first posting, doc freq),
+                                       sorted by term bytes
+        postings   num_postings u32 doc numbers, then num_postings u32 term frequencies
+        docs       num_docs x 5 u64    (id offset, id length, stored offset, stored length,
+                                       token count), sorted by doc ID bytes
+        strings    UTF-8 term bytes, doc IDs and stored-field JSON
+    """
+
+    MAGIC = b"AFSIDX01"
+    HEADER = struct.Struct("=8Q")
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:8] != self.MAGIC:
+            self._map.close()
+            raise ValueError(f"Not a search index segment: {path}")
+
+        (self.num_terms, self.num_docs, self.total_length, num_postings,
+         terms_offset, postings_offset, docs_offset, self._strings) = self.HEADER.unpack_from(self._map, 8)
+        view = memoryview(self._map)
+        self._terms = view[terms_offset:terms_offset + self.num_terms * 32].cast("Q")
+        self._doc_numbers_col = view[postings_offset:postings_offset + num_postings * 4].cast("I")
+        self._tf_col = view[postings_offset + num_postings * 4:postings_offset + num_postings * 8].cast("I")
+        self._docs = view[docs_offset:docs_offset + self.num_docs * 40].cast("Q")
+
+    def _string(self, table: memoryview, width: int, entry: int) -> bytes:
+        offset = self._strings + table[entry * width]
+        return self._map[offset:offset + table[entry * width + 1]]
+
+    def _bisect(self, table: memoryview, width: int, count: int, key: bytes) -> int:
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._string(table, width, mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < count and self._string(table, width, lo) == key else -1
+
+    def _term_bytes(self, entry: int) -> bytes:
+        return self._string(self._terms, 4, entry)
+
+    def _find(self, term: str) -> int:
+        return self._bisect(self._terms, 4, self.num_terms, term.encode())
+
+    def doc_freq(self, term: str) -> int:
+        entry = self._find(term)
+        return self._terms[entry * 4 + 3] if entry >= 0 else 0
+
+    def iter_postings(self, term: str) -> Iterator[Tuple[int, int]]:
+        entry = self._find(term)
+        if entry < 0:
+            return iter(())
+        start = self._terms[entry * 4 + 2]
+        end = start + self._terms[entry * 4 + 3]
+        return zip(self._doc_numbers_col[start:end], self._tf_col[start:end])
+
+    def length(self, number: int) -> int:
+        return self._docs[number * 5 + 4]
+
+    def stored(self, number: int) -> Dict[str, Any]:
+        offset = self._strings + self._docs[number * 5 + 2]
+        return json.loads(self._map[offset:offset + self._docs[number * 5 + 3]])
+
+    def doc_id(self, number: int) -> str:
+        return self._string(self._docs, 5, number).decode()
+
+    def doc_number(self, doc_id: str) -> Optional[int]:
+        number = self._bisect(self._docs, 5, self.num_docs, doc_id.encode())
+        return number if number >= 0 else None
+
+    def iter_docs(self, deleted: Iterable[int] = ()) -> Iterator[Tuple[str, Dict[str, Any], Dict[str, int]]]:
+        """(doc_id, stored, term -> frequency) for every document not in `deleted`"""
+        deleted = set(deleted)
+        terms: List[Dict[str, int]] = [{} for _ in range(self.num_docs)]
+        for entry in range(self.num_terms):
+            term = self._term_bytes(entry).decode()
+            start = self._terms[entry * 4 + 2]
+            for i in range(start, start + self._terms[entry * 4 + 3]):
+                terms[self._doc_numbers_col[i]][term] = self._tf_col[i]
+        for number in range(self.num_docs):
+            if number not in deleted:
+                yield self.doc_id(number), self.stored(number), terms[number]
+
+    def close(self) -> None:
+        for view in (self._terms, self._doc_numbers_col, self._tf_col, self._docs):
+            view.release()
+        self._map.close()
+
+    @classmethod
+    def write(cls, path: str, docs: Iterable[Tuple[str, Dict[str, Any], Dict[str, int]]]) -> int:
+        """
+        Write documents as a segment file (atomically replacing `path`)
+
+        Args:
+            path: Destination file
+            docs: (doc_id, stored, term -> frequency) tuples; frequency 0 marks facet terms
+
+        Returns:
+            Number of documents written
+        """
+        from array import array
+
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        doc_table = array("Q")
+        strings = bytearray()
+        total_length = 0
+        num_docs = 0
+        for number, (doc_id, stored, terms) in enumerate(sorted(docs, key=lambda d: d[0].encode())):
+            encoded = doc_id.encode()
+            blob = json.dumps(stored, separators=(",", ":"), default=str).encode()
+            length = sum(terms.values())
+            doc_table.extend((len(strings), len(encoded), len(strings) + len(encoded), len(blob), length))
+            strings += encoded + blob
+            total_length += length
+            num_docs += 1
+            for term, tf in terms.items():
+                postings.setdefault(term, []).append((number, tf))
+
+        term_table = array("Q")
+        doc_numbers = array("I")
+        frequencies = array("I")
+        for term in sorted(postings, key=str.encode):
+            encoded = term.encode()
+            term_table.extend((len(strings), len(encoded), len(doc_numbers), len(postings[term])))
+            strings += encoded
+            for number, tf in postings[term]:
+                doc_numbers.append(number)
+                frequencies.append(tf)
+
+        terms_offset = 8 + cls.HEADER.size
+        postings_offset = terms_offset + len(term_table) * 8
+        docs_offset = postings_offset + len(doc_numbers) * 8
+        strings_offset = docs_offset + len(doc_table) * 8
+
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(cls.MAGIC)
+            f.write(cls.HEADER.pack(
+                len(postings), num_docs, total_length, len(doc_numbers),
+                terms_offset, postings_offset, docs_offset, strings_offset
+            ))
+            for column in (term_table, doc_numbers, frequencies, doc_table):
+                f.write(column.tobytes())
+            f.write(strings)
+        os.replace(tmp, path)
+        return num_docs
+
+
+class SearchIndex:
+    """
+    Inverted index over text documents with facet filters
+
+    Documents live in an optional memory-mapped base segment (loaded with
+    open()) plus an in-memory segment for documents added since. Replacing
+    or removing a base-segment document marks it deleted; save() merges
+    both into a new base segment.
+
+    Scores are BM25 over all live documents. Facets are indexed as reserved
+    terms, so a filter is an intersection of posting lists.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.base: Optional[DiskSegment] = None
+        self.deleted: set = set()  # Base-segment doc numbers replaced or removed
+        self.memory = MemorySegment()
+        if path and os.path.exists(path):
+            self.open(path)
+
+    def __len__(self) -> int:
+        return self.memory.num_docs + (self.base.num_docs - len(self.deleted) if self.base else 0)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return self.stored(doc_id) is not None
+
+    def open(self, path: str) -> None:
+        """Use a saved segment as the base (replaces current contents)"""
+        self.close()
+        self.base = DiskSegment(path)
+        self.deleted = set()
+        self.memory = MemorySegment()
+
+    def close(self) -> None:
+        if self.base is not None:
+            self.base.close()
+            self.base = None
+
+    def save(self, path: str) -> int:
+        """
+        Merge everything into a segment file and reopen it as the base
+
+        Returns:
+            Number of documents written
+        """
+        docs = self.memory.iter_docs()
+        if self.base is not None:
+            from itertools import chain
+            docs = chain(self.base.iter_docs(self.deleted), docs)
+        count = DiskSegment.write(path, docs)
+        self.open(path)
+        return count
+
+    def add(
+        self,
+        doc_id: str,
+        text: str,
+        facets: Optional[Dict[str, Union[Any, List[Any]]]] = None,
+        stored: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Index a document, replacing any previous version
+
+        Args:
+            doc_id: Unique document ID
+            text: Searchable text
+            facets: Facet name -> value or list of values
+            stored: Fields returned with hits
+        """
+        self.remove(doc_id)
+        facet_terms = []
+        for name, values in (facets or {}).items():
+            for value in values if isinstance(values, (list, tuple, set)) else [values]:
+                if value is not None:
+                    facet_terms.append(facet_term(name, value))
+        self.memory.add(doc_id, tokenize(text), facet_terms, dict(stored or {}))
+
+    def remove(self, doc_id: str) -> bool:
+        if self.memory.remove(doc_id):
+            return True
+        if self.base is not None:
+            number = self.base.doc_number(doc_id)
+            if number is not None and number not in self.deleted:
+                self.deleted.add(number)
+                return True
+        return False
+
+    def stored(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        number = self.memory.doc_numbers.get(doc_id)
+        if number is not None:
+            return self.memory.stored(number)
+        if self.base is not None:
+            number = self.base.doc_number(doc_id)
+            if number is not None and number not in self.deleted:
+                return self.base.stored(number)
+        return None
+
+    def _segments(self) -> List[Tuple[Any, set]]:
+        segments = [(self.memory, set())]
+        if self.base is not None:
+            segments.append((self.base, self.deleted))
+        return segments
+
+    def _filter(self, segment: Any, deleted: set, filters: Dict[str, Any]) -> Optional[set]:
+        """Doc numbers matching every facet filter (None when unfiltered)"""
+        allowed = None
+        for name, values in filters.items():
+            if values is None:
+                continue
+            matches = set()
+            for value in values if isinstance(values, (list, tuple, set)) else [values]:
+                matches.update(number for number, _ in segment.iter_postings(facet_term(name, value)))
+            allowed = matches if allowed is None else allowed & matches
+        return allowed - deleted if allowed is not None else None
+
+    def search(
+        self,
+        query: str = "",
+        filters: Optional[Dict[str, Any]] = None,
+        limit: int = 20,
+        offset: int = 0,
+        facets: Iterable[str] = ()
+    ) -> Dict[str, Any]:
+        """
+        Rank documents for a query
+
+        Args:
+            query: Free text (empty returns all documents matching the filters)
+            filters: Facet name -> value or list of values (OR within, AND across)
+            limit: Maximum hits
+            offset: Hits to skip
+            facets: Stored fields to count values of across all matches
+                (index facet values as stored fields too to count them)
+
+        Returns:
+            {"total": int, "hits": [SearchHit], "facets": {name: {value: count}}}
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        filters = filters or {}
+        if not terms and not any(v is not None for v in filters.values()):
+            return {"total": 0, "hits": [], "facets": {name: {} for name in facets}}
+
+        num_docs = max(len(self), 1)
+        total_length = self.memory.total_length + (self.base.total_length if self.base else 0)
+        average_length = total_length / num_docs or 1.0
+        idf = {}
+        for term in terms:
+            df = sum(segment.doc_freq(term) for segment, _ in self._segments())
+            idf[term] = math.log(1 + (num_docs - df + 0.5) / (df + 0.5))
+
+        scored: List[Tuple[float, int, Any, int]] = []
+        for rank, (segment, deleted) in enumerate(self._segments()):
+            allowed = self._filter(segment, deleted, filters)
+            if allowed is not None and not allowed:
+                continue
+            if not terms:
+                scored.extend((0.0, rank, segment, number) for number in sorted(allowed))
+                continue
+
+            scores: Dict[int, float] = {}
+            for term in terms:
+                for number, tf in segment.iter_postings(term):
+                    if number in deleted or (allowed is not None and number not in allowed):
+                        continue
+                    norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * segment.length(number) / average_length)
+                    scores[number] = scores.get(number, 0.0) + idf[term] * tf * (BM25_K1 + 1) / norm
+            scored.extend((score, rank, segment, number) for number, score in scores.items())
+
+        counts: Dict[str, Counter] = {name: Counter() for name in facets}
+        if counts:
+            for _, _, segment, number in scored:
+                stored = segment.stored(number)
+                for name, counter in counts.items():
+                    values = stored.get(name)
+                    counter.update(values if isinstance(values, list) else [values] if values is not None else [])
+
+        top = heapq.nsmallest(offset + limit, scored, key=lambda s: (-s[0], s[1], s[3]))[offset:]
+        hits = []
+        for score, _, segment, number in top:
+            hits.append(SearchHit(segment.doc_id(number), round(score, 6), dict(segment.stored(number))))
+        return {
+            "total": len(scored),
+            "hits": hits,
+            "facets": {name: dict(counter.most_common()) for name, counter in counts.items()},
+        }
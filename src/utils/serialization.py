@@ -0,0 +1,283 @@
+"""
+Serialization utilities for large API payloads
+Sparse fieldsets (fields/exclude projections), sub-collection slicing,
+incremental JSON encoding of pydantic models and fast whole-model codecs
+"""
+from typing import Any, Dict, Iterator, Optional, Type, TypeVar, Union
+from pydantic import BaseModel
+from pydantic_core import to_json, to_jsonable_python
+
+try:
+    import orjson
+except ImportError:  # Optional: faster encoding/decoding of plain python data
+    orjson = None
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+# Nested field spec: {"title": True, "scenes": {"location": True}}
+# List-valued fields are addressed by name, their items inherit the sub-spec.
+FieldSpec = Dict[str, Union[bool, "FieldSpec"]]
+
+# Slices keyed by dotted path to a list field, e.g. {"scenes": slice(0, 50)}
+SliceSpec = Dict[str, slice]
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def parse_field_spec(fields: Optional[str]) -> Optional[FieldSpec]:
+    """
+    Parse a comma-separated list of dotted field paths into a nested spec
+
+    Args:
+        fields: e.g. "title,scenes.location,scenes.dialogues.text"
+
+    Returns:
+        Nested field spec, or None if no fields were given
+    """
+    if not fields:
+        return None
+
+    spec: FieldSpec = {}
+    for path in fields.split(","):
+        path = path.strip()
+        if not path:
+            continue
+        node = spec
+        parts = path.split(".")
+        for part in parts[:-1]:
+            child = node.get(part)
+            if child is True:
+                # Whole field already selected, a narrower path adds nothing
+                break
+            if child is None:
+                child = node[part] = {}
+            node = child
+        else:
+            node[parts[-1]] = True
+    return spec or None
+
+
+def _child_spec(spec: Optional[FieldSpec], name: str) -> Optional[FieldSpec]:
+    """Return the sub-spec for a field (None means 'no restriction')"""
+    if spec is None:
+        return None
+    value = spec.get(name)
+    return value if isinstance(value, dict) else None
+
+
+def _select_fields(
+    obj: Any,
+    include: Optional[FieldSpec],
+    exclude: Optional[FieldSpec]
+) -> Iterator[tuple]:
+    """Yield (name, value, sub_include, sub_exclude) for the selected fields"""
+    if isinstance(obj, BaseModel):
+        names = obj.model_fields.keys()
+        getter = obj.__dict__.__getitem__
+    else:
+        names = list(obj.keys())
+        getter = obj.__getitem__
+
+    for name in names:
+        if include is not None and name not in include:
+            continue
+        if exclude is not None and exclude.get(name) is True:
+            continue
+        yield name, getter(name), _child_spec(include, name), _child_spec(exclude, name)
+
+
+def _is_container(value: Any) -> bool:
+    return isinstance(value, (BaseModel, dict, list, tuple))
+
+
+def _has_slices_below(slices: Optional[SliceSpec], path: str) -> bool:
+    if not slices:
+        return False
+    prefix = f"{path}." if path else ""
+    return any(key == path or key.startswith(prefix) for key in slices)
+
+
+def _needs_walk(value: Any, include: Optional[FieldSpec], exclude: Optional[FieldSpec],
+                slices: Optional[SliceSpec], path: str) -> bool:
+    """Whether a value must be walked rather than encoded in one call"""
+    if not _is_container(value):
+        return False
+    if isinstance(value, (list, tuple)):
+        return True
+    return include is not None or exclude is not None or _has_slices_below(slices, path)
+
+
+def project(
+    obj: Any,
+    include: Optional[FieldSpec] = None,
+    exclude: Optional[FieldSpec] = None,
+    slices: Optional[SliceSpec] = None,
+    _path: str = ""
+) -> Any:
+    """
+    Project a model (or nested structure) into JSON-compatible python data
+
+    Args:
+        obj: Pydantic model, dict, list or scalar
+        include: Fields to keep (None keeps everything)
+        exclude: Fields to drop
+        slices: Pagination slices keyed by dotted list path
+
+    Returns:
+        Projected, JSON-compatible value
+    """
+    if isinstance(obj, (list, tuple)):
+        window = slices.get(_path) if slices else None
+        items = obj[window] if window is not None else obj
+        return [project(item, include, exclude, slices, _path) for item in items]
+
+    if isinstance(obj, (BaseModel, dict)):
+        result = {}
+        for name, value, sub_include, sub_exclude in _select_fields(obj, include, exclude):
+            child_path = f"{_path}.{name}" if _path else name
+            if _needs_walk(value, sub_include, sub_exclude, slices, child_path):
+                result[name] = project(value, sub_include, sub_exclude, slices, child_path)
+            else:
+                result[name] = to_jsonable_python(value)
+        return result
+
+    return to_jsonable_python(obj)
+
+
+def iter_json(
+    obj: Any,
+    include: Optional[FieldSpec] = None,
+    exclude: Optional[FieldSpec] = None,
+    slices: Optional[SliceSpec] = None,
+    _path: str = ""
+) -> Iterator[bytes]:
+    """
+    Incrementally encode a model as JSON
+
+    Lists and nested models are walked element by element so that the full
+    document is never materialized; leaves are encoded by pydantic-core.
+
+    Yields:
+        Encoded JSON fragments (not chunk-aligned, see iter_json_chunks)
+    """
+    if isinstance(obj, (list, tuple)):
+        window = slices.get(_path) if slices else None
+        items = obj[window] if window is not None else obj
+        yield b"["
+        first = True
+        for item in items:
+            if not first:
+                yield b","
+            first = False
+            if _needs_walk(item, include, exclude, slices, _path):
+                yield from iter_json(item, include, exclude, slices, _path)
+            else:
+                yield to_json(item)
+        yield b"]"
+        return
+
+    if isinstance(obj, (BaseModel, dict)):
+        is_model = isinstance(obj, BaseModel)
+        yield b"{"
+        first = True
+        for name, value, sub_include, sub_exclude in _select_fields(obj, include, exclude):
+            child_path = f"{_path}.{name}" if _path else name
+            key = b'"' + name.encode() + b'"' if is_model else to_json(str(name))
+            yield (key if first else b"," + key) + b":"
+            first = False
+            if _needs_walk(value, sub_include, sub_exclude, slices, child_path):
+                yield from iter_json(value, sub_include, sub_exclude, slices, child_path)
+            else:
+                yield to_json(value)
+        yield b"}"
+        return
+
+    yield to_json(obj)
+
+
+def iter_json_chunks(
+    obj: Any,
+    include: Optional[FieldSpec] = None,
+    exclude: Optional[FieldSpec] = None,
+    slices: Optional[SliceSpec] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    Incrementally encode a model as JSON, coalesced into ~chunk_size writes
+
+    Suitable as the body iterator of a StreamingResponse.
+    """
+    buffer = bytearray()
+    for fragment in iter_json(obj, include, exclude, slices):
+        buffer += fragment
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def dumps_json(obj: Any, indent: Optional[int] = None) -> bytes:
+    """
+    Encode plain python data (dicts, lists, datetimes, models) as JSON
+
+    Uses orjson when installed, otherwise pydantic-core; both are compiled.
+    Unknown types are encoded as str().
+    """
+    if orjson is not None and indent in (None, 2):
+        option = orjson.OPT_INDENT_2 if indent else 0
+        return orjson.dumps(obj, option=option | orjson.OPT_NON_STR_KEYS, default=_orjson_default)
+    return to_json(obj, indent=indent, serialize_unknown=True)
+
+
+def _orjson_default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return to_jsonable_python(value, serialize_unknown=True)
+
+
+def loads_json(data: Union[str, bytes]) -> Any:
+    """Decode JSON into plain python data"""
+    if orjson is not None:
+        return orjson.loads(data)
+    from pydantic_core import from_json
+    return from_json(data)
+
+
+def dump_model_json(model: BaseModel, indent: Optional[int] = None) -> str:
+    """Encode a model with its compiled pydantic-core serializer"""
+    return model.model_dump_json(indent=indent)
+
+
+def load_model_json(model_type: Type[ModelT], data: Union[str, bytes]) -> ModelT:
+    """
+    Parse and validate a model from JSON
+
+    Decoding with loads_json() and validating the resulting python data
+    measured about twice as fast as model_validate_json() on large scripts
+    with pydantic 2.5.
+    """
+    return model_type.model_validate(loads_json(data))
+
+
+def dump_model_msgpack(model: BaseModel) -> bytes:
+    """
+    Encode a model as MessagePack (requires the optional msgpack package)
+
+    Values are first converted to their JSON-compatible form (datetimes as
+    ISO strings, enums as values), so load_model_msgpack() validates them
+    exactly like JSON input.
+    """
+    import msgpack
+
+    return msgpack.packb(model.model_dump(mode="json"), use_bin_type=True)
+
+
+def load_model_msgpack(model_type: Type[ModelT], data: bytes) -> ModelT:
+    """Decode and validate a MessagePack payload written by dump_model_msgpack()"""
+    import msgpack
+
+    return model_type.model_validate(msgpack.unpackb(data, raw=False))
@@ -0,0 +1,78 @@
+"""
+Fake LLM Server
+A local OpenAI-compatible server for LLM gateway tests
+
+Serve it in-process with httpx.ASGITransport(app=server.app), or run it
+standalone with `uvicorn tests.fake_llm_server:app` and point LLM_BASE_URL at it.
+"""
+import asyncio
+from typing import List, Dict, Any
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+class FakeLLMServer:
+    """
+    Echoes prompts back as completions and records what it was asked
+
+    Args:
+        latency: Seconds each call takes
+        failures: Status codes returned (in order) before calls start succeeding
+        retry_after: Retry-After header sent with 429 responses
+    """
+
+    def __init__(self, latency: float = 0.0, failures: List[int] = (), retry_after: float = None):
+        self.latency = latency
+        self.failures = list(failures)
+        self.retry_after = retry_after
+        self.calls: List[Dict[str, Any]] = []
+        self.active = 0
+        self.peak_concurrency = 0
+        self.app = FastAPI()
+        self.app.post("/v1/chat/completions")(self.chat_completions)
+        self.app.post("/v1/completions")(self.completions)
+
+    async def _enter(self, path: str, body: Dict[str, Any]):
+        self.calls.append({"path": path, **body})
+        self.active += 1
+        self.peak_concurrency = max(self.peak_concurrency, self.active)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.active -= 1
+        if self.failures:
+            status = self.failures.pop(0)
+            headers = {"Retry-After": str(self.retry_after)} if status == 429 and self.retry_after else {}
+            return JSONResponse({"error": {"message": "fake failure"}}, status_code=status, headers=headers)
+        return None
+
+    async def chat_completions(self, request: Request):
+        body = await request.json()
+        failure = await self._enter("chat", body)
+        if failure:
+            return failure
+        prompt = body["messages"][-1]["content"]
+        return {
+            "object": "chat.completion",
+            "model": body["model"],
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": f"echo: {prompt}"}}],
+        }
+
+    async def completions(self, request: Request):
+        body = await request.json()
+        failure = await self._enter("completions", body)
+        if failure:
+            return failure
+        prompts = body["prompt"] if isinstance(body["prompt"], list) else [body["prompt"]]
+        return {
+            "object": "text_completion",
+            "model": body["model"],
+            "choices": [
+                {"index": i, "text": f"echo: {p.split(chr(10) + chr(10))[-1]}"}
+                for i, p in reversed(list(enumerate(prompts)))
+            ],
+        }
+
+
+app = FakeLLMServer(latency=0.05).app
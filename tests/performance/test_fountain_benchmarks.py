@@ -0,0 +1,140 @@
+"""
+Fountain Parser/Writer Benchmarks
+Throughput on feature-length scripts with memory held constant by streaming
+"""
+import io
+import time
+import tracemalloc
+import pytest
+
+LINES_PER_PAGE = 55
+
+PAGE = """INT. SAFEHOUSE KITCHEN - NIGHT
+
+Rain hammers the window. MARA paces beside a table strewn with maps,
+coffee cups and a disassembled radio. DEV watches from the doorway.
+
+MARA
+They know we're here. They've known since the bridge.
+
+DEV
+(quietly)
+Then why haven't they come?
+
+MARA
+Because they want the drive more than they want us.
+
+She slides a thumb drive across the table. Dev doesn't touch it.
+
+DEV (O.S.)
+So we give it to them.
+
+MARA
+We give them a copy. A broken one.
+
+And we're gone before they notice.
+
+DEV
+You've done this before.
+
+MARA
+Once. It went badly.
+
+A long beat. Thunder.
+
+DEV
+How badly?
+
+MARA
+I'm the only one who walked away.
+
+Dev finally picks up the drive, turns it over in his fingers.
+
+DEV
+Then we don't do it like last time.
+
+CUT TO:
+
+"""
+
+
+def pages(count: int, chunk_size: int = 8192):
+    """Lazily produce `count` screenplay pages as byte chunks"""
+    page = PAGE.encode()
+    pending = b"Title: Benchmark\nAuthor: Perf Suite\n\n"
+    for _ in range(count):
+        pending += page
+        while len(pending) >= chunk_size:
+            yield pending[:chunk_size]
+            pending = pending[chunk_size:]
+    if pending:
+        yield pending
+
+
+def parse_and_discard(writing_engine, page_count: int):
+    scenes = dialogues = 0
+    start = time.perf_counter()
+    for item in writing_engine.iter_fountain(pages(page_count)):
+        if item.__class__.__name__ == "Scene":
+            scenes += 1
+        else:
+            dialogues += 1
+    return scenes, dialogues, time.perf_counter() - start
+
+
+@pytest.mark.performance
+class TestFountainBenchmarks:
+    """Benchmarks for streaming Fountain import/export"""
+
+    @pytest.fixture
+    def writing_engine(self):
+        from src.engines.writing_engine import WritingEngine
+        return WritingEngine()
+
+    @pytest.mark.parametrize("page_count", [120, 300])
+    def test_parse_throughput(self, writing_engine, page_count):
+        """Test parse throughput on 120- and 300-page scripts"""
+        scenes, dialogues, elapsed = parse_and_discard(writing_engine, page_count)
+
+        assert scenes == page_count
+        assert dialogues == page_count * 10
+        pages_per_second = page_count / elapsed
+        print(f"\nFountain parse {page_count} pages: {elapsed:.3f}s ({pages_per_second:.0f} pages/s)")
+        assert pages_per_second > 100
+
+    def test_parse_memory_is_constant(self, writing_engine):
+        """Test peak parser memory does not grow with script length"""
+        peaks = {}
+        for page_count in (120, 300):
+            tracemalloc.start()
+            parse_and_discard(writing_engine, page_count)
+            peaks[page_count] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        print(f"\nFountain parse peak memory: {peaks}")
+        assert peaks[300] < peaks[120] * 1.25
+        assert peaks[300] < 1024 * 1024
+
+    def test_write_throughput(self, writing_engine):
+        """Test streaming export of a 300-page script"""
+        script = writing_engine.import_from_fountain(pages(300))
+
+        class Sink(io.TextIOBase):
+            def __init__(self):
+                self.size = 0
+
+            def write(self, s):
+                self.size += len(s)
+                return len(s)
+
+        sink = Sink()
+        tracemalloc.start()
+        start = time.perf_counter()
+        written = writing_engine.write_fountain(script, sink)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        assert written == sink.size > LINES_PER_PAGE * 300
+        print(f"\nFountain write 300 pages: {elapsed:.3f}s, peak {peak} bytes")
+        assert peak < 256 * 1024
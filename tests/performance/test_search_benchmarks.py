@@ -0,0 +1,88 @@
+"""
+Script Search Benchmarks
+Indexing, query latency and segment load time across thousands of scripts
+"""
+import time
+import pytest
+
+SCRIPTS = 2000
+SCENES_PER_SCRIPT = 5
+LINES_PER_SCENE = 4
+WORDS = (
+    "vault diamonds alarm rooftop harbor signal courier engine midnight ledger "
+    "river lantern orchard tunnel canyon archive garden bridge station market"
+).split()
+
+
+@pytest.fixture(scope="module")
+def engine():
+    from src.engines.writing_engine import (
+        WritingEngine, Script, ScriptType, Scene, SceneType, Dialogue
+    )
+
+    engine = WritingEngine()
+    for s in range(SCRIPTS):
+        scenes = []
+        for n in range(SCENES_PER_SCRIPT):
+            scene = Scene(
+                scene_number=n + 1, scene_type=SceneType.INT, location=f"{WORDS[(s + n) % 20]} room",
+                description=" ".join(WORDS[(s * 3 + n + k) % 20] for k in range(12)),
+            )
+            scene.dialogues = [
+                Dialogue(character_id=f"C{(s + i) % 50}", scene_id=scene.scene_id, line_number=i + 1,
+                         text=" ".join(WORDS[(s + n * 7 + i * 3 + k) % 20] for k in range(8)))
+                for i in range(LINES_PER_SCENE)
+            ]
+            scenes.append(scene)
+        script = Script(title=f"Script {s}", script_type=ScriptType.FILM, genre=["drama", "thriller"][s % 2],
+                        logline="A courier crosses the river", scenes=scenes)
+        engine.scripts[script.script_id] = script
+    return engine
+
+
+@pytest.mark.performance
+class TestSearchBenchmarks:
+    """Search throughput benchmarks"""
+
+    def test_index_and_query(self, engine):
+        """Full index build, then ranked and faceted queries"""
+        start = time.perf_counter()
+        engine.search_scripts("warmup")
+        build = time.perf_counter() - start
+        docs = len(engine.search.index)
+        assert docs == SCRIPTS * (1 + SCENES_PER_SCRIPT * (1 + LINES_PER_SCENE))
+
+        start = time.perf_counter()
+        for word in WORDS:
+            results = engine.search_scripts(f"{word} vault", genre="thriller", kind="line", limit=10)
+            assert results["hits"]
+        query = (time.perf_counter() - start) / len(WORDS)
+        print(f"\nindexed {docs} docs in {build:.2f}s; filtered query {query * 1000:.1f}ms")
+        assert query < 0.5
+
+    def test_incremental_update_and_segment_load(self, engine, tmp_path):
+        """One-line edit re-indexes one scene; saved segments open without parsing"""
+        from src.engines.writing_engine import WritingEngine
+
+        engine.search_scripts("warmup")
+        script = next(iter(engine.scripts.values()))
+        scene = script.scenes[2]
+        engine.touch_scene(script.script_id, scene.scene_id)
+        start = time.perf_counter()
+        engine.search_scripts("vault")
+        assert engine.search.indexed == 1
+        update = time.perf_counter() - start
+
+        path = str(tmp_path / "bench.idx")
+        engine.save_search_index(path)
+        restarted = WritingEngine()
+        start = time.perf_counter()
+        restarted.load_search_index(path)
+        load = time.perf_counter() - start
+        start = time.perf_counter()
+        hits = restarted.search.search("diamonds harbor", limit=10)["hits"]
+        first_query = time.perf_counter() - start
+        assert hits
+        print(f"\nincremental sync {update * 1000:.1f}ms; segment open {load * 1000:.2f}ms; "
+              f"first query {first_query * 1000:.1f}ms")
+        assert load < 0.05
@@ -58,8 +58,20 @@ class TestSecurity:
                 assert "<script>" not in response_text.lower()
                 assert "javascript:" not in response_text.lower()
 
-    def test_authentication_required(self, client):
+    @pytest.fixture
+    def locked_client(self, client, monkeypatch):
+        """Test client for the app running with API_AUTH_REQUIRED on"""
+        from src.api.auth import APIKeyAuthMiddleware
+        client.get("/api/v1/health")  # Builds the middleware stack
+        layer = client.app.middleware_stack
+        while not isinstance(layer, APIKeyAuthMiddleware):
+            layer = layer.app
+        monkeypatch.setattr(layer, "require_key", True)
+        return client
+
+    def test_authentication_required(self, locked_client):
         """Test protected endpoints require authentication"""
+        client = locked_client
         protected_endpoints = [
             "/api/v1/projects",
             "/api/v1/characters",
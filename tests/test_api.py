@@ -1,4 +1,5 @@
 """Tests for API endpoints"""
+import json
 import pytest
 from fastapi.testclient import TestClient
 from src.api.main import app
@@ -31,3 +32,68 @@ def test_about():
     assert "capabilities" in data
     assert isinstance(data["capabilities"], list)
     assert len(data["capabilities"]) > 0
+
+def test_get_script_sparse_fields_and_stream():
+    """Test script projection and streamed responses"""
+    from src.api.main import writing_engine
+    script = writing_engine.generate_script("A lighthouse keeper's last night", title="Last Light")
+
+    response = client.get(f"/api/v1/scripts/{script.script_id}", params={"fields": "title,version"})
+    assert response.status_code == 200
+    assert response.json() == {"title": "Last Light", "version": "1.0"}
+
+    response = client.get(f"/api/v1/scripts/{script.script_id}", params={"stream": True, "exclude": "metadata"})
+    assert response.status_code == 200
+    assert response.json()["title"] == "Last Light"
+    assert "metadata" not in response.json()
+
+def test_metrics_endpoint():
+    """Test metrics are exposed in Prometheus text format"""
+    client.get("/api/v1/health")
+    response = client.get("/api/v1/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/health"}' in response.text
+
+def test_export_script_fountain():
+    """Test Fountain export is streamed as text"""
+    from src.api.main import writing_engine
+    script = writing_engine.import_from_fountain("Title: Streamed\n\nINT. DOCK - DAWN\n\nFog.\n\nMARA\nWe're late.\n")
+
+    response = client.get(f"/api/v1/scripts/{script.script_id}/fountain")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert response.text.startswith("Title: Streamed\n\nINT. DOCK - DAWN\n")
+    assert "\nMARA\nWe're late.\n" in response.text
+
+def test_export_import_script_round_trip():
+    """Test scripts move between services as JSON or MessagePack"""
+    from src.api.main import writing_engine
+    script = writing_engine.import_from_fountain("INT. DOCK - DAWN\n\nFog.\n\nMARA\nWe're late.\n")
+
+    exported = client.get(f"/api/v1/scripts/{script.script_id}/export")
+    assert exported.headers["content-type"] == "application/json"
+    del writing_engine.scripts[script.script_id]
+    imported = client.post("/api/v1/scripts/import", content=exported.content)
+    assert imported.json() == {"script_id": script.script_id, "scene_count": 1}
+
+    packed = client.get(f"/api/v1/scripts/{script.script_id}/export", params={"format": "msgpack"})
+    assert packed.headers["content-type"] == "application/msgpack"
+    response = client.post(
+        "/api/v1/scripts/import", content=packed.content, headers={"Content-Type": "application/msgpack"}
+    )
+    assert response.status_code == 200
+    assert writing_engine.scripts[script.script_id].scenes[0].dialogues[0].text == "We're late."
+
+    assert client.post("/api/v1/scripts/import", content=b"{}").status_code == 400
+
+def test_stream_storyboard():
+    """Test storyboard frames stream as newline-delimited JSON"""
+    from src.api.main import writing_engine
+    script = writing_engine.import_from_fountain("INT. DOCK - DAWN\n\nFog.\n\nEXT. PIER - DAY\n\nGulls.\n")
+
+    response = client.get(f"/api/v1/scripts/{script.script_id}/storyboard", params={"style": "sketch"})
+    assert response.headers["content-type"] == "application/x-ndjson"
+    frames = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(f["description"] for f in frames) == ["Fog.", "Gulls."]
+    assert {f["visual_style"] for f in frames} == {"sketch"}
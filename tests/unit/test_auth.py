@@ -0,0 +1,196 @@
+"""
+Unit Tests for API Key Authentication and Rate Limiting
+Tests hashed key lookup, the validated-key cache, token buckets and middleware
+"""
+import pytest
+from datetime import datetime, timedelta
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+
+class FakeRedis:
+    """Minimal async stand-in for redis.asyncio running the token-bucket script"""
+
+    def __init__(self):
+        self.hashes = {}
+        self.scripts = {}
+
+    async def script_load(self, script):
+        sha = f"sha{len(self.scripts)}"
+        self.scripts[sha] = script
+        return sha
+
+    async def evalsha(self, sha, numkeys, key, capacity, rate, now, cost):
+        from src.api.rate_limit import refill
+        if sha not in self.scripts:
+            raise RuntimeError("NOSCRIPT No matching script")
+        if rate <= 0:
+            return [0, "0"]
+        state = self.hashes.get(key, {})
+        tokens = float(state.get("tokens", capacity))
+        last = float(state.get("ts", now))
+        allowed, tokens = refill(tokens, last, now, capacity, rate, cost)
+        self.hashes[key] = {"tokens": str(tokens), "ts": str(now)}
+        return [1 if allowed else 0, str(tokens)]
+
+    async def delete(self, key):
+        self.hashes.pop(key, None)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.unit
+class TestAPIKeyAuth:
+    """Test suite for API key authentication"""
+
+    @pytest.fixture
+    def platform(self):
+        from src.engines.enterprise_platform import EnterprisePlatform
+        return EnterprisePlatform()
+
+    @pytest.fixture
+    def organization(self, platform):
+        return platform.create_organization(name="Key Studio")
+
+    @pytest.fixture
+    def app_factory(self, platform):
+        from src.api.auth import APIKeyAuthMiddleware
+
+        def factory(**kwargs):
+            app = FastAPI()
+            app.add_middleware(APIKeyAuthMiddleware, platform=platform, **kwargs)
+
+            @app.get("/api/v1/whoami")
+            async def whoami(request: Request):
+                api_key = getattr(request.state, "api_key", None)
+                return {"organization_id": api_key.organization_id if api_key else None}
+
+            @app.get("/api/v1/health")
+            async def health():
+                return {"status": "healthy"}
+
+            return TestClient(app)
+        return factory
+
+    def test_keys_are_stored_hashed_and_indexed(self, platform, organization):
+        """Test only the hash is stored and lookup goes through the index"""
+        from src.engines.enterprise_platform import hash_api_key
+
+        created = platform.create_api_key(organization_id=organization.organization_id, name="CI")
+        stored = platform.api_keys[created.key_id]
+
+        assert created.key and stored.key is None
+        assert stored.key_hash == hash_api_key(created.key)
+        assert platform.lookup_api_key(stored.key_hash) is stored
+        assert platform.validate_api_key(created.key) is True
+        assert platform.validate_api_key("afs_wrong") is False
+
+        platform.revoke_api_key(created.key_id)
+        assert platform.validate_api_key(created.key) is False
+
+    def test_expired_key_is_invalid(self, platform, organization):
+        """Test expiry is honoured"""
+        created = platform.create_api_key(organization_id=organization.organization_id, name="Old")
+        platform.api_keys[created.key_id].expires_at = datetime.utcnow() - timedelta(seconds=1)
+
+        assert platform.validate_api_key(created.key) is False
+
+    async def test_local_token_bucket(self):
+        """Test burst capacity, refill and retry-after"""
+        from src.api.rate_limit import LocalRateLimiter
+
+        clock = FakeClock()
+        limiter = LocalRateLimiter(clock=clock)
+
+        results = [await limiter.acquire("k", capacity=2, rate=1.0) for _ in range(3)]
+        assert [r.allowed for r in results] == [True, True, False]
+        assert results[2].retry_after == pytest.approx(1.0)
+
+        clock.now += 1.0
+        assert (await limiter.acquire("k", capacity=2, rate=1.0)).allowed
+
+    async def test_redis_token_bucket_shared_between_limiters(self):
+        """Test two limiters on one Redis share a bucket and survive script flushes"""
+        from src.api.rate_limit import RedisRateLimiter
+
+        redis = FakeRedis()
+        clock = FakeClock()
+        pod_a = RedisRateLimiter(redis, clock=clock)
+        pod_b = RedisRateLimiter(redis, clock=clock)
+
+        assert (await pod_a.acquire("k", capacity=2, rate=0.5)).allowed
+        assert (await pod_b.acquire("k", capacity=2, rate=0.5)).allowed
+        denied = await pod_a.acquire("k", capacity=2, rate=0.5)
+        assert not denied.allowed
+        assert denied.retry_after == pytest.approx(2.0)
+
+        redis.scripts.clear()
+        clock.now += 2.0
+        assert (await pod_b.acquire("k", capacity=2, rate=0.5)).allowed
+
+    async def test_zero_rate_key_is_blocked(self):
+        """Test a rate of 0 rejects outright instead of dividing by zero for the TTL"""
+        from src.api.rate_limit import LocalRateLimiter, RedisRateLimiter, TOKEN_BUCKET_SCRIPT
+
+        redis = FakeRedis()
+        for limiter in (LocalRateLimiter(clock=FakeClock()), RedisRateLimiter(redis, clock=FakeClock())):
+            result = await limiter.acquire("blocked", capacity=5, rate=0)
+            assert not result.allowed
+            assert result.remaining == 0
+            assert result.retry_after == float("inf")
+        assert redis.hashes == {}
+        assert TOKEN_BUCKET_SCRIPT.index("rate <= 0") < TOKEN_BUCKET_SCRIPT.index("capacity / rate")
+
+    def test_middleware_authenticates_and_rate_limits(self, platform, organization, app_factory):
+        """Test valid keys pass with headers and exhausted keys get 429"""
+        created = platform.create_api_key(
+            organization_id=organization.organization_id, name="Tiny", rate_limit=2
+        )
+        client = app_factory()
+        headers = {"X-API-Key": created.key}
+
+        first = client.get("/api/v1/whoami", headers=headers)
+        assert first.status_code == 200
+        assert first.json()["organization_id"] == organization.organization_id
+        assert first.headers["x-ratelimit-limit"] == "2"
+        assert first.headers["x-ratelimit-remaining"] == "1"
+
+        assert client.get("/api/v1/whoami", headers={"Authorization": f"Bearer {created.key}"}).status_code == 200
+        limited = client.get("/api/v1/whoami", headers=headers)
+        assert limited.status_code == 429
+        assert int(limited.headers["retry-after"]) > 0
+
+    def test_middleware_rejects_bad_and_missing_keys(self, app_factory):
+        """Test invalid keys are rejected and anonymous access follows require_key"""
+        open_client = app_factory()
+        assert open_client.get("/api/v1/whoami", headers={"X-API-Key": "afs_nope"}).status_code == 401
+        assert open_client.get("/api/v1/whoami").status_code == 200
+
+        locked_client = app_factory(require_key=True)
+        assert locked_client.get("/api/v1/whoami").status_code == 401
+        assert locked_client.get("/api/v1/health").status_code == 200
+
+    def test_public_paths_match_whole_segments(self, app_factory):
+        """Test lookalike paths are not anonymous just because they share a prefix"""
+        client = app_factory(require_key=True)
+
+        assert client.get("/api/v1/health-internal").status_code == 401
+        assert client.get("/api/v1/metrics_admin").status_code == 401
+        assert client.get("/static/app.js").status_code == 404  # public, just missing
+        assert client.get("/openapi.json").status_code == 200
+
+    def test_revoked_key_rejected_despite_cache(self, platform, organization, app_factory):
+        """Test revocation takes effect immediately for cached keys"""
+        created = platform.create_api_key(organization_id=organization.organization_id, name="Temp")
+        client = app_factory()
+        headers = {"X-API-Key": created.key}
+
+        assert client.get("/api/v1/whoami", headers=headers).status_code == 200
+        platform.revoke_api_key(created.key_id)
+        assert client.get("/api/v1/whoami", headers=headers).status_code == 401
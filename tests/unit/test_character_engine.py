@@ -312,3 +312,116 @@ class TestCharacterEngine:
         assert clone.id != original.id
         assert clone.name == "Clone Character"
         assert clone.appearance == original.appearance
+
+
+@pytest.mark.unit
+class TestCharacterIndexes:
+    """Test suite for the multi-attribute character indexes"""
+
+    @pytest.fixture
+    def engine(self):
+        from src.engines.character_engine import CharacterEngine, CharacterMode, CharacterType
+
+        engine = CharacterEngine()
+        for i in range(12):
+            engine.create_character(
+                name=f"C{i}",
+                project_id=f"p{i % 2}",
+                brand_id="acme" if i % 3 == 0 else None,
+                mode=CharacterMode.BRAND if i % 3 == 0 else CharacterMode.AVATAR,
+                character_type=CharacterType.STYLIZED if i % 4 == 0 else None
+            )
+        return engine
+
+    async def test_intersecting_filters_match_scan(self, engine):
+        """Test every filter combination returns what a full scan would"""
+        from itertools import product
+        from src.engines.character_engine import CharacterMode, CharacterType
+
+        for project_id, mode, brand_id, character_type in product(
+            (None, "p0", "p1"), (None, CharacterMode.BRAND, CharacterMode.AVATAR),
+            (None, "acme"), (None, CharacterType.STYLIZED)
+        ):
+            expected = [
+                c for c in engine.characters.values()
+                if (not project_id or c.project_id == project_id) and (not mode or c.mode == mode)
+                and (not brand_id or c.brand_id == brand_id)
+                and (not character_type or c.character_type == character_type)
+            ]
+            found = await engine.list_characters(
+                project_id=project_id, mode=mode, brand_id=brand_id, character_type=character_type
+            )
+            assert found == expected
+
+    async def test_recently_updated_first(self, engine):
+        """Test updated_at ordering follows edits, clones and deletes"""
+        characters = list(engine.characters.values())
+        engine.set_pose(characters[4].character_id, "crouch")
+        engine.assign_voice(characters[2], "voice-1")
+        clone = await engine.clone_character(characters[6].character_id)
+        await engine.delete_character(characters[2].character_id)
+
+        recent = await engine.list_characters(project_id="p0", order_by="-updated_at")
+        assert [c.identity.name for c in recent[:3]] == ["C6 (Clone)", "C4", "C10"]
+        oldest_first = await engine.list_characters(project_id="p0", order_by="updated_at")
+        assert oldest_first == recent[::-1]
+
+        first = await engine.list_characters_page(order_by="-updated_at", limit=5)
+        second = await engine.list_characters_page(order_by="-updated_at", cursor=first.next_cursor, limit=5)
+        everything = await engine.list_characters(order_by="-updated_at")
+        assert first.items + second.items == everything[:10]
+        assert first.items[0] is clone
+
+        with pytest.raises(ValueError):
+            await engine.list_characters(order_by="name")
+
+
+@pytest.mark.unit
+class TestIdentityPromptCache:
+    """Test suite for compiled identity prompts and conditioning"""
+
+    @pytest.fixture
+    def engine(self):
+        from src.engines.character_engine import CharacterEngine
+        return CharacterEngine()
+
+    async def test_identity_block_compiled_once_per_revision(self, engine):
+        """Test repeated renders reuse the block and identity edits rebuild it"""
+        mara = engine.create_character(
+            name="Mara", description="Safecracker", physical_attributes={"hair": "black"},
+            cultural_context="Lagos, 1970s"
+        )
+        first = await engine.generate_character_image(mara.character_id, "opens the vault", pose="kneeling")
+        assert first.metadata["prompt"] == (
+            "Character: Mara, Description: Safecracker, Physical: hair: black, "
+            "Cultural context: Lagos, 1970s, Pose: kneeling, Action: opens the vault"
+        )
+        await engine.generate_character_image(mara.character_id, "runs", lighting="neon")
+        assert list(engine.identity_blocks) == [(mara.character_id, 0)]
+
+        engine.update_appearance(mara, {"scar": "left cheek"})
+        engine.set_personality(mara, {"traits": ["calm"]})
+        edited = await engine.generate_character_image(mara.character_id, "waits")
+        assert mara.identity.revision == 2 and edited.metadata["identity_revision"] == 2
+        assert "scar: left cheek" in edited.metadata["prompt"]
+        assert edited.metadata["prompt"].endswith("Action: waits")
+
+    async def test_reference_embedding_cached_until_versions_change(self, engine):
+        """Test the conditioning reference is reused and refreshed on new versions"""
+        from src.engines.character_engine import CharacterVersionType
+
+        mara = engine.create_character(name="Mara")
+        assert engine.get_identity_conditioning(mara.character_id)["reference_embedding"] is None
+        await engine.add_character_version(mara.character_id, CharacterVersionType.CONCEPT, "s3://b/a.jpg", "a.jpg")
+
+        first = engine.get_identity_conditioning(mara.character_id)["reference_embedding"]
+        assert engine.get_identity_conditioning(mara.character_id)["reference_embedding"] is first
+        await engine.generate_character_image(mara.character_id, "smiles")
+        assert engine.get_identity_conditioning(mara.character_id)["reference_embedding"] is first
+
+        await engine.add_character_version(mara.character_id, CharacterVersionType.CASTING, "s3://b/b.jpg", "b.jpg")
+        conditioning = engine.get_identity_conditioning(mara.character_id)
+        assert conditioning["reference_embedding"] is not first
+        assert conditioning["identity_prompt"].startswith("Character: Mara")
+        with pytest.raises(ValueError):
+            engine.get_identity_conditioning("missing")
@@ -0,0 +1,83 @@
+"""
+Unit Tests for Character Graph
+Tests relationship storage, type lookups, k-hop, shortest-path and scene queries
+"""
+import pytest
+
+
+@pytest.mark.unit
+class TestCharacterGraph:
+    """Test suite for the character relationship graph"""
+
+    @pytest.fixture
+    def engine(self):
+        """A-B-C-D chain of friends, A-E rivals, F unconnected"""
+        from src.engines.character_engine import CharacterEngine
+
+        engine = CharacterEngine()
+        engine.cast = {name: engine.create_character(name=name) for name in "ABCDEF"}
+        ids = {name: c.character_id for name, c in engine.cast.items()}
+        engine.ids = ids
+        engine.load_relationships([
+            (ids["A"], ids["B"], "friend"), (ids["B"], ids["C"], "friend"),
+            (ids["C"], ids["D"], "friend"), (ids["A"], ids["E"], "rival"),
+        ])
+        return engine
+
+    def test_relationships_stored_once_and_typed(self, engine):
+        """Test relationships are not duplicated and can be looked up by type"""
+        ids = engine.ids
+        first = engine.create_relationship(engine.cast["B"], engine.cast["E"], "family")
+        again = engine.create_relationship(ids["E"], ids["B"], "family")
+        assert first == again and first["type"] == "family"
+        assert len(engine.relationships) == 5
+        assert "relationships" not in engine.cast["B"].metadata
+
+        assert len(engine.get_relationships(ids["B"])) == 3
+        rivals = engine.get_relationships(ids["E"], relationship_type="rival")
+        assert [(r["character1_id"], r["character2_id"]) for r in rivals] == [(ids["A"], ids["E"])]
+        assert len(engine.relationships.of_type("friend")) == 3
+
+        with pytest.raises(ValueError):
+            engine.create_relationship(ids["A"], ids["A"], "friend")
+
+    def test_k_hop_neighborhood(self, engine):
+        """Test neighborhoods by distance and relationship type"""
+        ids = engine.ids
+        names = {v: k for k, v in ids.items()}
+
+        two = engine.get_related_characters(ids["A"], hops=2)
+        assert {names[c]: d for c, d in two.items()} == {"B": 1, "E": 1, "C": 2}
+        friends = engine.get_related_characters(ids["A"], hops=5, relationship_types=["friend"])
+        assert {names[c] for c in friends} == {"B", "C", "D"}
+
+    def test_shortest_path(self, engine):
+        """Test fewest-hop paths, type filters and unconnected pairs"""
+        ids = engine.ids
+        names = {v: k for k, v in ids.items()}
+
+        path = engine.find_relationship_path(ids["E"], ids["D"])
+        assert [names[c] for c in path] == ["E", "A", "B", "C", "D"]
+        assert engine.find_relationship_path(ids["E"], ids["D"], relationship_types=["friend"]) is None
+        assert engine.find_relationship_path(ids["A"], ids["F"]) is None
+
+        engine.create_relationship(ids["E"], ids["D"], "family")
+        assert [names[c] for c in engine.find_relationship_path(ids["A"], ids["D"])] == ["A", "E", "D"]
+
+    async def test_scene_connections_and_delete(self, engine):
+        """Test 'everyone in scene X connected to Y' and cleanup on delete"""
+        from src.engines.character_engine import CharacterVersionType
+
+        ids = engine.ids
+        names = {v: k for k, v in ids.items()}
+        for name in "CDF":
+            version = await engine.add_character_version(ids[name], CharacterVersionType.FINAL, "u", "k")
+            await engine.assign_character_to_scene(ids[name], version.version_id, "scene-9")
+
+        connected = engine.get_scene_connections("scene-9", ids["A"])
+        assert {names[c]: d for c, d in connected.items()} == {"C": 2, "D": 3}
+        assert engine.get_scene_connections("scene-9", ids["A"], hops=2) == {ids["C"]: 2}
+
+        await engine.delete_character(ids["B"])
+        assert engine.get_scene_connections("scene-9", ids["A"]) == {}
+        assert len(engine.relationships) == 2
@@ -0,0 +1,118 @@
+"""
+Unit Tests for Character Renders
+Tests batched image requests, bounded concurrency and streamed animation frames
+"""
+import asyncio
+import pytest
+
+
+class FakeImageGenerator:
+    """Image backend recording batches and in-flight requests"""
+
+    def __init__(self, latency=0.01, slow_starts=()):
+        self.latency = latency
+        self.slow_starts = set(slow_starts)
+        self.batches = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate(self, batch):
+        self.batches.append(batch)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency * (10 if batch.start in self.slow_starts else 1))
+        finally:
+            self.in_flight -= 1
+        return [f"s3://fake/{batch.character_id}/{batch.kind}/{i}" for i in batch.indexes]
+
+
+@pytest.mark.unit
+class TestCharacterRenders:
+    """Test suite for batched character image generation"""
+
+    def make_engine(self, generator, batch_size=4, concurrency=2):
+        from src.engines.character_engine import CharacterEngine
+        from src.engines.character_renders import BatchRenderer
+
+        engine = CharacterEngine(image_generator=generator)
+        engine.renderer = BatchRenderer(engine._generate_images, batch_size, concurrency)
+        return engine
+
+    async def test_jobs_become_bounded_batches(self):
+        """Test N items go out as ceil(N / batch_size) requests, never above the limit"""
+        generator = FakeImageGenerator()
+        engine = self.make_engine(generator)
+
+        variations, frames = await asyncio.gather(
+            engine.generate_variations({"id": "c1"}, num_variations=10),
+            engine.generate_animation_frames(engine.create_character(name="Mara"), num_frames=9)
+        )
+        assert [v["variation_number"] for v in variations] == list(range(1, 11))
+        assert variations[9]["url"] == "s3://fake/c1/variation/9"
+        assert [b.count for b in generator.batches if b.kind == "variation"] == [4, 4, 2]
+        assert [f["frame_number"] for f in frames] == list(range(9))
+        assert generator.max_in_flight == 2 and engine.renderer.requests == 6
+
+    async def test_frames_stream_as_batches_finish(self):
+        """Test fast batches are yielded before a slow earlier one"""
+        generator = FakeImageGenerator(slow_starts={0})
+        engine = self.make_engine(generator, batch_size=8, concurrency=4)
+        mara = engine.create_character(name="Mara")
+
+        order = []
+        async for frames in engine.stream_animation_frames(mara, num_frames=24, animation_type="run", fps=12):
+            order.append(frames[0]["frame_number"])
+        assert order[-1] == 0 and sorted(order) == [0, 8, 16]
+        assert generator.batches[0].params == {"animation_type": "run"}
+
+        frames = await engine.generate_animation(mara.character_id, "walk", num_frames=10)
+        assert frames[5] == {
+            "frame_number": 5, "url": f"s3://fake/{mara.character_id}/frame/5",
+            "timestamp": 5 / 24.0, "animation_type": "walk"
+        }
+
+    async def test_placeholder_urls_unchanged(self):
+        """Test the default backend keeps the existing URL layout"""
+        from src.engines.character_engine import CharacterEngine
+
+        engine = CharacterEngine(s3_bucket="studio")
+        portrait = await engine.generate_portrait({"id": "c1"})
+        assert portrait["url"] == "https://studio.s3.amazonaws.com/portraits/c1.png"
+        variations = await engine.generate_variations({"id": "c1"}, num_variations=2)
+        assert variations[1]["url"] == "https://studio.s3.amazonaws.com/portraits/c1_v2.png"
+        mara = engine.create_character(name="Mara")
+        frames = await engine.generate_animation_frames(mara, num_frames=30)
+        assert frames[29]["url"].endswith(f"/animation/{mara.character_id}/frame_0029.png")
+        assert frames[12]["timestamp"] == 0.5
+
+    async def test_shot_batch_scored_in_one_pass(self):
+        """Test a shot list is one backend job and one embedder call"""
+        from src.engines.character_engine import CharacterVersionType
+        from src.engines.identity_embeddings import HashingEmbedder
+
+        calls = []
+        embed = HashingEmbedder(256)
+
+        def embedder(visuals):
+            calls.append(len(visuals))
+            return embed(visuals)
+
+        generator = FakeImageGenerator()
+        engine = self.make_engine(generator, batch_size=3)
+        engine.embedder = embedder
+        mara = engine.create_character(name="Mara")
+        await engine.add_character_version(mara.character_id, CharacterVersionType.FINAL, "s3://b/a.jpg", "a.jpg")
+        calls.clear()
+
+        shots = [{"pose": p, "emotion": "calm"} for p in ("standing", "sitting", "running", "kneeling")]
+        visuals = await engine.generate_character_images(mara.character_id, "waits", shots, scene_context="Dock")
+        assert calls == [4]
+        assert [v.pose for v in visuals] == ["standing", "sitting", "running", "kneeling"]
+        assert all(v.consistency_score is not None for v in visuals)
+        assert visuals[2].metadata["prompt"].endswith("Scene: Dock, Pose: running, Emotion: calm, Action: waits")
+        assert visuals[3].s3_key == f"{mara.character_id}/image/3"
+        assert [b.prompts[0] for b in generator.batches] == [visuals[0].metadata["prompt"], visuals[3].metadata["prompt"]]
+
+        with pytest.raises(ValueError):
+            await engine.generate_character_images("missing", "waits", shots)
@@ -0,0 +1,99 @@
+"""
+Unit Tests for Character Scenes
+Tests the scene assignment index and its use by the production engines
+"""
+import pytest
+
+
+async def cast_engine(engine=None):
+    """Engine with Mara in scenes 1 and 2 and Dev in scene 1"""
+    from src.engines.character_engine import CharacterEngine, CharacterVersionType
+
+    engine = engine or CharacterEngine()
+    mara = engine.create_character(name="Mara")
+    dev = engine.create_character(name="Dev")
+    concept = await engine.add_character_version(mara.character_id, CharacterVersionType.CONCEPT, "s3://b/1.jpg", "1.jpg")
+    final = await engine.add_character_version(mara.character_id, CharacterVersionType.FINAL, "s3://b/2.jpg", "2.jpg")
+    dev_final = await engine.add_character_version(dev.character_id, CharacterVersionType.FINAL, "s3://b/3.jpg", "3.jpg")
+    await engine.assign_character_to_scene(mara.character_id, concept.version_id, "scene-1")
+    await engine.assign_character_to_scene(mara.character_id, final.version_id, "scene-1")
+    await engine.assign_character_to_scene(mara.character_id, final.version_id, "scene-2")
+    await engine.assign_character_to_scene(dev.character_id, dev_final.version_id, "scene-1")
+    return engine, mara, dev
+
+
+@pytest.mark.unit
+class TestSceneAssignments:
+    """Test suite for scene assignment queries"""
+
+    async def test_both_directions(self):
+        """Test scene casts and character scenes agree with the versions"""
+        engine, mara, dev = await cast_engine()
+        concept, final = (v.version_id for v in mara.versions)
+
+        assert engine.get_scene_cast("scene-1") == {
+            mara.character_id: [concept, final], dev.character_id: [dev.versions[0].version_id]
+        }
+        assert engine.get_character_scenes(mara.character_id) == {"scene-1": [concept, final], "scene-2": [final]}
+        assert engine.get_scene_casts(["scene-2", "scene-9"]) == {"scene-2": {mara.character_id: [final]}, "scene-9": {}}
+        assert engine.get_scenes_for_characters([dev.character_id])[dev.character_id] == {
+            "scene-1": [dev.versions[0].version_id]
+        }
+        with pytest.raises(ValueError):
+            engine.get_character_scenes("missing")
+
+    async def test_clone_delete_and_save_stay_consistent(self):
+        """Test clones inherit assignments, deletes drop them and saves re-read them"""
+        engine, mara, dev = await cast_engine()
+        clone = await engine.clone_character(mara.character_id)
+        assert set(engine.get_scene_cast("scene-2")) == {mara.character_id, clone.character_id}
+
+        await engine.assign_character_to_scene(clone.character_id, clone.versions[0].version_id, "scene-3")
+        assert list(engine.get_scene_cast("scene-3")) == [clone.character_id]
+        engine.create_relationship(dev.character_id, clone.character_id, "rival")
+        assert engine.get_scene_connections("scene-3", dev.character_id) == {clone.character_id: 1}
+
+        await engine.delete_character(mara.character_id)
+        assert list(engine.get_scene_cast("scene-2")) == [clone.character_id]
+        assert engine.get_scene_cast("scene-1").keys() == {clone.character_id, dev.character_id}
+
+        dev.versions[0].scene_assignments.remove("scene-1")
+        engine.save(dev)
+        assert dev.character_id not in engine.get_scene_cast("scene-1")
+        assert engine.get_scenes_for_characters([dev.character_id]) == {dev.character_id: {}}
+
+    async def test_rebuilt_from_repository(self, tmp_path):
+        """Test a reopened SQLite store rebuilds the index without decoding characters"""
+        from src.engines.character_engine import CharacterEngine
+        from src.engines.character_store import SQLiteCharacterRepository
+
+        path = str(tmp_path / "characters.db")
+        engine, mara, dev = await cast_engine(CharacterEngine(repository=SQLiteCharacterRepository(path)))
+        engine.characters.close()
+
+        reopened = CharacterEngine(repository=SQLiteCharacterRepository(path))
+        assert reopened.characters.loads == 0
+        assert reopened.get_scene_casts(["scene-1", "scene-2"]) == engine.get_scene_casts(["scene-1", "scene-2"])
+
+    async def test_production_engines_use_scene_casts(self):
+        """Test breakdowns and AI shots pick up assigned characters"""
+        from src.engines.preproduction_engine import PreProductionEngine
+        from src.engines.production_layer import ProductionLayer
+
+        engine, mara, dev = await cast_engine()
+        breakdown = PreProductionEngine(character_engine=engine).create_breakdown("script-1", {"scenes": [
+            {"scene_id": "scene-1", "characters": [dev.character_id, "extra"]},
+            {"scene_id": "scene-2"}
+        ]})
+        assert [(item.name, item.scene_ids) for item in breakdown.cast] == [
+            (f"Character {dev.character_id}", ["scene-1"]),
+            ("Character extra", ["scene-1"]),
+            (f"Character {mara.character_id}", ["scene-1"]),
+            (f"Character {mara.character_id}", ["scene-2"])
+        ]
+
+        layer = ProductionLayer(character_engine=engine)
+        shot = await layer.generate_ai_shot("scene-1", prompt="Standoff")
+        assert shot.metadata["character_ids"] == [mara.character_id, dev.character_id]
+        explicit = await layer.generate_ai_shot("scene-1", character_ids=[dev.character_id])
+        assert explicit.metadata["character_ids"] == [dev.character_id]
@@ -0,0 +1,90 @@
+"""
+Unit Tests for Character Snapshots
+Tests binary snapshot round trips and the fast character serializers
+"""
+import io
+import json
+import pytest
+from fastapi.testclient import TestClient
+
+
+async def populated_engine():
+    from src.engines.character_engine import CharacterEngine, CharacterVersionType
+
+    engine = CharacterEngine()
+    characters = [engine.create_character(name=f"Avatar {i}", project_id=f"p{i % 3}") for i in range(25)]
+    version = await engine.add_character_version(
+        characters[4].character_id, CharacterVersionType.FINAL, "s3://b/4.jpg", "4.jpg", pose="standing"
+    )
+    await engine.assign_character_to_scene(characters[4].character_id, version.version_id, "scene-1")
+    return engine, characters
+
+
+@pytest.mark.unit
+class TestCharacterSnapshot:
+    """Test suite for binary character snapshots"""
+
+    async def test_round_trip_restores_store_and_indexes(self, tmp_path):
+        """Test a snapshot restores characters, list indexes and scene casts"""
+        from src.engines.character_engine import CharacterEngine
+        from src.engines.character_snapshot import SNAPSHOT_MAGIC
+        from src.engines.character_store import SQLiteCharacterRepository
+
+        engine, characters = await populated_engine()
+        out = io.BytesIO()
+        assert engine.dump_snapshot(out) == 25
+        assert out.getvalue().startswith(SNAPSHOT_MAGIC)
+        assert len(out.getvalue()) < sum(len(engine.to_json(c)) for c in characters) / 3
+
+        warm = CharacterEngine(repository=SQLiteCharacterRepository(str(tmp_path / "c.db"), cache_size=4))
+        assert warm.restore_snapshot(io.BytesIO(out.getvalue())) == 25
+        assert warm.load(characters[4].character_id) == characters[4]
+        assert [c.character_id for c in await warm.list_characters(project_id="p1")] == [
+            c.character_id for c in characters if c.project_id == "p1"
+        ]
+        assert list(warm.get_scene_cast("scene-1")) == [characters[4].character_id]
+
+    async def test_rejects_foreign_and_truncated_files(self):
+        """Test bad magic and truncated snapshots raise ValueError"""
+        from src.engines.character_engine import CharacterEngine
+
+        engine, _ = await populated_engine()
+        out = io.BytesIO()
+        engine.dump_snapshot(out)
+        with pytest.raises(ValueError):
+            CharacterEngine().restore_snapshot(io.BytesIO(b"not a snapshot"))
+        with pytest.raises(ValueError):
+            CharacterEngine().restore_snapshot(io.BytesIO(out.getvalue()[:-8]))
+
+
+@pytest.mark.unit
+class TestCharacterSerializers:
+    """Test suite for compiled character serializers"""
+
+    async def test_version_history_optional(self):
+        """Test to_dict/to_json and the API endpoints can leave out versions"""
+        from src.api.main import app, character_engine, enterprise_platform
+        from src.engines.character_engine import CharacterVersionType
+
+        mara = character_engine.create_character(name="Serialized Mara", project_id="serializer-project")
+        await character_engine.add_character_version(
+            mara.character_id, CharacterVersionType.FINAL, "s3://b/m.jpg", "m.jpg"
+        )
+        assert json.loads(character_engine.to_json(mara)) == mara.model_dump(mode="json")
+        assert "versions" not in character_engine.to_dict(mara, include_versions=False)
+
+        client = TestClient(app)
+        full = client.get(f"/api/v1/characters/{mara.character_id}").json()
+        assert len(full["versions"]) == 1
+        summary = client.get(f"/api/v1/characters/{mara.character_id}", params={"versions": "false"}).json()
+        assert "versions" not in summary and summary["identity"]["name"] == "Serialized Mara"
+
+        org = enterprise_platform.create_organization(name="Serializer")
+        key = enterprise_platform.create_api_key(organization_id=org.organization_id, name="ser")
+        page = client.get(
+            "/api/v1/characters",
+            params={"project_id": "serializer-project", "versions": "false"},
+            headers={"X-API-Key": key.key}
+        ).json()
+        assert [c["character_id"] for c in page["items"]] == [mara.character_id]
+        assert "versions" not in page["items"][0] and page["next_cursor"] is None
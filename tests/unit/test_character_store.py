@@ -0,0 +1,99 @@
+"""
+Unit Tests for Character Store
+Tests SQLite persistence, lazy loading, the bounded LRU and streaming import/export
+"""
+import io
+import pytest
+
+
+@pytest.mark.unit
+class TestCharacterStore:
+    """Test suite for character repositories"""
+
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        return str(tmp_path / "characters.db")
+
+    def make_engine(self, path, cache_size=8):
+        from src.engines.character_engine import CharacterEngine
+        from src.engines.character_store import SQLiteCharacterRepository
+
+        return CharacterEngine(repository=SQLiteCharacterRepository(path, cache_size=cache_size))
+
+    async def test_survives_restart(self, db_path):
+        """Test identities, versions and visuals are reloaded by a new engine"""
+        from src.engines.character_engine import CharacterMode, CharacterVersionType
+
+        engine = self.make_engine(db_path)
+        hero = engine.create_character(name="Mara", project_id="p1", mode=CharacterMode.ACTOR)
+        engine.create_character(name="Dev", project_id="p2")
+        version = await engine.add_character_version(
+            hero.character_id, CharacterVersionType.CASTING, "s3://b/mara.jpg", "mara.jpg", pose="standing"
+        )
+        await engine.assign_character_to_scene(hero.character_id, version.version_id, "scene-1")
+        engine.assign_voice(hero, "elevenlabs_bella")
+        engine.characters.close()
+
+        reopened = self.make_engine(db_path)
+        assert reopened.characters.loads == 0
+        assert [c.identity.name for c in await reopened.list_characters(project_id="p1")] == ["Mara"]
+        loaded = await reopened.get_character(hero.character_id)
+        assert loaded.identity.voice_id == "elevenlabs_bella"
+        assert loaded.get_active_version().visual.pose == "standing"
+        assert loaded.versions[0].scene_assignments == ["scene-1"]
+        assert len(reopened.characters) == 2
+        assert [c.identity.name for c in await reopened.list_characters(mode=CharacterMode.ACTOR)] == ["Mara"]
+
+    async def test_bounded_cache_writes_back(self, db_path):
+        """Test at most cache_size characters stay in memory and evicted edits persist"""
+        engine = self.make_engine(db_path, cache_size=4)
+        ids = [engine.create_character(name=f"Extra {i}").character_id for i in range(20)]
+        assert len(engine.characters.cache) == 4
+
+        engine.set_pose(ids[15], "kneeling")  # no active version; stamps updated_at
+        edited = engine.update_appearance(await engine.get_character(ids[16]), {"hair": "red"})
+        for character_id in ids[:6]:
+            await engine.get_character(character_id)
+        assert ids[16] not in engine.characters.cache and not engine.characters.dirty
+
+        loads = engine.characters.loads
+        assert (await engine.get_character(ids[16])).identity.physical_attributes == {"hair": "red"}
+        assert engine.characters.loads == loads + 1
+        assert (await engine.get_character(ids[16])) is not edited
+
+        # A stale copy edited after eviction is written as the latest state
+        engine.assign_voice(edited, "elevenlabs_adam")
+        engine.characters.close()
+        reopened = self.make_engine(db_path)
+        assert reopened.load(ids[16]).identity.voice_id == "elevenlabs_adam"
+        assert (await reopened.list_characters(order_by="-updated_at"))[0].character_id == ids[16]
+
+    async def test_delete_and_clone(self, db_path):
+        """Test deletes remove rows and clones are stored"""
+        engine = self.make_engine(db_path)
+        original = engine.create_character(name="Mara")
+        clone = await engine.clone_character(original.character_id)
+        assert await engine.delete_character(original.character_id)
+        assert original.character_id not in engine.characters
+        assert not await engine.delete_character(original.character_id)
+        assert list(engine.characters) == [clone.character_id]
+
+    def test_streaming_export_import(self, db_path):
+        """Test a JSON-lines export round-trips into another store"""
+        from src.engines.character_engine import CharacterEngine
+
+        source = CharacterEngine()
+        for i in range(30):
+            source.create_character(name=f"Avatar {i}", brand_id="acme" if i % 3 == 0 else None)
+        out = io.StringIO()
+        assert source.export_characters(out) == 30
+
+        target = self.make_engine(db_path, cache_size=2)
+        assert target.import_characters(io.StringIO(out.getvalue())) == 30
+        assert len(target.characters.cache) == 0
+        assert len(target.character_index.iter_ids(brand_id="acme")) == 10
+
+        again = io.StringIO()
+        assert target.export_characters(again) == 30
+        assert again.getvalue() == out.getvalue()
+        assert len(target.characters.cache) == 0
@@ -0,0 +1,172 @@
+"""
+Unit Tests for Character Versions
+Tests indexed version lookups and the compact version history
+"""
+import json
+import pytest
+
+
+def make_character(versions=0):
+    from src.engines.character_engine import (
+        Character, CharacterIdentity, CharacterMode, CharacterType,
+        CharacterVersion, CharacterVersionType, CharacterVisual
+    )
+
+    character = Character(
+        identity=CharacterIdentity(character_id="c1", name="Mara", description="Pilot"),
+        mode=CharacterMode.BRAND,
+        character_type=CharacterType.STYLIZED
+    )
+    types = list(CharacterVersionType)
+    for i in range(versions):
+        character.add_version(CharacterVersion(
+            version_id=f"v{i}",
+            character_id=character.character_id,
+            version_type=types[i % 2],
+            visual=CharacterVisual(image_url=f"s3://b/{i}.jpg", s3_key=f"{i}.jpg", version=str(i),
+                                   pose="standing", metadata={"prompt": "Mara", "seed": {"value": i}})
+        ))
+    return character
+
+
+@pytest.mark.unit
+class TestVersionIndex:
+    """Test suite for indexed version lookups"""
+
+    def test_lookups_follow_appends(self):
+        """Test active, by-ID and by-type lookups stay correct as versions are added"""
+        from src.engines.character_engine import CharacterVersionType
+
+        character = make_character(3)
+        assert character.get_active_version().version_id == "v2"
+        assert character.get_version_by_type(CharacterVersionType.CASTING).version_id == "v1"
+        assert character.get_version_by_type(CharacterVersionType.FINAL) is None
+
+        character.add_version(character.versions[0].model_copy(update={
+            "version_id": "v3", "version_type": CharacterVersionType.FINAL
+        }))
+        assert character.get_active_version().version_id == "v3"
+        assert character.get_version_by_type(CharacterVersionType.FINAL).version_id == "v3"
+        assert character.get_version("v1") is character.versions[1]
+        assert character.get_version("missing") is None
+
+    def test_replaced_or_edited_lists_rebuild(self):
+        """Test the index notices a replaced list and in-place edits, and ignores equality"""
+        from src.engines.character_engine import Character
+
+        character = make_character(4)
+        assert character.get_version("v3") is not None
+        character.versions = character.versions[2:]
+        assert character.get_version("v3") is character.versions[1]
+        assert character.get_version("v0") is None
+
+        character.versions.reverse()
+        assert character.get_active_version() is character.versions[0]
+        assert Character.model_validate(character.model_dump()) == character
+
+
+@pytest.mark.unit
+class TestCompactHistory:
+    """Test suite for the compact version history"""
+
+    def test_round_trip_stores_only_deltas(self):
+        """Test later versions hold only changed fields and expand back unchanged"""
+        character = make_character(5)
+        character.versions[3].visual.metadata["seed"]["value"] = 30
+        records = json.loads(json.dumps(character.compact_history()))
+
+        assert records[0][0][0] == []
+        changed = {tuple(path) for path, _ in records[3]}
+        assert ("visual", "metadata", "seed", "value") in changed
+        assert ("visual", "pose") not in changed and ("character_id",) not in changed
+
+        restored = character.model_copy(update={"versions": []})
+        restored.restore_history(records)
+        assert restored.versions == character.versions
+        assert restored.get_active_version().version_id == "v4"
+        assert restored.versions[2].visual.metadata == {"prompt": "Mara", "seed": {"value": 2}}
+
+    def test_history_must_start_whole(self):
+        """Test records not starting with a whole version are rejected"""
+        from src.engines.character_versions import expand_versions
+        from src.engines.character_engine import CharacterVersion
+
+        with pytest.raises(ValueError):
+            expand_versions([[(["notes"], "x")]], CharacterVersion)
+
+
+@pytest.mark.unit
+class TestCopyOnWriteClones:
+    """Test suite for clones sharing their source's versions"""
+
+    async def test_clone_shares_until_modified(self):
+        """Test edits on either side copy only the edited version"""
+        from src.engines.character_engine import CharacterEngine
+
+        engine = CharacterEngine()
+        base = make_character(3)
+        engine.save(base)
+        clone = await engine.clone_character(base.character_id, new_name="Mara (EU)")
+        assert clone.lineage == [base.character_id] and clone.identity.name == "Mara (EU)"
+        assert all(clone.versions[i].visual is base.versions[i].visual for i in range(3))
+
+        engine.set_pose(clone.character_id, "waving")
+        assert clone.versions[2].visual.pose == "waving" and base.versions[2].visual.pose == "standing"
+        assert all(clone.versions[i].visual is base.versions[i].visual for i in (0, 1))
+        engine.set_pose(clone.character_id, "sitting")
+        assert base.versions[2].visual.pose == "standing"
+
+        await engine.assign_character_to_scene(base.character_id, "v0", "scene-1")
+        assert clone.versions[0].scene_assignments == [] and base.versions[0].scene_assignments == ["scene-1"]
+
+        base.add_version(base.versions[0].model_copy(update={"version_id": "v3"}))
+        assert len(base.versions) == 4 and len(clone.versions) == 3
+
+    async def test_clone_owns_its_versions(self):
+        """Test a clone's versions report the clone as owner under IDs of their own"""
+        from src.engines.character_engine import CharacterEngine
+
+        engine = CharacterEngine()
+        base = make_character(3)
+        engine.save(base)
+        await engine.assign_character_to_scene(base.character_id, "v1", "scene-1")
+        clone = await engine.clone_character(base.character_id)
+        again = await engine.clone_character(base.character_id)
+
+        assert {v.character_id for v in clone.versions} == {clone.character_id}
+        assert clone.get_active_version().character_id == clone.character_id
+        assert clone.get_active_version().visual is base.get_active_version().visual
+        ids = [v.version_id for c in (base, clone, again) for v in c.versions]
+        assert len(set(ids)) == len(ids) == 9
+        assert clone.get_version("v1") is None
+        assert engine.get_character_scenes(clone.character_id) == {"scene-1": [clone.versions[1].version_id]}
+        assert set(engine.get_scene_cast("scene-1")) == {base.character_id, clone.character_id, again.character_id}
+
+    async def test_clone_into_sqlite_repository(self):
+        """Test clones are stored and reloaded by the SQLite repository"""
+        from src.engines.character_engine import CharacterEngine
+        from src.engines.character_store import SQLiteCharacterRepository
+
+        engine = CharacterEngine(repository=SQLiteCharacterRepository(cache_size=1))
+        base = make_character(3)
+        engine.save(base)
+        clone = await engine.clone_character(base.character_id)
+        engine.set_pose(clone.character_id, "waving")
+        engine.characters.flush()
+
+        reloaded = CharacterEngine(repository=engine.characters)
+        stored = reloaded.load(clone.character_id)
+        assert [v.version_id for v in stored.versions] == [v.version_id for v in clone.versions]
+        assert stored.get_active_version().visual.pose == "waving"
+        assert reloaded.load(base.character_id).get_active_version().visual.pose == "standing"
+
+    async def test_lineage_follows_clones_of_clones(self):
+        """Test lineage reaches back to the original source"""
+        from src.engines.character_engine import CharacterEngine
+
+        engine = CharacterEngine()
+        base = engine.create_character(name="Mara")
+        regional = await engine.clone_character(base.character_id)
+        local = await engine.clone_character(regional.character_id)
+        assert local.lineage == [base.character_id, regional.character_id]
+        assert engine.load(local.character_id).lineage == local.lineage
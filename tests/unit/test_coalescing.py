@@ -0,0 +1,115 @@
+"""
+Unit Tests for Request Coalescing
+Tests single-flight execution, scoping and collapse metrics
+"""
+import pytest
+import asyncio
+
+
+@pytest.mark.unit
+class TestRequestCoalescing:
+    """Test suite for single-flight request coalescing"""
+
+    @pytest.fixture
+    def coalescer(self):
+        from src.utils.metrics import MetricsRegistry
+        from src.api.coalescing import RequestCoalescer, SCOPE_GLOBAL, SCOPE_OFF
+        return RequestCoalescer(
+            scopes={"/voice": SCOPE_GLOBAL, "/uncached": SCOPE_OFF},
+            registry=MetricsRegistry()
+        )
+
+    @pytest.fixture
+    def slow_work(self):
+        calls = []
+
+        def factory(value):
+            async def work():
+                calls.append(value)
+                await asyncio.sleep(0.01)
+                return {"value": value, "call": len(calls)}
+            return work
+
+        factory.calls = calls
+        return factory
+
+    def test_request_key_is_canonical(self):
+        """Test body key order does not matter but route and tenant do"""
+        from src.api.coalescing import request_key
+
+        assert request_key("/p", {"a": 1, "b": 2}, "t") == request_key("/p", {"b": 2, "a": 1}, "t")
+        assert request_key("/p", {"a": 1}, "t1") != request_key("/p", {"a": 1}, "t2")
+        assert request_key("/p", {"a": 1}, "t") != request_key("/q", {"a": 1}, "t")
+
+    async def test_identical_concurrent_requests_share_one_execution(self, coalescer, slow_work):
+        """Test duplicates await the leader's result"""
+        body = {"project_id": "p1", "style": "noir"}
+        results = await asyncio.gather(*[
+            coalescer.run("/poster", dict(body), slow_work("poster"), tenant="org1") for _ in range(10)
+        ])
+
+        assert len(slow_work.calls) == 1
+        assert all(r is results[0] for r in results)
+        assert coalescer.collapsed.labels("/poster").value == 9
+        assert coalescer.executed.labels("/poster").value == 1
+        assert coalescer.flights.in_flight == {}
+
+    async def test_tenant_scope_isolates_organizations(self, coalescer, slow_work):
+        """Test tenant-scoped routes do not share across organizations"""
+        await asyncio.gather(
+            coalescer.run("/poster", {"x": 1}, slow_work("a"), tenant="org1"),
+            coalescer.run("/poster", {"x": 1}, slow_work("b"), tenant="org2"),
+        )
+        assert len(slow_work.calls) == 2
+
+    async def test_global_and_off_scopes(self, coalescer, slow_work):
+        """Test global scope shares across tenants and off never coalesces"""
+        await asyncio.gather(
+            coalescer.run("/voice", {"text": "hi"}, slow_work("a"), tenant="org1"),
+            coalescer.run("/voice", {"text": "hi"}, slow_work("b"), tenant="org2"),
+        )
+        assert slow_work.calls == ["a"]
+
+        await asyncio.gather(*[coalescer.run("/uncached", {}, slow_work("c")) for _ in range(3)])
+        assert slow_work.calls.count("c") == 3
+
+    async def test_sequential_requests_are_not_cached(self, coalescer, slow_work):
+        """Test results are only shared while the leader is in flight"""
+        await coalescer.run("/poster", {"x": 1}, slow_work("a"))
+        await coalescer.run("/poster", {"x": 1}, slow_work("b"))
+        assert slow_work.calls == ["a", "b"]
+
+    async def test_errors_propagate_to_all_waiters(self, coalescer):
+        """Test a failing leader fails every coalesced caller"""
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise ValueError("generation failed")
+
+        results = await asyncio.gather(
+            *[coalescer.run("/poster", {"x": 1}, failing) for _ in range(3)],
+            return_exceptions=True
+        )
+        assert all(isinstance(r, ValueError) for r in results)
+
+    async def test_cancelled_leader_does_not_cancel_followers(self, coalescer, slow_work):
+        """Test the shared execution survives the leader's cancellation"""
+        leader = asyncio.ensure_future(coalescer.run("/poster", {"x": 1}, slow_work("a")))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(coalescer.run("/poster", {"x": 1}, slow_work("b")))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert (await follower)["value"] == "a"
+        assert slow_work.calls == ["a"]
+
+    async def test_api_routes_do_not_coalesce_across_organizations(self, slow_work):
+        """Test the app's generation routes keep tenants' results apart"""
+        from src.api.main import coalescer
+
+        for route in ("/api/v1/post-production/voice", "/api/v1/marketing/poster"):
+            first, second = await asyncio.gather(
+                coalescer.run(route, {"text": "hi"}, slow_work(f"{route}:a"), tenant="org1"),
+                coalescer.run(route, {"text": "hi"}, slow_work(f"{route}:b"), tenant="org2"),
+            )
+            assert first["value"] != second["value"]
+        assert len(slow_work.calls) == 4
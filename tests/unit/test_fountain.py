@@ -0,0 +1,174 @@
+"""
+Unit Tests for the Fountain Parser and Writer
+Tests tokenization, incremental Scene/Dialogue parsing and streaming export
+"""
+import io
+import pytest
+
+SCREENPLAY = """Title: Big Fish
+Credit: written by
+Author: John August
+Draft date: 1/1/2000
+
+FADE IN:
+
+INT. OFFICE - DAY #1#
+
+A cluttered desk. /* cut
+this */ Papers [[a note]] everywhere.
+Still action.
+
+ALEX (V.O.)
+(quietly)
+Hello, world.
+
+Second paragraph.
+
+BOB ^
+Hi.
+
+CUT TO:
+
+EXT. BEACH - NIGHT
+
+> THE END <
+
+.FLASHBACK
+
+# Act Two
+= The twist
+
+===
+
+!SHOUTING
+""".replace("Hello, world.\n\n", "Hello, world.\n  \n")  # Two-space line continues dialogue
+
+
+def chunks(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.unit
+class TestFountainTokenizer:
+    """Test suite for the Fountain tokenizer"""
+
+    def test_elements(self):
+        """Test every element kind is recognized"""
+        from src.utils import fountain
+
+        elements = list(fountain.tokenize(SCREENPLAY))
+        kinds = [e.kind for e in elements]
+
+        assert kinds[:4] == [fountain.TITLE] * 4
+        assert elements[0] == fountain.Element(fountain.TITLE, "Big Fish", "Title")
+        assert fountain.Element(fountain.ACTION, "FADE IN:") in elements  # Only "TO:" implies a transition
+        assert fountain.Element(fountain.SCENE_HEADING, "INT. OFFICE - DAY", "1") in elements
+        assert fountain.Element(fountain.ACTION, "A cluttered desk.  Papers  everywhere.\nStill action.") in elements
+        assert fountain.Element(fountain.CHARACTER, "ALEX", "V.O.") in elements
+        assert fountain.Element(fountain.PARENTHETICAL, "(quietly)") in elements
+        assert fountain.Element(fountain.DIALOGUE, "Hello, world.\n\nSecond paragraph.") in elements
+        assert fountain.Element(fountain.CHARACTER, "BOB", None, True) in elements
+        assert fountain.Element(fountain.CENTERED, "THE END") in elements
+        assert fountain.Element(fountain.SCENE_HEADING, "FLASHBACK") in elements
+        assert fountain.Element(fountain.SECTION, "Act Two", 1) in elements
+        assert fountain.Element(fountain.SYNOPSIS, "The twist") in elements
+        assert fountain.PAGE_BREAK in kinds
+        assert elements[-1] == fountain.Element(fountain.ACTION, "SHOUTING")
+
+    @pytest.mark.parametrize("size", [1, 3, 64])
+    def test_chunked_bytes_and_file_objects(self, size):
+        """Test chunk boundaries, CRLF endings and multi-byte characters"""
+        from src.utils import fountain
+
+        text = SCREENPLAY.replace("Hi.", "Ça va? 🎬")
+        expected = list(fountain.tokenize(text))
+        data = text.replace("\n", "\r\n").encode("utf-8")
+
+        assert list(fountain.tokenize(chunks(data, size))) == expected
+        assert list(fountain.tokenize(io.BytesIO(data))) == expected
+        assert list(fountain.tokenize(io.StringIO(text))) == expected
+
+    def test_uppercase_action_is_not_character(self):
+        """Test an all-caps line followed by a blank line stays action"""
+        from src.utils import fountain
+
+        elements = list(fountain.tokenize("INT. HALL - DAY\n\nBOOM!\n\nThe door flies open.\n"))
+        assert [e.kind for e in elements] == [fountain.SCENE_HEADING, fountain.ACTION, fountain.ACTION]
+
+    def test_render_round_trip(self):
+        """Test rendered output tokenizes back to the same elements"""
+        from src.utils import fountain
+
+        elements = list(fountain.tokenize(SCREENPLAY))
+        rendered = "".join(fountain.render(elements))
+
+        assert list(fountain.tokenize(rendered)) == elements
+
+    def test_multiline_action_continuations_round_trip(self):
+        """Test continuation lines that look like other elements are forced"""
+        from src.utils import fountain
+
+        text = "She walks in.\n# not a section\n= not synopsis\n!bang\n> not a transition <"
+        elements = [fountain.Element(fountain.ACTION, text)]
+        rendered = "".join(fountain.render(elements))
+
+        assert list(fountain.tokenize(rendered)) == elements
+        assert "".join(fountain.render([fountain.Element(fountain.ACTION, "One.\nTwo.")])) == "One.\nTwo.\n"
+
+
+@pytest.mark.unit
+class TestWritingEngineFountain:
+    """Test suite for WritingEngine Fountain import/export"""
+
+    @pytest.fixture
+    def writing_engine(self):
+        from src.engines.writing_engine import WritingEngine
+        return WritingEngine()
+
+    def test_iter_fountain_is_incremental(self, writing_engine):
+        """Test dialogues are yielded before their scene completes"""
+        from src.engines.writing_engine import Dialogue, Scene
+
+        items = list(writing_engine.iter_fountain(SCREENPLAY))
+        assert [type(i) for i in items] == [Dialogue, Dialogue, Scene, Scene, Scene]
+
+        office = items[2]
+        assert items[0].scene_id == office.scene_id
+        assert items[0].parenthetical == "(quietly)" and items[0].extension == "V.O."
+        assert office.characters == ["ALEX", "BOB"]
+        assert office.time_of_day == "DAY"
+        assert office.metadata["transition"] == "CUT TO:"
+
+    def test_import_and_export_round_trip(self, writing_engine):
+        """Test import keeps action, dialogue and title page through export"""
+        from src.engines.writing_engine import SceneType
+
+        script = writing_engine.import_from_fountain(io.BytesIO(SCREENPLAY.encode()))
+        assert script.title == "Big Fish"
+        assert script.metadata["title_page"]["Author"] == "John August"
+        assert script.scenes[1].scene_type == SceneType.EXT
+        assert "Still action." in script.scenes[0].description
+
+        out = io.StringIO()
+        written = writing_engine.write_fountain(script, out)
+        assert written == len(out.getvalue())
+        assert out.getvalue() == writing_engine.export_to_fountain(script)
+
+        again = writing_engine.import_from_fountain(out.getvalue())
+        assert [s.model_dump(exclude={"scene_id", "dialogues"}) for s in again.scenes] == \
+            [s.model_dump(exclude={"scene_id", "dialogues"}) for s in script.scenes]
+        assert [(d.character_id, d.text) for d in again.scenes[0].dialogues] == \
+            [(d.character_id, d.text) for d in script.scenes[0].dialogues]
+
+    def test_export_resolves_character_names(self, writing_engine):
+        """Test character IDs are mapped to names in the export"""
+        from src.engines.writing_engine import Dialogue, Scene, SceneType, Script, ScriptType
+
+        scene = Scene(scene_number=1, scene_type=SceneType.INT, location="LAB", description="Quiet.")
+        scene.dialogues.append(Dialogue(
+            character_id="char-1", text="Hello.", scene_id=scene.scene_id, line_number=1
+        ))
+        script = Script(title="Names", script_type=ScriptType.FILM, scenes=[scene])
+
+        text = "".join(writing_engine.iter_fountain_export(script, {"char-1": "Mara"}))
+        assert "\nMARA\nHello.\n" in text
@@ -0,0 +1,143 @@
+"""
+Unit Tests for Identity Embeddings
+Tests the embedding store, consistency scores and near-duplicate search
+"""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+
+@pytest.mark.unit
+class TestIdentityEmbeddings:
+    """Test suite for identity-consistency embeddings"""
+
+    @pytest.fixture
+    def engine(self):
+        from src.engines.character_engine import CharacterEngine
+        return CharacterEngine()
+
+    async def add_versions(self, engine, character, looks):
+        from src.engines.character_engine import CharacterVersionType
+
+        return [
+            await engine.add_character_version(
+                character.character_id, CharacterVersionType.CONCEPT, f"s3://b/{i}.jpg", f"{i}.jpg",
+                pose=look, lighting="soft key light", wardrobe="red leather jacket"
+            )
+            for i, look in enumerate(looks)
+        ]
+
+    def test_store_query_and_persistence(self, tmp_path):
+        """Test cosine queries, row reuse, growth and memory-mapped reopen"""
+        from src.engines.identity_embeddings import IdentityEmbeddingStore
+
+        rng = np.random.default_rng(0)
+        path = str(tmp_path / "identity.npy")
+        store = IdentityEmbeddingStore(dim=16, path=path, capacity=4)
+        vectors = rng.normal(size=(10, 16)).astype(np.float32)
+        for i, vector in enumerate(vectors):
+            store.add(f"c{i % 2}", f"v{i}", vector)
+
+        hits = store.query(vectors[3] + 0.01, k=3)
+        assert hits[0][:2] == ("c1", "v3") and hits[0][2] == pytest.approx(1.0, abs=1e-3)
+        assert all(c == "c0" for c, _, _ in store.query(vectors[3], k=5, character_id="c0"))
+
+        store.remove("v4")
+        store.add("c0", "v10", vectors[4])
+        assert store.rows["v10"] == 4 and len(store) == 10
+        store.flush()
+
+        reopened = IdentityEmbeddingStore(dim=16, path=path)
+        assert isinstance(reopened.matrix, np.memmap)
+        assert len(reopened) == 10 and reopened.query(vectors[7], k=1)[0][1] == "v7"
+
+    async def test_consistency_scores(self, engine):
+        """Test versions and generations are scored against the identity"""
+        mara = engine.create_character(name="Mara")
+        versions = await self.add_versions(engine, mara, ["standing", "standing arms crossed", "standing"])
+        assert versions[0].visual.consistency_score is None
+        assert versions[2].visual.consistency_score > 0.8
+
+        odd = await self.add_versions(engine, mara, ["underwater diving suit helmet bubbles"])
+        assert odd[0].visual.consistency_score < versions[2].visual.consistency_score
+
+        scores = engine.score_character_versions(mara.character_id)
+        assert set(scores) == {v.version_id for v in mara.versions}
+        assert min(scores, key=scores.get) == odd[0].version_id
+        assert mara.versions[0].visual.consistency_score == scores[mara.versions[0].version_id]
+
+        engine.consistency_config.identity_threshold = 0.99
+        visual = await engine.generate_character_image(mara.character_id, "jumps off a cliff at sunset")
+        assert visual.consistency_score is not None and visual.metadata["identity_drift"]
+
+    async def test_batch_rescore_matches_individual(self, engine):
+        """Test the vectorized leave-one-out scores equal per-version references"""
+        characters = [engine.create_character(name=n) for n in ("A", "B")]
+        for character, looks in zip(characters, (["run", "run fast", "sit"], ["smile", "frown"])):
+            await self.add_versions(engine, character, looks)
+
+        index = engine.identity_index
+        scores = engine.score_character_versions()
+        for version_id, row in index.rows.items():
+            character_id = index.keys[row][0]
+            reference = index.reference(character_id, exclude=version_id)
+            assert scores[version_id] == pytest.approx(float(index.matrix[row] @ reference), abs=1e-5)
+
+    async def test_similar_and_duplicates(self, engine):
+        """Test similar-visual search, duplicates, clones and deletes"""
+        mara = engine.create_character(name="Mara")
+        versions = await self.add_versions(engine, mara, ["standing", "running", "standing"])
+        dev = engine.create_character(name="Dev")
+        await self.add_versions(engine, dev, ["standing"])
+
+        similar = engine.find_similar_visuals(mara.character_id, versions[0].version_id, k=2)
+        assert similar[0]["version_id"] == versions[2].version_id
+        assert all(s["character_id"] == mara.character_id for s in similar)
+        anywhere = engine.find_similar_visuals(mara.character_id, versions[0].version_id, k=3, across_characters=True)
+        assert dev.character_id in {s["character_id"] for s in anywhere}
+
+        pairs = engine.find_duplicate_visuals(mara.character_id, threshold=0.9)
+        assert {(a, b) for a, b, _ in pairs} <= {
+            (versions[0].version_id, versions[2].version_id), (versions[2].version_id, versions[0].version_id)
+        } and pairs
+
+        clone = await engine.clone_character(mara.character_id)
+        assert len(engine.identity_index.by_character[clone.character_id]) == 3
+        reference = engine.get_identity_conditioning(clone.character_id)["reference_embedding"]
+        assert reference == pytest.approx(engine.identity_index.reference(mara.character_id))
+        await engine.delete_character(mara.character_id)
+        assert mara.character_id not in engine.identity_index.by_character
+
+        # The clone keeps its identity once its source is gone
+        assert engine.get_identity_conditioning(clone.character_id)["reference_embedding"] == pytest.approx(reference)
+        similar = engine.find_similar_visuals(clone.character_id, clone.versions[0].version_id, k=1)
+        assert similar[0]["character_id"] == clone.character_id
+        assert similar[0]["version_id"] == clone.versions[2].version_id
+        added = await self.add_versions(engine, clone, ["standing"])
+        assert added[0].visual.consistency_score is not None
+
+    async def test_persisted_index_updated_before_first_use(self, engine, tmp_path, monkeypatch):
+        """Test clones and deletes reach a persisted index this process has not loaded yet"""
+        import io
+        from src.config import settings
+        from src.engines.character_engine import CharacterEngine
+        from src.engines.identity_embeddings import IdentityEmbeddingStore
+
+        monkeypatch.setattr(settings, "IDENTITY_INDEX_PATH", str(tmp_path / "identity.npy"))
+        mara = engine.create_character(name="Mara")
+        await self.add_versions(engine, mara, ["standing", "running"])
+        engine.flush()
+        assert len(IdentityEmbeddingStore(settings.IDENTITY_EMBEDDING_DIM, settings.IDENTITY_INDEX_PATH)) == 2
+        snapshot = io.BytesIO()
+        engine.dump_snapshot(snapshot)
+
+        restarted = CharacterEngine()
+        restarted.restore_snapshot(io.BytesIO(snapshot.getvalue()))
+        clone = await restarted.clone_character(mara.character_id)
+        await restarted.delete_character(mara.character_id)
+        restarted.flush()
+
+        reopened = IdentityEmbeddingStore(settings.IDENTITY_EMBEDDING_DIM, settings.IDENTITY_INDEX_PATH)
+        assert mara.character_id not in reopened.by_character
+        assert {reopened.keys[row][1] for row in reopened.by_character[clone.character_id]} == \
+            {v.version_id for v in clone.versions}
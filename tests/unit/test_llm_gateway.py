@@ -0,0 +1,151 @@
+"""
+Unit Tests for LLM Gateway
+Tests caching, concurrency limits, retries and batching against a local fake LLM server
+"""
+import asyncio
+import pytest
+import httpx
+
+from tests.fake_llm_server import FakeLLMServer
+
+
+@pytest.mark.unit
+class TestLLMGateway:
+    """Test suite for the async LLM gateway"""
+
+    @pytest.fixture
+    def registry(self):
+        from src.utils.metrics import MetricsRegistry
+        return MetricsRegistry()
+
+    @pytest.fixture
+    def sleeps(self):
+        return []
+
+    def make_gateway(self, server, registry, sleeps, cache=None, **provider_kwargs):
+        from src.services.llm_gateway import LLMGateway, OpenAICompatibleProvider
+
+        async def fake_sleep(delay):
+            sleeps.append(delay)
+
+        provider = OpenAICompatibleProvider(
+            "http://fake-llm", transport=httpx.ASGITransport(app=server.app), **provider_kwargs
+        )
+        return LLMGateway({"default": provider}, cache=cache, sleep=fake_sleep, registry=registry)
+
+    def test_cache_key_normalizes_prompt(self):
+        """Test whitespace-only differences share a key but params do not"""
+        from src.services.llm_gateway import LLMRequest, cache_key
+
+        a = LLMRequest(prompt="Write  a\nline", params={"temperature": 0.2, "max_tokens": 10})
+        b = LLMRequest(prompt=" Write a line ", params={"max_tokens": 10, "temperature": 0.2})
+        c = LLMRequest(prompt="Write a line", params={"temperature": 0.9, "max_tokens": 10})
+        assert cache_key(a) == cache_key(b) != cache_key(c)
+        assert cache_key(a) != cache_key(a.model_copy(update={"model": "other"}))
+
+    def test_response_cache_lru_and_persistence(self, tmp_path):
+        """Test the size cap evicts least recently used entries and survives reopening"""
+        from src.services.llm_gateway import ResponseCache
+
+        path = str(tmp_path / "llm.sqlite3")
+        cache = ResponseCache(path, max_bytes=30)
+        cache.put("a", "x" * 10)
+        cache.put("b", "y" * 10)
+        cache.get("a")
+        cache.put("c", "z" * 15)
+        assert cache.get("b") is None and cache.get("a") == "x" * 10
+        assert cache.total_bytes == 25
+        cache.close()
+
+        reopened = ResponseCache(path, max_bytes=30)
+        assert len(reopened) == 2 and reopened.total_bytes == 25
+        assert reopened.get("c") == "z" * 15
+
+    async def test_cached_and_coalesced(self, registry, sleeps):
+        """Test repeats hit the cache and concurrent duplicates share one call"""
+        from src.services.llm_gateway import ResponseCache
+
+        server = FakeLLMServer(latency=0.01)
+        gateway = self.make_gateway(server, registry, sleeps, cache=ResponseCache())
+
+        first, second = await asyncio.gather(
+            gateway.complete("Hello", temperature=0), gateway.complete("Hello", temperature=0)
+        )
+        assert first.content == second.content == "echo: Hello"
+        again = await gateway.complete("  Hello ", temperature=0)
+        assert again.cached and len(server.calls) == 1
+        assert registry.counter("llm_requests_total", "", ("provider", "outcome")) \
+            .labels("default", "cache_hit").value == 1
+
+    async def test_concurrency_is_bounded(self, registry, sleeps):
+        """Test in-flight provider calls never exceed max_concurrency"""
+        from src.services.llm_gateway import LLMRequest
+
+        server = FakeLLMServer(latency=0.02)
+        gateway = self.make_gateway(server, registry, sleeps, max_concurrency=3)
+        responses = await gateway.complete_many([LLMRequest(prompt=f"p{i}") for i in range(12)])
+
+        assert [r.content for r in responses] == [f"echo: p{i}" for i in range(12)]
+        assert server.peak_concurrency == 3
+
+    async def test_retries_with_jittered_backoff(self, registry, sleeps):
+        """Test transient failures retry, honour Retry-After and give up after max_retries"""
+        from src.services.llm_gateway import LLMRetryableError, LLMError
+
+        server = FakeLLMServer(failures=[503, 429], retry_after=2)
+        gateway = self.make_gateway(server, registry, sleeps)
+        response = await gateway.complete("Retry me")
+
+        assert response.content == "echo: Retry me" and response.attempts == 3
+        assert 0 <= sleeps[0] <= gateway.base_delay and sleeps[1] == 2.0
+
+        server.failures = [500] * 4
+        with pytest.raises(LLMRetryableError):
+            await gateway.complete("Always failing")
+        assert len(sleeps) == 2 + gateway.max_retries
+
+        server.failures = [400]
+        with pytest.raises(LLMError):
+            await gateway.complete("Bad request")
+
+    async def test_batches_compatible_requests(self, registry, sleeps):
+        """Test batching groups requests by model and params and splits at max_batch_size"""
+        from src.services.llm_gateway import LLMRequest
+
+        server = FakeLLMServer()
+        gateway = self.make_gateway(server, registry, sleeps, max_batch_size=4)
+        requests = [LLMRequest(prompt=f"p{i}", system="Be brief") for i in range(6)]
+        requests.append(LLMRequest(prompt="hot", params={"temperature": 1.0}))
+        responses = await gateway.complete_many(requests)
+
+        assert [r.content for r in responses] == [f"echo: p{i}" for i in range(6)] + ["echo: hot"]
+        batches = [c for c in server.calls if c["path"] == "completions"]
+        assert sorted(len(c["prompt"]) for c in batches) == [2, 4]
+        assert len(server.calls) == 3  # The lone request goes through chat completions
+
+    async def test_writing_engine_scene_dialogues(self, registry, sleeps):
+        """Test WritingEngine writes lines for every character in every scene"""
+        from src.engines.writing_engine import WritingEngine, SceneType
+
+        server = FakeLLMServer(latency=0.01)
+        engine = WritingEngine(llm_gateway=self.make_gateway(server, registry, sleeps, max_concurrency=4))
+        script = engine.generate_script("Two friends", title="Gateway")
+        for n in range(1, 6):
+            scene = await engine.add_scene(script.script_id, n, SceneType.INT, f"Room {n}", "Talk.")
+            scene.characters = ["MARA", "DEV"]
+
+        lines = await engine.generate_scene_dialogues(script.script_id, temperature=0.7)
+        assert len(lines) == 10 and server.peak_concurrency <= 4
+        assert [d.character_id for d in script.scenes[2].dialogues] == ["MARA", "DEV"]
+        assert script.scenes[2].dialogues[1].text.endswith("Write DEV's next line.")
+        assert all(c["temperature"] == 0.7 for c in server.calls)
+
+    async def test_default_gateway_wraps_engine_client(self):
+        """Test the engine falls back to its OpenAI-style client"""
+        from src.engines.writing_engine import WritingEngine, SceneType
+
+        engine = WritingEngine()
+        script = engine.generate_script("Quiet", title="Fallback")
+        await engine.add_scene(script.script_id, 1, SceneType.EXT, "Pier", "Waves.")
+        lines = await engine.generate_scene_dialogues(script.script_id, character_ids=["MARA"])
+        assert lines[0].text == "Generated content"
@@ -0,0 +1,94 @@
+"""
+Unit Tests for In-Process Metrics
+Tests histograms, registry exposition, the timing decorator and middleware
+"""
+import pytest
+
+
+@pytest.mark.unit
+class TestMetrics:
+    """Test suite for metrics collection"""
+
+    @pytest.fixture
+    def registry(self):
+        """Fresh registry isolated from the process-wide one"""
+        from src.utils.metrics import MetricsRegistry
+        return MetricsRegistry()
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test observations land in the right buckets"""
+        from src.utils.metrics import Histogram
+
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 5.0):
+            histogram.observe(value)
+
+        assert list(histogram.cumulative()) == [("0.1", 2), ("1", 3), ("+Inf", 4)]
+        assert histogram.count == 4
+        assert histogram.sum == pytest.approx(5.65)
+
+    def test_series_cap_collapses_into_overflow(self, registry):
+        """Test label cardinality is bounded"""
+        from src.utils.metrics import OVERFLOW_LABEL
+
+        family = registry.counter("hits_total", "Hits", ("route",), max_series=2)
+        for route in ("a", "b", "c", "d"):
+            family.labels(route).inc()
+
+        assert len(family.series) == 3
+        assert family.series[(OVERFLOW_LABEL,)].value == 2
+
+    def test_render_prometheus_text(self, registry):
+        """Test the exposition format"""
+        family = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(1.0,))
+        family.labels('/a"b').observe(0.5)
+
+        text = registry.render()
+        assert "# TYPE latency_seconds histogram" in text
+        assert 'latency_seconds_bucket{route="/a\\"b",le="1"} 1' in text
+        assert 'latency_seconds_bucket{route="/a\\"b",le="+Inf"} 1' in text
+        assert 'latency_seconds_count{route="/a\\"b"} 1' in text
+
+    async def test_timed_decorator(self):
+        """Test sync and async functions are timed and errors counted"""
+        from src.utils.metrics import timed, FUNCTION_DURATION, FUNCTION_ERRORS
+
+        @timed("test.sync_call")
+        def sync_call(x):
+            return x * 2
+
+        @timed("test.async_call")
+        async def async_call():
+            raise RuntimeError("boom")
+
+        assert sync_call(2) == 4
+        with pytest.raises(RuntimeError):
+            await async_call()
+
+        assert FUNCTION_DURATION.labels("test.sync_call").count >= 1
+        assert FUNCTION_ERRORS.labels("test.async_call").value >= 1
+
+    def test_middleware_labels_by_route_template(self, registry):
+        """Test per-route metrics use templates, not raw paths"""
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from src.api.metrics import MetricsMiddleware, UNMATCHED_ROUTE
+
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware, registry=registry)
+
+        @app.get("/items/{item_id}")
+        async def get_item(item_id: str):
+            return {"item_id": item_id}
+
+        client = TestClient(app)
+        client.get("/items/1")
+        client.get("/items/2")
+        client.get("/nope")
+
+        duration = registry.families["http_request_duration_seconds"]
+        requests = registry.families["http_requests_total"]
+        assert duration.series[("GET", "/items/{item_id}")].count == 2
+        assert requests.series[("GET", "/items/{item_id}", "200")].value == 2
+        assert requests.series[("GET", UNMATCHED_ROUTE, "404")].value == 1
+        assert registry.families["http_requests_in_flight"].series[()].value == 0
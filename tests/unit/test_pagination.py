@@ -0,0 +1,177 @@
+"""
+Unit Tests for Cursor Pagination
+Tests the cursor index and the paginated list methods of the engines
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+
+def collect_pages(fetch, limit):
+    """Follow cursors until the last page, returning all items"""
+    items, cursor = [], None
+    while True:
+        page = fetch(cursor, limit)
+        items.extend(page[0])
+        cursor = page[1]
+        if cursor is None:
+            return items
+
+
+@pytest.mark.unit
+class TestCursorIndex:
+    """Test suite for CursorIndex"""
+
+    @pytest.fixture
+    def index(self):
+        from src.utils.pagination import CursorIndex
+        index = CursorIndex(("project_id", "status"))
+        for i in range(10):
+            index.add(f"e{i}", {"project_id": f"p{i % 2}", "status": "draft"})
+        return index
+
+    def test_pages_are_stable_and_complete(self, index):
+        """Test following cursors visits every match once, in insertion order"""
+        ids = collect_pages(lambda c, n: index.page({"project_id": "p0"}, c, n), 2)
+        assert ids == ["e0", "e2", "e4", "e6", "e8"]
+
+        first, cursor = index.page({}, None, 3)
+        assert first == ["e0", "e1", "e2"]
+        index.add("e10", {"project_id": "p0", "status": "draft"})
+        index.remove("e3")
+        rest = collect_pages(lambda c, n: index.page({}, c or cursor, n), 3)
+        assert rest == ["e4", "e5", "e6", "e7", "e8", "e9", "e10"]
+
+    def test_update_moves_buckets_and_keeps_position(self, index):
+        """Test updates re-bucket entities without changing their order"""
+        index.update("e4", {"project_id": "p0", "status": "approved"})
+        index.update("e0", {"project_id": "p0", "status": "approved"})
+
+        assert index.page({"status": "approved"})[0] == ["e0", "e4"]
+        assert index.count(project_id="p0", status="draft") == 3
+        assert index.count(project_id="p0") == 5
+
+    def test_add_many_matches_add(self):
+        """Test bulk loading out-of-order sort values gives the same buckets as one-by-one adds"""
+        from src.utils.pagination import CursorIndex
+
+        entries = [(f"e{i}", {"project_id": f"p{i % 3}", "status": "draft", "updated": (i * 3) % 10})
+                   for i in range(10)]
+        one_by_one = CursorIndex(("project_id", "status"), sort_field="updated")
+        for entity_id, attrs in entries:
+            one_by_one.add(entity_id, attrs)
+        bulk = CursorIndex(("project_id", "status"), sort_field="updated")
+        assert bulk.add_many(entries) == 10
+
+        assert bulk.buckets == one_by_one.buckets
+        assert bulk.page({"project_id": "p1"}, None, 10)[0] == ["e7", "e4", "e1"]
+
+    def test_invalid_cursor_and_unknown_filter(self, index):
+        """Test bad input raises ValueError"""
+        with pytest.raises(ValueError):
+            index.page({}, "not-a-cursor")
+        with pytest.raises(ValueError):
+            index.page({"genre": "drama"})
+
+
+@pytest.mark.unit
+class TestEnginePagination:
+    """Test suite for paginated engine list methods"""
+
+    async def test_characters_page_with_filters(self):
+        """Test character pages honour filters, saves and deletes"""
+        from src.engines.character_engine import CharacterEngine, CharacterMode
+
+        engine = CharacterEngine()
+        created = [
+            engine.create_character(name=f"C{i}", project_id="proj", mode=CharacterMode.AVATAR)
+            for i in range(5)
+        ]
+        engine.create_character(name="Other", project_id="other")
+
+        first = await engine.list_characters_page(project_id="proj", limit=2)
+        assert [c.identity.name for c in first.items] == ["C0", "C1"]
+        second = await engine.list_characters_page(project_id="proj", cursor=first.next_cursor, limit=2)
+        assert [c.identity.name for c in second.items] == ["C2", "C3"]
+
+        created[2].mode = CharacterMode.BRAND
+        engine.save(created[2])
+        await engine.delete_character(created[3].character_id)
+
+        avatars = await engine.list_characters(project_id="proj", mode=CharacterMode.AVATAR)
+        assert [c.identity.name for c in avatars] == ["C0", "C1", "C4"]
+        brand = await engine.list_characters_page(mode="brand")
+        assert brand.items == [created[2]] and brand.next_cursor is None
+
+    async def test_project_assets_page_follows_status_changes(self):
+        """Test asset status transitions are reflected in filtered pages"""
+        from src.engines.production_management import (
+            ProductionManager, AssetType, AssetStatus
+        )
+
+        manager = ProductionManager()
+        project = manager.create_project(name="Film", created_by="u1")
+        assets = [
+            await manager.add_asset(project.project_id, AssetType.SCRIPT, f"A{i}", "u1")
+            for i in range(4)
+        ]
+        await manager.lock_asset(assets[1].asset_id, "u1")
+
+        locked = await manager.get_project_assets_page(project.project_id, status=AssetStatus.LOCKED)
+        assert locked.items == [assets[1]]
+        drafts = await manager.get_project_assets(project.project_id, status=AssetStatus.DRAFT)
+        assert [a.name for a in drafts] == ["A0", "A2", "A3"]
+
+    async def test_marketing_and_shot_pages(self):
+        """Test marketing asset and scene shot pages"""
+        from src.engines.marketing_engine import MarketingEngine
+        from src.engines.production_layer import ProductionLayer
+
+        marketing = MarketingEngine()
+        for i in range(3):
+            await marketing.generate_poster("proj", style=f"style-{i}")
+        page = await marketing.get_marketing_assets_page("proj", limit=2)
+        assert len(page.items) == 2 and page.next_cursor
+        rest = await marketing.get_marketing_assets_page("proj", cursor=page.next_cursor, limit=2)
+        assert len(rest.items) == 1 and rest.next_cursor is None
+
+        layer = ProductionLayer()
+        shots = [layer.upload_real_footage(scene_id="s1") for _ in range(3)]
+        layer.upload_real_footage(scene_id="s2")
+        page = await layer.get_scene_shots_page("s1", limit=5)
+        assert page.items == shots
+
+
+@pytest.mark.unit
+class TestListEndpoints:
+    """Test suite for paginated list endpoints"""
+
+    def test_list_characters_paginates(self):
+        """Test the characters listing returns cursors and follows the middleware's auth setting"""
+        from src.api.main import app, character_engine, enterprise_platform
+
+        client = TestClient(app)
+        assert client.get("/api/v1/characters").status_code == 200  # API_AUTH_REQUIRED is off
+
+        org = enterprise_platform.create_organization(name="Lister")
+        key = enterprise_platform.create_api_key(organization_id=org.organization_id, name="ls")
+        headers = {"X-API-Key": key.key}
+        for i in range(3):
+            character_engine.create_character(name=f"Paged {i}", project_id="paged-project")
+
+        first = client.get(
+            "/api/v1/characters",
+            params={"project_id": "paged-project", "limit": 2},
+            headers=headers
+        ).json()
+        assert len(first["items"]) == 2 and first["next_cursor"]
+
+        second = client.get(
+            "/api/v1/characters",
+            params={"project_id": "paged-project", "limit": 2, "cursor": first["next_cursor"]},
+            headers=headers
+        ).json()
+        assert [c["identity"]["name"] for c in second["items"]] == ["Paged 2"]
+        assert second["next_cursor"] is None
+
+        bad = client.get("/api/v1/characters", params={"cursor": "!!"}, headers=headers)
+        assert bad.status_code == 400
@@ -0,0 +1,115 @@
+"""
+Unit Tests for Script Analytics
+Tests per-scene metric caching and incremental script aggregates
+"""
+import pytest
+
+
+@pytest.mark.unit
+class TestScriptAnalytics:
+    """Test suite for incrementally maintained script metrics"""
+
+    @pytest.fixture
+    def writing_engine(self):
+        from src.engines.writing_engine import WritingEngine
+        return WritingEngine()
+
+    @pytest.fixture
+    def script(self, writing_engine):
+        from src.engines.writing_engine import Dialogue, Scene, SceneType, Script, ScriptType
+
+        scenes = []
+        for n in range(1, 301):
+            scene = Scene(scene_number=n, scene_type=SceneType.INT, location=f"ROOM {n}", description="Two words")
+            scene.dialogues = [
+                Dialogue(character_id="MARA" if i % 2 else "DEV", text="one two three four five",
+                         scene_id=scene.scene_id, line_number=i)
+                for i in range(1, 5)
+            ]
+            scenes.append(scene)
+        script = Script(title="Analytics", script_type=ScriptType.FILM, scenes=scenes)
+        writing_engine.scripts[script.script_id] = script
+        return script
+
+    def test_aggregates(self, writing_engine, script):
+        """Test script totals roll up per-scene metrics"""
+        summary = writing_engine.get_script_analytics(script.script_id)
+        assert summary["scene_count"] == 300 and summary["dialogue_count"] == 1200
+        assert summary["word_count"] == 300 * (20 + 2)
+        assert summary["estimated_duration"] == 300 * 8.0
+        assert summary["lines_by_character"] == {"MARA": 600, "DEV": 600}
+        assert summary["scenes_analyzed"] == 300
+
+    async def test_edit_reanalyzes_only_changed_scene(self, writing_engine, script):
+        """Test a one-line edit touches only its scene"""
+        writing_engine.get_script_analytics(script.script_id)
+        scene = script.scenes[150]
+        await writing_engine.update_dialogue(
+            script.script_id, scene.scene_id, scene.dialogues[0].dialogue_id, text="short"
+        )
+
+        summary = writing_engine.get_script_analytics(script.script_id)
+        assert summary["scenes_analyzed"] == 1
+        assert summary["word_count"] == 300 * 22 - 4
+        assert writing_engine.get_script_analytics(script.script_id)["scenes_analyzed"] == 0
+
+    async def test_structural_changes_detected(self, writing_engine, script):
+        """Test added, removed and reordered scenes update totals without touch()"""
+        from src.engines.writing_engine import SceneType
+
+        writing_engine.get_script_analytics(script.script_id)
+        removed = script.scenes.pop(10)
+        await writing_engine.add_scene(script.script_id, 301, SceneType.EXT, "", "")
+        await writing_engine.add_dialogue(script.script_id, script.scenes[0].scene_id, "BOB", "Hi there")
+        script.scenes[1], script.scenes[2] = script.scenes[2], script.scenes[1]
+
+        analytics = writing_engine.analytics[script.script_id]
+        summary = writing_engine.get_script_analytics(script.script_id)
+        assert summary["scenes_analyzed"] == 2
+        assert summary["scene_count"] == 300 and removed.scene_id not in analytics.metrics
+        assert summary["dialogue_count"] == 1200 - 4 + 1
+        assert summary["lines_by_character"]["BOB"] == 1
+        assert summary["scenes_out_of_order"] == 1
+        assert analytics.warnings() == ["Scene 300 has no description", "Scene 300 has no location"]
+
+    async def test_engine_methods_use_cache(self, writing_engine, script):
+        """Test duration, scene analysis and validation read cached metrics"""
+        scene = script.scenes[0]
+        assert writing_engine.calculate_duration(scene) == 8.0
+        await writing_engine.update_scene(script.script_id, scene.scene_id, description="", duration_estimate=40.0)
+
+        assert writing_engine.calculate_duration(scene) == 40.0
+        assert writing_engine.analytics[script.script_id].analyzed == 1
+        analysis = writing_engine.analyze_scene(scene)
+        assert analysis["word_count"] == 20 and analysis["warnings"] == ["Scene has no description"]
+        assert writing_engine.validate_structure(script)["warnings"] == ["Scene 1 has no description"]
+        assert await writing_engine.suggest_improvements(script) == []
+
+        with pytest.raises(ValueError):
+            await writing_engine.update_scene(script.script_id, scene.scene_id, dialogues=[])
+
+    def test_unregistered_scene_is_analyzed_directly(self, writing_engine):
+        """Test scenes outside any script still get a duration"""
+        from src.engines.writing_engine import Scene, SceneType
+
+        scene = Scene(scene_number=1, scene_type=SceneType.EXT, location="Pier", description="")
+        assert writing_engine.calculate_duration(scene) == 5.0
+
+    async def test_scene_lookup_touches_only_its_script(self, writing_engine, script, monkeypatch):
+        """Test scene metrics resolve the owning script directly rather than scanning every script"""
+        from src.engines.writing_engine import SceneType
+
+        others = [writing_engine.generate_script("Filler", title=f"Other {i}") for i in range(50)]
+        for other in others:
+            await writing_engine.add_scene(other.script_id, 1, SceneType.INT, "HALL", "Filler")
+        version = await writing_engine.create_script_version(script.script_id)
+        writing_engine.calculate_duration(script.scenes[0])
+
+        looked_up = []
+        index = writing_engine._index
+        monkeypatch.setattr(writing_engine, "_index", lambda script_id: looked_up.append(script_id) or index(script_id))
+        assert writing_engine.calculate_duration(script.scenes[5]) == 8.0
+        assert writing_engine.calculate_duration(version.scenes[5]) == 8.0
+        assert writing_engine.analyze_scene(others[7].scenes[0])["dialogue_count"] == 0
+        assert set(looked_up) == {script.script_id, version.script_id, others[7].script_id}
+        assert writing_engine.analytics[version.script_id].analyzed == 300
@@ -0,0 +1,110 @@
+"""
+Unit Tests for Script Context
+Tests token estimates, scene windows, cached sequence summaries and prefix reuse
+"""
+import pytest
+
+
+@pytest.mark.unit
+class TestScriptContext:
+    """Test suite for token-budgeted prompt assembly"""
+
+    @pytest.fixture
+    async def writing_engine(self):
+        from src.engines.writing_engine import WritingEngine, SceneType
+
+        engine = WritingEngine()
+        script = engine.generate_script("A heist that goes wrong", title="Long Night")
+        for n in range(1, 41):
+            scene = await engine.add_scene(
+                script.script_id, n, SceneType.INT, f"Vault {n}",
+                f"The crew works the lock in room {n}. Alarms stay quiet for now."
+            )
+            await engine.add_dialogue(script.script_id, scene.scene_id, "MARA", f"Keep moving, we have {n} minutes.")
+        engine.script_id = script.script_id
+        return engine
+
+    def test_estimate_tokens(self):
+        """Test the local estimate tracks words and punctuation"""
+        from src.engines.script_context import estimate_tokens
+
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("Hello, world!") == 4
+        assert estimate_tokens("extraordinarily") == 3
+        text = "They know we're here. They've known since the bridge, and they're coming."
+        assert len(text.split()) <= estimate_tokens(text) <= len(text) // 2
+
+    async def test_budget_window_and_summaries(self, writing_engine):
+        """Test recent scenes in full, earlier sequences summarized, all under budget"""
+        from src.engines.script_context import estimate_tokens
+
+        script = writing_engine.scripts[writing_engine.script_id]
+        focus = script.scenes[35].scene_id
+        ctx = await writing_engine.build_prompt_context(
+            writing_engine.script_id, focus, "Rewrite the scene.", budget=900
+        )
+
+        assert ctx.total_tokens <= 900
+        assert ctx.total_tokens == estimate_tokens(ctx.system) + estimate_tokens(ctx.prompt)
+        assert ctx.scene_ids[-1] == focus and 1 < len(ctx.scene_ids) < 36
+        assert ctx.scene_ids == [s.scene_id for s in script.scenes[36 - len(ctx.scene_ids):36]]
+        assert ctx.summarized_sequences > 0
+        assert ctx.prompt.index("STORY SO FAR") < ctx.prompt.index("RECENT SCENES") < ctx.prompt.index("CURRENT SCENE")
+        assert ctx.prompt.endswith("Rewrite the scene.")
+
+        with pytest.raises(ValueError):
+            await writing_engine.build_prompt_context(writing_engine.script_id, focus, "Rewrite.", budget=20)
+        with pytest.raises(ValueError):
+            await writing_engine.build_prompt_context(writing_engine.script_id, "missing", "Rewrite.")
+
+    async def test_summaries_cached_per_sequence(self, writing_engine):
+        """Test an edit re-summarizes only the sequence that contains it"""
+        calls = []
+
+        async def summarize(text):
+            calls.append(text)
+            return f"Summary {len(calls)}."
+
+        writing_engine.context.summarize = summarize
+        script = writing_engine.scripts[writing_engine.script_id]
+        focus = script.scenes[39].scene_id
+        first = await writing_engine.build_prompt_context(writing_engine.script_id, focus, "Go.", budget=700)
+        built = writing_engine.context.summaries_built
+        assert built == first.summarized_sequences > 0
+
+        await writing_engine.build_prompt_context(writing_engine.script_id, focus, "Go again.", budget=700)
+        assert writing_engine.context.summaries_built == built
+
+        await writing_engine.update_scene(writing_engine.script_id, script.scenes[2].scene_id, description="Boom.")
+        second = await writing_engine.build_prompt_context(writing_engine.script_id, focus, "Go.", budget=700)
+        assert writing_engine.context.summaries_built == built + 1
+        assert "Boom." in calls[-1]
+        assert second.prompt != first.prompt
+
+    async def test_sequences_follow_beats(self, writing_engine):
+        """Test beats define sequences when the script has them"""
+        from src.engines.writing_engine import Beat
+
+        script = writing_engine.scripts[writing_engine.script_id]
+        script.beats = [
+            Beat(title="Setup", description="", order=1, scene_ids=[s.scene_id for s in script.scenes[:5]]),
+            Beat(title="Break-in", description="", order=2, scene_ids=[s.scene_id for s in script.scenes[5:30]]),
+        ]
+        sizes = [len(sequence) for sequence in writing_engine.context.sequences(script)]
+        assert sizes == [5, 25, 10]
+
+    async def test_shared_prefix_is_stable(self, writing_engine):
+        """Test identical bible/style give a byte-identical system prefix"""
+        script = writing_engine.scripts[writing_engine.script_id]
+        script.metadata["style_guide"] = "Terse. Present tense."
+        bible = {"MARA": "Safecracker, 40s.", "DEV": "Driver, nervous."}
+
+        a = await writing_engine.build_prompt_context(
+            writing_engine.script_id, script.scenes[10].scene_id, "A", character_bible=bible
+        )
+        b = await writing_engine.build_prompt_context(
+            writing_engine.script_id, script.scenes[30].scene_id, "B", character_bible=dict(reversed(bible.items()))
+        )
+        assert a.system == b.system and a.prefix_key == b.prefix_key
+        assert a.system.index("STYLE GUIDE") < a.system.index("- DEV:") < a.system.index("- MARA:")
+        assert a.prompt != b.prompt
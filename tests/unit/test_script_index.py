@@ -0,0 +1,108 @@
+"""
+Unit Tests for Script Indexes
+Tests scene, character-line and location lookups maintained by WritingEngine
+"""
+import pytest
+
+
+@pytest.mark.unit
+class TestScriptIndex:
+    """Test suite for per-script indexes"""
+
+    @pytest.fixture
+    def writing_engine(self):
+        from src.engines.writing_engine import WritingEngine
+        return WritingEngine()
+
+    @pytest.fixture
+    async def script(self, writing_engine):
+        from src.engines.writing_engine import SceneType
+
+        script = writing_engine.generate_script("A heist in two rooms", title="Index")
+        for n, location in enumerate(["Vault", "Office", "VAULT ", "Roof"], start=1):
+            await writing_engine.add_scene(
+                script.script_id, n, SceneType.INT, location, f"Scene {n}"
+            )
+        return script
+
+    async def test_scene_and_location_queries(self, writing_engine, script):
+        """Test scene lookup by ID and location matching"""
+        second = script.scenes[1]
+        assert await writing_engine.get_scene(script.script_id, second.scene_id) is second
+
+        vaults = await writing_engine.get_scenes_at_location(script.script_id, "vault")
+        assert vaults == [script.scenes[0], script.scenes[2]]
+
+        with pytest.raises(ValueError):
+            await writing_engine.get_scene(script.script_id, "missing")
+
+    async def test_character_lines_in_script_order(self, writing_engine, script):
+        """Test lines come back in script order even when added out of order"""
+        first, _, third, _ = script.scenes
+        await writing_engine.add_dialogue(script.script_id, third.scene_id, "MARA", "Later")
+        await writing_engine.add_dialogue(script.script_id, first.scene_id, "MARA", "Earlier")
+        await writing_engine.add_dialogue(script.script_id, first.scene_id, "DEV", "Hm")
+        await writing_engine.add_dialogue(script.script_id, first.scene_id, "MARA", "Then")
+
+        lines = await writing_engine.get_character_lines(script.script_id, "MARA")
+        assert [d.text for d in lines] == ["Earlier", "Then", "Later"]
+        assert [d.line_number for d in first.dialogues] == [1, 2, 3]
+
+    async def test_line_numbers_survive_removal(self, writing_engine, script):
+        """Test line numbers keep increasing after a line is removed"""
+        scene = script.scenes[0]
+        await writing_engine.add_dialogue(script.script_id, scene.scene_id, "MARA", "One")
+        await writing_engine.add_dialogue(script.script_id, scene.scene_id, "MARA", "Two")
+        scene.dialogues.pop(0)
+
+        third = await writing_engine.add_dialogue(script.script_id, scene.scene_id, "MARA", "Three")
+        assert third.line_number == 3
+
+    def test_sync_generate_dialogue_records_line(self, writing_engine):
+        """Test the simple dialogue interface appends to the scene when given one"""
+        from src.engines.writing_engine import Scene, SceneType
+
+        script = writing_engine.generate_script("Short", title="Sync")
+        script.scenes.append(Scene(scene_number=1, scene_type=SceneType.EXT, location="Pier", description=""))
+
+        text = writing_engine.generate_dialogue(
+            character={"name": "Mara"}, emotion="happy",
+            script_id=script.script_id, scene_id=script.scenes[0].scene_id, character_id="char-1"
+        )
+        assert script.scenes[0].dialogues[0].text == text
+        assert writing_engine.indexes[script.script_id].character_lines("char-1")[0].text == text
+
+    async def test_index_rebuilds_after_direct_edits(self, writing_engine, script):
+        """Test scenes appended or scripts replaced outside the engine are picked up"""
+        from src.engines.writing_engine import Scene, SceneType
+
+        await writing_engine.get_scenes_at_location(script.script_id, "Roof")
+        extra = Scene(scene_number=5, scene_type=SceneType.EXT, location="Roof", description="")
+        script.scenes.append(extra)
+        assert extra in await writing_engine.get_scenes_at_location(script.script_id, "roof")
+
+        revision = writing_engine.commit_script(script.script_id)
+        restored = writing_engine.restore_script_version(script.script_id, revision.version_id)
+        found = await writing_engine.get_scene(script.script_id, extra.scene_id)
+        assert found is restored.scenes[-1]
+
+    async def test_storyboard_uses_scene_lookup(self, writing_engine, script):
+        """Test storyboards for one scene"""
+        frames = await writing_engine.generate_storyboard(script.script_id, script.scenes[3].scene_id)
+        assert [f.scene_id for f in frames] == [script.scenes[3].scene_id]
+        assert await writing_engine.generate_storyboard(script.script_id, "missing") == []
+
+    async def test_list_filters_use_indexes(self, writing_engine, script):
+        """Test location and character filters on the list methods"""
+        await writing_engine.add_dialogue(script.script_id, script.scenes[1].scene_id, "MARA", "A")
+        await writing_engine.add_dialogue(script.script_id, script.scenes[2].scene_id, "MARA", "B")
+        await writing_engine.add_dialogue(script.script_id, script.scenes[2].scene_id, "DEV", "C")
+
+        scenes = await writing_engine.list_scenes(script.script_id, location="vault", fields="location")
+        assert scenes["total"] == 2
+        lines = await writing_engine.list_dialogues(script.script_id, character_id="MARA", fields="text")
+        assert lines["items"] == [{"text": "A"}, {"text": "B"}]
+        lines = await writing_engine.list_dialogues(
+            script.script_id, scene_id=script.scenes[2].scene_id, character_id="MARA", fields="text"
+        )
+        assert lines["items"] == [{"text": "B"}] and lines["total"] == 1
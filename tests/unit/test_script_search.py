@@ -0,0 +1,131 @@
+"""
+Unit Tests for Script Search
+Tests BM25 ranking, facet filters, incremental updates and memory-mapped segments
+"""
+import pytest
+
+
+@pytest.mark.unit
+class TestSearchIndex:
+    """Test suite for the generic inverted index"""
+
+    @pytest.fixture
+    def index(self):
+        from src.utils.search_index import SearchIndex
+
+        index = SearchIndex()
+        index.add("a", "The vault door is open", {"genre": "heist"}, {"genre": "heist"})
+        index.add("b", "Open the vault. Open it now! Open!", {"genre": "heist"}, {"genre": "heist"})
+        index.add("c", "A quiet garden at dawn", {"genre": "drama"}, {"genre": "drama"})
+        return index
+
+    def test_tokenize(self):
+        """Test lowercasing, apostrophes and stopwords"""
+        from src.utils.search_index import tokenize
+
+        assert tokenize("Don't open THE vault, Mara!") == ["dont", "open", "vault", "mara"]
+
+    def test_bm25_ranking_and_filters(self, index):
+        """Test term frequency ranks higher and facet filters restrict matches"""
+        results = index.search("open vault")
+        assert [h.doc_id for h in results["hits"]] == ["b", "a"]
+        assert results["hits"][0].score > results["hits"][1].score > 0
+
+        assert index.search("open", filters={"genre": "drama"})["total"] == 0
+        assert index.search("", filters={"genre": ["drama", "heist"]}, facets=["genre"])["facets"] == \
+            {"genre": {"heist": 2, "drama": 1}}
+
+    def test_segment_round_trip(self, index, tmp_path):
+        """Test saved segments reload with identical scores and accept updates"""
+        path = str(tmp_path / "search.idx")
+        before = index.search("open vault")["hits"]
+        assert index.save(path) == 3
+
+        from src.utils.search_index import SearchIndex
+        loaded = SearchIndex(path)
+        assert loaded.search("open vault")["hits"] == before
+        assert loaded.stored("c") == {"genre": "drama"}
+
+        loaded.add("a", "A locked door", {"genre": "heist"})
+        loaded.remove("c")
+        assert [h.doc_id for h in loaded.search("open")["hits"]] == ["b"]
+        assert len(loaded) == 2 and "c" not in loaded
+        loaded.save(path)
+        assert SearchIndex(path).search("locked door")["hits"][0].doc_id == "a"
+
+
+@pytest.mark.unit
+class TestScriptSearch:
+    """Test suite for WritingEngine search"""
+
+    @pytest.fixture
+    def writing_engine(self):
+        from src.engines.writing_engine import WritingEngine
+        return WritingEngine()
+
+    @pytest.fixture
+    async def scripts(self, writing_engine):
+        from src.engines.writing_engine import SceneType, ScriptType
+
+        heist = writing_engine.generate_script("Crew robs a casino vault", title="Heist", genre="thriller")
+        scene = await writing_engine.add_scene(heist.script_id, 1, SceneType.INT, "Casino Vault", "Alarms blare.")
+        await writing_engine.add_dialogue(heist.script_id, scene.scene_id, "MARA", "Grab the diamonds and run")
+        await writing_engine.add_dialogue(heist.script_id, scene.scene_id, "DEV", "The vault is empty")
+
+        ad = writing_engine.generate_script("Coffee at dawn", title="Brew", script_type=ScriptType.AD)
+        scene = await writing_engine.add_scene(ad.script_id, 1, SceneType.EXT, "Garden", "Sunrise over the vault of sky.")
+        await writing_engine.add_dialogue(ad.script_id, scene.scene_id, "MARA", "Best coffee ever")
+        return heist, ad
+
+    async def test_search_lines_scenes_and_facets(self, writing_engine, scripts):
+        """Test hits across document kinds with facet filters and counts"""
+        heist, ad = scripts
+        results = writing_engine.search_scripts("vault", facets=["kind", "script_type"])
+        assert results["total"] == 4
+        assert results["facets"]["kind"] == {"scene": 2, "line": 1, "script": 1}
+        assert results["facets"]["script_type"] == {"film": 3, "ad": 1}
+
+        lines = writing_engine.search_scripts("diamonds", kind="line", character_id="MARA")
+        assert [h["text"] for h in lines["hits"]] == ["Grab the diamonds and run"]
+        assert lines["hits"][0]["script_id"] == heist.script_id
+        assert writing_engine.search_scripts("vault", script_type="ad")["hits"][0]["kind"] == "scene"
+        assert writing_engine.search_scripts(kind="scene", location=" casino  vault")["total"] == 1
+        assert writing_engine.search_scripts("coffee", genre="thriller")["total"] == 0
+
+        with pytest.raises(ValueError):
+            writing_engine.search_scripts("vault", facets=["mood"])
+
+    async def test_incremental_updates(self, writing_engine, scripts):
+        """Test edits re-index only the changed scene"""
+        heist, ad = scripts
+        writing_engine.search_scripts("vault")
+        scene = heist.scenes[0]
+        await writing_engine.update_dialogue(
+            heist.script_id, scene.scene_id, scene.dialogues[0].dialogue_id, text="Take the emeralds"
+        )
+
+        assert writing_engine.search_scripts("emeralds")["total"] == 1
+        assert writing_engine.search.indexed == 1
+        assert writing_engine.search_scripts("diamonds")["total"] == 0
+
+        del writing_engine.scripts[ad.script_id]
+        assert writing_engine.search_scripts("coffee")["total"] == 0
+        assert writing_engine.search.indexed == 0
+
+    async def test_saved_index_is_adopted(self, writing_engine, scripts, tmp_path):
+        """Test a loaded segment serves unchanged scripts without re-indexing"""
+        from src.engines.writing_engine import WritingEngine
+
+        heist, ad = scripts
+        path = str(tmp_path / "scripts.idx")
+        assert writing_engine.save_search_index(path) == 2 + 2 + 3
+
+        restarted = WritingEngine()
+        restarted.scripts = dict(writing_engine.scripts)
+        restarted.load_search_index(path)
+        assert restarted.search_scripts("diamonds")["total"] == 1
+        assert restarted.search.indexed == 0
+
+        await restarted.add_dialogue(ad.script_id, ad.scenes[0].scene_id, "DEV", "Fresh diamonds")
+        assert restarted.search_scripts("diamonds")["total"] == 2
+        assert restarted.search.indexed == 1
@@ -0,0 +1,121 @@
+"""
+Unit Tests for Script Variants
+Tests concurrent best-of-N drafts, local scoring and early termination
+"""
+import asyncio
+import pytest
+
+BALANCED = """Title: Take
+
+INT. KITCHEN - NIGHT
+
+Rain on the window.
+
+MARA
+We leave at dawn.
+
+DEV
+Then we pack tonight.
+
+MARA
+Light bags only.
+
+DEV
+Fine.
+"""
+
+MONOLOGUE = """INT. KITCHEN - NIGHT
+
+MARA
+We leave at dawn.
+
+MARA
+Nobody follows.
+"""
+
+
+class FakeClient:
+    """Async OpenAI-style client: the draft and its latency depend on the seed"""
+
+    def __init__(self, drafts):
+        self.drafts = drafts  # seed -> (latency, text)
+        self.started = []
+        self.finished = []
+        self.chat = self
+        self.completions = self
+
+    async def create(self, seed, **kwargs):
+        self.started.append(seed)
+        latency, text = self.drafts[seed]
+        await asyncio.sleep(latency)
+        self.finished.append(seed)
+        return type("Result", (), {"choices": [
+            type("Choice", (), {"message": type("Message", (), {"content": text})})
+        ]})
+
+
+@pytest.mark.unit
+class TestScriptVariants:
+    """Test suite for best-of-N draft generation"""
+
+    def make_engine(self, drafts):
+        from src.engines.writing_engine import WritingEngine
+        from src.services.llm_gateway import LLMGateway, ClientProvider
+        from src.utils.metrics import MetricsRegistry
+
+        client = FakeClient(drafts)
+        gateway = LLMGateway({"default": ClientProvider(client, max_concurrency=8)}, registry=MetricsRegistry())
+        return WritingEngine(llm_gateway=gateway), client
+
+    def test_scores(self):
+        """Test the cheap heuristics"""
+        from src.engines.script_variants import pacing_score, structure_score, dialogue_balance
+
+        assert pacing_score(60, 60) == 1.0 and pacing_score(90, 60) == 0.5 and pacing_score(200, 60) == 0.0
+        assert structure_score({"valid": True, "warnings": ["x"]}) == pytest.approx(0.9)
+        assert structure_score({"valid": False}) == 0.0
+        assert dialogue_balance({"A": 3, "B": 3}) == pytest.approx(1.0)
+        assert 0 < dialogue_balance({"A": 9, "B": 1}) < 0.5
+        assert dialogue_balance({"A": 4}) == 0.0
+
+    async def test_ranked_drafts_in_parallel(self):
+        """Test N drafts run concurrently and come back best first"""
+        engine, client = self.make_engine({0: (0.05, MONOLOGUE), 1: (0.05, BALANCED), 2: (0.05, "Not a script")})
+
+        start = asyncio.get_running_loop().time()
+        variants = await engine.generate_variants("A couple plans an escape", n=3)
+        assert asyncio.get_running_loop().time() - start < 0.12
+
+        assert [v.sample for v in variants] == [1, 0, 2]
+        assert variants[0].scores["dialogue_balance"] == pytest.approx(1.0)
+        assert variants[0].script.scenes[0].location == "KITCHEN"
+        assert variants[0].score > variants[1].score > variants[2].score
+        assert engine.scripts == {}
+
+    async def test_early_termination_cancels_slow_drafts(self):
+        """Test generation stops once enough good drafts arrive"""
+        drafts = {0: (0.01, BALANCED), 1: (0.02, BALANCED)}
+        drafts.update({seed: (5.0, BALANCED) for seed in range(2, 6)})
+        engine, client = self.make_engine(drafts)
+
+        variants = await asyncio.wait_for(
+            engine.generate_variants("Escape", n=6, enough=2, min_score=0.7), timeout=1
+        )
+        assert [v.sample for v in variants] == [0, 1]
+        assert sorted(client.finished) == [0, 1]
+        await asyncio.sleep(0)  # Done callbacks of the cancelled fetches
+        assert engine.llm_gateway.in_flight == {} and engine.llm_gateway.waiters == {}
+
+    async def test_scene_takes_use_story_context(self):
+        """Test alternative takes of a scene are scored against its duration"""
+        from src.engines.writing_engine import SceneType
+
+        engine, client = self.make_engine({0: (0.0, BALANCED), 1: (0.0, MONOLOGUE)})
+        script = engine.generate_script("Escape", title="Dawn")
+        scene = await engine.add_scene(script.script_id, 1, SceneType.INT, "Kitchen", "They argue.")
+
+        variants = await engine.generate_variants(n=2, script_id=script.script_id, scene_id=scene.scene_id)
+        assert variants[0].sample == 0 and variants[0].scores["pacing"] == 1.0
+
+        with pytest.raises(ValueError):
+            await engine.generate_variants(n=2)
@@ -0,0 +1,149 @@
+"""
+Unit Tests for Script Versioning
+Tests structural sharing between revisions, scene-level diffs and delta storage
+"""
+import io
+import json
+import pytest
+
+
+@pytest.mark.unit
+class TestScriptVersions:
+    """Test suite for structurally shared script revisions"""
+
+    @pytest.fixture
+    def writing_engine(self):
+        from src.engines.writing_engine import WritingEngine
+        return WritingEngine()
+
+    @pytest.fixture
+    def script(self, writing_engine):
+        from src.engines.writing_engine import Dialogue, Scene, SceneType, Script, ScriptType
+
+        scenes = []
+        for n in range(1, 201):
+            scene = Scene(scene_number=n, scene_type=SceneType.INT, location=f"ROOM {n}", description="Quiet.")
+            scene.dialogues = [
+                Dialogue(character_id="MARA", text=f"Line {i}", scene_id=scene.scene_id, line_number=i)
+                for i in range(1, 4)
+            ]
+            scenes.append(scene)
+        script = Script(title="Versions", script_type=ScriptType.FILM, scenes=scenes)
+        writing_engine.scripts[script.script_id] = script
+        return script
+
+    def test_unchanged_scenes_are_shared(self, writing_engine, script):
+        """Test a revision only copies edited scenes and lines"""
+        first = writing_engine.commit_script(script.script_id, notes="draft 1")
+        script.scenes[5].description = "Loud."
+        script.scenes[7].dialogues[1].text = "Changed line"
+        second = writing_engine.commit_script(script.script_id, notes="draft 2")
+
+        assert first.changed_scenes == 200 and second.changed_scenes == 2
+        old = writing_engine.versions.get(first.version_id).scenes
+        new = writing_engine.versions.get(second.version_id).scenes
+        assert sum(a is b for a, b in zip(old, new)) == 198
+        assert old[7].scene.dialogues[0] is new[7].scene.dialogues[0]
+        assert old[7].scene.dialogues[1] is not new[7].scene.dialogues[1]
+        assert [v.version_id for v in writing_engine.list_script_versions(script.script_id)] == \
+            [first.version_id, second.version_id]
+
+    def test_revisions_are_isolated_from_edits(self, writing_engine, script):
+        """Test editing the working copy or a materialized copy never changes a revision"""
+        revision = writing_engine.commit_script(script.script_id)
+        script.scenes[0].dialogues[0].text = "Edited after commit"
+        copy = writing_engine.get_script_version(revision.version_id)
+        copy.scenes[0].characters.append("BOB")
+
+        restored = writing_engine.restore_script_version(script.script_id, revision.version_id)
+        assert restored.scenes[0].dialogues[0].text == "Line 1"
+        assert restored.scenes[0].characters == []
+        assert writing_engine.scripts[script.script_id] is restored
+
+    async def test_create_script_version_does_not_alias(self, writing_engine, script):
+        """Test new versions are independent copies sharing history with the original"""
+        branch = await writing_engine.create_script_version(script.script_id, "alt ending")
+        branch.scenes[0].description = "Branch only"
+
+        assert script.scenes[0].description == "Quiet."
+        assert branch.version == "1.1"
+        revision = writing_engine.commit_script(branch.script_id)
+        assert revision.parent_version_id == branch.metadata["parent_revision"]
+        assert revision.changed_scenes == 1
+
+    def test_scene_level_diff(self, writing_engine, script):
+        """Test diffs report added, removed, modified and reordered scenes"""
+        from src.engines.writing_engine import Dialogue, Scene, SceneType
+
+        before = writing_engine.commit_script(script.script_id)
+        removed = script.scenes.pop(3)
+        added = Scene(scene_number=201, scene_type=SceneType.EXT, location="ROOF", description="Wind.")
+        script.scenes.append(added)
+        script.scenes[0].location = "HALL"
+        script.scenes[1].dialogues.pop(0)
+        script.scenes[1].dialogues.append(
+            Dialogue(character_id="BOB", text="New", scene_id=script.scenes[1].scene_id, line_number=4)
+        )
+        script.title = "Versions II"
+        after = writing_engine.commit_script(script.script_id)
+
+        diff = writing_engine.diff_script_versions(before.version_id, after.version_id)
+        assert diff.header_fields == ["title"]
+        assert diff.scenes_added == [added.scene_id]
+        assert diff.scenes_removed == [removed.scene_id]
+        changes = {c.scene_id: c for c in diff.scenes_modified}
+        assert changes[script.scenes[0].scene_id].fields == ["location"]
+        assert len(changes[script.scenes[1].scene_id].dialogues_added) == 1
+        assert len(changes[script.scenes[1].scene_id].dialogues_removed) == 1
+        assert not diff.reordered
+
+        script.scenes[0], script.scenes[1] = script.scenes[1], script.scenes[0]
+        swapped = writing_engine.commit_script(script.script_id)
+        diff = writing_engine.diff_script_versions(after.version_id, swapped.version_id)
+        assert diff.reordered and not diff.scenes_modified
+        assert writing_engine.diff_script_versions(after.version_id, after.version_id).is_empty
+
+    def test_delta_history_round_trip(self, writing_engine, script):
+        """Test the delta format stores only changes and reloads identical revisions"""
+        from src.engines.writing_engine import WritingEngine
+
+        versions = [writing_engine.commit_script(script.script_id)]
+        for n in range(1, 20):
+            script.scenes[n].description = f"Revision {n}"
+            versions.append(writing_engine.commit_script(script.script_id))
+
+        out = io.StringIO()
+        assert writing_engine.save_script_history(script.script_id, out) == 20
+        lines = out.getvalue().splitlines()
+        assert len(lines) == 21
+        assert all(len(json.loads(line)["scenes"]) == 1 for line in lines[2:])
+        assert len(lines[2]) < len(lines[1]) / 50
+
+        other = WritingEngine()
+        loaded = other.load_script_history(io.StringIO(out.getvalue()))
+        assert [v.version_id for v in loaded] == [v.version_id for v in versions]
+        for version in (versions[0], versions[-1]):
+            assert other.get_script_version(version.version_id).model_dump() == \
+                writing_engine.get_script_version(version.version_id).model_dump()
+        first, last = (other.versions.get(v.version_id).scenes for v in (versions[0], versions[-1]))
+        assert first[100] is last[100]
+
+    def test_delta_history_round_trip_without_scenes(self, writing_engine, script):
+        """Test an empty script and a remove-every-scene revision reload as empty"""
+        from src.engines.writing_engine import WritingEngine
+
+        empty = writing_engine.generate_script("A blank page", title="Empty")
+        writing_engine.commit_script(empty.script_id)
+        full = writing_engine.commit_script(script.script_id)
+        script.scenes.clear()
+        cleared = writing_engine.commit_script(script.script_id)
+
+        other = WritingEngine()
+        for script_id in (empty.script_id, script.script_id):
+            out = io.StringIO()
+            writing_engine.save_script_history(script_id, out)
+            other.load_script_history(io.StringIO(out.getvalue()))
+
+        assert other.get_script_version(writing_engine.versions.history[empty.script_id][0]).scenes == []
+        assert len(other.get_script_version(full.version_id).scenes) == 200
+        assert other.get_script_version(cleared.version_id).scenes == []
@@ -0,0 +1,158 @@
+"""
+Unit Tests for API Serialization Utilities
+Tests sparse fieldsets, sub-collection slicing and streaming JSON encoding
+"""
+import pytest
+import json
+import asyncio
+
+
+@pytest.mark.unit
+class TestSerialization:
+    """Test suite for projection and incremental encoding"""
+
+    @pytest.fixture
+    def writing_engine(self):
+        """Writing engine with one populated script"""
+        from src.engines.writing_engine import WritingEngine, SceneType
+        engine = WritingEngine()
+        script = engine.generate_script("A heist in a rainy city", title="Rain Heist")
+
+        async def populate():
+            for i in range(5):
+                scene = await engine.add_scene(
+                    script.script_id, i + 1, SceneType.INT, f"VAULT {i}", f"Scene {i}"
+                )
+                for j in range(3):
+                    scene.dialogues.append(engine_dialogue(scene.scene_id, j))
+
+        def engine_dialogue(scene_id, line):
+            from src.engines.writing_engine import Dialogue
+            return Dialogue(character_id="char_a", text=f"Line {line}", scene_id=scene_id, line_number=line + 1)
+
+        asyncio.run(populate())
+        engine.script_id = script.script_id
+        return engine
+
+    def test_parse_field_spec(self):
+        """Test dotted paths become a nested spec"""
+        from src.utils.serialization import parse_field_spec
+
+        spec = parse_field_spec("title, scenes.location,scenes.dialogues.text")
+        assert spec == {"title": True, "scenes": {"location": True, "dialogues": {"text": True}}}
+        assert parse_field_spec("") is None
+        assert parse_field_spec("scenes,scenes.location") == {"scenes": True}
+
+    def test_streamed_json_matches_model_dump(self, writing_engine):
+        """Test the incremental encoder produces the same document as pydantic"""
+        from src.utils.serialization import iter_json_chunks
+
+        script = writing_engine.scripts[writing_engine.script_id]
+        streamed = b"".join(iter_json_chunks(script, chunk_size=128))
+
+        assert json.loads(streamed) == json.loads(script.model_dump_json())
+
+    def test_streamed_json_respects_projection(self, writing_engine):
+        """Test fields, exclude and slices apply to the streamed output"""
+        body = b"".join(writing_engine.iter_script_json(
+            writing_engine.script_id,
+            fields="title,scenes.location,scenes.dialogues",
+            exclude="scenes.dialogues.emotion",
+            scene_offset=1,
+            scene_limit=2,
+            dialogue_limit=1
+        ))
+        data = json.loads(body)
+
+        assert set(data) == {"title", "scenes"}
+        assert [s["location"] for s in data["scenes"]] == ["VAULT 1", "VAULT 2"]
+        assert len(data["scenes"][0]["dialogues"]) == 1
+        assert "emotion" not in data["scenes"][0]["dialogues"][0]
+
+    async def test_get_script_view(self, writing_engine):
+        """Test non-streamed projection matches the streamed one"""
+        view = await writing_engine.get_script_view(
+            writing_engine.script_id, fields="title,scenes.scene_number", scene_limit=3
+        )
+        streamed = json.loads(b"".join(writing_engine.iter_script_json(
+            writing_engine.script_id, fields="title,scenes.scene_number", scene_limit=3
+        )))
+
+        assert view == streamed
+        assert view == {"title": "Rain Heist", "scenes": [{"scene_number": n} for n in (1, 2, 3)]}
+
+    async def test_list_scenes_and_dialogues(self, writing_engine):
+        """Test paginated sub-collections"""
+        scenes = await writing_engine.list_scenes(writing_engine.script_id, offset=4, limit=10)
+        assert scenes["total"] == 5
+        assert len(scenes["items"]) == 1
+
+        lines = await writing_engine.list_dialogues(
+            writing_engine.script_id, offset=2, limit=2, fields="text"
+        )
+        assert lines["total"] == 15
+        assert lines["items"] == [{"text": "Line 2"}, {"text": "Line 0"}]
+
+    def test_negative_offsets_and_limits_rejected(self):
+        """Test script paging parameters are validated rather than sliced"""
+        from fastapi.testclient import TestClient
+        from src.api.main import app, writing_engine
+
+        client = TestClient(app)
+        script_id = writing_engine.generate_script("A short", title="Paged").script_id
+        for path, params in [
+            ("", {"scene_offset": -1}),
+            ("", {"scene_limit": 0}),
+            ("", {"dialogue_limit": -2}),
+            ("/scenes", {"offset": -1}),
+            ("/scenes", {"limit": -5}),
+            ("/dialogues", {"offset": -3}),
+            ("/dialogues", {"limit": 0}),
+        ]:
+            response = client.get(f"/api/v1/scripts/{script_id}{path}", params=params)
+            assert response.status_code == 422, (path, params)
+        assert client.get(f"/api/v1/scripts/{script_id}/scenes", params={"limit": 1}).status_code == 200
+
+    def test_iter_script_json_unknown_script(self, writing_engine):
+        """Test unknown script raises ValueError"""
+        with pytest.raises(ValueError):
+            writing_engine.iter_script_json("missing")
+
+    def test_json_export_import_round_trip(self, writing_engine):
+        """Test the compiled JSON codec round-trips every field"""
+        from src.engines.writing_engine import WritingEngine
+
+        script = writing_engine.scripts[writing_engine.script_id]
+        exported = writing_engine.export_to_json(script)
+        assert json.loads(exported)["scenes"][0]["dialogues"][0]["scene_id"] == script.scenes[0].scene_id
+
+        other = WritingEngine()
+        imported = other.import_from_json(writing_engine.export_to_json(script, indent=None).encode())
+        assert imported == script and other.scripts[script.script_id] is imported
+
+        with pytest.raises(ValueError):
+            other.import_from_json('{"title": "No type"}')
+
+    def test_dict_json_backends_agree(self, monkeypatch):
+        """Test orjson and the pydantic-core fallback encode plain data alike"""
+        from datetime import datetime
+        from src.utils import serialization
+
+        data = {"when": datetime(2024, 5, 1, 12, 30), "items": [1, "two", None], 3: "int key"}
+        fast = serialization.dumps_json(data)
+        monkeypatch.setattr(serialization, "orjson", None)
+        fallback = serialization.dumps_json(data)
+
+        assert json.loads(fast) == json.loads(fallback) == \
+            {"when": "2024-05-01T12:30:00", "items": [1, "two", None], "3": "int key"}
+        assert serialization.loads_json(fallback) == json.loads(fallback)
+
+    def test_msgpack_round_trip(self, writing_engine):
+        """Test the binary codec is smaller than JSON and round-trips"""
+        pytest.importorskip("msgpack")
+        from src.engines.writing_engine import WritingEngine
+
+        script = writing_engine.scripts[writing_engine.script_id]
+        packed = writing_engine.export_to_msgpack(script)
+        assert len(packed) < len(writing_engine.export_to_json(script, indent=None))
+        assert WritingEngine().import_from_msgpack(packed) == script
@@ -0,0 +1,86 @@
+"""
+Unit Tests for Storyboard Pipeline
+Tests bounded fan-out, progressive results and per-revision frame caching
+"""
+import asyncio
+import pytest
+
+
+@pytest.mark.unit
+class TestStoryboardPipeline:
+    """Test suite for concurrent storyboard generation"""
+
+    @pytest.fixture
+    async def writing_engine(self):
+        from src.engines.writing_engine import WritingEngine, SceneType
+
+        engine = WritingEngine()
+        script = engine.generate_script("Chase across rooftops", title="Boards")
+        for n in range(1, 13):
+            await engine.add_scene(script.script_id, n, SceneType.EXT, f"Roof {n}", f"Jump {n}")
+        engine.script_id = script.script_id
+        return engine
+
+    @pytest.fixture
+    def renders(self, writing_engine):
+        """Slow fake renderer recording calls and peak concurrency"""
+        from src.engines.writing_engine import StoryboardFrame
+
+        state = {"calls": [], "active": 0, "peak": 0}
+
+        async def render(scene, style):
+            state["calls"].append(scene.scene_number)
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+            await asyncio.sleep(0.001 * (13 - scene.scene_number))  # Later scenes finish first
+            state["active"] -= 1
+            return [
+                StoryboardFrame(scene_id=scene.scene_id, shot_number=shot, description=scene.description,
+                                visual_style=style)
+                for shot in (1, 2)
+            ]
+
+        writing_engine.storyboards.render = render
+        return state
+
+    async def test_bounded_fan_out_in_script_order(self, writing_engine, renders):
+        """Test concurrency limit and ordered results from generate_storyboard"""
+        writing_engine.storyboards.concurrency = 4
+        frames = await writing_engine.generate_storyboard(writing_engine.script_id, style="noir")
+
+        assert renders["peak"] == 4
+        assert len(frames) == 24 and all(f.visual_style == "noir" for f in frames)
+        script = writing_engine.scripts[writing_engine.script_id]
+        assert [f.scene_id for f in frames[::2]] == [s.scene_id for s in script.scenes]
+
+    async def test_frames_stream_as_scenes_finish(self, writing_engine, renders):
+        """Test the iterator yields in completion order, not script order"""
+        numbers = []
+        scenes = {s.scene_id: s.scene_number for s in writing_engine.scripts[writing_engine.script_id].scenes}
+        async for frame in writing_engine.iter_storyboard(writing_engine.script_id, concurrency=12):
+            numbers.append(scenes[frame.scene_id])
+        assert numbers[:2] == [12, 12] and numbers[-1] == 1
+
+    async def test_cache_by_revision_and_style(self, writing_engine, renders):
+        """Test re-runs regenerate only edited scenes and new styles"""
+        script_id = writing_engine.script_id
+        first = await writing_engine.generate_storyboard(script_id)
+        scene = writing_engine.scripts[script_id].scenes[5]
+        scene.description = "Falls"
+        scene.metadata["note"] = "ignored by storyboards"
+        renders["calls"].clear()
+
+        second = await writing_engine.generate_storyboard(script_id)
+        assert renders["calls"] == [6]
+        assert second[0] is first[0] and second[10].description == "Falls"
+
+        await writing_engine.generate_storyboard(script_id, scene.scene_id, style="anime")
+        assert renders["calls"] == [6, 6]
+
+    async def test_closing_early_cancels_renders(self, writing_engine, renders):
+        """Test abandoning the stream stops outstanding renders"""
+        stream = writing_engine.iter_storyboard(writing_engine.script_id, concurrency=2)
+        await stream.__anext__()
+        await stream.aclose()
+        await asyncio.sleep(0.02)
+        assert len(renders["calls"]) < 12